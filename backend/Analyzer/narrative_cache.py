@@ -0,0 +1,83 @@
+"""
+Cache of finished analyst narratives.
+
+Keyed on (normalized analysis question, analysis domain, hash of the result
+DataFrame's contents), so a repeat analysis of unchanged data skips the LLM
+even when the SQL that produced the frame differed. Current-season data
+that changes produces a different frame hash, so no TTL is needed; the cache
+is bounded by entry count with LRU eviction.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+
+from Interpreter.sql_cache import normalize_question
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Stable hash of a frame's columns, dtypes and values (row order included, index ignored)."""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts) fall back to the text rendering.
+        digest.update(df.to_csv(index=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def narrative_key(question: str, domain: str, df: pd.DataFrame) -> str:
+    parts = (normalize_question(question), domain, dataframe_fingerprint(df))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class NarrativeCache:
+    """Thread-safe LRU of narrative text by ``narrative_key``."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
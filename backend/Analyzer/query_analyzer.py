@@ -2,23 +2,27 @@ import os
 import sys
 import re
 from dataclasses import dataclass
-from typing import Optional, Any, List, Set, Dict
+from typing import Optional, Any, Iterator, List, Set, Dict, Tuple, Union
 from pathlib import Path
 import importlib.util
 
 import numpy as np
 import pandas as pd
 from Interpreter.interpreter import run_query
+from Analyzer.narrative_cache import NarrativeCache, narrative_key
+from Interpreter.llm_gateway import get_llm_gateway
+from Interpreter.question_features import question_features
 
 from dotenv import load_dotenv
-from openai import OpenAI
 
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(
-    api_key=api_key,
-    base_url="https://us.api.openai.com/v1"
-)
+client = get_llm_gateway()
+# Finished narratives by (question, domain, result-data hash); see Analyzer.narrative_cache.
+_narrative_cache = NarrativeCache(max_entries=int(os.getenv("NARRATIVE_CACHE_MAX_ENTRIES", "512")))
+
+
+def narrative_cache_stats() -> dict:
+    return _narrative_cache.stats()
 
 
 def _resolve_user_input(module: Optional[Any]) -> Optional[str]:
@@ -298,7 +302,7 @@ def compute_scores(df: pd.DataFrame, cfg: ScoreConfig) -> pd.DataFrame:
 
 
 def infer_domain(user_q: str, cols: List[str]) -> str:
-    uq = (user_q or "").lower()
+    uq = question_features(user_q).lowered
     txt = " ".join(cols).lower()
 
     if any(k in uq for k in ["team", "franchise", "standings", "winrate"]) or any(
@@ -425,15 +429,8 @@ def _build_simple_top_scorers_prompts(question: str, rows_to_show: pd.DataFrame)
 
 
 def _extract_requested_top_n(question: str, default_n: int = 5, max_n: int = 50) -> int:
-    q = (question or "").lower()
-    match = re.search(r"\b(top|best|leading|worst|bottom|lowest)\s+(\d{1,3})\b", q)
-    if not match:
-        return default_n
-    try:
-        n = int(match.group(2))
-    except Exception:
-        return default_n
-    if n < 1:
+    n = question_features(question).top_n
+    if n is None or n < 1:
         return default_n
     return min(n, max_n)
 
@@ -686,7 +683,8 @@ def _format_single_player_season_trend_response(df: pd.DataFrame, question: str,
                 f"Data: {trend_data}"
             )
 
-            resp = client.chat.completions.create(
+            resp = client.chat_completion(
+                "analysis_trend",
                 model="gpt-5.4-mini",
                 messages=[
                     {"role": "system", "content": trend_system},
@@ -694,6 +692,7 @@ def _format_single_player_season_trend_response(df: pd.DataFrame, question: str,
                 ],
                 temperature=0.3,
                 max_completion_tokens=300,
+                prompt_cache_key="analysis_trend",
             )
             summary = (resp.choices[0].message.content or "").strip()
         except Exception:
@@ -849,7 +848,8 @@ def _generate_natural_player_season_summary(
     )
 
     try:
-        resp = client.chat.completions.create(
+        resp = client.chat_completion(
+            "analysis_season",
             model="gpt-5.4-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -857,6 +857,7 @@ def _generate_natural_player_season_summary(
             ],
             temperature=0.3,
             max_completion_tokens=400,
+            prompt_cache_key="analysis_season",
         )
         txt = (resp.choices[0].message.content or "").strip()
         return txt if txt else None
@@ -1537,7 +1538,8 @@ def _format_spatial_shots_narrative(df: pd.DataFrame, question: str, client: Any
     )
     user_prompt = f"Question:\n{question}\n\n{summary}\n\nAnswer in a relaxed, broadcast tone."
     try:
-        resp = client.chat.completions.create(
+        resp = client.chat_completion(
+            "analysis_shots",
             model="gpt-5.4-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1545,6 +1547,7 @@ def _format_spatial_shots_narrative(df: pd.DataFrame, question: str, client: Any
             ],
             temperature=0.75,
             max_completion_tokens=900,
+            prompt_cache_key="analysis_shots",
         )
         raw = (resp.choices[0].message.content or "").strip()
         formatted = raw.replace("###", "\n\n###").replace("####", "\n\n####")
@@ -1566,13 +1569,73 @@ def analyze_question(question: str) -> str:
     return analyze_question_with_data(question, df)
 
 
+@dataclass
+class _NarrativePlan:
+    """Prompts for the general analyst narrative, shared by the blocking and streaming paths."""
+    system_prompt: str
+    user_prompt: str
+    df_summary: str
+    is_comparison: bool
+    entity_singular: str
+    entity_noun: str
+    cache_key: str
+
+
 def analyze_question_with_data(question: str, df: pd.DataFrame) -> str:
     """
     Analyze a pre-fetched DataFrame directly without re-running any query.
     This is called from main.py after run_query() has already succeeded,
     so we never run the query twice or trigger a false empty-result error.
     """
+    plan = _plan_analysis(question, df)
+    if isinstance(plan, str):
+        return plan
+    cached = _narrative_cache.get(plan.cache_key)
+    if cached is not None:
+        return cached
+    try:
+        response = client.chat_completion("analysis_narrative", **_narrative_request(plan))
+        raw_response = _retry_short_comparison(plan, response.choices[0].message.content.strip())
+        narrative = _format_narrative(raw_response)
+        _narrative_cache.put(plan.cache_key, narrative)
+        return narrative
+    except Exception as e:
+        return f"Error during AI analysis: {str(e)}"
+
+
+def stream_analysis_with_data(question: str, df: pd.DataFrame) -> Iterator[Tuple[str, str]]:
+    """
+    Streaming variant of analyze_question_with_data for the SSE endpoint.
 
+    Yields ("token", delta) pairs while the general narrative is generated,
+    then one ("analysis", text) with the final formatted answer (which may be
+    a comparison retry). Cached narratives, deterministic formatters and the
+    short specialized LLM answers have nothing worth streaming and yield only
+    ("analysis", text). Failures yield ("error", message).
+    """
+    plan = _plan_analysis(question, df)
+    if isinstance(plan, str):
+        yield "analysis", plan
+        return
+    cached = _narrative_cache.get(plan.cache_key)
+    if cached is not None:
+        yield "analysis", cached
+        return
+    parts: List[str] = []
+    try:
+        for delta in client.stream_chat_completion("analysis_narrative", **_narrative_request(plan)):
+            parts.append(delta)
+            yield "token", delta
+        raw_response = _retry_short_comparison(plan, "".join(parts).strip())
+        narrative = _format_narrative(raw_response)
+        _narrative_cache.put(plan.cache_key, narrative)
+        yield "analysis", narrative
+    except Exception as e:
+        yield "error", f"Error during AI analysis: {str(e)}"
+
+
+def _plan_analysis(question: str, df: pd.DataFrame) -> Union[str, _NarrativePlan]:
+    """Finished answer text for the short-circuit paths, else the narrative prompts."""
 
     if df is None or df.empty:
         return (
@@ -1728,10 +1791,10 @@ def analyze_question_with_data(question: str, df: pd.DataFrame) -> str:
             f"Analyze the top result and compare to the next strongest contenders in a natural, engaging format.{per_note}"
         )
     else:
+        # Static instructions only; domain guidance rides in the user message so
+        # the system prompt stays a cacheable prefix.
         system_prompt = (
             "You are an expert NBA analyst providing insightful, narrative-driven analysis.\n\n"
-            f"Domain: {domain}\n"
-            f"Guidance: {rubric_by_domain.get(domain, '')}\n\n"
             "Adapt your formatting to best answer the specific question asked.\n"
             "- For a simple stat check, provide a concise, direct answer.\n"
             "- For complex questions, use engaging paragraphs and bold text for emphasis.\n"
@@ -1750,6 +1813,8 @@ def analyze_question_with_data(question: str, df: pd.DataFrame) -> str:
             system_prompt += "\n\nNote: Data comes from game-by-game logs. Focus your narrative on recent form, splits, streaks, or single-game anomalies."
 
         user_prompt = (
+            f"Domain: {domain}\n"
+            f"Guidance: {rubric_by_domain.get(domain, '')}\n\n"
             f"User's question: {question}\n\n"
             f"Data:\n{df_summary}{per_note}\n"
             "Analyze the data and answer the question in a fluid, engaging sports-analyst style."
@@ -1775,50 +1840,65 @@ def analyze_question_with_data(question: str, df: pd.DataFrame) -> str:
                 f"Cover each {comparison_entity_singular}'s stats, where each has an edge, and end with a verdict."
             )
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-5.4-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0,
-            max_completion_tokens=1600,
-        )
-        raw_response = response.choices[0].message.content.strip()
-        
-        # RETRY: if the response is suspiciously short for a comparison
-        # (under 150 chars when we have 2+ players), the model likely
-        # ignored the comparison directive. Retry with higher temperature
-        # and an even more forceful prompt.
-        if is_comparison and len(raw_response) < 150:
-            retry_prompt = (
-                f"Your previous response was too short and only mentioned one {comparison_entity_singular}. "
-                f"The user asked to COMPARE multiple {comparison_entity_noun}. Here is the data again:\n\n"
-                f"{df_summary}\n\n"
-                f"Write a FULL comparison covering EACH {comparison_entity_singular}'s stats, their relative "
-                f"strengths, and a clear verdict on who performed better. "
-                f"Minimum 4 sentences."
-            )
-            retry_response = client.chat.completions.create(
-                model="gpt-5.4-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                    {"role": "assistant", "content": raw_response},
-                    {"role": "user", "content": retry_prompt},
-                ],
-                temperature=0.3,
-                max_completion_tokens=1600,
-            )
-            retry_text = retry_response.choices[0].message.content.strip()
-            if len(retry_text) > len(raw_response):
-                raw_response = retry_text
+    return _NarrativePlan(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        df_summary=df_summary,
+        is_comparison=is_comparison,
+        entity_singular=comparison_entity_singular,
+        entity_noun=comparison_entity_noun,
+        cache_key=narrative_key(question, domain, df),
+    )
 
-        formatted_response = raw_response.replace("###", "\n\n###").replace("####", "\n\n####")
-        return "\n" + formatted_response.strip()
-    except Exception as e:
-        return f"Error during AI analysis: {str(e)}"
+
+def _narrative_request(plan: _NarrativePlan) -> Dict[str, Any]:
+    return dict(
+        model="gpt-5.4-mini",
+        messages=[
+            {"role": "system", "content": plan.system_prompt},
+            {"role": "user", "content": plan.user_prompt},
+        ],
+        temperature=0,
+        max_completion_tokens=1600,
+        prompt_cache_key="analysis_narrative",
+    )
+
+
+def _retry_short_comparison(plan: _NarrativePlan, raw_response: str) -> str:
+    # RETRY: if the response is suspiciously short for a comparison
+    # (under 150 chars when we have 2+ players), the model likely
+    # ignored the comparison directive. Retry with higher temperature
+    # and an even more forceful prompt.
+    if not plan.is_comparison or len(raw_response) >= 150:
+        return raw_response
+    retry_prompt = (
+        f"Your previous response was too short and only mentioned one {plan.entity_singular}. "
+        f"The user asked to COMPARE multiple {plan.entity_noun}. Here is the data again:\n\n"
+        f"{plan.df_summary}\n\n"
+        f"Write a FULL comparison covering EACH {plan.entity_singular}'s stats, their relative "
+        f"strengths, and a clear verdict on who performed better. "
+        f"Minimum 4 sentences."
+    )
+    retry_response = client.chat_completion(
+        "analysis_narrative_retry",
+        model="gpt-5.4-mini",
+        messages=[
+            {"role": "system", "content": plan.system_prompt},
+            {"role": "user", "content": plan.user_prompt},
+            {"role": "assistant", "content": raw_response},
+            {"role": "user", "content": retry_prompt},
+        ],
+        temperature=0.3,
+        max_completion_tokens=1600,
+        prompt_cache_key="analysis_narrative",
+    )
+    retry_text = retry_response.choices[0].message.content.strip()
+    return retry_text if len(retry_text) > len(raw_response) else raw_response
+
+
+def _format_narrative(raw_response: str) -> str:
+    formatted_response = raw_response.replace("###", "\n\n###").replace("####", "\n\n####")
+    return "\n" + formatted_response.strip()
 
 if __name__ == "__main__":
     import argparse
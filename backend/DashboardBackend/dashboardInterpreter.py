@@ -1,9 +1,12 @@
+import functools
 import logging
 import os
 import json
-from psycopg2.extras import RealDictCursor
-from Executer.executor import get_connection
-from openai import OpenAI
+from Executer.executor import get_schema_catalog, pooled_connection
+from Executer.player_index import get_player_index, rewrite_player_name_filters_to_ids
+from Executer.streaming import default_max_rows, stream_query
+from Interpreter.llm_gateway import get_llm_gateway
+from Interpreter.question_features import question_features
 from typing import Dict, List, Any, Tuple, Optional
 from dotenv import load_dotenv
 import re
@@ -16,8 +19,7 @@ if api_key_env:
     logger.debug("OpenAI API key loaded from environment")
 else:
     logger.warning("OPENAI_API_KEY is not set")
-client = OpenAI(api_key=api_key_env,
-                base_url="https://us.api.openai.com/v1")
+client = get_llm_gateway()
 
 # Database schema info for GPT
 DATABASE_SCHEMA = """
@@ -128,7 +130,10 @@ OUTPUT SHAPE RULES (VERY IMPORTANT):
 """
 
 
+@functools.lru_cache(maxsize=1)
 def build_system_prompt() -> str:
+    # Fully static: it is the cached prefix of every dashboard call, so no
+    # per-request values belong here (they go in the hint message after it).
     return f"""You are an NBA analytics assistant.
 {DATABASE_SCHEMA}
 
@@ -488,74 +493,10 @@ ALLOWED_CHART_TYPES = {
 RADAR_KEYS = {"PTS", "AST", "REB", "STL", "BLK"}
 
 
-def _extract_names_heuristic(q: str) -> List[str]:
-    # Strip possessives so "LeBron's" doesn't truncate the next word.
-    cleaned_q = re.sub(r"['\u2019]s\b", "", q)
-    # Strip leading verb phrases like "Compare", "Show me", "Plot", "Tell me"
-    # at the START of the question so they don't get glued to a real player name
-    # (e.g. "Compare LeBron and KD" must extract "LeBron" not "Compare LeBron").
-    # We do this only at sentence start to avoid mangling mid-sentence content.
-    cleaned_q = re.sub(
-        r"^\s*(?:please\s+)?"
-        r"(?:can\s+you\s+|could\s+you\s+|would\s+you\s+)?"
-        r"(?:please\s+)?"
-        r"(?:show\s+me|show|tell\s+me|tell|give\s+me|give|"
-        r"compare|plot|graph|chart|display|find|fetch|get|pull\s+up|pull|"
-        r"how\s+(?:has|did|does|do)|how\s+many|how\s+much|"
-        r"who(?:'s|\s+is|\s+was|\s+are|\s+were|\s+had)?|"
-        r"what(?:'s|\s+is|\s+are|\s+were|\s+was)?|"
-        r"where\s+(?:is|are|was|were|does|do|did)?|"
-        r"when\s+(?:is|are|was|were|does|do|did)?|"
-        r"which|let\s+me\s+see|i\s+want\s+to\s+see)\b",
-        "",
-        cleaned_q,
-        flags=re.IGNORECASE,
-    )
-    # Allow internal capitals (LeBron, McGrady, DeRozan, O'Neal etc.).
-    name_token = r"[A-Z][A-Za-z][A-Za-z\-']*"
-    candidates = re.findall(rf"\b{name_token}(?:\s+{name_token}){{0,2}}\b", cleaned_q)
-    blacklist = {
-        "Top", "Show", "Compare", "Vs", "Versus", "Skill", "Profile", "Points",
-        "Assists", "Rebounds", "Playoffs", "Regular", "Season", "Last", "Games",
-        "Trend", "Leaderboard", "Heat", "Shot", "Chart", "Map", "Best", "Worst",
-        "Shooting", "Zones", "Selection",
-        # Common verbs / question-words at sentence start.
-        "Tell", "Give", "Make", "Create", "Build", "Find",
-        "When", "Where", "Why", "How", "What", "Who",
-        # Acronyms / stat tokens that look like names but aren't
-        "PPG", "RPG", "APG", "SPG", "BPG", "MPG",
-        "FG", "FGM", "FGA", "FT", "FTM", "FTA",
-        "TS", "EFG", "USG", "PER", "PIE", "VORP", "BPM",
-        "PTS", "REB", "AST", "STL", "BLK", "TOV",
-        "NBA", "MVP", "DPOY", "ROY",
-        # Months (so "March 2024" doesn't become a "name")
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December",
-        # NBA team mascots — so "vs the Celtics" doesn't extract "Celtics" as a player.
-        "Hawks", "Celtics", "Nets", "Hornets", "Bulls", "Cavaliers", "Cavs",
-        "Mavericks", "Mavs", "Nuggets", "Pistons", "Warriors", "Rockets",
-        "Pacers", "Clippers", "Lakers", "Grizzlies", "Heat", "Bucks",
-        "Timberwolves", "Wolves", "Pelicans", "Knicks", "Thunder",
-        "Magic", "Sixers", "Suns", "Blazers", "Trail", "Kings",
-        "Spurs", "Raptors", "Jazz", "Wizards",
-        # Other noise tokens
-        "Plot", "Graph", "Distribution", "Scatter",
-    }
-    out = []
-    seen = set()
-    for c in candidates:
-        # Single-word candidates that exactly match a blacklist word are noise.
-        if " " not in c and c in blacklist:
-            continue
-        if c in seen:
-            continue
-        seen.add(c)
-        out.append(c)
-    return out
-
-
 def _intent_hint(user_question: str) -> Dict[str, Any]:
-    q = user_question.lower()
+    features = question_features(user_question)
+    q = features.lowered
+    names = list(features.names)
     hint: Dict[str, Any] = {}
 
     # ─────────────────────────────────────────────────────────────────────
@@ -603,15 +544,14 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
     # comparison, not a shot map. We require multi-word names ("LeBron James")
     # because single-token candidates may be artifacts of split possessives like
     # "Shaquille O'Neal" → ["Shaquille", "Neal"].
-    def _multi_word_player_count(question: str) -> int:
-        return sum(1 for n in _extract_names_heuristic(question) if " " in n.strip())
+    multi_word_player_count = sum(1 for n in names if " " in n.strip())
 
-    if is_shotchart and _multi_word_player_count(user_question) >= 2:
+    if is_shotchart and multi_word_player_count >= 2:
         is_shotchart = False
 
     # Compare/comparison of shot stats with two players → CompareStats, not ShotChart.
     if is_shotchart and ("compare" in q or " versus " in q):
-        if _multi_word_player_count(user_question) >= 2:
+        if multi_word_player_count >= 2:
             is_shotchart = False
 
     if is_shotchart:
@@ -634,7 +574,7 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
         else:
             hint["suggestedMode"] = "volume"
 
-        hint["guessedNames"] = _extract_names_heuristic(user_question)[:4]
+        hint["guessedNames"] = names[:4]
         return hint
 
     # Not a shot chart
@@ -673,7 +613,6 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
         """'compare X and Y' or 'compare X vs Y' where X, Y are stat words."""
         if "compare" not in question_lower:
             return False
-        names = _extract_names_heuristic(user_question)
         # If we found 2+ player names, it's a player comparison, not scatter.
         if len(names) >= 2:
             return False
@@ -691,7 +630,6 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
         if "graph " in question_lower and (" against " in question_lower or " vs " in question_lower):
             return True
         # 3) "X vs/against Y" with stat words on both sides (no players)
-        names = _extract_names_heuristic(user_question)
         has_vs = (" vs " in question_lower or " versus " in question_lower
                   or " against " in question_lower)
         if has_vs and len(names) <= 1:
@@ -751,8 +689,8 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
     # language is present and at least two years are mentioned.
     repeated_name_radar = (
         is_profile
-        and len(_extract_names_heuristic(user_question)) == 1
-        and len(re.findall(r"\b(19\d{2}|20\d{2})\b", user_question)) >= 2
+        and len(names) == 1
+        and len(features.years) >= 2
     )
     if repeated_name_radar:
         is_compare = True
@@ -785,7 +723,7 @@ def _intent_hint(user_question: str) -> Dict[str, Any]:
     # Detect multi-player trend (2+ names + trend marker)
     # IMPORTANT: bare "from "/" to " no longer counts — that fires on
     # single-player trends too. Require an actual trend keyword.
-    guessed_names = _extract_names_heuristic(user_question)[:4]
+    guessed_names = names[:4]
     is_multi_player_trend = len(guessed_names) >= 2 and is_trend
 
     if any(w in q for w in ["against ", "vs the"]):
@@ -973,11 +911,13 @@ Still follow the main schema exactly, and only output valid JSON."""
 
     messages.append({"role": "user", "content": user_question})
 
-    response = client.chat.completions.create(
+    response = client.chat_completion(
+        "dashboard",
         model="gpt-5.4-mini",
         messages=messages,
         temperature=0.1,
-        response_format={"type": "json_object"}
+        response_format={"type": "json_object"},
+        prompt_cache_key="dashboard",
     )
 
     interpretation = json.loads(response.choices[0].message.content)
@@ -1211,8 +1151,32 @@ def _post_process_sql(sql: str, chart_type: str) -> str:
     return sql
 
 
+def _fetch_rows(sql_query: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Stream rows (capped at QUERY_MAX_ROWS) and return them with a truncated flag."""
+    # Borrow only around execution so LLM latency never holds a pooled connection.
+    with pooled_connection() as conn:
+        try:
+            id_sql = rewrite_player_name_filters_to_ids(
+                sql_query, get_player_index(conn), get_schema_catalog(conn)
+            )
+            result = None
+            if id_sql != sql_query:
+                # player_id lookups hit the index; ILIKE stays as the fallback.
+                try:
+                    result = stream_query(conn, id_sql, max_rows=default_max_rows())
+                except Exception as e:
+                    logger.warning("player_id rewrite failed (%s); retrying with player_name ILIKE", e)
+                    conn.rollback()
+                if result is not None and not result.row_count:
+                    result = None
+            if result is None:
+                result = stream_query(conn, sql_query, max_rows=default_max_rows())
+        finally:
+            conn.rollback()
+    return result.to_records(), result.truncated
+
+
 def interpret_question(user_question: str) -> Dict[str, Any]:
-    conn = None
     try:
         print(f"Analyzing question: {user_question}")
 
@@ -1229,10 +1193,7 @@ def interpret_question(user_question: str) -> Dict[str, Any]:
         print(f"Chart Type: {chart_type}")
         print(f"Generated SQL: {sql_query}")
 
-        conn = get_connection()
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(sql_query)
-            raw_data = cursor.fetchall()
+        raw_data, truncated = _fetch_rows(sql_query)
 
         if not raw_data:
             return {
@@ -1274,9 +1235,7 @@ def interpret_question(user_question: str) -> Dict[str, Any]:
             print(f"[Retry] Chart Type: {chart_type}")
             print(f"[Retry] Generated SQL: {sql_query}")
 
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(sql_query)
-                raw_data = cursor.fetchall()
+            raw_data, truncated = _fetch_rows(sql_query)
 
             if not raw_data:
                 return {
@@ -1344,11 +1303,9 @@ def interpret_question(user_question: str) -> Dict[str, Any]:
             "chartType": chart_type,
             "data": final_data,
             "config": chart_config,
+            "truncated": truncated,
         }
 
     except Exception as e:
         print(f"Error occurred: {e}")
         return {"success": False, "error": str(e)}
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
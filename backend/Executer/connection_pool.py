@@ -0,0 +1,265 @@
+import logging
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    Keeps between ``min_size`` and ``max_size`` open connections so requests
+    reuse an existing TLS session instead of opening a new one on every call.
+    Connections are health-checked on borrow, reset on return, and any
+    checkout held longer than ``leak_seconds`` is logged with the stack that
+    borrowed it.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], "extensions.connection"],
+        min_size: int = 1,
+        max_size: int = 10,
+        checkout_timeout: float = 10.0,
+        ping_after_idle: float = 30.0,
+        max_lifetime: float = 1800.0,
+        leak_seconds: float = 120.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.ping_after_idle = ping_after_idle
+        self.max_lifetime = max_lifetime
+        self.leak_seconds = leak_seconds
+
+        self._cond = threading.Condition()
+        # Idle entries are (conn, created_at, last_used_at).
+        self._idle: deque = deque()
+        # In-use entries are keyed by id(conn): (conn, created_at, checked_out_at, stack).
+        self._in_use: dict = {}
+        self._opening = 0
+        self._closed = False
+        self._reported_leaks: set = set()
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "leaks_detected": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def warm(self) -> None:
+        """Open connections up to ``min_size`` so the first requests skip the handshake."""
+        while True:
+            with self._cond:
+                if self._closed or self._size() >= self.min_size:
+                    return
+                self._opening += 1
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                now = time.monotonic()
+                self._idle.append((conn, now, now))
+                self._cond.notify()
+
+    def getconn(self, timeout: Optional[float] = None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = None
+            must_open = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._report_leaks()
+                while not self._idle and self._size() >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"({len(self._in_use)} in use, max {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    # LIFO keeps the hottest connections in use and lets idle ones age out.
+                    entry = self._idle.pop()
+                else:
+                    self._opening += 1
+                    must_open = True
+
+            if must_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                now = time.monotonic()
+                with self._cond:
+                    self._opening -= 1
+                    self._mark_in_use(conn, now)
+                return conn
+
+            conn, created_at, last_used = entry
+            if self._is_healthy(conn, created_at, last_used):
+                with self._cond:
+                    self._stats["reused"] += 1
+                    self._mark_in_use(conn, created_at)
+                return conn
+
+            self._discard(conn)
+            with self._cond:
+                self._cond.notify()
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            self._reported_leaks.discard(id(conn))
+        if entry is None:
+            logger.warning("Returned a connection that was not checked out from this pool")
+            self._discard(conn)
+            return
+
+        created_at = entry[1]
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._cond.notify()
+                return
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.getconn(timeout=timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken or conn.closed)
+
+    def close_all(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _open(self):
+        conn = self._connect()
+        with self._cond:
+            self._stats["opened"] += 1
+        logger.debug("Opened new pooled database connection")
+        return conn
+
+    def _mark_in_use(self, conn, created_at: float) -> None:
+        stack = "".join(traceback.format_stack(limit=8)[:-2]) if self.leak_seconds else ""
+        self._in_use[id(conn)] = (conn, created_at, time.monotonic(), stack)
+
+    def _is_healthy(self, conn, created_at: float, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            logger.debug("Recycling pooled connection older than %.0fs", self.max_lifetime)
+            return False
+        try:
+            if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if now - last_used >= self.ping_after_idle:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1;")
+                    cursor.fetchone()
+                conn.rollback()
+        except Exception as e:
+            logger.info("Discarding unhealthy pooled connection: %s", e)
+            return False
+        return True
+
+    def _discard(self, conn) -> None:
+        with self._cond:
+            self._stats["discarded"] += 1
+        self._close_quietly(conn)
+
+    def _report_leaks(self) -> None:
+        """Log checkouts held past ``leak_seconds`` once each. Caller holds the lock."""
+        if not self.leak_seconds:
+            return
+        now = time.monotonic()
+        for key, (_, _, checked_out_at, stack) in self._in_use.items():
+            held = now - checked_out_at
+            if held < self.leak_seconds or key in self._reported_leaks:
+                continue
+            self._reported_leaks.add(key)
+            self._stats["leaks_detected"] += 1
+            logger.warning(
+                "Possible connection leak: checked out for %.0fs (threshold %.0fs). Borrowed at:\n%s",
+                held, self.leak_seconds, stack,
+            )
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
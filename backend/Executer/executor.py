@@ -7,18 +7,34 @@ from sqlglot.errors import ParseError
 import json
 import logging
 import os
-from typing import Optional
+from typing import Collection, Optional
+import functools
+import threading
 import time
 
+from Executer.connection_pool import ConnectionPool
+from Executer.plan_cost_cache import CATALOG_STATS_VERSION_SQL, PlanCostCache, sql_fingerprint
+from Executer.schema_catalog import SchemaCatalog, load_snapshot, save_snapshot
+from Executer.streaming import default_max_rows, stream_query
+from Executer.result_cache import ResultCache, is_cacheable_sql, table_refs as _table_refs, ttl_for_tables
 
-_schema_cache: dict = {"value": None, "fetched_at": 0.0}
+
+_schema_cache: dict = {"value": None, "catalog": None, "fetched_at": 0.0}
 _SCHEMA_TTL_SECONDS = 600
+# Catalog snapshot shared by every worker and restart. Override with SCHEMA_SNAPSHOT_PATH.
+_SCHEMA_SNAPSHOT_PATH = os.getenv(
+    "SCHEMA_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "schema_catalog.json"),
+)
+_schema_lock = threading.Lock()
+_schema_refreshing = threading.Event()
 
 # Root logging is configured by the app entrypoint (e.g. Interpreter.interpreter before
 # this import, or uvicorn). Avoid basicConfig here so we do not steal first configuration
 # and hide DEBUG lines in the interpreter.
 logger = logging.getLogger(__name__)
 def get_connection():
+    """Open a new, unpooled connection. Request paths should use pooled_connection()."""
     return psycopg2.connect(
         host=os.environ["POSTGRES_HOST"],
         port=int(os.getenv("POSTGRES_PORT", "5432")),
@@ -26,9 +42,47 @@ def get_connection():
         user=os.environ["POSTGRES_USER"],
         password=os.environ["POSTGRES_PASSWORD"],
         sslmode=os.getenv("POSTGRES_SSLMODE", "require"),
+        keepalives=1,
+        keepalives_idle=int(os.getenv("POSTGRES_KEEPALIVES_IDLE", "60")),
     )
 
 
+# Process-wide pool shared by the interpreter, dashboard and debug routes.
+# Sized via env: POSTGRES_POOL_MIN / POSTGRES_POOL_MAX / POSTGRES_POOL_TIMEOUT /
+# POSTGRES_POOL_PING_AFTER / POSTGRES_POOL_LEAK_SECONDS.
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_connection,
+                    min_size=int(os.getenv("POSTGRES_POOL_MIN", "1")),
+                    max_size=int(os.getenv("POSTGRES_POOL_MAX", "10")),
+                    checkout_timeout=float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+                    ping_after_idle=float(os.getenv("POSTGRES_POOL_PING_AFTER", "30")),
+                    leak_seconds=float(os.getenv("POSTGRES_POOL_LEAK_SECONDS", "120")),
+                )
+    return _pool
+
+
+def pooled_connection(timeout: Optional[float] = None):
+    """Context manager that borrows a connection from the shared pool and returns it on exit."""
+    return get_pool().connection(timeout=timeout)
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
 # 3. Read DB schema (for GPT prompt) — COMPACT + WHITELISTED version
 # Only includes tables the app actually queries. Groups repeated season tables
 # by type and lists columns once. Cuts token usage by ~95% vs the original.
@@ -66,20 +120,105 @@ def _is_heavy_use_table(table_name: str) -> bool:
     return any(re.match(p, table_name) for p in _HEAVY_USE_PATTERNS)
 
 
+def _install_schema_catalog(catalog: SchemaCatalog, fetched_at: float) -> None:
+    description = describe_schema(catalog)
+    with _schema_lock:
+        _schema_cache["catalog"] = catalog
+        _schema_cache["value"] = description
+        _schema_cache["fetched_at"] = fetched_at
+
+
+def _load_schema_snapshot() -> bool:
+    snapshot = load_snapshot(_SCHEMA_SNAPSHOT_PATH)
+    if snapshot is None:
+        return False
+    catalog, fetched_at = snapshot
+    _install_schema_catalog(catalog, fetched_at)
+    logger.info(
+        "Loaded schema snapshot: %d tables, %.0fs old", len(catalog), max(0.0, time.time() - fetched_at)
+    )
+    return True
+
+
+def _rebuild_schema_catalog(conn) -> SchemaCatalog:
+    logger.debug("Fetching database schema catalog (bulk)...")
+    fetched_at = time.time()
+    catalog = SchemaCatalog.load(conn)
+    _install_schema_catalog(catalog, fetched_at)
+    try:
+        save_snapshot(catalog, _SCHEMA_SNAPSHOT_PATH, fetched_at)
+    except OSError as e:
+        logger.warning("Could not write schema snapshot %s: %s", _SCHEMA_SNAPSHOT_PATH, e)
+    return catalog
+
+
+def refresh_schema_catalog(conn) -> SchemaCatalog:
+    """Rebuild the catalog and snapshot now (build steps call this after DDL)."""
+    return _rebuild_schema_catalog(conn)
+
+
+def _refresh_schema_in_background() -> None:
+    """Stale-while-revalidate: rebuild on a pooled connection; at most one refresh runs at a time."""
+    with _schema_lock:
+        if _schema_refreshing.is_set():
+            return
+        _schema_refreshing.set()
+
+    def _run():
+        try:
+            with pooled_connection() as conn:
+                _rebuild_schema_catalog(conn)
+        except Exception as e:
+            logger.warning("Background schema refresh failed; serving previous catalog: %s", e)
+        finally:
+            _schema_refreshing.clear()
+
+    threading.Thread(target=_run, name="schema-refresh", daemon=True).start()
+
+
+def warm_schema_catalog() -> None:
+    """Load the on-disk snapshot (if any) and start a background refresh when it is stale or missing."""
+    if _schema_cache.get("catalog") is None:
+        _load_schema_snapshot()
+    if _schema_cache.get("catalog") is None or time.time() - _schema_cache["fetched_at"] >= _SCHEMA_TTL_SECONDS:
+        _refresh_schema_in_background()
+
+
+def get_schema_catalog(conn) -> SchemaCatalog:
+    """
+    Bulk-loaded catalog of every public table/column/type.
+
+    Served from memory or the on-disk snapshot. Once older than
+    _SCHEMA_TTL_SECONDS it is still returned and a background refresh is
+    started. ``conn`` is only used when no catalog exists anywhere yet.
+    """
+    catalog = _schema_cache.get("catalog")
+    if catalog is None and _load_schema_snapshot():
+        catalog = _schema_cache["catalog"]
+    if catalog is None:
+        return _rebuild_schema_catalog(conn)
+    if time.time() - _schema_cache["fetched_at"] >= _SCHEMA_TTL_SECONDS:
+        _refresh_schema_in_background()
+    return catalog
+
+
 def get_db_schema(conn):
+    get_schema_catalog(conn)
+    return _schema_cache["value"]
 
-    now = time.time()
-    if _schema_cache["value"] and (now - _schema_cache["fetched_at"]) < _SCHEMA_TTL_SECONDS:
-        return _schema_cache["value"]
-    
-    logger.debug("Fetching database schema (tiered)...")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT table_name FROM information_schema.tables
-        WHERE table_schema = 'public' ORDER BY table_name;
-    """)
-    all_tables = [row[0] for row in cursor.fetchall()]
 
+def describe_schema(catalog: SchemaCatalog, sections: Optional[Collection[str]] = None) -> str:
+    """
+    Prompt text for the SQL model, derived from the catalog without further DB calls.
+
+    ``sections`` limits the output to the named parts ("all_players",
+    "nba_advanced", "team_advanced", "nba_standings", "families", or a
+    table name such as "player_game_logs"); None describes everything.
+    """
+    def _wanted(section):
+        return sections is None or section in sections
+
+    all_tables = catalog.table_names()
     heavy = [t for t in all_tables if _is_heavy_use_table(t)]
 
     regular_tables  = sorted(t for t in heavy if re.match(r"all_players_regular_\d{4}_\d{4}$", t))
@@ -99,15 +238,10 @@ def get_db_schema(conn):
     schema_parts = []
 
     def _columns_for(table):
-        cursor.execute(
-            "SELECT column_name FROM information_schema.columns "
-            "WHERE table_name = %s ORDER BY ordinal_position;",
-            (table,),
-        )
-        return ", ".join(c[0] for c in cursor.fetchall())
+        return ", ".join(catalog.columns(table))
 
     # ---- Heavy-use families: full column lists (single sample) ----
-    if regular_tables:
+    if regular_tables and _wanted("all_players"):
         years = []
         for t in regular_tables:
             m = re.match(r"all_players_regular_(\d{4})_(\d{4})$", t)
@@ -119,7 +253,7 @@ def get_db_schema(conn):
             f"Available ({len(regular_tables)}): {', '.join(years)}\n"
         )
 
-    if playoffs_tables:
+    if playoffs_tables and _wanted("all_players"):
         years = []
         for t in playoffs_tables:
             m = re.match(r"all_players_playoffs_(\d{4})_(\d{4})$", t)
@@ -131,7 +265,7 @@ def get_db_schema(conn):
             f"Available ({len(playoffs_tables)}): {', '.join(years)}\n"
         )
 
-    if advanced_tables:
+    if advanced_tables and _wanted("nba_advanced"):
         schema_parts.append(
             "=== Advanced Season Tables ===\n"
             "Pattern: nba_advanced_season_YYYY_YY_season_type_regular_season_per and nba_advanced_season_YYYY_YY_season_type_playoffs_per_mode_p\n"
@@ -139,7 +273,7 @@ def get_db_schema(conn):
             f"Available ({len(advanced_tables)}): {', '.join(advanced_tables)}\n"
         )
 
-    if team_advanced_tables:
+    if team_advanced_tables and _wanted("team_advanced"):
         schema_parts.append(
             "=== Team Advanced Tables ===\n"
             "Pattern: team_advanced_season_YYYY_YY_regular_season_pergame and team_advanced_season_YYYY_YY_playoffs_pergame\n"
@@ -148,7 +282,7 @@ def get_db_schema(conn):
             f"Available ({len(team_advanced_tables)}): {', '.join(team_advanced_tables)}\n"
         )
 
-    if standings_tables:
+    if standings_tables and _wanted("nba_standings"):
         schema_parts.append(
             "=== Team Standings Tables ===\n"
             "Pattern: nba_standings_season_YYYY_YY_leaguestandingsv3\n"
@@ -158,7 +292,8 @@ def get_db_schema(conn):
         )
 
     for t in other_heavy:
-        schema_parts.append(f"{t}({_columns_for(t)})")
+        if _wanted(t):
+            schema_parts.append(f"{t}({_columns_for(t)})")
 
     # ---- Other families: directory only (no columns) ----
     directory_lines = []
@@ -169,7 +304,7 @@ def get_db_schema(conn):
         sample = family[0]
         directory_lines.append(f"  {prefix}* ({len(family)} tables, e.g. {sample})")
 
-    if directory_lines:
+    if directory_lines and _wanted("families"):
         schema_parts.append(
             "=== Other Available Table Families (use intent routing in RULE 0) ===\n"
             "These exist but columns are not pre-loaded to save tokens.\n"
@@ -184,21 +319,21 @@ def get_db_schema(conn):
         "Schema: %d chars | %d heavy-use, %d other-family tables enumerated",
         len(schema_description), len(heavy), sum(1 for t in all_tables if any(t.startswith(p) for p in _OTHER_FAMILY_PREFIXES))
     )
-    _schema_cache["value"] = schema_description
-    _schema_cache["fetched_at"] = now
     return schema_description
 
 
 # 4. SQL safety checker
 # replaced the function is_sql_safe()
-def validate_and_normalize_sql(sql_query: str) -> str:
+def validate_and_normalize_sql(sql_query: str, parsed=None) -> str:
+    """``parsed`` is an already-known postgres tree for exactly ``sql_query``; it skips the re-parse."""
     logger.debug("Validating SQL:\n%s", sql_query)
-    try:
-        # parse SQL to ensure validity
-        parsed = parse_one(sql_query, read="postgres")
+    if parsed is None:
+        try:
+            # parse SQL to ensure validity
+            parsed = parse_one(sql_query, read="postgres")
 
-    except ParseError as e:
-        raise ValueError(f"SQL Syntax Error: {e}")
+        except ParseError as e:
+            raise ValueError(f"SQL Syntax Error: {e}")
 
     #  only SELECT statement
     if parsed.key.upper() != "SELECT":
@@ -236,6 +371,33 @@ def _default_query_plan_cost_cap() -> float:
     return float(os.getenv("QUERY_PLAN_COST_MAX", "2000000").strip())
 
 
+# Plan costs memoized by literal-stripped fingerprint. QUERY_PLAN_COST_SKIP_RATIO
+# sets how far under the cap a fingerprint must be to skip EXPLAIN;
+# QUERY_PLAN_COST_STATS_CHECK_SECONDS how often catalog stats are re-checked.
+_plan_cost_cache = PlanCostCache(
+    skip_ratio=float(os.getenv("QUERY_PLAN_COST_SKIP_RATIO", "0.5")),
+    stats_check_seconds=float(os.getenv("QUERY_PLAN_COST_STATS_CHECK_SECONDS", "300")),
+)
+
+
+def _read_catalog_stats_version(conn):
+    # Savepoint so a failed probe cannot abort the caller's transaction.
+    cursor = conn.cursor()
+    cursor.execute("SAVEPOINT catalog_stats_probe;")
+    try:
+        cursor.execute(CATALOG_STATS_VERSION_SQL)
+        return tuple(cursor.fetchone())
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT catalog_stats_probe;")
+        raise
+    finally:
+        cursor.execute("RELEASE SAVEPOINT catalog_stats_probe;")
+
+
+def plan_cost_cache_stats() -> dict:
+    return _plan_cost_cache.stats()
+
+
 def check_query_cost(conn, sql_query, max_cost: Optional[float] = None):
     if _query_plan_cost_disabled():
         logger.debug("Skipping PostgreSQL planner cost check (disabled via env)")
@@ -244,6 +406,13 @@ def check_query_cost(conn, sql_query, max_cost: Optional[float] = None):
     if max_cost is None:
         max_cost = _default_query_plan_cost_cap()
 
+    _plan_cost_cache.check_stats_version(lambda: _read_catalog_stats_version(conn))
+    fingerprint = sql_fingerprint(sql_query)
+    cached_cost = _plan_cost_cache.lookup(fingerprint, max_cost)
+    if cached_cost is not None:
+        logger.info("Estimated Query Cost: %s (cached plan fingerprint, EXPLAIN skipped)", cached_cost)
+        return cached_cost
+
     cursor = conn.cursor()
 
     explain_query = f"EXPLAIN (FORMAT JSON) {sql_query}"
@@ -255,6 +424,7 @@ def check_query_cost(conn, sql_query, max_cost: Optional[float] = None):
     total_cost = explain_json["Plan"]["Total Cost"]
 
     logger.info("Estimated Query Cost: %s", total_cost)
+    _plan_cost_cache.record(fingerprint, total_cost)
 
     if total_cost > max_cost:
         raise ValueError(
@@ -263,21 +433,64 @@ def check_query_cost(conn, sql_query, max_cost: Optional[float] = None):
 
     return total_cost
 
+# Result cache in front of execute_query. Sized via env: RESULT_CACHE_MAX_BYTES
+# (default 64 MiB); TTLs per table family via RESULT_CACHE_LIVE_TTL /
+# RESULT_CACHE_DEFAULT_TTL (see Executer.result_cache.ttl_for_tables).
+# RESULT_CACHE_DISABLED=1 turns it off.
+_result_cache = ResultCache(max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+
+def _result_cache_enabled() -> bool:
+    return os.getenv("RESULT_CACHE_DISABLED", "").strip().lower() not in ("1", "true", "yes")
+
+
+@functools.lru_cache(maxsize=2048)
+def _result_cache_key(sql_query: str) -> str:
+    """Key results by the same sqlglot normalization validate_and_normalize_sql applies."""
+    try:
+        return validate_and_normalize_sql(sql_query)
+    except ValueError:
+        return re.sub(r"\s+", " ", sql_query).strip().rstrip(";")
+
+
+def result_cache_stats() -> dict:
+    return _result_cache.stats()
+
+
+def clear_result_cache() -> None:
+    _result_cache.clear()
+
+
 # Query execution function
-def execute_query(conn, sql_query, max_cost: Optional[float] = None, timeout_ms=60000):
+def execute_query(
+    conn,
+    sql_query,
+    max_cost: Optional[float] = None,
+    timeout_ms=60000,
+    use_cache: bool = True,
+    max_rows: Optional[int] = None,
+):
+    """
+    Run a validated SELECT and return a DataFrame.
+
+    Rows are streamed through a server-side cursor and capped at ``max_rows``
+    (default QUERY_MAX_ROWS). ``df.attrs["truncated"]`` is True when the cap
+    was hit.
+    """
     logger.info("Executing SQL: %s", _summarize_sql(sql_query))
     logger.debug("Full SQL:\n%s", sql_query)
-    table_refs = sorted(
-        set(
-            re.findall(
-                r'(?i)\b(?:from|join)\s+(?:public\.)?"?([a-zA-Z_][a-zA-Z0-9_]*)"?',
-                sql_query or "",
-            )
-        )
-    )
+    table_refs = _table_refs(sql_query)
     if table_refs:
         logger.info("Source tables referenced: %s", ", ".join(table_refs))
-    
+
+    cache_key = None
+    if use_cache and _result_cache_enabled() and is_cacheable_sql(sql_query):
+        cache_key = _result_cache_key(sql_query)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Result cache hit | Rows: %d", len(cached))
+            return cached
+
     # CRITICAL: Clear any previous failed transactions before starting
     conn.rollback() 
     
@@ -289,15 +502,14 @@ def execute_query(conn, sql_query, max_cost: Optional[float] = None, timeout_ms=
         # Check cost before running the full query
         total_cost = check_query_cost(conn, sql_query, max_cost)
         
-        cursor.execute(sql_query)
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        df_result = pd.DataFrame(rows, columns=colnames)
-        
+        streamed = stream_query(conn, sql_query, max_rows=max_rows if max_rows is not None else default_max_rows())
+        df_result = streamed.to_dataframe()
+
         conn.commit() # Save changes
         logger.info(
-            "Query executed successfully | Rows: %d | Cost: %s",
-            len(rows),
+            "Query executed successfully | Rows: %d%s | Cost: %s",
+            streamed.row_count,
+            " (truncated)" if streamed.truncated else "",
             total_cost
         )
         if df_result.empty:
@@ -309,6 +521,8 @@ def execute_query(conn, sql_query, max_cost: Optional[float] = None, timeout_ms=
                 ", ".join(df_result.columns[:10]) + ("..." if len(df_result.columns) > 10 else ""),
             )
             logger.debug("Full result table:\n%s", df_result.to_string(index=False))
+        if cache_key is not None:
+            _result_cache.put(cache_key, df_result, ttl_for_tables(table_refs))
         return df_result
 
     except Exception as e:
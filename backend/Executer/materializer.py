@@ -0,0 +1,117 @@
+import logging
+import re
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+logger = logging.getLogger(__name__)
+
+# Text OIDs (text, varchar, bpchar, name). Text-storage families keep stats in these.
+TEXT_OIDS = frozenset({25, 1043, 1042, 19})
+
+# Repeated labels worth storing as categories; matched case-insensitively
+# because text-storage families use PLAYER_NAME / TEAM_ABBREVIATION.
+CATEGORICAL_COLUMNS = frozenset({"player_name", "team_abbreviation"})
+_CATEGORICAL_MIN_ROWS = 64
+_CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+_NUMERIC_TEXT_RE = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# IDs such as GAME_ID "0022300061" must stay text or the leading zeros are lost.
+_LEADING_ZERO_RE = r"[-+]?0\d"
+
+_INT16 = np.iinfo(np.int16)
+_INT32 = np.iinfo(np.int32)
+
+
+def _is_rank_column(name: str) -> bool:
+    return bool(re.search(r"(?i)rank$", name or ""))
+
+
+def _compact_int(values: np.ndarray, name: str) -> np.ndarray:
+    # int32 is the floor: analyzer sums/means over int16 stats could overflow.
+    # Rank columns are bounded by league size and are only compared, never summed.
+    if values.size == 0:
+        return values.astype(np.int32)
+    lo, hi = values.min(), values.max()
+    if _is_rank_column(name) and _INT16.min <= lo and hi <= _INT16.max:
+        return values.astype(np.int16)
+    if _INT32.min <= lo and hi <= _INT32.max:
+        return values.astype(np.int32)
+    return values
+
+
+def _compact_float(values: np.ndarray) -> np.ndarray:
+    # Only narrow when every value survives the round trip unchanged.
+    narrowed = values.astype(np.float32)
+    with np.errstate(over="ignore", invalid="ignore"):
+        exact = np.array_equal(narrowed.astype(np.float64), values, equal_nan=True)
+    return narrowed if exact else values
+
+
+def _parse_numeric_text(series: pd.Series) -> Optional[np.ndarray]:
+    """Numeric values for a text column whose non-empty cells are all numbers, else None."""
+    present = series[series.notna()]
+    if present.empty or ptypes.infer_dtype(present, skipna=True) not in ("string", "empty"):
+        return None
+    present = present.astype(str).str.strip()
+    filled = present[present != ""]
+    if filled.empty:
+        return None
+    if not filled.str.fullmatch(_NUMERIC_TEXT_RE).all() or filled.str.match(_LEADING_ZERO_RE).any():
+        return None
+    cleaned = series.astype(object).where(series.notna(), None)
+    cleaned = cleaned.map(lambda v: None if v is None or str(v).strip() == "" else str(v).strip())
+    return pd.to_numeric(cleaned, errors="coerce").to_numpy()
+
+
+def _maybe_categorical(series: pd.Series, name: str):
+    if (name or "").lower() not in CATEGORICAL_COLUMNS or len(series) < _CATEGORICAL_MIN_ROWS:
+        return None
+    if ptypes.infer_dtype(series, skipna=True) != "string":
+        return None
+    if series.nunique(dropna=True) > len(series) * _CATEGORICAL_MAX_UNIQUE_RATIO:
+        return None
+    return pd.Categorical(series)
+
+
+def compact_column(values: np.ndarray, name: str, type_code: Optional[int]):
+    """Narrowest safe representation of one result column."""
+    if values.dtype.kind in "iu":
+        return _compact_int(values, name)
+    if values.dtype.kind == "f":
+        return _compact_float(values)
+    if values.dtype != object:
+        return values
+
+    series = pd.Series(values, dtype=object)
+    categorical = _maybe_categorical(series, name)
+    if categorical is not None:
+        return categorical
+    if type_code in TEXT_OIDS:
+        parsed = _parse_numeric_text(series)
+        if parsed is not None:
+            return compact_column(parsed, name, None)
+    return values
+
+
+def materialize_dataframe(
+    column_names: Sequence[str],
+    type_codes: Sequence[Optional[int]],
+    columns: List[np.ndarray],
+    compact: bool = True,
+) -> pd.DataFrame:
+    """
+    Build the result DataFrame from column arrays and ``cursor.description``
+    type OIDs: integers narrowed to int32 (int16 for rank columns), floats to
+    float32 when exact, repeated player/team labels as categoricals, and
+    numeric TEXT columns parsed to numbers in one vectorized pass.
+    """
+    data = {}
+    for i, (values, name, type_code) in enumerate(zip(columns, column_names, type_codes)):
+        data[i] = compact_column(values, name, type_code) if compact else values
+    df = pd.DataFrame(data)
+    # Positional build then rename keeps duplicate column names (e.g. two "season" legs).
+    df.columns = list(column_names)
+    return df
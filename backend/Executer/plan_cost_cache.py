@@ -0,0 +1,114 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlglot import exp, parse_one
+from sqlglot.errors import ParseError
+
+logger = logging.getLogger(__name__)
+
+# One cheap probe that changes whenever the planner's inputs change: a table
+# is (auto)analyzed, or tables are added/dropped.
+CATALOG_STATS_VERSION_SQL = """
+    SELECT COALESCE(MAX(GREATEST(last_analyze, last_autoanalyze))::text, ''), COUNT(*)
+    FROM pg_stat_user_tables
+    WHERE schemaname = 'public';
+"""
+
+
+@functools.lru_cache(maxsize=2048)
+def sql_fingerprint(sql_query: str) -> str:
+    """
+    Normalized SQL with every value literal replaced by a placeholder.
+
+    Questions that differ only by player name or season year share a
+    fingerprint, and therefore share a plan-cost entry. Row-count literals
+    (LIMIT / OFFSET / FETCH) are kept: the planner's cost depends on them.
+    """
+    try:
+        parsed = parse_one(sql_query, read="postgres")
+    except ParseError:
+        return " ".join(sql_query.split())
+    stripped = parsed.transform(_placeholder_for_value_literal)
+    return stripped.sql(dialect="postgres")
+
+
+def _placeholder_for_value_literal(node: exp.Expression) -> exp.Expression:
+    if isinstance(node, exp.Literal) and not isinstance(node.parent, (exp.Limit, exp.Offset, exp.Fetch)):
+        return exp.Placeholder()
+    return node
+
+
+class PlanCostCache:
+    """
+    Memoized EXPLAIN cost per SQL fingerprint.
+
+    A fingerprint whose last estimate was comfortably under the cost cap
+    (``cost <= max_cost * skip_ratio``) skips EXPLAIN entirely. The whole
+    cache is dropped when the catalog statistics version changes, which is
+    re-read at most every ``stats_check_seconds``.
+    """
+
+    def __init__(self, max_entries: int = 4096, skip_ratio: float = 0.5, stats_check_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.skip_ratio = skip_ratio
+        self.stats_check_seconds = stats_check_seconds
+        self._lock = threading.Lock()
+        self._costs: "OrderedDict[str, float]" = OrderedDict()
+        self._stats_version = None
+        self._stats_checked_at: Optional[float] = None
+        self._stats = {"explains_run": 0, "explains_skipped": 0, "invalidations": 0}
+
+    def lookup(self, fingerprint: str, max_cost: float) -> Optional[float]:
+        """Return the cached cost if EXPLAIN can be skipped, else None."""
+        with self._lock:
+            cost = self._costs.get(fingerprint)
+            if cost is None or cost > max_cost * self.skip_ratio:
+                return None
+            self._costs.move_to_end(fingerprint)
+            self._stats["explains_skipped"] += 1
+            return cost
+
+    def record(self, fingerprint: str, cost: float) -> None:
+        with self._lock:
+            self._stats["explains_run"] += 1
+            # Keep the highest estimate seen so a cheap literal cannot mask an expensive one.
+            self._costs[fingerprint] = max(cost, self._costs.get(fingerprint, cost))
+            self._costs.move_to_end(fingerprint)
+            while len(self._costs) > self.max_entries:
+                self._costs.popitem(last=False)
+
+    def check_stats_version(self, read_version: Callable[[], object]) -> None:
+        """Re-read the catalog stats version when due and invalidate on change."""
+        now = time.monotonic()
+        with self._lock:
+            if self._stats_checked_at is not None and now - self._stats_checked_at < self.stats_check_seconds:
+                return
+            self._stats_checked_at = now
+        try:
+            version = read_version()
+        except Exception as e:
+            logger.debug("Could not read catalog stats version: %s", e)
+            return
+        with self._lock:
+            if self._stats_version is not None and version != self._stats_version and self._costs:
+                logger.info("Catalog statistics changed; dropping %d cached plan costs", len(self._costs))
+                self._costs.clear()
+                self._stats["invalidations"] += 1
+            self._stats_version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._costs.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "saved_round_trips": self._stats["explains_skipped"],
+                "entries": len(self._costs),
+                "skip_ratio": self.skip_ratio,
+            }
@@ -0,0 +1,396 @@
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from Executer.executor import get_schema_catalog, pooled_connection
+from Executer.result_cache import table_refs
+from Executer.schema_catalog import SchemaCatalog
+
+logger = logging.getLogger(__name__)
+
+_PLAYER_INDEX_TTL_SECONDS = float(os.getenv("PLAYER_INDEX_TTL_SECONDS", str(6 * 3600)))
+_FUZZY_MIN_SIMILARITY = 0.45
+# Bit 0 of a season-presence mask is the 1946-47 season.
+_FIRST_SEASON_START = 1946
+
+
+def fold_name(name: str) -> str:
+    """Lowercase, strip accents (Dončić → doncic) and punctuation, collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_only = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", ascii_only.lower()).split())
+
+
+def _trigrams(folded: str) -> Set[str]:
+    padded = f"  {folded} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _season_tables(catalog: SchemaCatalog) -> List[str]:
+    return catalog.family_tables("all_players_regular") + catalog.family_tables("all_players_playoffs")
+
+
+def player_index_sql(catalog: SchemaCatalog) -> Optional[str]:
+    """
+    One query returning (season_start, season_type, player_id, player_name,
+    nickname) for every player in every season table.
+    """
+    legs = []
+    for table in _season_tables(catalog):
+        cols = set(catalog.columns(table))
+        if "player_name" not in cols:
+            continue
+        info = catalog.table_info(table)
+        player_id = "player_id" if "player_id" in cols else "NULL"
+        nickname = "nickname" if "nickname" in cols else "NULL"
+        legs.append(
+            f"SELECT {info.season_start} AS season_start, '{info.season_type}' AS season_type, "
+            f'{player_id}::bigint AS player_id, player_name::text AS player_name, '
+            f'{nickname}::text AS nickname FROM public."{table}"'
+        )
+    return " UNION ".join(legs) if legs else None
+
+
+class PlayerIndex:
+    """
+    In-memory resolver over every player_name / nickname / player_id across
+    all season tables.
+
+    Lookups fold accents and case, then try exact name or nickname, then
+    token prefixes ("Luka Don" → Luka Dončić), and finally trigram similarity
+    for did-you-mean suggestions.
+
+    Rows may carry (season_start, season_type) after the nickname; those build
+    a per-player bitmap of the regular and playoff seasons played, so season
+    resolution ("his second season", "rookie year", career spans) needs no
+    per-season probe queries.
+    """
+
+    def __init__(self, rows: Iterable[Tuple], season_tables: Iterable[str] = ()):
+        self.names: Dict[int, str] = {}
+        self.season_tables = frozenset(season_tables)
+        self._presence: Dict[str, Dict[int, int]] = {"regular": defaultdict(int), "playoffs": defaultdict(int)}
+        self._exact: Dict[str, Set[int]] = defaultdict(set)
+        self._token_ids: Dict[str, Set[int]] = defaultdict(set)
+        self._trigram_ids: Dict[str, Set[int]] = defaultdict(set)
+        self._folded: Dict[int, str] = {}
+        synthetic_id = -1
+        by_name: Dict[str, int] = {}
+        for row in rows:
+            player_id, player_name, nickname = row[:3]
+            if not player_name:
+                continue
+            if player_id is None:
+                # Tables without player_id: one synthetic id per distinct name.
+                folded_name = fold_name(player_name)
+                if folded_name not in by_name:
+                    by_name[folded_name] = synthetic_id
+                    synthetic_id -= 1
+                player_id = by_name[folded_name]
+            player_id = int(player_id)
+            self.names.setdefault(player_id, player_name)
+            if len(row) >= 5 and row[3] is not None and row[4] in self._presence:
+                offset = int(row[3]) - _FIRST_SEASON_START
+                if offset >= 0:
+                    self._presence[row[4]][player_id] |= 1 << offset
+            for label in (player_name, nickname):
+                folded = fold_name(label or "")
+                if not folded:
+                    continue
+                self._exact[folded].add(player_id)
+                for token in folded.split():
+                    self._token_ids[token].add(player_id)
+            folded = fold_name(player_name)
+            self._folded.setdefault(player_id, folded)
+            for gram in _trigrams(folded):
+                self._trigram_ids[gram].add(player_id)
+        self._sorted_tokens = sorted(self._token_ids)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _ids_with_token_prefix(self, prefix: str) -> Set[int]:
+        ids: Set[int] = set()
+        i = bisect.bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            ids |= self._token_ids[self._sorted_tokens[i]]
+            i += 1
+        return ids
+
+    def resolve(self, name: str, aliases: Optional[Mapping[str, Sequence[str]]] = None) -> List[int]:
+        """player_ids matching ``name`` (alias, exact, then token-prefix), best first. Never fuzzy."""
+        if aliases:
+            alias_targets = aliases.get((name or "").strip().lower())
+            if alias_targets:
+                ids: List[int] = []
+                for target in alias_targets:
+                    for player_id in self.resolve(target):
+                        if player_id not in ids:
+                            ids.append(player_id)
+                if ids:
+                    return ids
+
+        folded = fold_name(name)
+        if not folded:
+            return []
+        exact = self._exact.get(folded)
+        if exact:
+            return sorted(exact)
+
+        tokens = folded.split()
+        # Mirrors the old ILIKE fallback: every token must start some token of the name.
+        candidates: Optional[Set[int]] = None
+        for token in tokens:
+            ids = self._ids_with_token_prefix(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        return sorted(candidates or [], key=lambda pid: (len(self._folded.get(pid, "")), pid))
+
+    def contains(self, name: str, aliases: Optional[Mapping[str, Sequence[str]]] = None) -> bool:
+        return bool(self.resolve(name, aliases))
+
+    @property
+    def has_seasons(self) -> bool:
+        return any(self._presence.values())
+
+    def seasons(self, player_ids: Iterable[int], season_type: str) -> List[int]:
+        """Season starts (ascending) in which any of ``player_ids`` appears in ``season_type`` tables."""
+        presence = self._presence.get(season_type, {})
+        mask = 0
+        for player_id in player_ids:
+            mask |= presence.get(player_id, 0)
+        out = []
+        offset = 0
+        while mask:
+            if mask & 1:
+                out.append(_FIRST_SEASON_START + offset)
+            mask >>= 1
+            offset += 1
+        return out
+
+    def suggest(self, name: str, limit: int = 3) -> List[str]:
+        """Did-you-mean: closest player names by trigram similarity."""
+        folded = fold_name(name)
+        if not folded:
+            return []
+        grams = _trigrams(folded)
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for player_id in self._trigram_ids.get(gram, ()):
+                overlap[player_id] += 1
+        scored = []
+        for player_id, shared in overlap.items():
+            other = self._folded[player_id]
+            similarity = shared / float(len(grams | _trigrams(other)))
+            if similarity >= _FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, self.names[player_id]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        out: List[str] = []
+        for _, player_name in scored:
+            if player_name not in out:
+                out.append(player_name)
+            if len(out) >= limit:
+                break
+        return out
+
+    @classmethod
+    def load(cls, conn, catalog: SchemaCatalog) -> "PlayerIndex":
+        sql = player_index_sql(catalog)
+        if not sql:
+            return cls([])
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            rows = [(pid, name, nick, start, kind) for start, kind, pid, name, nick in cursor.fetchall()]
+        finally:
+            cursor.close()
+        index = cls(rows, _season_tables(catalog))
+        logger.info("Loaded player index: %d players", len(index))
+        return index
+
+
+_index_state: dict = {"index": None, "loaded_at": 0.0}
+_index_lock = threading.Lock()
+_index_refreshing = threading.Event()
+
+
+def _load_into_state(conn) -> PlayerIndex:
+    loaded_at = time.time()
+    index = PlayerIndex.load(conn, get_schema_catalog(conn))
+    with _index_lock:
+        _index_state["index"] = index
+        _index_state["loaded_at"] = loaded_at
+    return index
+
+
+def _refresh_in_background() -> None:
+    with _index_lock:
+        if _index_refreshing.is_set():
+            return
+        _index_refreshing.set()
+
+    def _run():
+        try:
+            with pooled_connection() as conn:
+                _load_into_state(conn)
+        except Exception as e:
+            logger.warning("Background player index refresh failed; keeping previous index: %s", e)
+        finally:
+            _index_refreshing.clear()
+
+    threading.Thread(target=_run, name="player-index-refresh", daemon=True).start()
+
+
+def warm_player_index() -> None:
+    """Start loading the index in the background so the first question does not pay for it."""
+    if _index_state["index"] is None:
+        _refresh_in_background()
+
+
+def get_player_index(conn) -> Optional[PlayerIndex]:
+    """
+    Process-wide player index. Loaded inline on first use, then served from
+    memory and refreshed in the background after PLAYER_INDEX_TTL_SECONDS.
+    Returns None if it cannot be loaded (callers fall back to their old path).
+    """
+    index = _index_state["index"]
+    if index is None:
+        try:
+            return _load_into_state(conn)
+        except Exception as e:
+            logger.warning("Could not load player index: %s", e)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            return None
+    if time.time() - _index_state["loaded_at"] >= _PLAYER_INDEX_TTL_SECONDS:
+        _refresh_in_background()
+    else:
+        # Season tables added or dropped by a catalog refresh: rebuild the presence bitmaps.
+        try:
+            if frozenset(_season_tables(get_schema_catalog(conn))) != index.season_tables:
+                _refresh_in_background()
+        except Exception:
+            pass
+    return index
+
+
+# ----------------------------------------------------------------------
+# player_name ILIKE → player_id = ANY(...) rewrite
+# ----------------------------------------------------------------------
+_NAME_COL = r"(?P<col>(?:[A-Za-z_]\w*\.)?\"?player_name\"?)"
+# The accent-robust group emitted by _expand_player_name_filters_for_encoding:
+# (col ILIKE '%Full Name%' [OR col ILIKE '%...%'] OR (col ILIKE '%First%' AND col ILIKE '%Las%'))
+_EXPANDED_NAME_FILTER_RE = re.compile(
+    r"(?i)\(\s*" + _NAME_COL + r"\s+ILIKE\s+'%(?P<name>[^%']+)%'"
+    r"(?:\s+OR\s+(?P=col)\s+ILIKE\s+'%[^%']+%')*"
+    r"\s+OR\s+\(\s*(?P=col)\s+ILIKE\s+'%[^%']+%'\s+AND\s+(?P=col)\s+ILIKE\s+'%[^%']+%'\s*\)\s*\)"
+)
+_PLAIN_NAME_FILTER_RE = re.compile(r"(?i)" + _NAME_COL + r"\s+ILIKE\s+'%(?P<name>[^%']+)%'")
+_NUMERIC_ID_TYPES = frozenset({"smallint", "integer", "bigint", "numeric", "real", "double precision"})
+_MAX_IDS_PER_FILTER = int(os.getenv("PLAYER_ID_FILTER_MAX_IDS", "8"))
+
+
+def player_ids_for_name_filter(
+    where_clause: str,
+    index: Optional[PlayerIndex],
+    aliases: Optional[Mapping[str, Sequence[str]]] = None,
+) -> Optional[Set[int]]:
+    """
+    player_ids selected by a WHERE clause made only of OR-ed player_name ILIKE
+    filters (plain or accent-expanded). None when the clause has any other
+    condition or a name does not resolve, so callers fall back to querying.
+    """
+    if index is None or not where_clause:
+        return None
+    names: List[str] = []
+
+    def take(match: re.Match) -> str:
+        names.append(match.group("name").strip())
+        return " "
+
+    residue = _PLAIN_NAME_FILTER_RE.sub(take, _EXPANDED_NAME_FILTER_RE.sub(take, where_clause))
+    if not names or re.sub(r"(?i)\bor\b|[()\s;]", "", residue):
+        return None
+    ids: Set[int] = set()
+    for name in names:
+        resolved = index.resolve(name, aliases)
+        if not resolved or len(resolved) > _MAX_IDS_PER_FILTER:
+            return None
+        ids.update(resolved)
+    return ids
+
+
+def _id_column_for(name_col: str) -> str:
+    """player_name → player_id, keeping alias prefix, quoting and case ("PLAYER_NAME" → "PLAYER_ID")."""
+    return re.sub(r"(?i)player_name", lambda m: "PLAYER_ID" if m.group(0).isupper() else "player_id", name_col)
+
+
+def _tables_have_numeric_id(catalog: SchemaCatalog, tables: Sequence[str], id_col: str) -> bool:
+    bare = id_col.split(".")[-1].strip('"')
+    if not id_col.split(".")[-1].startswith('"'):
+        bare = bare.lower()
+    for table in tables:
+        data_type = catalog.column_types(table).get(bare)
+        if data_type is None or data_type.lower() not in _NUMERIC_ID_TYPES:
+            return False
+    return True
+
+
+def rewrite_player_name_filters_to_ids(
+    sql_query: str,
+    index: Optional[PlayerIndex],
+    catalog: Optional[SchemaCatalog],
+    aliases: Optional[Mapping[str, Sequence[str]]] = None,
+) -> str:
+    """
+    Replace ``player_name ILIKE '%Name%'`` filters (plain or accent-expanded)
+    with ``player_id = ANY(ARRAY[...])`` so the planner can use the player_id
+    index instead of scanning every row with ILIKE.
+
+    A filter is left as ILIKE when the name does not resolve, resolves to too
+    many players, or when any table the statement reads lacks a numeric
+    player_id column (text-storage families keep their ILIKE path).
+    """
+    if not sql_query or index is None or catalog is None or "ilike" not in sql_query.lower():
+        return sql_query
+
+    tables = table_refs(sql_query)
+    if not tables or any(t not in catalog for t in tables):
+        return sql_query
+
+    def repl(match: re.Match) -> str:
+        id_col = _id_column_for(match.group("col"))
+        if not _tables_have_numeric_id(catalog, tables, id_col):
+            return match.group(0)
+        ids = index.resolve(match.group("name").strip(), aliases)
+        if not ids or len(ids) > _MAX_IDS_PER_FILTER or any(pid < 0 for pid in ids):
+            return match.group(0)
+        id_list = ", ".join(str(pid) for pid in ids)
+        return f"{id_col} = ANY(ARRAY[{id_list}])"
+
+    # Expanded groups that stay ILIKE are parked so the plain pass cannot
+    # rewrite their first-name / last-prefix pieces on their own.
+    kept: List[str] = []
+
+    def repl_expanded(match: re.Match) -> str:
+        replaced = repl(match)
+        if replaced != match.group(0):
+            return f"({replaced})"
+        kept.append(match.group(0))
+        return f"\x00{len(kept) - 1}\x00"
+
+    rewritten = _EXPANDED_NAME_FILTER_RE.sub(repl_expanded, sql_query)
+    rewritten = _PLAIN_NAME_FILTER_RE.sub(repl, rewritten)
+    rewritten = re.sub(r"\x00(\d+)\x00", lambda m: kept[int(m.group(1))], rewritten)
+    if rewritten != sql_query:
+        logger.info("rewriter:player_id replaced player_name ILIKE filters with player_id lookups")
+    return rewritten
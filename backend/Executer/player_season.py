@@ -0,0 +1,144 @@
+"""
+Build step for the consolidated ``player_season`` fact table.
+
+One row per player per season (regular season and playoffs) copied from the
+closed-season ``all_players_{regular,playoffs}_YYYY_YYYY`` tables, with
+``season_start`` / ``season_label`` / ``season_type`` columns and indexes on
+them. Career and by-season rewrites can then scan one indexed table instead of
+a UNION ALL over ~29 season tables.
+
+The current season is left out on purpose: it changes daily, so queries keep
+reading it from its own table. Re-run after each season closes:
+
+    python -m Executer.player_season
+"""
+
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from Executer.result_cache import current_season_start
+from Executer.schema_catalog import SchemaCatalog
+
+logger = logging.getLogger(__name__)
+
+PLAYER_SEASON_TABLE = "player_season"
+_SEASON_TYPES = ("regular", "playoffs")
+
+
+def source_tables(catalog: SchemaCatalog, max_start: Optional[int] = None) -> List[tuple]:
+    """(season_type, season_start, table_name) for every closed season table."""
+    max_start = current_season_start() - 1 if max_start is None else max_start
+    out = []
+    for season_type in _SEASON_TYPES:
+        for start in catalog.season_starts(f"all_players_{season_type}"):
+            if start <= max_start:
+                out.append((season_type, start, f"all_players_{season_type}_{start}_{start + 1}"))
+    return out
+
+
+def common_columns(catalog: SchemaCatalog, tables: List[str]) -> List[str]:
+    """Columns present in every source table, in the newest table's order."""
+    if not tables:
+        return []
+    shared = set(catalog.columns(tables[0]))
+    for table in tables[1:]:
+        shared &= set(catalog.columns(table))
+    newest = max(tables, key=lambda t: catalog.table_info(t).season_start or 0)
+    reserved = {"season_start", "season_label", "season_type"}
+    return [c for c in catalog.columns(newest) if c in shared and c not in reserved]
+
+
+def build_statements(catalog: SchemaCatalog, max_start: Optional[int] = None) -> tuple:
+    """SQL statements that rebuild the fact table, plus the coverage they produce."""
+    sources = source_tables(catalog, max_start)
+    if not sources:
+        raise ValueError("No closed-season all_players_* tables found in the catalog")
+    columns = common_columns(catalog, [t for _, _, t in sources])
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+
+    legs = []
+    coverage: Dict[str, List[int]] = {t: [] for t in _SEASON_TYPES}
+    for season_type, start, table in sources:
+        label = f"{start}-{str(start + 1)[-2:]}"
+        legs.append(
+            f"SELECT {start}::int AS season_start, '{label}'::text AS season_label, "
+            f"'{season_type}'::text AS season_type, {col_sql} FROM public.\"{table}\""
+        )
+        coverage[season_type].append(start)
+
+    staging = f"{PLAYER_SEASON_TABLE}__build"
+    comment = json.dumps({"coverage": coverage, "built_at": int(time.time())}, separators=(",", ":"))
+    statements = [
+        f'DROP TABLE IF EXISTS public."{staging}"',
+        f'CREATE TABLE public."{staging}" AS ' + " UNION ALL ".join(legs),
+        f'CREATE INDEX ON public."{staging}" (season_type, season_start)',
+        f'CREATE INDEX ON public."{staging}" (player_id, season_type, season_start)',
+        f'CREATE INDEX ON public."{staging}" (player_name)',
+        f'DROP TABLE IF EXISTS public."{PLAYER_SEASON_TABLE}"',
+        f'ALTER TABLE public."{staging}" RENAME TO "{PLAYER_SEASON_TABLE}"',
+        f"COMMENT ON TABLE public.\"{PLAYER_SEASON_TABLE}\" IS '{comment}'",
+    ]
+    return statements, coverage
+
+
+def build_player_season_table(conn, catalog: SchemaCatalog, max_start: Optional[int] = None) -> Dict[str, List[int]]:
+    """Rebuild the fact table in one transaction; readers see the old table until commit."""
+    statements, coverage = build_statements(catalog, max_start)
+    cursor = conn.cursor()
+    try:
+        for sql in statements:
+            logger.debug("player_season build: %s", sql[:200])
+            cursor.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    # ANALYZE outside the build transaction so the planner sees fresh stats immediately.
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f'ANALYZE public."{PLAYER_SEASON_TABLE}"')
+        conn.commit()
+    finally:
+        cursor.close()
+    logger.info(
+        "Built %s: %d regular + %d playoff seasons",
+        PLAYER_SEASON_TABLE, len(coverage["regular"]), len(coverage["playoffs"]),
+    )
+    return coverage
+
+
+def player_season_coverage(catalog: Optional[SchemaCatalog]) -> Optional[Dict[str, Set[int]]]:
+    """Seasons loaded into the fact table (from its table comment), or None if it is unusable."""
+    if catalog is None or PLAYER_SEASON_TABLE not in catalog:
+        return None
+    raw = catalog.table_comment(PLAYER_SEASON_TABLE)
+    try:
+        coverage = json.loads(raw or "")["coverage"]
+        return {season_type: set(coverage.get(season_type) or []) for season_type in _SEASON_TYPES}
+    except (ValueError, KeyError, TypeError):
+        logger.debug("%s has no readable coverage comment; not routing to it", PLAYER_SEASON_TABLE)
+        return None
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    from Executer.executor import get_connection, refresh_schema_catalog
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    conn = get_connection()
+    try:
+        build_player_season_table(conn, refresh_schema_catalog(conn))
+        # Pick up the new table and its coverage comment in the snapshot.
+        refresh_schema_catalog(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
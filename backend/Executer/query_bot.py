@@ -11,6 +11,7 @@ import os
 
 # 1. OpenAI client
 from dotenv import load_dotenv
+from Executer.schema_catalog import SchemaCatalog
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -49,35 +50,16 @@ user_input = None
 def get_db_schema():
     global conn, cursor
     try:
-        cursor.execute("""
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = 'public';
-        """)
+        catalog = SchemaCatalog.load(conn)
     except Exception:
         # Reconnect if connection is dead
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = 'public';
-        """)
+        catalog = SchemaCatalog.load(conn)
 
-    tables = cursor.fetchall()
     schema_description = ""
-
-    for table in tables:
-        table_name = table[0]
-
-        cursor.execute(f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = '{table_name}'
-        """)
-
-        columns = cursor.fetchall()
-        column_list = ", ".join([col[0] for col in columns])
+    for table_name in catalog.table_names():
+        column_list = ", ".join(catalog.columns(table_name))
         schema_description += f"{table_name}({column_list})\n"
 
     return schema_description
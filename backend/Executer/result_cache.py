@@ -0,0 +1,177 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+import sqlglot
+from sqlglot import exp
+
+logger = logging.getLogger(__name__)
+
+# TTL sentinel for results that never go stale (closed historical seasons).
+FOREVER: Optional[float] = None
+
+_TABLE_REF_RE = re.compile(r'(?i)\b(?:from|join)\s+(?:public\.)?"?([a-zA-Z_][a-zA-Z0-9_]*)"?')
+_NON_DETERMINISTIC_RE = re.compile(
+    r"(?i)\b(random|now|clock_timestamp|statement_timestamp|current_date|current_time|current_timestamp|localtimestamp)\b"
+)
+_FULL_SEASON_RE = re.compile(r"^all_players_(?:regular|playoffs)_(\d{4})_\d{4}$")
+_SHORT_SEASON_RE = re.compile(r"_season_(\d{4})_\d{2}(?:_|$)")
+
+
+def current_season_start() -> int:
+    """First year of the season still being played (2025 → 2025-26). Override with CURRENT_SEASON_START."""
+    return int(os.getenv("CURRENT_SEASON_START", "2025"))
+
+
+@lru_cache(maxsize=512)
+def _table_refs(sql: str) -> Tuple[str, ...]:
+    try:
+        trees = [tree for tree in sqlglot.parse(sql, read="postgres") if tree is not None]
+    except sqlglot.errors.SqlglotError:
+        trees = []
+    if not trees:
+        # Unparseable text: the FROM/JOIN scan still finds the usual shapes.
+        return tuple(sorted(set(_TABLE_REF_RE.findall(sql))))
+    names = set()
+    for tree in trees:
+        ctes = {cte.alias_or_name for cte in tree.find_all(exp.CTE)}
+        for table in tree.find_all(exp.Table):
+            # Table functions (generate_series(...)) have no identifier name.
+            if isinstance(table.this, exp.Identifier) and table.name not in ctes:
+                names.add(table.name)
+    return tuple(sorted(names))
+
+
+def table_refs(sql: str) -> list:
+    """Every table a statement reads (comma joins and subqueries included), CTE names excluded."""
+    return list(_table_refs(sql or ""))
+
+
+def season_start_for_table(table: str) -> Optional[int]:
+    m = _FULL_SEASON_RE.match(table) or _SHORT_SEASON_RE.search(table)
+    return int(m.group(1)) if m else None
+
+
+def ttl_for_tables(tables: Iterable[str]) -> Optional[float]:
+    """
+    Pick a TTL for a result from the tables it read.
+
+    Closed seasons never change, so they are cached forever. Game logs and
+    current-season families are refreshed during the season and expire
+    quickly. Anything else (schedules, shot charts, unknown tables) gets the
+    default TTL. The shortest TTL across all referenced tables wins.
+    """
+    live_ttl = float(os.getenv("RESULT_CACHE_LIVE_TTL", "300"))
+    default_ttl = float(os.getenv("RESULT_CACHE_DEFAULT_TTL", "3600"))
+    current = current_season_start()
+
+    ttl: Optional[float] = FOREVER
+    tables = list(tables)
+    if not tables:
+        return default_ttl
+    for table in tables:
+        table = table.lower()
+        if table == "player_game_logs":
+            table_ttl = live_ttl
+        else:
+            start = season_start_for_table(table)
+            if start is None:
+                table_ttl = default_ttl
+            elif start >= current:
+                table_ttl = live_ttl
+            else:
+                table_ttl = FOREVER
+        if table_ttl is not FOREVER and (ttl is FOREVER or table_ttl < ttl):
+            ttl = table_ttl
+    return ttl
+
+
+def is_cacheable_sql(sql: str) -> bool:
+    return not _NON_DETERMINISTIC_RE.search(sql or "")
+
+
+def dataframe_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ResultCache:
+    """
+    Byte-bounded LRU of query results keyed by normalized SQL.
+
+    Entries are stored and returned as copies so callers can keep mutating
+    the DataFrames they get back without corrupting the cache.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self._lock = threading.Lock()
+        # key -> (df, nbytes, expires_at or None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "oversize": 0}
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            df, nbytes, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return df.copy()
+
+    def put(self, key: str, df: pd.DataFrame, ttl: Optional[float]) -> bool:
+        if ttl is not None and ttl <= 0:
+            return False
+        nbytes = dataframe_nbytes(df)
+        if nbytes > self.max_entry_bytes:
+            with self._lock:
+                self._stats["oversize"] += 1
+            logger.debug("Result too large to cache (%d bytes)", nbytes)
+            return False
+        stored = df.copy()
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (stored, nbytes, expires_at)
+            self._bytes += nbytes
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Every public table, column and data type in one round trip. The table
+# comment rides along on the first column's row (build steps record metadata there).
+CATALOG_SQL = """
+    SELECT table_name, column_name, data_type,
+           CASE WHEN ordinal_position = 1
+                THEN obj_description(format('%I.%I', table_schema, table_name)::regclass, 'pg_class')
+           END AS table_comment
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+    ORDER BY table_name, ordinal_position;
+"""
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+_ALL_PLAYERS_RE = re.compile(r"^all_players_(regular|playoffs)_(\d{4})_(\d{4})$")
+_SEASON_TABLE_RE = re.compile(r"^(?P<family>[a-z0-9_]+?)_season_(?P<start>\d{4})_(?P<yy>\d{2})(?:_(?P<rest>.*))?$")
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """Where a table sits in the season-table layout."""
+
+    name: str
+    family: str
+    season_start: Optional[int] = None
+    season_type: Optional[str] = None  # "regular" or "playoffs"
+
+    @property
+    def season_end(self) -> Optional[int]:
+        return None if self.season_start is None else self.season_start + 1
+
+
+def classify_table(table_name: str) -> TableInfo:
+    """
+    Split a table name into family / season start / season type.
+
+    all_players_regular_2010_2011 -> ("all_players_regular", 2010, "regular")
+    nba_advanced_season_2023_24_season_type_playoffs_per_mode_p -> ("nba_advanced", 2023, "playoffs")
+    player_game_logs -> ("player_game_logs", None, None)
+    """
+    name = (table_name or "").lower()
+    m = _ALL_PLAYERS_RE.match(name)
+    if m:
+        return TableInfo(name, f"all_players_{m.group(1)}", int(m.group(2)), m.group(1))
+    m = _SEASON_TABLE_RE.match(name)
+    if m:
+        rest = m.group("rest") or ""
+        season_type = "playoffs" if "playoffs" in rest else "regular"
+        return TableInfo(name, m.group("family"), int(m.group("start")), season_type)
+    return TableInfo(name, name)
+
+
+class SchemaCatalog:
+    """
+    In-memory view of the public schema: every table with its ordered
+    (column, data_type) pairs, indexed by family, season start and season type.
+
+    Built once from CATALOG_SQL; every lookup after that is a dict access, so
+    prompt text, season routing and debug output need no further DB calls.
+    """
+
+    def __init__(self, columns: Dict[str, List[Tuple[str, str]]], comments: Optional[Dict[str, str]] = None):
+        self._columns = {t: list(cols) for t, cols in columns.items()}
+        self._comments = {t: c for t, c in (comments or {}).items() if c}
+        self._info: Dict[str, TableInfo] = {t: classify_table(t) for t in self._columns}
+        # family -> season_type -> season_start -> table names
+        self._by_family: Dict[str, Dict[Optional[str], Dict[Optional[int], List[str]]]] = {}
+        for table in sorted(self._columns):
+            info = self._info[table]
+            (
+                self._by_family.setdefault(info.family, {})
+                .setdefault(info.season_type, {})
+                .setdefault(info.season_start, [])
+                .append(table)
+            )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> "SchemaCatalog":
+        """Rows of (table, column, data_type[, table_comment])."""
+        columns: Dict[str, List[Tuple[str, str]]] = {}
+        comments: Dict[str, str] = {}
+        for row in rows:
+            table_name, column_name, data_type = row[0], row[1], row[2]
+            columns.setdefault(table_name, []).append((column_name, data_type))
+            if len(row) > 3 and row[3]:
+                comments[table_name] = row[3]
+        return cls(columns, comments)
+
+    @classmethod
+    def load(cls, conn) -> "SchemaCatalog":
+        cursor = conn.cursor()
+        try:
+            cursor.execute(CATALOG_SQL)
+            catalog = cls.from_rows(cursor.fetchall())
+        finally:
+            cursor.close()
+        logger.debug("Loaded schema catalog: %d tables", len(catalog))
+        return catalog
+
+    def to_dict(self) -> dict:
+        return {
+            "tables": {t: [list(c) for c in cols] for t, cols in self._columns.items()},
+            "comments": dict(self._comments),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchemaCatalog":
+        return cls(
+            {t: [tuple(c) for c in cols] for t, cols in (data.get("tables") or {}).items()},
+            data.get("comments") or {},
+        )
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __contains__(self, table_name: str) -> bool:
+        return table_name in self._columns
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def table_names(self) -> List[str]:
+        return sorted(self._columns)
+
+    def table_info(self, table_name: str) -> TableInfo:
+        return self._info.get(table_name) or classify_table(table_name)
+
+    def columns(self, table_name: str) -> List[str]:
+        return [c for c, _ in self._columns.get(table_name, [])]
+
+    def column_types(self, table_name: str) -> Dict[str, str]:
+        return dict(self._columns.get(table_name, []))
+
+    def table_comment(self, table_name: str) -> Optional[str]:
+        return self._comments.get(table_name)
+
+    def tables_with_prefix(self, prefix: str) -> List[str]:
+        return [t for t in self.table_names() if t.startswith(prefix)]
+
+    def family_tables(self, family: str, season_type: Optional[str] = None) -> List[str]:
+        by_type = self._by_family.get(family, {})
+        tables = []
+        for st, by_start in by_type.items():
+            if season_type is not None and st != season_type:
+                continue
+            for names in by_start.values():
+                tables.extend(names)
+        return sorted(tables)
+
+    def season_starts(self, family: str, season_type: Optional[str] = None) -> List[int]:
+        by_type = self._by_family.get(family, {})
+        starts = set()
+        for st, by_start in by_type.items():
+            if season_type is not None and st != season_type:
+                continue
+            starts.update(s for s in by_start if s is not None)
+        return sorted(starts)
+
+    def season_table(self, family: str, season_start: int, season_type: Optional[str] = None) -> Optional[str]:
+        by_type = self._by_family.get(family, {})
+        for st, by_start in by_type.items():
+            if season_type is not None and st != season_type:
+                continue
+            names = by_start.get(season_start)
+            if names:
+                return names[0]
+        return None
+
+
+def save_snapshot(catalog: SchemaCatalog, path: str, fetched_at: float) -> None:
+    """Write the catalog atomically so readers never see a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = {"version": SNAPSHOT_FORMAT_VERSION, "fetched_at": fetched_at, **catalog.to_dict()}
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".schema_catalog.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(path: str) -> Optional[Tuple[SchemaCatalog, float]]:
+    """Return (catalog, fetched_at) from a snapshot file, or None if missing/unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable schema snapshot %s: %s", path, e)
+        return None
+    if payload.get("version") != SNAPSHOT_FORMAT_VERSION or not payload.get("tables"):
+        return None
+    return SchemaCatalog.from_dict(payload), float(payload.get("fetched_at") or 0.0)
@@ -0,0 +1,422 @@
+"""
+Pre-flight check of generated SQL against the in-memory schema catalog.
+
+Every table and column in the sqlglot AST is resolved against
+SchemaCatalog before the statement reaches Postgres, following Postgres'
+own identifier rules: unquoted names fold to lowercase, quoted names are
+exact, and names longer than 63 bytes are truncated. Unambiguous slips are
+corrected in place (an unquoted ``TeamCity`` on a text-storage table becomes
+``"TeamCity"``; an untruncated tracking-table name becomes its stored
+63-character form). Anything still unknown raises SqlPreflightError with a
+Postgres-style "does not exist" message, so the repair path runs without a
+failed round trip to the database.
+
+Only names the catalog can vouch for are judged: columns of CTEs, derived
+tables, correlated outer references and non-public schemas are left alone.
+
+When a name is still unknown (here or in a Postgres error), auto_repair_sql
+tries edit-distance and table-family rules against the catalog before the
+LLM repair prompt is paid for.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlglot import exp, parse_one
+from sqlglot.optimizer.scope import traverse_scope
+
+from Executer.schema_catalog import SchemaCatalog, classify_table
+
+logger = logging.getLogger(__name__)
+
+# Postgres truncates identifiers to NAMEDATALEN - 1 bytes.
+MAX_IDENTIFIER_LENGTH = 63
+
+
+class SqlPreflightError(ValueError):
+    """Generated SQL names a table or column the catalog does not have."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+@dataclass
+class PreflightResult:
+    sql: str
+    corrections: List[str] = field(default_factory=list)
+    problems: List[str] = field(default_factory=list)
+
+
+def _postgres_name(identifier: exp.Identifier) -> str:
+    name = identifier.this if identifier.quoted else identifier.this.lower()
+    return name[:MAX_IDENTIFIER_LENGTH]
+
+
+def _resolve_table(table: exp.Table, catalog: SchemaCatalog) -> Optional[str]:
+    """Catalog name for a table reference, correcting truncation and case; None if unknown."""
+    identifier = table.this
+    name = _postgres_name(identifier)
+    if name in catalog:
+        if identifier.this != name:
+            identifier.set("this", name)
+        return name
+    folded = identifier.this.lower()[:MAX_IDENTIFIER_LENGTH]
+    if folded in catalog:
+        identifier.set("this", folded)
+        return folded
+    return None
+
+
+def _resolve_column(column: exp.Column, columns: Dict[str, List[str]]) -> Optional[str]:
+    """
+    Fix ``column`` in place against ``{catalog_name: [tables]}`` for the tables
+    in scope; returns the catalog name, or None if no table has it.
+    """
+    identifier = column.this
+    name = _postgres_name(identifier)
+    if name in columns:
+        return name
+    matches = [c for c in columns if c.lower() == identifier.this.lower()]
+    if len(matches) != 1:
+        return None
+    identifier.set("this", matches[0])
+    identifier.set("quoted", matches[0] != matches[0].lower() or identifier.quoted)
+    return matches[0]
+
+
+def _columns_by_name(tables: List[str], catalog: SchemaCatalog) -> Dict[str, List[str]]:
+    by_name: Dict[str, List[str]] = {}
+    for table in tables:
+        for column in catalog.columns(table):
+            by_name.setdefault(column, []).append(table)
+    return by_name
+
+
+@dataclass
+class _ColumnRef:
+    column: exp.Column
+    tables: List[str]  # catalog tables the column may come from
+    source: Optional[exp.Table]  # the single table it must come from, when known
+    maybe_outer: bool  # unqualified inside a subquery: could be a correlated reference
+
+
+def _parse(sql: str):
+    try:
+        ast = parse_one(sql, read="postgres")
+        return ast, traverse_scope(ast)
+    except Exception as e:
+        # validate_and_normalize_sql owns syntax errors; an AST sqlglot cannot
+        # scope is passed through unchecked.
+        logger.debug("SQL pre-flight skipped: %s", e)
+        return None, None
+
+
+def _catalog_table_refs(ast: exp.Expression) -> Iterator[exp.Table]:
+    """Table nodes that must name a public catalog table (not CTEs or table functions)."""
+    cte_names = {cte.alias_or_name.lower() for cte in ast.find_all(exp.CTE)}
+    for table in ast.find_all(exp.Table):
+        if not isinstance(table.this, exp.Identifier):
+            continue  # table functions such as generate_series()
+        if table.db and table.db.lower() != "public":
+            continue
+        if not table.db and table.name.lower() in cte_names:
+            continue
+        yield table
+
+
+def _column_refs(scopes, table_names: Dict[int, str]) -> Iterator[_ColumnRef]:
+    """Columns whose possible source tables are all known catalog tables."""
+    for scope in scopes:
+        sources: Dict[str, Optional[exp.Table]] = {}
+        for alias, source in scope.sources.items():
+            known = isinstance(source, exp.Table) and id(source) in table_names
+            sources[alias] = source if known else None
+        projection_aliases = {
+            s.alias.lower() for s in getattr(scope.expression, "selects", []) if isinstance(s, exp.Alias)
+        }
+        all_catalog_sources = bool(sources) and all(t is not None for t in sources.values())
+
+        for column in scope.columns:
+            if isinstance(column.this, exp.Star):
+                continue
+            if column.find_ancestor(exp.Select) is not scope.expression:
+                continue  # a correlated subquery's column; judged in its own scope
+            qualifier = column.table
+            if qualifier:
+                if sources.get(qualifier) is None:
+                    continue
+                nodes = [sources[qualifier]]
+            else:
+                if not all_catalog_sources or column.name.lower() in projection_aliases:
+                    continue
+                nodes = list(sources.values())
+            yield _ColumnRef(
+                column=column,
+                tables=list(dict.fromkeys(table_names[id(n)] for n in nodes)),
+                source=nodes[0] if len(nodes) == 1 else None,
+                maybe_outer=not qualifier and scope.is_subquery,
+            )
+
+
+def _missing_column(ref: _ColumnRef) -> str:
+    qualifier = ref.column.table
+    name = ref.column.this.this
+    return f'column "{qualifier}.{name}" does not exist' if qualifier else f'column "{name}" does not exist'
+
+
+def check_sql(sql: str, catalog: Optional[SchemaCatalog]) -> PreflightResult:
+    """Resolve every catalog-backed table and column in ``sql``; see the module docstring."""
+    result = PreflightResult(sql)
+    if catalog is None or not len(catalog):
+        return result
+    ast, scopes = _parse(sql)
+    if ast is None:
+        return result
+
+    table_names: Dict[int, str] = {}
+    for table in _catalog_table_refs(ast):
+        before = table.name
+        resolved = _resolve_table(table, catalog)
+        if resolved is None:
+            qualified = f"{table.db}.{before}" if table.db else before
+            result.problems.append(f'relation "{qualified}" does not exist')
+            continue
+        if resolved != before:
+            result.corrections.append(f"table {before} -> {resolved}")
+        table_names[id(table)] = resolved
+
+    for ref in _column_refs(scopes, table_names):
+        before = ref.column.this.sql(dialect="postgres")
+        if _resolve_column(ref.column, _columns_by_name(ref.tables, catalog)) is None:
+            if not ref.maybe_outer:
+                result.problems.append(_missing_column(ref))
+        elif ref.column.this.sql(dialect="postgres") != before:
+            result.corrections.append(f"column {before} -> {ref.column.this.sql(dialect='postgres')}")
+
+    result.problems = list(dict.fromkeys(result.problems))
+    if result.corrections:
+        result.sql = ast.sql(dialect="postgres")
+    return result
+
+
+# ----------------------------------------------------------------------
+# Deterministic repair of unknown names
+# ----------------------------------------------------------------------
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or ``limit + 1`` as soon as it must exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _closest(name: str, candidates: Iterable[str], limit: int) -> Optional[str]:
+    """The single candidate within ``limit`` edits of ``name`` (case-insensitive), else None."""
+    scored = sorted((edit_distance(name.lower(), c.lower(), limit), c) for c in candidates)
+    scored = [(d, c) for d, c in scored if d <= limit]
+    if not scored or (len(scored) > 1 and scored[1][0] == scored[0][0]):
+        return None
+    return scored[0][1]
+
+
+def _digits(name: str) -> List[str]:
+    return re.findall(r"\d", name)
+
+
+def _closest_column(name: str, columns: Iterable[str]) -> Optional[str]:
+    """
+    A near-miss column: same name ignoring case and underscores, or one or
+    two edits away. Stat abbreviations are short and dense (fg_pct / fg3_pct
+    / ts_pct), so an edit match must keep the digits and the first two
+    letters, and names under six characters only get the first rule.
+    """
+    columns = list(columns)
+    key = re.sub(r"[^a-z0-9]", "", name.lower())
+    same = [c for c in columns if re.sub(r"[^a-z0-9]", "", c.lower()) == key]
+    if len(same) == 1:
+        return same[0]
+    if len(name) < 6:
+        return None
+    plausible = [c for c in columns if _digits(c) == _digits(name) and c[:2].lower() == name[:2].lower()]
+    return _closest(name, plausible, 1 if len(name) < 10 else 2)
+
+
+def _derived_percentage(column: exp.Column, columns: Iterable[str]) -> Optional[exp.Expression]:
+    """fg_pct / fg3_pct / ft_pct computed from makes and attempts (player_game_logs stores only those)."""
+    m = re.fullmatch(r"(fg3|fg|ft)_pct", column.name.lower())
+    if not m:
+        return None
+    by_lower = {c.lower(): c for c in columns}
+    makes, attempts = by_lower.get(f"{m.group(1)}m"), by_lower.get(f"{m.group(1)}a")
+    if not makes or not attempts:
+        return None
+    prefix = f"{column.table}." if column.table else ""
+    return parse_one(
+        f"(CAST({prefix}{makes} AS DOUBLE PRECISION) / NULLIF({prefix}{attempts}, 0))", read="postgres"
+    )
+
+
+def _repair_table(name: str, catalog: SchemaCatalog) -> Optional[str]:
+    """
+    Same family, season and season type first (the usual miss is a suffix
+    truncated differently from the stored name); a season that is simply not
+    loaded is left alone. Names outside any known family get a close edit match.
+    """
+    folded = name.lower()
+    info = classify_table(folded)
+    family_tables = catalog.family_tables(info.family, info.season_type)
+    if info.season_start is not None and family_tables:
+        same_season = [t for t in family_tables if catalog.table_info(t).season_start == info.season_start]
+        if len(same_season) == 1:
+            return same_season[0]
+        return _closest(folded, same_season, len(folded)) if same_season else None
+    return _closest(folded, [t for t in catalog.table_names() if _digits(t) == _digits(folded)], 3)
+
+
+def _sibling_table(table: str, needed: Set[str], catalog: SchemaCatalog) -> Optional[str]:
+    """The one other table for the same season and season type that has every needed column."""
+    info = catalog.table_info(table)
+    if info.season_start is None:
+        return None
+    siblings = []
+    for candidate in catalog.table_names():
+        other = catalog.table_info(candidate)
+        if candidate == table or other.season_start != info.season_start or other.season_type != info.season_type:
+            continue
+        if needed <= {c.lower() for c in catalog.columns(candidate)}:
+            siblings.append(candidate)
+    return siblings[0] if len(siblings) == 1 else None
+
+
+def auto_repair_sql(sql: str, catalog: Optional[SchemaCatalog]) -> Optional[PreflightResult]:
+    """
+    Fix unknown tables and columns without the LLM, or return None.
+
+    In order: map a table to its stored (truncated) family/season name or a
+    close edit match; map a column to its near-miss catalog name, or compute
+    a missing shooting percentage from makes/attempts; if a table still lacks
+    columns, swap it for the one same-season sibling table that has every
+    column read from it. Case and quoting are then settled by check_sql.
+    Returns None unless the result passes the pre-flight check cleanly.
+    """
+    if catalog is None or not len(catalog):
+        return None
+    ast, _ = _parse(sql)
+    if ast is None:
+        return None
+    fixes: List[str] = []
+
+    table_names: Dict[int, str] = {}
+    for table in _catalog_table_refs(ast):
+        resolved = _resolve_table(table, catalog)
+        if resolved is None:
+            resolved = _repair_table(table.name, catalog)
+            if resolved is None:
+                return None
+            fixes.append(f"table {table.name} -> {resolved}")
+            table.this.set("this", resolved)
+        table_names[id(table)] = resolved
+
+    # Table names changed, so scopes are rebuilt from the updated tree.
+    refs = list(_column_refs(traverse_scope(ast), table_names))
+    unresolved: Dict[int, exp.Table] = {}
+    for ref in refs:
+        columns = _columns_by_name(ref.tables, catalog)
+        before = ref.column.this.sql(dialect="postgres")
+        if _resolve_column(ref.column, columns) is not None:
+            if ref.column.this.sql(dialect="postgres") != before:
+                fixes.append(f"column {before} -> {ref.column.this.sql(dialect='postgres')}")
+            continue
+        name = ref.column.this.this
+        best = _closest_column(name, columns)
+        derived = None if best is not None else _derived_percentage(ref.column, columns)
+        if best is not None:
+            fixes.append(f"column {name} -> {best}")
+            ref.column.this.set("this", best)
+            ref.column.this.set("quoted", best != best.lower())
+        elif derived is not None:
+            fixes.append(f"column {name} -> {derived.sql(dialect='postgres')}")
+            select = ref.column.find_ancestor(exp.Select)
+            is_projection = ref.column.parent is select and ref.column.arg_key == "expressions"
+            ref.column.replace(exp.alias_(derived, name) if is_projection else derived)
+        elif ref.source is not None:
+            unresolved[id(ref.source)] = ref.source
+        elif not ref.maybe_outer:
+            return None
+
+    for key, source in unresolved.items():
+        table = table_names[key]
+        needed = {r.column.this.this.lower() for r in refs if r.source is source}
+        sibling = _sibling_table(table, needed, catalog)
+        if sibling is None:
+            return None
+        fixes.append(f"table {table} -> {sibling} (sibling family)")
+        source.this.set("this", sibling)
+
+    result = check_sql(ast.sql(dialect="postgres"), catalog)
+    if result.problems or not (fixes or result.corrections):
+        return None
+    result.corrections = fixes + result.corrections
+    return result
+
+
+class PreflightStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "corrected": 0, "rejected": 0, "auto_repaired": 0, "auto_repair_failed": 0}
+
+    def record(self, result: PreflightResult) -> None:
+        with self._lock:
+            self._stats["checked"] += 1
+            if result.corrections:
+                self._stats["corrected"] += 1
+            if result.problems:
+                self._stats["rejected"] += 1
+
+    def record_repair(self, repaired: bool) -> None:
+        with self._lock:
+            self._stats["auto_repaired" if repaired else "auto_repair_failed"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+_stats = PreflightStats()
+
+
+def preflight_sql(sql: str, catalog: Optional[SchemaCatalog]) -> str:
+    """Corrected ``sql``, or SqlPreflightError listing what does not exist."""
+    result = check_sql(sql, catalog)
+    _stats.record(result)
+    if result.corrections:
+        logger.info("SQL pre-flight corrected: %s", ", ".join(result.corrections))
+    if result.problems:
+        logger.warning("SQL pre-flight rejected: %s", "; ".join(result.problems))
+        raise SqlPreflightError(result.problems)
+    return result.sql
+
+
+def repair_sql_locally(sql: str, catalog: Optional[SchemaCatalog]) -> Optional[str]:
+    """``auto_repair_sql`` with logging and counters; None means ask the LLM."""
+    result = auto_repair_sql(sql, catalog)
+    _stats.record_repair(result is not None)
+    if result is None:
+        return None
+    logger.info("SQL auto-repaired without the LLM: %s", ", ".join(result.corrections))
+    return result.sql
+
+
+def preflight_stats() -> dict:
+    return _stats.snapshot()
@@ -0,0 +1,146 @@
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from Executer.materializer import materialize_dataframe
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL type OIDs (pg_type.oid) grouped by the NumPy column they stream into.
+INT_OIDS = frozenset({20, 21, 23, 26})       # int8, int2, int4, oid
+FLOAT_OIDS = frozenset({700, 701, 1700})     # float4, float8, numeric
+BOOL_OIDS = frozenset({16})
+
+
+def default_batch_size() -> int:
+    return int(os.getenv("QUERY_STREAM_BATCH_SIZE", "2000"))
+
+
+def default_max_rows() -> Optional[int]:
+    """Row ceiling per query (QUERY_MAX_ROWS). 0/off disables the ceiling."""
+    raw = os.getenv("QUERY_MAX_ROWS", "100000").strip().lower()
+    if raw in ("", "0", "off", "none", "unlimited"):
+        return None
+    return int(raw)
+
+
+def _column_kind(type_code: Optional[int]) -> str:
+    if type_code in INT_OIDS:
+        return "int"
+    if type_code in FLOAT_OIDS:
+        return "float"
+    if type_code in BOOL_OIDS:
+        return "bool"
+    return "object"
+
+
+def _batch_array(values: Sequence[Any], kind: str) -> np.ndarray:
+    """One column of one fetchmany batch as a typed array. NULLs force float (NaN) or object."""
+    has_null = any(v is None for v in values)
+    if kind == "int" and not has_null:
+        return np.fromiter(values, dtype=np.int64, count=len(values))
+    if kind in ("int", "float"):
+        return np.fromiter(
+            (np.nan if v is None else float(v) for v in values), dtype=np.float64, count=len(values)
+        )
+    if kind == "bool" and not has_null:
+        return np.fromiter(values, dtype=np.bool_, count=len(values))
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+@dataclass
+class StreamedResult:
+    """Column-oriented query result assembled batch by batch from a server-side cursor."""
+
+    column_names: List[str]
+    type_codes: List[Optional[int]]
+    columns: List[np.ndarray]
+    row_count: int
+    truncated: bool = False
+    max_rows: Optional[int] = None
+    batches: int = field(default=0, repr=False)
+
+    def to_dataframe(self, compact: bool = True) -> pd.DataFrame:
+        df = materialize_dataframe(self.column_names, self.type_codes, self.columns, compact=compact)
+        df.attrs["truncated"] = self.truncated
+        df.attrs["max_rows"] = self.max_rows
+        return df
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Rows as dicts of plain Python values (NaN → None), like RealDictCursor rows."""
+        py_columns = []
+        for col in self.columns:
+            values = col.tolist()
+            if col.dtype.kind == "f":
+                values = [None if v != v else v for v in values]
+            py_columns.append(values)
+        return [dict(zip(self.column_names, row)) for row in zip(*py_columns)]
+
+
+def stream_query(
+    conn,
+    sql_query: str,
+    batch_size: Optional[int] = None,
+    max_rows: Optional[int] = None,
+) -> StreamedResult:
+    """
+    Run ``sql_query`` through a named (server-side) cursor and pull it in
+    ``fetchmany`` batches, so at most one batch of Python tuples is alive at
+    a time. Stops after ``max_rows`` rows and flags the result as truncated.
+
+    Must run inside an open transaction; the cursor is closed before returning.
+    """
+    batch_size = batch_size or default_batch_size()
+    cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex[:16]}")
+    cursor.itersize = batch_size
+    chunks: List[List[np.ndarray]] = []
+    fetched = 0
+    truncated = False
+    kinds: Optional[List[str]] = None
+    try:
+        cursor.execute(sql_query.strip().rstrip(";"))
+        while True:
+            want = batch_size
+            if max_rows is not None:
+                # Ask for one row past the ceiling so truncation is detected, not guessed.
+                want = min(batch_size, max_rows + 1 - fetched)
+            rows = cursor.fetchmany(want)
+            if kinds is None:
+                kinds = [_column_kind(d[1]) for d in (cursor.description or [])]
+            if not rows:
+                break
+            if max_rows is not None and fetched + len(rows) > max_rows:
+                rows = rows[: max_rows - fetched]
+                truncated = True
+            if rows:
+                chunks.append([_batch_array(values, kind) for values, kind in zip(zip(*rows), kinds)])
+                fetched += len(rows)
+            if truncated:
+                break
+        description = cursor.description or []
+    finally:
+        cursor.close()
+
+    kinds = kinds or []
+    if chunks:
+        columns = [np.concatenate([chunk[i] for chunk in chunks]) for i in range(len(kinds))]
+    else:
+        columns = [_batch_array([], kind) for kind in kinds]
+    if truncated:
+        logger.warning("Result truncated at %d rows (QUERY_MAX_ROWS)", max_rows)
+    return StreamedResult(
+        column_names=[d[0] for d in description],
+        type_codes=[d[1] for d in description],
+        columns=columns,
+        row_count=fetched,
+        truncated=truncated,
+        max_rows=max_rows,
+        batches=len(chunks),
+    )
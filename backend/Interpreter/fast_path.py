@@ -0,0 +1,312 @@
+"""
+Deterministic SQL for the high-volume question shapes.
+
+Single-season leaderboards, a player's season line, a player's career by
+season, a player's last N games and league standings follow fixed table
+conventions (RULES 2-8 of the SQL prompt), so they can be written without a
+model call. Each builder returns a FastPathPlan with a confidence score; the
+interpreter only uses plans at or above FAST_PATH_MIN_CONFIDENCE and sends
+everything else to the model as before.
+
+Builders never guess: a missing table or column, more than one stat, a
+comparison, a filter they do not understand or a specialty family all mean
+"no plan".
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from Executer.schema_catalog import SchemaCatalog
+
+# Stat keyword → all_players_* column with a matching *_rank column.
+_LEADERBOARD_STATS = (
+    ("pts", r"\b(points|scor(?:er|ers|ing)|ppg)\b"),
+    ("reb", r"\b(rebounds?|rebound(?:er|ers|ing)|rpg|boards)\b"),
+    ("ast", r"\b(assists?|apg)\b"),
+    ("stl", r"\b(steals?|spg)\b"),
+    ("blk", r"\b(blocks?|blocked shots|bpg)\b"),
+    ("fg3m", r"\b(threes|three[- ]pointers?(?: made)?|3[- ]?pointers?(?: made)?|3pm)\b"),
+    ("tov", r"\b(turnovers?)\b"),
+    ("nba_fantasy_pts", r"\bfantasy\b"),
+    ("dd2", r"\bdouble[- ]doubles?\b"),
+    ("td3", r"\btriple[- ]doubles?\b"),
+)
+_LEADERBOARD_RE = re.compile(r"\b(top|leaders?|leading|led|leads|leaderboard|most|highest|best)\b")
+_LEADERBOARD_BLOCK = ["player_name", "team_abbreviation", "gp", "fg_pct", "fg3_pct", "fg3m", "fg3a", "ftm", "fta", "ft_pct"]
+
+_GAME_LOG_BLOCK = [
+    "player_name", "game_date", "matchup", "wl", "pts", "reb", "ast", "stl", "blk",
+    "tov", "fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "min",
+]
+_LAST_GAMES_RE = re.compile(r"\b(?:last|past|previous|recent)\s+(?:(\d{1,2}|\w+)\s+)?games?\b")
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "twenty": 20,
+}
+
+_CAREER_RE = re.compile(
+    r"\b(career|by season|per season|each season|every season|season by season|year by year|"
+    r"over the years|through the years|across seasons|over time|trend)\b"
+)
+_PROFILE_RE = re.compile(r"\b(stats?|statistics|numbers|averages?|season|profile|stat line|line)\b|\bhow did\b")
+
+_STANDINGS_RE = re.compile(r"\b(standings?|seeds?|seeding|conference rank(?:ings?)?|playoff picture)\b")
+_STANDINGS_COLUMNS = [
+    "TeamCity", "TeamName", "Conference", "PlayoffRank", "WINS", "LOSSES",
+    "WinPCT", "Record", "L10", "CurrentStreak",
+]
+# Standings "TeamName" values for nicknames people actually type.
+_TEAM_NAMES = {
+    "hawks": "Hawks", "celtics": "Celtics", "nets": "Nets", "hornets": "Hornets", "bulls": "Bulls",
+    "cavaliers": "Cavaliers", "cavs": "Cavaliers", "mavericks": "Mavericks", "mavs": "Mavericks",
+    "nuggets": "Nuggets", "pistons": "Pistons", "warriors": "Warriors", "rockets": "Rockets",
+    "pacers": "Pacers", "clippers": "Clippers", "lakers": "Lakers", "grizzlies": "Grizzlies",
+    "heat": "Heat", "bucks": "Bucks", "timberwolves": "Timberwolves", "wolves": "Timberwolves",
+    "pelicans": "Pelicans", "knicks": "Knicks", "thunder": "Thunder", "magic": "Magic",
+    "76ers": "76ers", "sixers": "76ers", "suns": "Suns", "blazers": "Trail Blazers",
+    "kings": "Kings", "spurs": "Spurs", "raptors": "Raptors", "jazz": "Jazz", "wizards": "Wizards",
+}
+
+# Any of these means the question needs something the builders do not write.
+_DISQUALIFIERS = re.compile(
+    r"\b(compare|comparison|versus|vs|than|between|better|worse|against|"
+    r"clutch|hustle|deflections?|tracking|drives?|touches|shot chart|shot distance|lineups?|"
+    r"advanced|true shooting|ts|efg|usage|usg|net rating|off rating|def rating|pie|"
+    r"rookies?|age|aged|at least|minimum|more than|fewer|less than|without|(?:over|under) \d+|"
+    r"home|away|road|month|january|february|march|april|may|june|july|august|september|"
+    r"october|november|december|since|from|until|through \d+|decade|all time|alltime|ever|history|"
+    r"worst|lowest|fewest|least|bottom|franchise|total|totals|sum|combined|"
+    r"percentage|percent|pct|efficien\w*|rate|per 36|per 100)\b|%"
+)
+_TEAM_RE = re.compile(r"\bteams?\b")
+# "3-pointers" / "3pt" carry a digit that is part of the stat, not a filter.
+_STAT_DIGITS_RE = re.compile(r"\b3[- ]?(?:pt|pts|point|pointers?|pm|s)\b")
+
+
+@dataclass(frozen=True)
+class FastPathPlan:
+    """Deterministic SQL for one question, with how sure the builder is."""
+
+    intent: str
+    sql: str
+    confidence: float
+
+
+def _season_label(start: int) -> str:
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _quote_literal(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _player_filter(player_name: str) -> str:
+    return f"player_name ILIKE '%{_quote_literal(player_name)}%'"
+
+
+def _present(catalog: SchemaCatalog, table: str, columns: Sequence[str]) -> List[str]:
+    available = set(catalog.columns(table))
+    return [c for c in columns if c in available]
+
+
+def _confidence(question: str) -> float:
+    # Long or number-heavy questions usually carry a constraint no builder reads.
+    score = 1.0
+    question = _STAT_DIGITS_RE.sub("three", question)
+    if len(question.split()) > 14:
+        score -= 0.2
+    # Seasons ("2023-24", "2023 24", "2024") are read by the builders; anything else is not.
+    question = re.sub(r"\b(?:19|20)\d{2}(?:\s*[-/ ]\s*\d{2}(?:\d{2})?)?\b", "season", question)
+    stray_numbers = re.findall(r"\b\d+\b", question)
+    score -= 0.3 * len(stray_numbers)
+    return max(score, 0.0)
+
+
+def leaderboard_plan(
+    question: str, season_window: Tuple[int, int, bool], catalog: SchemaCatalog
+) -> Optional[FastPathPlan]:
+    """Top-N for one stat from one all_players_* season table, ordered by its rank column."""
+    q = question.lower()
+    if not _LEADERBOARD_RE.search(q) or _TEAM_RE.search(q):
+        return None
+    stats = [col for col, pattern in _LEADERBOARD_STATS if re.search(pattern, q)]
+    if len(stats) != 1:
+        return None
+    stat = stats[0]
+    start, end, is_playoffs = season_window
+    table = f"all_players_{'playoffs' if is_playoffs else 'regular'}_{start}_{end}"
+    if table not in catalog:
+        return None
+    columns = _present(catalog, table, ["player_name", "team_abbreviation", stat, f"{stat}_rank"] + _LEADERBOARD_BLOCK)
+    if stat not in columns or f"{stat}_rank" not in columns:
+        return None
+    columns = list(dict.fromkeys(columns))
+
+    n_match = re.search(r"\btop\s+(\d{1,2})\b", q)
+    limit = int(n_match.group(1)) if n_match else 10
+    # Leave room for traded players' extra rows; the analyzer de-dupes and shows the requested N.
+    fetch = limit + min(max(limit // 2, 3), 10)
+    confidence = _confidence(q.replace(n_match.group(0), "top") if n_match else q)
+    sql = (
+        f"SELECT {', '.join(columns)}, {start} AS season_start, '{_season_label(start)}' AS season_label "
+        f'FROM public."{table}" ORDER BY {stat}_rank ASC NULLS LAST LIMIT {fetch};'
+    )
+    return FastPathPlan("leaderboard", sql, confidence)
+
+
+def player_season_plan(
+    question: str,
+    player_name: str,
+    season_window: Tuple[int, int, bool],
+    catalog: SchemaCatalog,
+    full_row_columns: Sequence[str],
+) -> Optional[FastPathPlan]:
+    """One player's full season line from one all_players_* table."""
+    q = question.lower()
+    if not _PROFILE_RE.search(q) or _LEADERBOARD_RE.search(q) or _CAREER_RE.search(q) or re.search(r"\bgames?\b", q):
+        return None
+    start, end, is_playoffs = season_window
+    table = f"all_players_{'playoffs' if is_playoffs else 'regular'}_{start}_{end}"
+    if table not in catalog:
+        return None
+    columns = _present(catalog, table, full_row_columns)
+    if "player_name" not in columns:
+        return None
+    sql = (
+        f"SELECT {', '.join(columns)}, {start} AS season_start, '{_season_label(start)}' AS season_label "
+        f'FROM public."{table}" WHERE {_player_filter(player_name)};'
+    )
+    return FastPathPlan("player_season", sql, _confidence(q))
+
+
+def career_by_season_plan(
+    question: str,
+    player_name: str,
+    is_playoffs: bool,
+    catalog: SchemaCatalog,
+    career_columns: Sequence[str],
+) -> Optional[FastPathPlan]:
+    """One row per season for one player: UNION ALL over every season table (collapsed later)."""
+    q = question.lower()
+    if not _CAREER_RE.search(q) or _LEADERBOARD_RE.search(q):
+        return None
+    season_type = "playoffs" if is_playoffs else "regular"
+    starts = catalog.season_starts(f"all_players_{season_type}")
+    tables = [(s, f"all_players_{season_type}_{s}_{s + 1}") for s in starts]
+    tables = [(s, t) for s, t in tables if t in catalog]
+    if not tables:
+        return None
+    # Only columns every season table has, so the UNION ALL legs line up.
+    shared = set(career_columns)
+    for _, table in tables:
+        shared &= set(catalog.columns(table))
+    columns = [c for c in career_columns if c in shared]
+    if "player_name" not in columns:
+        return None
+    col_sql = ", ".join(columns)
+    legs = [
+        f"SELECT {s} AS season_start, '{_season_label(s)}' AS season_label, {col_sql} "
+        f'FROM public."{t}" WHERE {_player_filter(player_name)}'
+        for s, t in tables
+    ]
+    sql = " UNION ALL ".join(legs) + " ORDER BY season_start;"
+    return FastPathPlan("career_by_season", sql, _confidence(q))
+
+
+def last_games_plan(
+    question: str, player_name: str, is_playoffs: bool, catalog: SchemaCatalog
+) -> Optional[FastPathPlan]:
+    """A player's most recent N games from player_game_logs."""
+    q = question.lower()
+    m = _LAST_GAMES_RE.search(q)
+    if not m or "player_game_logs" not in catalog:
+        return None
+    raw_n = m.group(1)
+    if raw_n is None:
+        limit = 5 if "recent" in m.group(0) else 1
+    elif raw_n.isdigit():
+        limit = int(raw_n)
+    elif raw_n in _NUMBER_WORDS:
+        limit = _NUMBER_WORDS[raw_n]
+    else:
+        return None
+    if not 1 <= limit <= 82:
+        return None
+    columns = _present(catalog, "player_game_logs", _GAME_LOG_BLOCK)
+    if "game_date" not in columns or "player_name" not in columns:
+        return None
+    where = _player_filter(player_name)
+    if is_playoffs:
+        where += " AND season_type = 'Playoffs'"
+    sql = (
+        f"SELECT {', '.join(columns)} FROM public.\"player_game_logs\" WHERE {where} "
+        f"ORDER BY game_date DESC LIMIT {limit};"
+    )
+    return FastPathPlan("last_games", sql, _confidence(q.replace(m.group(0), "last games")))
+
+
+def standings_plan(question: str, season_start: int, catalog: SchemaCatalog) -> Optional[FastPathPlan]:
+    """League / conference standings (optionally one team) from nba_standings_*."""
+    q = question.lower()
+    if not _STANDINGS_RE.search(q):
+        return None
+    table = catalog.season_table("nba_standings", season_start)
+    if not table:
+        return None
+    columns = _present(catalog, table, _STANDINGS_COLUMNS)
+    if not {"TeamName", "Conference", "PlayoffRank"} <= set(columns):
+        return None
+
+    teams = {name for word, name in _TEAM_NAMES.items() if re.search(rf"\b{word}\b", q)}
+    where = []
+    if len(teams) > 1:
+        return None
+    if teams:
+        where.append(f"\"TeamName\" ILIKE '%{_quote_literal(teams.pop())}%'")
+    if re.search(r"\beast(?:ern)?\b", q):
+        where.append("\"Conference\" = 'East'")
+    elif re.search(r"\bwest(?:ern)?\b", q):
+        where.append("\"Conference\" = 'West'")
+
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+    sql = f'SELECT {col_sql} FROM public."{table}"'
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY \"Conference\", NULLIF(\"PlayoffRank\", '')::numeric ASC NULLS LAST;"
+    return FastPathPlan("standings", sql, _confidence(q))
+
+
+def plan_fast_path(
+    question: str,
+    players: Sequence[str],
+    season_window: Tuple[int, int, bool],
+    explicit_season: bool,
+    standings_season_start: int,
+    catalog: SchemaCatalog,
+    full_row_columns: Sequence[str],
+    career_columns: Sequence[str],
+) -> Optional[FastPathPlan]:
+    """
+    Pick the builder for ``question``. ``players`` must already be validated
+    against the player index; ``season_window`` is (start, end, is_playoffs).
+    """
+    q = " ".join((question or "").lower().split())
+    if not q or _DISQUALIFIERS.search(q):
+        return None
+    if len(players) > 1:
+        return None
+    _, _, is_playoffs = season_window
+
+    if not players:
+        if _STANDINGS_RE.search(q):
+            return standings_plan(q, standings_season_start, catalog)
+        return leaderboard_plan(q, season_window, catalog)
+
+    player = players[0]
+    if _LAST_GAMES_RE.search(q):
+        # "last 5 games of 2019" needs a date filter the builder does not write.
+        return None if explicit_season else last_games_plan(q, player, is_playoffs, catalog)
+    if _CAREER_RE.search(q):
+        return None if explicit_season else career_by_season_plan(q, player, is_playoffs, catalog, career_columns)
+    return player_season_plan(q, player, season_window, catalog, full_row_columns)
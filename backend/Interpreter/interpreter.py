@@ -1,8 +1,10 @@
+import hashlib
 import os
 import logging
 import re
+from dataclasses import replace
+from typing import Optional
 from dotenv import load_dotenv
-from openai import OpenAI
 
 load_dotenv()
 # Configure logging before importing executor: executor previously called basicConfig(INFO)
@@ -16,9 +18,44 @@ else:
     # Uvicorn (or another host) configured the root logger; only adjust severity.
     logging.getLogger().setLevel(_level)
 
+from sqlglot import exp as sql_exp
+from sqlglot import condition as sql_condition
+from sqlglot import parse_one as sql_parse_one
+from sqlglot.errors import SqlglotError
+from Executer.player_index import (
+    get_player_index,
+    player_ids_for_name_filter,
+    rewrite_player_name_filters_to_ids,
+)
+from Executer.player_season import PLAYER_SEASON_TABLE, player_season_coverage
+from Executer.result_cache import current_season_start
+from Executer.schema_catalog import SchemaCatalog
+from Executer.sql_preflight import preflight_sql, repair_sql_locally
+from Interpreter.fast_path import FastPathPlan, plan_fast_path
+from Interpreter.llm_gateway import get_llm_gateway
+from Interpreter.question_features import ORDINAL_WORDS as _ORDINAL_WORDS, question_features
+from Interpreter.rewrite_pipeline import RewriteContext, RewritePass, RewritePipeline, RewriteStats, to_sql
+from Interpreter.llm_usage import response_usage
+from Interpreter.sql_cache import (
+    DataVersionProbe,
+    SqlCache,
+    normalize_question,
+    question_key,
+    read_current_season_data_version,
+)
+from Interpreter.sql_prompt import (
+    PromptTokenStats,
+    build_sql_prompt,
+    estimate_tokens,
+    question_scopes,
+    schema_sections_for,
+)
+from Interpreter.sql_templates import QuestionSlots, fill_sql_template, parameterize_sql, question_slots
 from Executer.executor import (
-    get_connection,
+    pooled_connection,
+    describe_schema,
     get_db_schema,
+    get_schema_catalog,
     #is_safe_sql,
     limit_rows,
     execute_query,
@@ -29,93 +66,23 @@ logger = logging.getLogger(__name__)
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     logger.warning("OpenAI API key missing from environment")
-client = OpenAI(api_key=api_key,
-                base_url="https://us.api.openai.com/v1"
-                )
+client = get_llm_gateway()
 
 
 def _extract_current_question_text(user_input: str) -> str:
-    raw = (user_input or "").strip()
-    if not raw:
-        return ""
-    # If the backend wrapped chat history, use only the explicit current-question segment
-    # for intent/routing safeguards.
-    match = re.search(r"(?is)\bcurrent question\s*:\s*(.+)$", raw)
-    if match:
-        return match.group(1).strip()
-    return raw
+    return question_features(user_input).text
 
 
 def _is_single_player_profile_request(user_input: str) -> bool:
-    q = _extract_current_question_text(user_input).lower()
-    has_profile_intent = any(
-        k in q for k in ["what were", " stats", "stat ", "show", "profile", "season stats"]
-    )
-    has_exclusions = any(
-        k in q
-        for k in [
-            "top ", "best ", "highest", "most ", "leading ",
-            "compare", "versus", " vs ", "between",
-            "leaderboard", "by season", "per season",
-            "trend", "over time", "over the years", "through the years",
-            "decade", "rookie year", "from ", " to ", "career",
-            "better", "worse", "as well as", " or ",
-            "who was", "who is", "who's", "of the two",
-            "follow-up constraint",   # set by main.py when continuing a comparison
-        ]
-    )
-    return has_profile_intent and not has_exclusions
+    return question_features(user_input).is_single_player_profile
 
 
 def _extract_bare_year_request(user_input: str):
-    q = _extract_current_question_text(user_input).lower()
-    # If explicit season range is provided (e.g., 2024-25), do not override.
-    if re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2}|19\d{2}|20\d{2})\b", q):
-        return None
-
-    year_match = re.search(r"\b(19\d{2}|20\d{2})\b", q)
-    if not year_match:
-        return None
-
-    year = int(year_match.group(1))
-    is_playoffs = ("playoff" in q) or ("postseason" in q)
-    return year, is_playoffs
-
-
-_ORDINAL_WORDS = {
-    "first": 1,
-    "second": 2,
-    "third": 3,
-    "fourth": 4,
-    "fifth": 5,
-    "sixth": 6,
-    "seventh": 7,
-    "eighth": 8,
-    "ninth": 9,
-    "tenth": 10,
-    "eleventh": 11,
-    "twelfth": 12,
-    "thirteenth": 13,
-    "fourteenth": 14,
-    "fifteenth": 15,
-}
+    return question_features(user_input).bare_year
 
 
 def _extract_requested_nth_season(user_input: str):
-    q = _extract_current_question_text(user_input).lower()
-    digit_match = re.search(r"\b(\d{1,2})(st|nd|rd|th)\s+(season|year)\b", q)
-    if digit_match:
-        try:
-            n = int(digit_match.group(1))
-            if n > 0:
-                return n
-        except Exception:
-            pass
-
-    for word, n in _ORDINAL_WORDS.items():
-        if re.search(rf"\b{word}\s+(season|year)\b", q):
-            return n
-    return None
+    return question_features(user_input).nth_season
 
 
 def _extract_nth_comparison_player_names(user_input: str):
@@ -170,30 +137,31 @@ def _extract_nth_comparison_player_names(user_input: str):
 
 def _available_season_starts(conn, table_type: str):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = 'public'
-              AND table_name LIKE %s
-            ORDER BY table_name ASC;
-            """,
-            (f"all_players_{table_type}_%",),
-        )
-        starts = []
-        for (table_name,) in cursor.fetchall():
-            m = re.match(rf"all_players_{table_type}_(\d{{4}})_(\d{{4}})$", table_name or "")
-            if m:
-                starts.append(int(m.group(1)))
-        return sorted(set(starts))
+        return get_schema_catalog(conn).season_starts(f"all_players_{table_type}")
     except Exception:
         return []
 
 
+def _player_seasons_for_where(conn, table_type: str, where_clause: str) -> Optional[list[int]]:
+    """Seasons the players named by a name-only WHERE clause appeared in, from the presence index."""
+    if conn is None:
+        return None
+    index = get_player_index(conn)
+    if index is None or not index.has_seasons:
+        return None
+    player_ids = player_ids_for_name_filter(where_clause, index, _PLAYER_ALIAS_MAP)
+    if player_ids is None:
+        return None
+    return index.seasons(player_ids, table_type)
+
+
 def _first_season_start_for_where(conn, table_type: str, where_clause: str, starts: list[int]):
     if not where_clause or not starts:
         return None
+    played = _player_seasons_for_where(conn, table_type, where_clause)
+    if played is not None:
+        available = set(starts)
+        return next((start for start in played if start in available), None)
     cleaned_where = where_clause.strip().rstrip(";")
     for start in starts:
         end = start + 1
@@ -209,63 +177,78 @@ def _first_season_start_for_where(conn, table_type: str, where_clause: str, star
     return None
 
 
-def _enforce_nth_season_table_mapping(sql_query: str, user_input: str, conn) -> str:
+_SEASON_TABLE_RE = re.compile(r"(?i)all_players_(regular|playoffs)_(\d{4})_(\d{4})")
+
+
+def _season_table_match(node) -> Optional[re.Match]:
+    """Match for an all_players season table (or column qualifier) identifier."""
+    if not isinstance(node, sql_exp.Identifier):
+        return None
+    return _SEASON_TABLE_RE.fullmatch(node.name or "")
+
+
+def _rewrite_sql_text(sql_query: str, rewrite) -> str:
+    """Run a tree rewrite on SQL text; the text is returned as-is when it does not parse or nothing changed."""
     if not sql_query:
         return sql_query
-    nth = _extract_requested_nth_season(user_input)
-    if not nth:
+    try:
+        tree = sql_parse_one(sql_query, read="postgres")
+    except SqlglotError:
         return sql_query
+    rewritten = rewrite(tree)
+    return to_sql(rewritten) if rewritten is not None else sql_query
 
-    q = sql_query
-    regular_starts = _available_season_starts(conn, "regular")
-    playoffs_starts = _available_season_starts(conn, "playoffs")
 
-    leg_pattern = re.compile(
-        r"(?is)(select\s+)(?P<select_part>.*?)(\s+from\s+)"
-        r"(?P<table_name>all_players_(?P<table_type>regular|playoffs)_(?P<start>\d{4})_(?P<end>\d{4}))"
-        r"(?P<rest>\s+where\s+.*?)(?=(\bunion\s+all\b|$))"
+def _selects_expression(select: sql_exp.Select, name: str) -> bool:
+    return any(
+        isinstance(node, sql_exp.Identifier) and node.name.lower() == name
+        for projection in select.expressions
+        for node in projection.walk()
     )
 
-    def _rewrite_leg(match: re.Match):
-        select_part = match.group("select_part")
-        table_type = (match.group("table_type") or "").lower()
-        rest = match.group("rest") or ""
 
-        where_match = re.search(
-            r"(?is)\bwhere\b\s*(?P<where>.*?)(\bgroup\s+by\b|\border\s+by\b|\blimit\b|$)",
-            rest,
-        )
-        if not where_match:
-            return match.group(0)
+def _nth_season_table_tree(tree, user_input: str, conn):
+    """Point single-table season legs with a WHERE at the player's nth season; None when unchanged."""
+    nth = _extract_requested_nth_season(user_input)
+    if not nth:
+        return None
 
-        where_clause = (where_match.group("where") or "").strip()
-        if not where_clause:
-            return match.group(0)
+    tree = tree.copy()
+    starts_by_type: dict[str, list[int]] = {}
+    changed = False
+    for select in tree.find_all(sql_exp.Select):
+        from_ = select.args.get("from_")
+        where = select.args.get("where")
+        if from_ is None or where is None or select.args.get("joins") or not isinstance(from_.this, sql_exp.Table):
+            continue
+        table_match = _season_table_match(from_.this.this)
+        if not table_match:
+            continue
 
-        starts = regular_starts if table_type == "regular" else playoffs_starts
-        first_start = _first_season_start_for_where(conn, table_type, where_clause, starts)
+        table_type = table_match.group(1).lower()
+        if table_type not in starts_by_type:
+            starts_by_type[table_type] = _available_season_starts(conn, table_type)
+        starts = starts_by_type[table_type]
+        first_start = _first_season_start_for_where(conn, table_type, where.this.sql(dialect="postgres"), starts)
         if first_start is None:
-            return match.group(0)
+            continue
 
         target_start = first_start + (nth - 1)
         if target_start not in starts:
-            return match.group(0)
+            continue
         target_end = target_start + 1
-        target_table = f"all_players_{table_type}_{target_start}_{target_end}"
-        season_label = f"{target_start}-{str(target_end)[-2:]}"
+        from_.this.this.set("this", f"all_players_{table_type}_{target_start}_{target_end}")
+        if not _selects_expression(select, "season_label"):
+            season_label = f"{target_start}-{str(target_end)[-2:]}"
+            select.select(sql_exp.alias_(sql_exp.Literal.string(season_label), "season_label"), copy=False)
+        if not _selects_expression(select, "season_start"):
+            select.select(sql_exp.alias_(sql_exp.Literal.number(target_start), "season_start"), copy=False)
+        changed = True
+    return tree if changed else None
 
-        updated_select = select_part
-        if not re.search(r"(?i)\bseason_label\b", updated_select):
-            updated_select = updated_select.rstrip() + f", '{season_label}' AS season_label"
-        if not re.search(r"(?i)\bseason_start\b", updated_select):
-            updated_select = updated_select.rstrip() + f", {target_start} AS season_start"
 
-        return (
-            f"{match.group(1)}{updated_select}{match.group(3)}{target_table}{rest}"
-        )
-
-    q = re.sub(leg_pattern, _rewrite_leg, q)
-    return q
+def _enforce_nth_season_table_mapping(sql_query: str, user_input: str, conn) -> str:
+    return _rewrite_sql_text(sql_query, lambda tree: _nth_season_table_tree(tree, user_input, conn))
 
 
 def _rewrite_nth_season_comparison_sql(sql_query: str, user_input: str, conn) -> str:
@@ -314,76 +297,35 @@ def _rewrite_nth_season_comparison_sql(sql_query: str, user_input: str, conn) ->
     )
 
 
-def _enforce_start_year_table_mapping(sql_query: str, user_input: str) -> str:
-    if not sql_query:
-        return sql_query
-    if "union" in sql_query.lower():
-        return sql_query
-
+def _start_year_table_tree(tree, user_input: str):
+    """Point every season table at the bare year the question asks for; None when unchanged."""
     req = _extract_bare_year_request(user_input)
-    if req is None:
-        return sql_query
+    if req is None or tree.find(sql_exp.Union) is not None:
+        return None
     year, is_playoffs = req
+    start = year - 1 if is_playoffs else year
+    target = f"all_players_{'playoffs' if is_playoffs else 'regular'}_{start}_{start + 1}"
 
-    if is_playoffs:
-        start = year - 1
-        end = year
-        target = f"all_players_playoffs_{start}_{end}"
-        replaced = re.sub(r"(?i)all_players_(regular|playoffs)_\d{4}_\d{4}", target, sql_query)
-        return replaced
+    tree = tree.copy()
+    changed = False
+    for node in tree.find_all(sql_exp.Table, sql_exp.Column):
+        identifier = node.this if isinstance(node, sql_exp.Table) else node.args.get("table")
+        if _season_table_match(identifier) and identifier.name != target:
+            identifier.set("this", target)
+            changed = True
+    return tree if changed else None
 
-    start = year
-    end = year + 1
-    target = f"all_players_regular_{start}_{end}"
-    replaced = re.sub(r"(?i)all_players_(regular|playoffs)_\d{4}_\d{4}", target, sql_query)
-    return replaced
+
+def _enforce_start_year_table_mapping(sql_query: str, user_input: str) -> str:
+    return _rewrite_sql_text(sql_query, lambda tree: _start_year_table_tree(tree, user_input))
 
 
 def _is_advanced_metrics_request(user_input: str) -> bool:
-    q = _extract_current_question_text(user_input).lower()
-    advanced_terms = [
-        "true shooting",
-        "ts%",
-        "ts pct",
-        "ts_pct",
-        "efg",
-        "efg%",
-        "usage rate",
-        "usg",
-        "off rating",
-        "def rating",
-        "net rating",
-        "pie",
-        "advanced stat",
-        "advanced metric",
-    ]
-    return any(term in q for term in advanced_terms)
+    return question_features(user_input).is_advanced_metrics
 
 
 def _extract_requested_season_window(user_input: str):
-    q = _extract_current_question_text(user_input).lower()
-    is_playoffs = ("playoff" in q) or ("postseason" in q)
-
-    range_match = re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2}|19\d{2}|20\d{2})\b", q)
-    if range_match:
-        start = int(range_match.group(1))
-        end_raw = range_match.group(2)
-        end = int(f"{str(start)[:2]}{end_raw}") if len(end_raw) == 2 else int(end_raw)
-        return start, end, is_playoffs
-
-    bare = _extract_bare_year_request(user_input)
-    if bare is not None:
-        year, playoffs_flag = bare
-        if playoffs_flag:
-            return year - 1, year, True
-        return year, year + 1, False
-
-    if "this season" in q or "current season" in q or "last season" in q:
-        return 2024, 2025, False
-    if "this playoff" in q or "current playoff" in q or "last playoff" in q:
-        return 2024, 2025, True
-
-    return 2024, 2025, is_playoffs
+    return question_features(user_input).season_window
 
 
 def _all_players_full_row_columns() -> list[str]:
@@ -570,54 +512,20 @@ def _extract_player_names_from_question(question_text: str) -> list[str]:
 def _filter_valid_player_names(conn, candidates: list[str]) -> list[str]:
     if not candidates or conn is None:
         return list(candidates or [])
-    cursor = conn.cursor()
+    index = get_player_index(conn)
+    if index is None:
+        return list(candidates)  # Fallback to keeping names if the index is unavailable
+
     valid: list[str] = []
-    
     for name in candidates:
         raw_name = name.replace('%', '').replace('_', '')
-        parts = [p for p in raw_name.split() if p]
-        
-        if len(parts) >= 2:
-            first = parts[0]
-            # Safely grab the first 3 letters of the last name to bypass any accents/special characters
-            # (e.g., "Doncic" or "Dončić" -> "Don", "Jokic" -> "Jok")
-            last_prefix = parts[-1][:3]
-            
-            query = """
-                SELECT 1 WHERE EXISTS (
-                    SELECT 1 FROM public.all_players_regular_2024_2025
-                    WHERE player_name ILIKE %s OR (player_name ILIKE %s AND player_name ILIKE %s)
-                    UNION ALL
-                    SELECT 1 FROM public.all_players_regular_1996_1997
-                    WHERE player_name ILIKE %s OR (player_name ILIKE %s AND player_name ILIKE %s)
-                ) LIMIT 1;
-            """
-            params = (
-                f"%{raw_name}%", f"%{first}%", f"%{last_prefix}%",
-                f"%{raw_name}%", f"%{first}%", f"%{last_prefix}%"
-            )
+        if index.contains(raw_name, aliases=_PLAYER_ALIAS_MAP):
+            valid.append(name)
         else:
-            like = f"%{raw_name}%"
-            query = """
-                SELECT 1 WHERE EXISTS (
-                    SELECT 1 FROM public.all_players_regular_2024_2025
-                    WHERE player_name ILIKE %s
-                    UNION ALL
-                    SELECT 1 FROM public.all_players_regular_1996_1997
-                    WHERE player_name ILIKE %s
-                ) LIMIT 1;
-            """
-            params = (like, like)
-
-        try:
-            cursor.execute(query, params)
-            if cursor.fetchone():
-                valid.append(name)
-            else:
-                logger.debug("Dropped unverified player candidate: %r", name)
-        except Exception:
-            valid.append(name) # Fallback to keeping it if query fails
-            logger.exception("Error occurred while filtering player name: %r", name)
+            logger.debug(
+                "Dropped unverified player candidate: %r (did you mean: %s)",
+                name, ", ".join(index.suggest(raw_name)) or "no close match",
+            )
     return valid
 
 
@@ -628,6 +536,10 @@ def _extract_player_names_from_sql(sql_query: str) -> list[str]:
         for m in re.findall(r"(?i)player_name\s+ILIKE\s+'%([^%']+)%'", q)
         if m and m.strip()
     ]
+    return _preferred_player_names(matches)
+
+
+def _preferred_player_names(matches: list[str]) -> list[str]:
     if not matches:
         return []
 
@@ -645,7 +557,24 @@ def _extract_player_names_from_sql(sql_query: str) -> list[str]:
     return deduped
 
 
-def _extract_named_players(user_input: str, sql_query: str, conn=None) -> list[str]:
+def _player_names_from_tree(tree) -> list[str]:
+    """Names from the tree's ``player_name ILIKE '%name%'`` filters."""
+    matches = []
+    for node in tree.find_all(sql_exp.ILike):
+        pattern = node.expression
+        if not (isinstance(node.this, sql_exp.Column) and node.this.name.lower() == "player_name"):
+            continue
+        if not (isinstance(pattern, sql_exp.Literal) and pattern.is_string):
+            continue
+        match = re.fullmatch(r"%([^%']+)%", pattern.this)
+        if match and match.group(1).strip():
+            matches.append(match.group(1).strip())
+    return _preferred_player_names(matches)
+
+
+def _extract_named_players(
+    user_input: str, sql_query: str, conn=None, sql_names: Optional[list[str]] = None
+) -> list[str]:
     question_text = _extract_current_question_text(user_input)
     names = _extract_player_names_from_question(question_text)
 
@@ -653,7 +582,8 @@ def _extract_named_players(user_input: str, sql_query: str, conn=None) -> list[s
     # parsed out of the model's emitted ILIKE filters. Comparison questions in
     # particular often have one name fully spelled (e.g. "LeBron James") and
     # another given as a bare surname ("Jordan") that we won't alias-map.
-    sql_names = _extract_player_names_from_sql(sql_query) if sql_query else []
+    if sql_names is None:
+        sql_names = _extract_player_names_from_sql(sql_query) if sql_query else []
     if len(names) < 2 and sql_names:
         existing_lower = {n.lower() for n in names}
         for s in sql_names:
@@ -777,51 +707,7 @@ def _extract_per_player_year_spans(user_input: str, named_players: list[str]) ->
 
 
 def _extract_requested_season_start_span(user_input: str):
-    q = _extract_current_question_text(user_input).lower()
-    is_playoffs = ("playoff" in q) or ("postseason" in q)
-
-    explicit_range = re.search(
-        r"\b(19\d{2}|20\d{2})(?:\s+season)?\s*(?:to|through|thru|-)\s*(19\d{2}|20\d{2})(?:\s+season)?\b",
-        q,
-    )
-    if explicit_range:
-        start = int(explicit_range.group(1))
-        end = int(explicit_range.group(2))
-        if start > end:
-            start, end = end, start
-        return start, end, is_playoffs
-
-    prefixed_range = re.search(r"\bfrom\b\s*(19\d{2}|20\d{2})\b.+?\bto\b\s*(19\d{2}|20\d{2})\b", q)
-    if prefixed_range:
-        start = int(prefixed_range.group(1))
-        end = int(prefixed_range.group(2))
-        if start > end:
-            start, end = end, start
-        return start, end, is_playoffs
-
-    decade_match = re.search(r"\b(19\d{2}|20\d{2})s\b", q)
-    if decade_match:
-        start = int(decade_match.group(1))
-        return start, start + 9, is_playoffs
-
-    season_label_match = re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2})\b", q)
-    if season_label_match:
-        start = int(season_label_match.group(1))
-        return start, start, is_playoffs
-
-    bare = _extract_bare_year_request(user_input)
-    if bare is not None:
-        year, playoffs_flag = bare
-        if playoffs_flag:
-            return year - 1, year - 1, True
-        return year, year, False
-
-    if any(k in q for k in ["this season", "current season", "last season", "this playoff", "current playoff", "last playoff"]):
-        start, end, playoffs_flag = _extract_requested_season_window(user_input)
-        mapped_start = start if not playoffs_flag else start
-        return mapped_start, mapped_start, playoffs_flag
-
-    return None
+    return question_features(user_input).season_start_span
 
 
 def _advanced_table_name_for_window(start: int, end: int, is_playoffs: bool) -> str:
@@ -838,61 +724,25 @@ def _qualified_public_table_ref(table_name: str) -> str:
 
 
 def _pick_available_advanced_table(
-    schema_description: str, start: int, end: int, is_playoffs: bool
+    catalog: Optional[SchemaCatalog], start: int, end: int, is_playoffs: bool
 ) -> str:
-    if not schema_description:
-        return _advanced_table_name_for_window(start, end, is_playoffs)
-
-    pattern = re.compile(
-        r"nba_advanced_season_(\d{4})_(\d{2})_season_type_(regular_season|playoffs)_[a-z0-9_]+",
-        re.IGNORECASE,
-    )
-    matches = pattern.findall(schema_description)
-    if not matches:
+    if catalog is None:
         return _advanced_table_name_for_window(start, end, is_playoffs)
 
-    wanted_type = "playoffs" if is_playoffs else "regular_season"
-    candidates = []
-    for start_s, end_yy_s, season_type in matches:
-        if season_type.lower() != wanted_type:
-            continue
-        try:
-            st = int(start_s)
-            ed = int(f"{str(st)[:2]}{end_yy_s}")
-        except Exception:
-            continue
-        candidates.append((st, ed))
-
+    candidates = catalog.season_starts("nba_advanced", "playoffs" if is_playoffs else "regular")
     if not candidates:
         return _advanced_table_name_for_window(start, end, is_playoffs)
 
-    for st, ed in candidates:
-        if st == start and ed == end:
-            return _advanced_table_name_for_window(st, ed, is_playoffs)
+    if start in candidates:
+        return _advanced_table_name_for_window(start, end, is_playoffs)
 
-    older_or_equal = [c for c in candidates if c[0] <= start]
-    if older_or_equal:
-        best = max(older_or_equal, key=lambda c: c[0])
-    else:
-        best = max(candidates, key=lambda c: c[0])
-    return _advanced_table_name_for_window(best[0], best[1], is_playoffs)
+    older_or_equal = [st for st in candidates if st <= start]
+    best = max(older_or_equal) if older_or_equal else max(candidates)
+    return _advanced_table_name_for_window(best, best + 1, is_playoffs)
 
 
 def _is_point_differential_request(user_input: str) -> bool:
-    q = _extract_current_question_text(user_input).lower()
-    return any(
-        term in q
-        for term in [
-            "point differential",
-            "point diff",
-            "points differential",
-            "points diff",
-            "scoring differential",
-            "score differential",
-            "diffpointspg",
-            "diff points",
-        ]
-    )
+    return question_features(user_input).is_point_differential
 
 
 def _standings_table_name_for_window(start: int, end: int) -> str:
@@ -942,7 +792,9 @@ def _rewrite_point_differential_trend_sql(sql_query: str, user_input: str) -> st
     )
 
 
-def _enforce_advanced_table_mapping(sql_query: str, user_input: str, schema_description: str = "") -> str:
+def _enforce_advanced_table_mapping(
+    sql_query: str, user_input: str, catalog: Optional[SchemaCatalog] = None
+) -> str:
     if not sql_query or not _is_advanced_metrics_request(user_input):
         return sql_query
 
@@ -974,7 +826,7 @@ def _enforce_advanced_table_mapping(sql_query: str, user_input: str, schema_desc
             return sql_query
 
     start, end, is_playoffs = _extract_requested_season_window(user_input)
-    target = _pick_available_advanced_table(schema_description, start, end, is_playoffs)
+    target = _pick_available_advanced_table(catalog, start, end, is_playoffs)
     target_ref = _qualified_public_table_ref(target)
     q = sql_query
 
@@ -1036,43 +888,7 @@ def _columns_for_by_season_question(question_text: str) -> list[str]:
 
 
 def _is_over_time_request(question_text: str) -> bool:
-    q = (question_text or "").lower()
-    phrases = [
-        "by season",
-        "per season",
-        "each season",
-        "season by season",
-        "over the years",
-        "through the years",
-        "across seasons",
-        "year by year",
-        "trend",
-        "over time",
-        "over his career",
-        "over her career",
-        "over their career",
-        "throughout his career",
-        "throughout her career",
-        "throughout their career",
-    ]
-    if any(p in q for p in phrases):
-        return True
-    # Handle slight misspellings like "careeer" and flexible "over ... career" phrasing.
-    if re.search(r"\bover\b.*\bcaree+r\b", q):
-        return True
-    if re.search(r"\bthroughout\b.*\bcaree+r\b", q):
-        return True
-    if re.search(r"\b(per\s+game|per-game)\b.*\bcaree+r\b", q) or re.search(r"\bcaree+r\b.*\b(per\s+game|per-game)\b", q):
-        return True
-    if "rookie year" in q:
-        return True
-    if re.search(r"\bfrom\b.+\bto\b\s*(19\d{2}|20\d{2})\b", q):
-        return True
-    if re.search(r"\b(19\d{2}|20\d{2})s\b", q) or "decade" in q:
-        return True
-    if re.search(r"\b(highest|best|most|peak)\b.+\bseason\b", q):
-        return True
-    return re.search(r"\b(19\d{2}|20\d{2})\s*(to|through|thru|-)\s*(19\d{2}|20\d{2})\b", q) is not None
+    return question_features(question_text).is_over_time
 
 
 def _is_explicit_total_request(question_text: str) -> bool:
@@ -1189,6 +1005,10 @@ def _rewrite_implicit_head_to_head_to_career_sql(sql_query: str, user_input: str
     avail = _available_season_starts(conn, table_kind)
     if len(avail) < 2:
         return sql_query
+    played = _player_seasons_for_where(conn, table_kind, where_clause)
+    if played:
+        played_set = set(played)
+        avail = [start for start in avail if start in played_set] or avail
 
     legs = []
     for start_year in avail:
@@ -1215,7 +1035,34 @@ def _rewrite_implicit_head_to_head_to_career_sql(sql_query: str, user_input: str
     )
 
 
+def _by_season_leg(table_name: str, start: int, end: int, columns: list, where) -> sql_exp.Select:
+    table = sql_exp.Table(this=sql_exp.to_identifier(table_name))
+    return (
+        sql_exp.select(
+            sql_exp.alias_(sql_exp.Literal.number(start), "season_start"),
+            sql_exp.alias_(sql_exp.Literal.string(f"{start}-{str(end)[-2:]}"), "season_label"),
+            *columns,
+        )
+        .from_(table)
+        .where(where)
+    )
+
+
+def _by_season_union(legs: list, columns: list) -> sql_exp.Select:
+    union = sql_exp.union(*legs, distinct=False, copy=False)
+    return (
+        sql_exp.select(sql_exp.column("season_start"), sql_exp.column("season_label"), *columns)
+        .distinct()
+        .from_(union.subquery("by_season"))
+    )
+
+
 def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn=None) -> str:
+    return _rewrite_sql_text(sql_query, lambda tree: _career_by_season_tree(tree, user_input, conn))
+
+
+def _career_by_season_tree(tree, user_input: str, conn=None):
+    """Rebuild career / over-time asks as one UNION ALL leg per season table; None when unchanged."""
     question_text = _extract_current_question_text(user_input)
     q_input = question_text.lower()
     nth_request = _extract_requested_nth_season(question_text)
@@ -1223,16 +1070,23 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
     asks_over_time = _is_over_time_request(question_text)
     mentions_career = re.search(r"\bcaree+r\b", q_input) is not None
     wants_total = _is_explicit_total_request(question_text)
-    q = sql_query or ""
-    q_lower = q.lower()
-    has_union_sum_rollup = ("union all" in q_lower) and ("sum(" in q_lower) and ("group by player_name" in q_lower)
+    season_tables = [m for m in (_season_table_match(t.this) for t in tree.find_all(sql_exp.Table)) if m]
+    has_union_sum_rollup = (
+        tree.find(sql_exp.Union) is not None
+        and tree.find(sql_exp.Sum) is not None
+        and any(
+            isinstance(key, sql_exp.Column) and key.name.lower() == "player_name"
+            for group in tree.find_all(sql_exp.Group)
+            for key in group.expressions
+        )
+    )
     # Default non-total career asks to by-season rows rather than SUM rollups.
     if mentions_career and not wants_total:
         asks_over_time = True
     if has_union_sum_rollup and not wants_total:
         asks_over_time = True
 
-    named_players = _extract_named_players(user_input, q, conn=conn)
+    named_players = _extract_named_players(user_input, "", conn=conn, sql_names=_player_names_from_tree(tree))
     requested_span = _extract_requested_season_start_span(user_input)
 
     # Per-player year override: e.g. "Compare LeBron 2012 and Durant 2015"
@@ -1258,9 +1112,9 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
             "named_players=%s mentions_career=%s",
             named_players, mentions_career,
         )
-        return sql_query
+        return None
 
-    if "all_players_regular_" not in q_lower and "all_players_playoffs_" not in q_lower:
+    if not season_tables:
         # The model picked a non-season table (usually player_game_logs).
         # If we have named players AND a year range or career signal, the user
         # almost certainly wants a season-by-season breakdown — not 1000+ game
@@ -1284,7 +1138,7 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
             # the correct legs from available_starts.
         else:
             logger.debug("rewriter:career_aggregate skipped (no season-summary table in SQL)")
-            return q
+            return None
 
     logger.debug(
         "rewriter:career_aggregate applying — named_players=%s "
@@ -1293,18 +1147,11 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
         rookie_year_request, requested_span,
     )
 
-    table_type = "playoffs" if (("playoff" in q_input) or ("postseason" in q_input) or ("all_players_playoffs_" in q_lower)) else "regular"
+    asks_playoffs = "playoff" in q_input or "postseason" in q_input
+    table_type = "playoffs" if asks_playoffs or any(m.group(1).lower() == "playoffs" for m in season_tables) else "regular"
 
     # Build from detected season tables directly (no SUM/COUNT) for stable season-trend output.
-    table_matches = re.findall(r"(?i)\b(all_players_(?:regular|playoffs)_(\d{4})_(\d{4}))\b", q)
-    if not table_matches:
-        table_matches = []
-    unique_tables: dict[str, tuple[int, int]] = {}
-    for table_name, start_s, end_s in table_matches:
-        try:
-            unique_tables[table_name] = (int(start_s), int(end_s))
-        except Exception:
-            continue
+    unique_tables: dict[str, tuple[int, int]] = {m.group(0): (int(m.group(2)), int(m.group(3))) for m in season_tables}
     if named_players:
         is_comparison_or_trend = (
             len(named_players) > 1
@@ -1316,7 +1163,7 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
             if is_comparison_or_trend
             else _all_players_full_row_columns()
         )
-        col_sql = ", ".join(full_cols)
+        columns = [sql_exp.column(c) for c in full_cols]
         available_starts = _available_season_starts(conn, table_type) if conn is not None else []
         legs = []
 
@@ -1391,13 +1238,18 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
             elif unique_tables:
                 season_starts = sorted({start for start, _ in unique_tables.values()})
 
-            for start in season_starts:
-                end = start + 1
-                table_name = f"all_players_{table_type}_{start}_{end}"
-                season_label = f"{start}-{str(end)[-2:]}"
-                legs.append(
-                    f"SELECT {start} AS season_start, '{season_label}' AS season_label, "
-                    f"{col_sql} FROM {table_name} WHERE {player_where}"
+            # Drop legs for seasons the player never played (kept when none remain,
+            # so the statement still returns its usual empty result).
+            played = _player_seasons_for_where(conn, table_type, player_where) if len(season_starts) > 1 else None
+            if played is not None:
+                played_set = set(played)
+                season_starts = [start for start in season_starts if start in played_set] or season_starts
+
+            if season_starts:
+                where = sql_condition(player_where, dialect="postgres")
+                legs.extend(
+                    _by_season_leg(f"all_players_{table_type}_{start}_{start + 1}", start, start + 1, columns, where)
+                    for start in season_starts
                 )
 
         if legs:
@@ -1405,42 +1257,181 @@ def _rewrite_career_aggregate_to_by_season(sql_query: str, user_input: str, conn
                 "rewriter:career_aggregate emitted %d UNION legs across %d player(s)",
                 len(legs), len(named_players),
             )
-            return (
-                "SELECT DISTINCT season_start, season_label, "
-                f"{col_sql} FROM ({' UNION ALL '.join(legs)}) AS by_season LIMIT 500;"
-            )
+            return _by_season_union(legs, columns).limit(500, copy=False)
 
     if not unique_tables:
-        return q
+        return None
 
-    where_match = re.search(
-        r"(?is)\bwhere\b\s*(?P<where>.*?)(\bunion\s+all\b|\bgroup\s+by\b|\border\s+by\b|\blimit\b|$)",
-        q,
-    )
-    if not where_match:
-        return q
-    where_clause = (where_match.group("where") or "").strip()
-    if not where_clause:
-        return q
+    # The first WHERE in the statement: the outer query's, or the first leg's for a UNION.
+    where = tree.find(sql_exp.Where)
+    if where is None:
+        return None
 
-    cols = _columns_for_by_season_question(question_text)
-    col_sql = ", ".join(cols)
+    columns = [sql_exp.column(c) for c in ["player_name", *_columns_for_by_season_question(question_text)]]
     sorted_tables = sorted(unique_tables.items(), key=lambda kv: kv[1][0])
-
     legs = []
     for table_name, (start, end) in sorted_tables:
-        season_label = f"{start}-{str(end)[-2:]}"
-        legs.append(
-            f"SELECT {start} AS season_start, '{season_label}' AS season_label, "
-            f"player_name, {col_sql} FROM {table_name} WHERE {where_clause}"
-        )
+        legs.append(_by_season_leg(table_name, start, end, columns, where.this))
+
+    return (
+        _by_season_union(legs, columns)
+        .order_by(sql_exp.Ordered(this=sql_exp.column("season_start"), desc=False), copy=False)
+        .limit(50, copy=False)
+    )
+
+
+_UNION_ALL_RE = re.compile(r"union\s+all\b", re.IGNORECASE)
+_SEASON_UNION_LEG_RE = re.compile(
+    r'(?is)^\s*select\s+(?P<select>.+?)\s+from\s+(?:public\.)?"?all_players_(?P<type>regular|playoffs)_'
+    r'(?P<start>\d{4})_(?P<end>\d{4})"?(?:\s+where\s+(?P<where>.+?))?\s*$'
+)
+_UNION_TAIL_RE = re.compile(r"(?is)^(?P<leg>.*?)(?P<tail>\s+(?:order\s+by|limit)\b[^()']*)?\s*;?\s*$")
+
+
+def _split_top_level_union_all(sql: str) -> list[str]:
+    """Split on UNION ALL that is not inside parentheses or quotes."""
+    parts, depth, quote, last, i = [], 0, None, 0, 0
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0 and ch in "uU" and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] == "_")):
+            m = _UNION_ALL_RE.match(sql, i)
+            if m:
+                parts.append(sql[last:i])
+                i = last = m.end()
+                continue
+        i += 1
+    parts.append(sql[last:])
+    return parts
+
+
+def _matching_paren(sql: str, open_idx: int) -> int:
+    depth, quote = 0, None
+    for i in range(open_idx, len(sql)):
+        ch = sql[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _collapse_union_legs(parts: list[str], coverage: dict, fact_columns: set) -> Optional[str]:
+    legs = []
+    for part in parts:
+        m = _SEASON_UNION_LEG_RE.match(part)
+        if not m:
+            return None
+        start, end = int(m.group("start")), int(m.group("end"))
+        if end != start + 1:
+            return None
+        label = f"{start}-{str(end)[-2:]}"
+        select = m.group("select").strip()
+        # Per-leg season literals become the fact table's own columns.
+        select = re.sub(rf"(?i)^{start}\s+AS\s+season_start\b", "season_start", select)
+        select = re.sub(rf"(?i)'{re.escape(label)}'\s+AS\s+season_label\b", "season_label", select)
+        where = (m.group("where") or "").strip() or None
+        legs.append((m.group("type").lower(), start, select, where, part.strip()))
+
+    if len({" ".join(leg[2].split()).lower() for leg in legs}) != 1:
+        return None
+    covered = [leg for leg in legs if leg[1] in coverage.get(leg[0], ())]
+    uncovered = [leg for leg in legs if leg[1] not in coverage.get(leg[0], ())]
+    if len(covered) < 2:
+        return None
 
-    rebuilt = (
-        f"SELECT DISTINCT season_start, season_label, player_name, {col_sql} "
-        f"FROM ({' UNION ALL '.join(legs)}) AS by_season "
-        f"ORDER BY season_start ASC LIMIT 50;"
+    groups: dict = {}
+    for season_type, start, _, where, _ in covered:
+        groups.setdefault((season_type, where), []).append(start)
+    clauses = []
+    for (season_type, where), starts in groups.items():
+        clause = f"season_type = '{season_type}' AND season_start IN ({', '.join(str(s) for s in sorted(starts))})"
+        if where:
+            clause += f" AND ({where})"
+        clauses.append(f"({clause})")
+    collapsed = (
+        f"SELECT {covered[0][2]} FROM {_qualified_public_table_ref(PLAYER_SEASON_TABLE)} "
+        f"WHERE {' OR '.join(clauses)}"
     )
-    return rebuilt
+
+    # Only route when every referenced column exists in the fact table.
+    try:
+        parsed = sql_parse_one(collapsed, read="postgres")
+    except Exception:
+        return None
+    if {t.name.lower() for t in parsed.find_all(sql_exp.Table)} != {PLAYER_SEASON_TABLE}:
+        return None
+    if any(col.name.lower() not in fact_columns for col in parsed.find_all(sql_exp.Column)):
+        return None
+    # A star would pick up the fact table's extra season columns and change the row shape.
+    if any(
+        isinstance(projection, sql_exp.Star)
+        or (isinstance(projection, sql_exp.Column) and isinstance(projection.this, sql_exp.Star))
+        for projection in parsed.expressions
+    ):
+        return None
+
+    return " UNION ALL ".join([collapsed] + [leg[4] for leg in uncovered])
+
+
+def _collapse_season_unions_to_fact_table(sql_query: str, catalog: Optional[SchemaCatalog]) -> str:
+    """
+    Replace UNION ALL over all_players_* season tables with one scan of the
+    player_season fact table. Seasons not loaded into the fact table (the
+    current season) stay as their own UNION ALL legs.
+    """
+    if not sql_query or not re.search(r"(?i)\bunion\s+all\b", sql_query):
+        return sql_query
+    coverage = player_season_coverage(catalog)
+    if not coverage:
+        return sql_query
+    fact_columns = {c.lower() for c in catalog.columns(PLAYER_SEASON_TABLE)}
+    q = sql_query
+
+    # Derived tables: FROM ( leg UNION ALL leg ... ) AS alias
+    search_from = 0
+    while True:
+        m = re.compile(r"(?i)\bfrom\s*\(").search(q, search_from)
+        if not m:
+            break
+        open_idx = m.end() - 1
+        close_idx = _matching_paren(q, open_idx)
+        if close_idx < 0:
+            break
+        body = q[open_idx + 1 : close_idx]
+        parts = _split_top_level_union_all(body)
+        collapsed = _collapse_union_legs(parts, coverage, fact_columns) if len(parts) > 1 else None
+        if collapsed:
+            logger.info("rewriter:player_season collapsed %d UNION ALL legs into one scan", len(parts))
+            q = q[: open_idx + 1] + collapsed + q[close_idx:]
+        search_from = open_idx + 1
+
+    # Whole statement is a union, optionally followed by ORDER BY / LIMIT.
+    parts = _split_top_level_union_all(q)
+    if len(parts) > 1:
+        tail_m = _UNION_TAIL_RE.match(parts[-1])
+        tail = (tail_m.group("tail") or "") if tail_m else ""
+        legs = parts[:-1] + [tail_m.group("leg") if tail_m else parts[-1]]
+        collapsed = _collapse_union_legs(legs, coverage, fact_columns)
+        if collapsed:
+            logger.info("rewriter:player_season collapsed %d top-level UNION ALL legs into one scan", len(legs))
+            q = collapsed + tail
+    return q
 
 
 def _ensure_rebounding_leaderboard_columns(sql_query: str, user_input: str) -> str:
@@ -1602,6 +1593,37 @@ def _expand_player_name_filters_for_encoding(sql_query: str) -> str:
     return pattern.sub(repl, sql_query)
 
 
+def _resolve_player_name_filters_to_ids(sql_query: str, conn, catalog: Optional[SchemaCatalog]) -> tuple[str, Optional[str]]:
+    """
+    Last rewrite before execution: turn player_name ILIKE filters into
+    player_id = ANY(...) lookups. Returns (sql, ilike_sql) where ilike_sql is
+    the untouched statement to fall back on, or None when nothing changed.
+    Runs after the other rewriters because several of them read names back
+    out of the ILIKE filters.
+    """
+    index = get_player_index(conn)
+    rewritten = rewrite_player_name_filters_to_ids(sql_query, index, catalog, _PLAYER_ALIAS_MAP)
+    if rewritten == sql_query:
+        return sql_query, None
+    return rewritten, sql_query
+
+
+def _execute_with_name_filter_fallback(conn, sql_query: str, ilike_sql: Optional[str]):
+    """Run the player_id form; if it finds nothing, retry the original ILIKE statement."""
+    if not ilike_sql:
+        return execute_query(conn, sql_query)
+    try:
+        df = execute_query(conn, sql_query)
+    except Exception as e:
+        logger.warning("player_id rewrite failed (%s); retrying with player_name ILIKE", e)
+        conn.rollback()
+        return execute_query(conn, ilike_sql)
+    if df is not None and df.empty:
+        logger.info("player_id rewrite returned no rows; retrying with player_name ILIKE")
+        return execute_query(conn, ilike_sql)
+    return df
+
+
 def _ensure_profile_columns_in_sql(sql_query: str, user_input: str) -> str:
     if not _is_single_player_profile_request(user_input):
         return sql_query
@@ -1825,12 +1847,18 @@ def repair_sql_error(original_sql, error_message, schema_description, user_input
             "- DO NOT use GROUP BY, HAVING, or ORDER BY"
         )
 
+    # Schema and rules first (shared across repairs), the failure details last.
     r_prompt = f"""
-The following SQL query failed:
-
 Database schema:
 {schema_description}
 
+A SQL query failed. Fix the SQL to match the schema exactly while keeping a RAW DATA query shape.
+STRICT RULES:
+{cast_guidance}
+- Keep WHERE/JOIN only when needed to fetch correct rows and columns
+Return ONLY a valid PostgreSQL SELECT query.
+Do NOT include any additional text or markdown.
+
 User request:
 "{user_input}"
 
@@ -1839,23 +1867,18 @@ Failed SQL:
 
 Database error:
 {error_message}
-
-Fix the SQL to match the schema exactly while keeping a RAW DATA query shape.
-STRICT RULES:
-{cast_guidance}
-- Keep WHERE/JOIN only when needed to fetch correct rows and columns
-Return ONLY a valid PostgreSQL SELECT query.
-Do NOT include any additional text or markdown.
 """
 
-    response = client.chat.completions.create(
+    response = client.chat_completion(
+        "nl_sql_repair",
         model="gpt-5.4-mini",
         messages=[
             {"role": "system", "content": "Return ONLY valid SQL."},
             {"role": "user", "content": r_prompt}
         ],
         temperature=0,
-        max_completion_tokens=1500
+        max_completion_tokens=1500,
+        prompt_cache_key="nl-sql-repair",
     )
 
     fixed_sql = response.choices[0].message.content.strip()
@@ -1881,853 +1904,264 @@ Do NOT include any additional text or markdown.
 
 
 # 6. Convert natural language → SQL
-def natural_language_to_sql(user_input_param: str):
+_sql_cache = SqlCache(
+    max_entries=int(os.getenv("NL_SQL_CACHE_MAX_ENTRIES", "2048")),
+    ttl_seconds=float(os.getenv("NL_SQL_CACHE_TTL_SECONDS", str(24 * 3600))),
+    disk_path=os.getenv("NL_SQL_CACHE_PATH") or None,
+)
+_template_cache = SqlCache(
+    max_entries=int(os.getenv("NL_SQL_TEMPLATE_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("NL_SQL_CACHE_TTL_SECONDS", str(24 * 3600))),
+    disk_path=os.getenv("NL_SQL_CACHE_PATH") or None,
+    disk_table="nl_sql_templates",
+)
+_data_version_probe = DataVersionProbe(
+    check_seconds=float(os.getenv("NL_SQL_CACHE_VERSION_CHECK_SECONDS", "60"))
+)
+_prompt_token_stats = PromptTokenStats()
+
+
+def _sql_cache_enabled() -> bool:
+    return os.getenv("NL_SQL_CACHE_DISABLED", "").strip().lower() not in ("1", "true", "yes")
+
+
+def sql_cache_stats() -> dict:
+    return {"exact": _sql_cache.stats(), "template": _template_cache.stats()}
+
+
+def clear_sql_cache() -> None:
+    _sql_cache.clear()
+    _template_cache.clear()
+
+
+def _question_slots(user_input: str) -> Optional[QuestionSlots]:
+    """Player / season / nth-season slots for the template cache, from the existing extractors."""
+    start, end, _ = _extract_requested_season_window(user_input)
+    return question_slots(
+        normalize_question(user_input, _PLAYER_ALIAS_MAP),
+        _extract_player_names_from_question(_extract_current_question_text(user_input)),
+        (start, end),
+        _extract_requested_nth_season(user_input),
+        _ORDINAL_WORDS,
+    )
+
+
+def _current_season_data_version(conn) -> Optional[str]:
+    def _read() -> str:
+        try:
+            return read_current_season_data_version(conn, current_season_start())
+        except Exception:
+            conn.rollback()
+            raise
+
+    return _data_version_probe.current(_read)
+
+
+def current_data_version() -> Optional[str]:
+    """Current-season data version for keys outside the SQL pipeline (probe-cached)."""
+    def _read() -> str:
+        with pooled_connection() as conn:
+            return read_current_season_data_version(conn, current_season_start())
+
+    return _data_version_probe.current(_read)
+
+
+def _execute_prepared_sql(sql_query: str, conn, source: str):
+    """
+    Run SQL that needs none of the model-output repairs: NL→SQL cache hits
+    and fast-path plans. None means fall back to the model.
+    """
+    try:
+        catalog = get_schema_catalog(conn)
+        sql_query = _collapse_season_unions_to_fact_table(sql_query, catalog)
+        sql_query, ilike_sql = _resolve_player_name_filters_to_ids(sql_query, conn, catalog)
+        sql_query = validate_and_normalize_sql(limit_rows(sql_query))
+        ilike_sql = validate_and_normalize_sql(limit_rows(ilike_sql)) if ilike_sql else None
+        logger.info("Final SQL being executed (%s):\n%s", source, sql_query)
+        df = _execute_with_name_filter_fallback(conn, sql_query, ilike_sql)
+        if df is not None:
+            df.attrs["sql"] = ilike_sql or sql_query
+        return df
+    except Exception as e:
+        logger.warning("%s SQL failed; falling back to the model: %s", source, e)
+        conn.rollback()
+        return None
+
+
+_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.75"))
+# Capitalized words that are not player names in the no-player (leaderboard/standings) route.
+_FAST_PATH_NON_NAME_WORDS = {"nba", "mvp", "east", "eastern", "west", "western", "conference", "i"}
+
+
+def _fast_path_enabled() -> bool:
+    return os.getenv("FAST_PATH_DISABLED", "").strip().lower() not in ("1", "true", "yes")
+
+
+def _fast_path_plan(user_input: str, conn) -> Optional[FastPathPlan]:
+    """A deterministic plan for the question, or None to use the model."""
+    question = _extract_current_question_text(user_input)
+    # Follow-ups carry history context ("Current question: ...") the builders do not read.
+    if not question or question != (user_input or "").strip():
+        return None
+
+    index = get_player_index(conn)
+    players: list[str] = []
+    seen_ids: set = set()
+    for name in _filter_valid_player_names(conn, _extract_player_names_from_question(question)):
+        # "Steph" expands to two spellings of one player.
+        ids = frozenset(index.resolve(name, _PLAYER_ALIAS_MAP)) if index is not None else frozenset()
+        key = ids or name
+        if key not in seen_ids:
+            seen_ids.add(key)
+            players.append(name)
+    if not players:
+        # An unextracted single-word name ("Curry's points") must not turn into a league leaderboard.
+        words = re.findall(r"[A-Za-z][\w'.-]*", question)
+        if any(w[0].isupper() and w.lower() not in _FAST_PATH_NON_NAME_WORDS for w in words[1:]):
+            return None
+
+    start, end, is_playoffs = _extract_requested_season_window(question)
+    explicit_season = re.search(r"\b(?:19|20)\d{2}\b", question) is not None
+    q_lower = question.lower()
+    if explicit_season:
+        standings_start = start
+    elif "last season" in q_lower:
+        standings_start = current_season_start() - 1
+    else:
+        standings_start = current_season_start()
+
+    plan = plan_fast_path(
+        question,
+        players,
+        (start, end, is_playoffs),
+        explicit_season,
+        standings_start,
+        get_schema_catalog(conn),
+        _all_players_full_row_columns(),
+        _career_by_season_columns(),
+    )
+    if plan is None:
+        return None
+    if plan.confidence < _FAST_PATH_MIN_CONFIDENCE:
+        logger.info("Fast path %s skipped (confidence %.2f)", plan.intent, plan.confidence)
+        return None
+    return plan
+
+
+def natural_language_to_sql(user_input_param: str, use_cache: bool = True):
 
     user_input_lower = user_input_param.strip().lower()
     if user_input_lower.startswith(('select ', 'with ', 'insert ', 'update ', 'delete ', 'create ', 'drop ', 'alter ')):
         raise ValueError("Error")
 
-    conn = get_connection()
-    schema_description = get_db_schema(conn)
-
-    prompt = f"""
-You are a senior SQL data engineer specializing in NBA statistics databases.
-Your ONLY task is to convert a natural language request into a VALID PostgreSQL SELECT query.
-You MUST follow every rule below without exception. There is no ambiguity — if a rule applies, follow it exactly.
-
-GLOBAL OVERRIDE (HIGHEST PRIORITY):
-- Return RAW DATA queries only.
-- SELECT only direct existing columns from source table(s).
-- DO NOT use SUM, AVG, COUNT, MIN, MAX, CAST, NULLIF, COALESCE, window functions, or arithmetic expressions.
-- DO NOT use GROUP BY, HAVING, or ORDER BY.
-- The analyzer layer handles sorting, ranking, and math after query execution.
-
-════════════════════════════════════════════════════════════════════════
-SECTION 1: THE TWO TABLE TYPES — UNDERSTAND THEM COMPLETELY
-════════════════════════════════════════════════════════════════════════
-
-TYPE A — SEASON SUMMARY TABLES:
-  Naming pattern: `all_players_regular_YYYY_YYYY` and `all_players_playoffs_YYYY_YYYY`
-  What they contain: One row per player per season. Pre-aggregated season stats.
-  IMPORTANT SCHEMA MEANING:
-    - `pts`, `reb`, `ast`, `fg_pct`, `fg3_pct`, `ft_pct` are already season-level values for that player.
-    - `gp` is games played in that season.
-    - `_rank` columns (like `pts_rank`) are precomputed league ranks for that season.
-    - Because each player is already one row in a season table, single-season leaderboards should NOT use SUM()+GROUP BY.
-  Available regular season tables (oldest to newest):
-    all_players_regular_1996_1997, all_players_regular_1997_1998, all_players_regular_1998_1999,
-    all_players_regular_1999_2000, all_players_regular_2000_2001, all_players_regular_2001_2002,
-    all_players_regular_2002_2003, all_players_regular_2003_2004, all_players_regular_2004_2005,
-    all_players_regular_2005_2006, all_players_regular_2006_2007, all_players_regular_2007_2008,
-    all_players_regular_2008_2009, all_players_regular_2009_2010, all_players_regular_2010_2011,
-    all_players_regular_2011_2012, all_players_regular_2012_2013, all_players_regular_2013_2014,
-    all_players_regular_2014_2015, all_players_regular_2015_2016, all_players_regular_2016_2017,
-    all_players_regular_2017_2018, all_players_regular_2018_2019, all_players_regular_2019_2020,
-    all_players_regular_2020_2021, all_players_regular_2021_2022, all_players_regular_2022_2023,
-    all_players_regular_2023_2024, all_players_regular_2024_2025
-  Available playoffs tables (oldest to newest):
-    all_players_playoffs_2007_2008, all_players_playoffs_2008_2009, all_players_playoffs_2009_2010,
-    all_players_playoffs_2010_2011, all_players_playoffs_2011_2012, all_players_playoffs_2012_2013,
-    all_players_playoffs_2013_2014, all_players_playoffs_2014_2015, all_players_playoffs_2015_2016,
-    all_players_playoffs_2016_2017, all_players_playoffs_2017_2018, all_players_playoffs_2018_2019,
-    all_players_playoffs_2019_2020, all_players_playoffs_2020_2021, all_players_playoffs_2021_2022,
-    all_players_playoffs_2022_2023, all_players_playoffs_2023_2024, all_players_playoffs_2024_2025
-
-  COLUMNS THAT EXIST in all_players_regular_* AND all_players_playoffs_*:
-    player_id, player_name, nickname, team_id, team_abbreviation, age, gp, w, l,
-    w_pct, min, fgm, fga, fg_pct, fg3m, fg3a, fg3_pct, ftm, fta, ft_pct,
-    oreb, dreb, reb, ast, tov, stl, blk, blka, pf, pfd, pts, plus_minus,
-    nba_fantasy_pts, dd2, td3, gp_rank, w_rank, l_rank, w_pct_rank, min_rank,
-    fgm_rank, fga_rank, fg_pct_rank, fg3m_rank, fg3a_rank, fg3_pct_rank,
-    ftm_rank, fta_rank, ft_pct_rank, oreb_rank, dreb_rank, reb_rank, ast_rank,
-    tov_rank, stl_rank, blk_rank, blka_rank, pf_rank, pfd_rank, pts_rank,
-    plus_minus_rank, nba_fantasy_pts_rank, dd2_rank, td3_rank, wnba_fantasy_pts,
-    wnba_fantasy_pts_rank, team_count
-
-  COLUMNS THAT DO NOT EXIST in season summary tables — NEVER USE THEM:
-    ❌ season_id       (the season is encoded in the TABLE NAME itself)
-    ❌ game_date       (these are season summaries, not individual games)
-    ❌ game_id         (no individual game tracking)
-    ❌ matchup         (no opponent info)
-    ❌ wl              (w and l are separated into two columns)
-    ❌ season_type     (regular vs playoffs is encoded in the TABLE NAME)
-
-TYPE B — GAME LOGS TABLE:
-  Table name: `player_game_logs` (only ONE table, not split by year)
-  What it contains: One row per player per game. Raw box score per game.
-  IMPORTANT: This table is the MOST UP TO DATE data source, containing game logs
-  through February 2026. It covers the full 2025-26 season currently in progress.
-  Use this table whenever the user wants current, recent, or live-season data.
-
-  COLUMNS THAT EXIST in player_game_logs:
-    player_id, player_name, team_abbreviation, game_id, game_date, season_id,
-    season_type, matchup, wl, pts, ast, reb, stl, blk, tov, fgm, fga,
-    fg3m, fg3a, ftm, fta, min
-
-  COLUMNS THAT DO NOT EXIST in player_game_logs — NEVER USE THEM:
-    ❌ fg_pct          (must be calculated: CAST(SUM(fgm) AS DOUBLE PRECISION) / NULLIF(SUM(fga), 0))
-    ❌ fg3_pct         (must be calculated: CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0))
-    ❌ ft_pct          (must be calculated: CAST(SUM(ftm) AS DOUBLE PRECISION) / NULLIF(SUM(fta), 0))
-    ❌ age             (not tracked per game)
-    ❌ gp              (not a column — count rows instead: COUNT(*) AS games_played)
-    ❌ oreb            (offensive rebounds not tracked separately)
-    ❌ dreb            (defensive rebounds not tracked separately)
-    ❌ nickname        (not in this table)
-    ❌ plus_minus      (not in this table)
-    ❌ dd2, td3        (not in this table)
-    ❌ any _rank columns (none of the rank columns exist here)
-    ❌ team_id         (not in this table)
-    ❌ team_count      (not in this table)
-
-TYPE C — EXTENDED NBA DATA FAMILIES (from current_working_data schema):
-  These tables exist and should be used when user intent clearly matches them:
-  - `nba_advanced_...`  (advanced metrics / impact context)
-  - `nba_clutch_...`    (late-game / clutch situations)
-  - `nba_hustle_...`    (hustle events: deflections, contested stats, etc.)
-  - `nba_lineups_...`   (lineup combinations and lineup performance)
-  - `nba_schedule_...`  (game schedules)
-  - `nba_standings_...` (team standings / rank / records)
-
-  IMPORTANT:
-  - These tables are highly structured by name (season, season_type, per_mode, endpoint naming).
-  - ALWAYS rely on DATABASE SCHEMA below to pick exact columns; never invent columns.
-  - If user asks for clutch/hustle/lineup/schedule/standings, do NOT force all_players_regular_* or player_game_logs.
-  - Use table-name pattern matching by intent first, then schema-confirmed columns.
-
-════════════════════════════════════════════════════════════════════════
-SECTION 2: TABLE SELECTION RULES — FOLLOW IN ORDER, FIRST MATCH WINS
-════════════════════════════════════════════════════════════════════════
-
-RULE 0 — INTENT ROUTING FOR EXTENDED TABLE FAMILIES:
-  If a question clearly targets one of these domains, use that family first:
-  - "clutch", "in close games", "last 5 minutes"        → `nba_clutch_...`
-  - "hustle", "deflections", "box outs", "charges"      → `nba_hustle_...`
-  - "tracking", "drives", "touches", "distance", "speed"→ `nba_player_tracking_...`
-  - "shot chart", "shot distance", "step back", "dunks" → `court_shots`
-  - "lineup", "5-man unit", "best lineup"               → `nba_lineups_...`
-  - "standings", "seed", "conference rank"              → `nba_standings_...`
-  - "advanced metrics", "true shooting", "net rating"   → `nba_advanced_...`
-  When routing to any of the families above:
-  - "this season" / no year → 2025_26 (these families are current).
-  - For all_players_regular / all_players_playoffs, "this season" still maps to 2024_2025
-    because those tables are not produced yet for 2025-26.
-
-RULE 1 — MOST RECENT PLAYOFF PERFORMANCE:
-  Trigger phrases: "playoff performance", "playoffs", "analyze playoffs", "postseason"
-  With NO specific year mentioned:
-  → ALWAYS use: `all_players_playoffs_2024_2025`
-  → ALWAYS use SUM() aggregation with GROUP BY player_name
-
-RULE 2 — MOST RECENT REGULAR SEASON PERFORMANCE:
-  Trigger phrases: "season stats", "season averages", "top scorers", "leaderboards"
-  With NO specific year mentioned:
-  → ALWAYS use: `all_players_regular_2024_2025`
-  → Use this table when rank columns (_rank) or oreb, dreb, age, gp are needed.
-
-RULE 3 — CURRENT FORM / RECENT ACTIVITY:
-  Trigger phrases: "lately", "recently", "last X games", "hot streak", "game log"
-  → ALWAYS use `player_game_logs` — it has data through February 2026.
-  → For 2025-26 season: WHERE season_id = '22025' AND season_type = 'Regular Season'
-  → ALWAYS ORDER BY game_date DESC LIMIT X.
-
-RULE 4 — SPECIFIC YEAR OR SEASON REQUESTED:
-  START-YEAR RULE: A bare year means the season that STARTS that year.
-    "2020" or "2020 season" → all_players_regular_2020_2021
-  PLAYOFF EXCEPTION: A playoff year refers to playoffs at the END of that season.
-    "2020 playoffs" → all_players_playoffs_2019_2020
-
-RULE 5 — CAREER STATS & TRENDS:
-  → For "career" stats: UNION ALL across ALL available yearly tables for that player, then wrap in a subquery with SUM() and GROUP BY.
-  → For "by season" or "trends over time": UNION ALL across relevant season tables, but return ONE ROW PER SEASON (do NOT use SUM or GROUP BY).
-
-RULE 6 — COMPARING PLAYERS:
-  → Specific season ("this season"): Use ONE `all_players_regular` table.
-  → No year context ("Who is better X or Y?"): Treat as a CAREER comparison. UNION ALL across every table and calculate career weighted averages.
-  → Different eras: UNION ALL per player from their respective era tables.
-
-RULE 7 — TOP PLAYERS / LEADERBOARD QUESTIONS:
-  → Use ONE season summary table directly. Do NOT use SUM(), GROUP BY, or UNION.
-  → ALWAYS ORDER BY the requested stat (e.g., ORDER BY pts_rank ASC NULLS LAST).
-
-RULE 8 — TEAM AND FRANCHISE QUERIES:
-  Trigger phrases: "top teams", "best NBA teams", "team winrate", "team standings", "best offense",
-    "best defense", "net rating", "which team", "Warriors", "Lakers", "Celtics", franchise/team names.
-  → If the subject is a TEAM or FRANCHISE, do NOT query player tables.
-  → Use `team_advanced_season_YYYY_YY_regular_season_pergame` / `team_advanced_season_YYYY_YY_playoffs_pergame`
-    for team offense, defense, net rating, pace, true shooting, eFG, rebounding rate, turnover rate, and team-level comparisons.
-  → Use `nba_standings_season_YYYY_YY_leaguestandingsv3` for records, standings, seed, conference/division rank,
-    home/road record, last 10, streaks, point differential, and games-back questions.
-  → "point differential" means standings column "DiffPointsPG" (points per game differential),
-    NOT team_advanced "NET_RATING". If a range is requested ("from 2010 to 2024"),
-    UNION ALL one `nba_standings_season_YYYY_YY_leaguestandingsv3` table per season and
-    include `season_start` / `season_label`; do NOT collapse to one year or LIMIT 1.
-  → For "this season", "current season", or no year on team_advanced/nba_standings, use 2025_26 when available.
-    Use 2024_25 only for "last season" or explicit 2024-25 wording.
-  → Team advanced columns are UPPERCASE and must be double-quoted:
-    "TEAM_ID", "TEAM_NAME", "GP", "W", "L", "W_PCT", "OFF_RATING", "DEF_RATING",
-    "NET_RATING", "AST_PCT", "REB_PCT", "TM_TOV_PCT", "EFG_PCT", "TS_PCT", "PACE", "PIE".
-  → Standings columns are CamelCase/text and must be double-quoted:
-    "TeamCity", "TeamName", "Conference", "Division", "PlayoffRank", "WINS", "LOSSES",
-    "WinPCT", "Record", "HOME", "ROAD", "L10", "CurrentStreak", "PointsPG", "OppPointsPG", "DiffPointsPG".
-  → All team_advanced_* and nba_standings_* numeric columns are TEXT, so leaderboards and numeric filters require
-    NULLIF("COLUMN", '')::numeric casts in WHERE/ORDER BY.
-  → Team name matching:
-    - team_advanced_*: use "TEAM_NAME" ILIKE '%Warriors%' or '%Golden State Warriors%'.
-    - nba_standings_*: use "TeamName" ILIKE '%Warriors%' OR "TeamCity" ILIKE '%Golden State%'.
-
-RULE 9 — SHOT CHARTS, DISTANCE, AND PLAY-BY-PLAY (court_shots):
-  Trigger phrases: "shot chart", "where does X shoot from", "average shot distance", "dunks", "layups", "step back"
-  → ALWAYS use the `court_shots` table.
-  → `court_shots` is ONE massive table. Do NOT append years to the table name.
-  → Filter by `game_date` or `player_name` using standard WHERE clauses.
-  → Columns are lowercase: game_id, player_name, team_name, game_date, action_type, shot_type, shot_zone_basic, shot_distance, loc_x, loc_y, shot_made_flag
-
-RULE 10 — LINEUPS AND 5-MAN UNITS (PLAYOFFS-ONLY DATA):
-  Trigger phrases: "best 5-man lineup", "lineup net rating", "best lineup"
-  IMPORTANT: lineup data EXISTS ONLY FOR PLAYOFFS. There are no regular-season lineup tables.
-  Available years: 2007-08, 2012-13, 2021-22, 2022-23, 2023-24, 2024-25.
-  → Use ONLY: nba_lineups_group_5_season_YYYY_YY_season_type_playoffs_pe (ends in _pe)
-  → If the user asks for regular-season lineups, answer that the data is playoff-only
-    and ask whether they want the most recent playoff lineups instead. Return no other table.
-
-RULE 11 — SPECIALTY STATS & TRACKING (STRICT 63-CHAR TABLE NAMES):
-
-    CURRENT SEASON NOTE: Unlike all_players_*, the advanced / clutch / hustle / tracking
-    families DO have 2025-26 tables. For "this season" or "current season" advanced/specialty
-    questions, use the 2025_26 suffix (e.g. nba_advanced_season_2025_26_season_type_regular_season_per).
-    Use 2024_25 only when the user explicitly asks for last season.
-
-  CRITICAL: PostgreSQL forcefully truncated these table names at exactly 63 characters. 
-  DO NOT write "regular_season" or "per_mode_per" for the tracking tables. You MUST copy these exact suffix patterns character-for-character:
-  
-  → Hustle ("deflections", "contested shots", "charges", "screen assists"):
-      Regular Season: `nba_hustle_season_YYYY_YY_season_type_regular_season_per_mo`
-      Playoffs: `nba_hustle_season_YYYY_YY_season_type_playoffs_per_mode_per`
-      Columns to use: "SCREEN_ASSISTS", "SCREEN_AST_PTS", "DEFLECTIONS", "CHARGES_DRAWN"
-      Availability in this database:
-        - Regular-season hustle data exists from 2015_16 through 2025_26 only.
-        - Playoff hustle data exists for 1998_99, 2004_05, and 2015_16 through 2024_25.
-        - If the requested hustle/deflections season is unavailable, do NOT invent a table.
-      
-  → Clutch ("clutch", "last 5 minutes"):
-      Regular: `nba_clutch_season_YYYY_YY_season_type_regular_season_per_mo`
-      Playoffs: `nba_clutch_season_YYYY_YY_season_type_playoffs_per_mode_per`
-      
-  → Drives ("drives", "drives per game"):
-      Regular: `nba_player_tracking_pt_drives_season_YYYY_YY_season_type_re`
-      Playoffs: `nba_player_tracking_pt_drives_season_YYYY_YY_season_type_pl`
-      Available columns: "DRIVES", "DRIVE_FGM", "DRIVE_FGA", "DRIVE_FG_PCT",
-                         "DRIVE_PTS", "DRIVE_PASSES", "DRIVE_AST", "DRIVE_TOV", "GP".
-      CRITICAL: The `_re` and `_pl` tables are stored in PER-GAME mode by default.
-      "DRIVES" is ALREADY the per-game value. DO NOT divide DRIVES by GP.
-      For "most drives per game" → ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST.
-      Apply WHERE NULLIF("GP", '')::numeric >= 20 for leaderboards to exclude small-sample outliers.
-      
-  → Passing ("passing", "assists created"):
-      Regular: `nba_player_tracking_pt_passing_season_YYYY_YY_season_type_r`
-      Playoffs: `nba_player_tracking_pt_passing_season_YYYY_YY_season_type_p`
-
-  → Defense ("defense", "opponent points at rim", "rim protection", "give up"):
-      Regular: `nba_player_tracking_pt_defense_season_YYYY_YY_season_type_r`
-      Columns to use: "DEF_RIM_FGM", "DEF_RIM_FGA", "DEF_RIM_FG_PCT", "STL", "BLK" (Do not use OPP_PTS, it does not exist).
-      IMPORTANT: DO NOT use the `SUM(pts)` aggregation block for defense tables. Use RAW columns.
-      
-  → Tracking endpoints that DO NOT split by regular/playoffs (append this EXACT suffix to the season year):
-      "catch and shoot": `nba_player_tracking_pt_catchshoot_season_YYYY_YY_season_typ`
-      "post-ups": `nba_player_tracking_pt_posttouch_season_YYYY_YY_season_type`
-      "paint touches": `nba_player_tracking_pt_painttouch_season_YYYY_YY_season_typ`
-      "pull up": `nba_player_tracking_pt_pullupshot_season_YYYY_YY_season_typ`
-      "efficiency" / "drive points": `nba_player_tracking_pt_efficiency_season_YYYY_YY_season_typ`
-      → Tracking endpoints that DO NOT split by regular/playoffs:
-      "possessions" / "seconds per touch" / "time of possession": `nba_player_tracking_pt_possessions_season_YYYY_YY_season_ty`
-        → Use column "AVG_SEC_PER_TOUCH" for seconds per touch.
-      "rebounding" / "rebound chances": `nba_player_tracking_pt_rebounding_season_YYYY_YY_season_typ`
-      "speed and distance" / "miles run": `nba_player_tracking_pt_speeddistance_season_YYYY_YY_season`
-
-  UPPERCASE COLUMNS: You MUST wrap the column names in double quotes for ALL these tables. 
-  ALWAYS include `"TEAM_ABBREVIATION"` and `"GP"` (Games Played) in your SELECT statement for tracking tables so the user can distinguish between regular season rows, playoff rows, and mid-season trades. Example: SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "AVG_SEC_PER_TOUCH" ...
-
-RULE 12 — ADVANCED METRICS (STRICT 63-CHAR TABLE NAMES):
-  For "PER", "Win Shares", or "impact", use `"PIE"` or `"NET_RATING"` from the advanced tables.
-  CRITICAL: PostgreSQL forcefully truncated the advanced table names. You MUST use these exact suffixes:
-  → Regular Season: `nba_advanced_season_YYYY_YY_season_type_regular_season_per`
-  → Playoffs: `nba_advanced_season_YYYY_YY_season_type_playoffs_per_mode_p`
-  Remember to wrap UPPERCASE columns in double quotes.
-
-RULE 13 — MATCHUPS AND OPPONENTS (VS / AGAINST):
-  Trigger phrases: "vs [Team]", "against the [Team]", "when playing the [Team]"
-  → ALWAYS use the `player_game_logs` table.
-  → Use the `matchup` column to filter for the opponent using a wildcard. 
-  → The matchup format is "TEAM vs. OPP" or "TEAM @ OPP". 
-  → EXAMPLE: For "against the Nuggets", use `WHERE matchup ILIKE '%DEN%'`.
-  → (Note: ALWAYS convert team mascots to their 3-letter abbreviations for the ILIKE filter).
-
-RULE 14 — FANTASY BASKETBALL:
-  Trigger phrases: "fantasy points", "best fantasy player", "fantasy value"
-  → Use the `all_players_regular_YYYY_YYYY` tables.
-  → Select the `nba_fantasy_pts` and `nba_fantasy_pts_rank` columns. Do NOT attempt to calculate fantasy points manually.
-
-RULE 15 — SPECIFIC ADVANCED ACRONYMS (TS%, eFG%, USG%):
-  If the user asks for specific advanced shooting/usage metrics:
-  → Use the `nba_advanced_season_...` tables.
-  → "True Shooting" or "TS%" = `"TS_PCT"`
-  → "Effective Field Goal" or "eFG%" = `"EFG_PCT"`
-  → "Usage Rate" or "USG%" = `"USG_PCT"`
-  → "Assist Percentage" = `"AST_PCT"`
-  → "Rebound Percentage" = `"REB_PCT"`
-  → "PER" (Player Efficiency Rating, John Hollinger's metric):
-       This database does NOT store classic PER. The closest equivalent is "PIE" in nba_advanced_*.
-       Numbers in nba_advanced_* are TEXT-stored, so cast with NULLIF(col, '')::numeric.
-       Map "PER" → SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "PIE"
-                   FROM nba_advanced_season_YYYY_YY_season_type_regular_season_per
-                   WHERE NULLIF("GP", '')::numeric >= 20
-                   ORDER BY NULLIF("PIE", '')::numeric DESC NULLS LAST LIMIT 10;
-       The analyzer will rename PIE to "PIE (PER equivalent)" in the rendered output —
-       you do NOT need to alias it in the SQL.
-  CRITICAL: You MUST wrap these uppercase column names in double quotes.
-
-RULE 16 — TABLES YOU MUST NOT USE:
-  These tables appear in the schema but are NOT to be queried by this system:
-  - `nba_regular_season_totals_*`  (legacy import, columns differ from all_players_regular_*)
-  - `nba_shot_locations_*`         (column names are unnamed/duplicated, unusable)
-  - `team_advanced_staging`        (staging copy, not for production)
-  ALWAYS prefer the canonical equivalent:
-  - season totals → `all_players_regular_YYYY_YYYY`
-  - shot location → `court_shots`
-  - team advanced → `team_advanced_season_YYYY_YY_regular_season_pergame`
-
-════════════════════════════════════════════════════════════════════════
-SECTION 3: MANDATORY QUERY CONSTRUCTION RULES
-════════════════════════════════════════════════════════════════════════
-
-PLAYER NAME MATCHING:
-  - ALWAYS use ILIKE with wildcards on BOTH sides: player_name ILIKE '%Giannis%'
-  - For full names use: player_name ILIKE '%LeBron James%'
-  - NEVER use exact match (=) for player names
-  - NEVER use ILIKE 'Jordan%' — this matches Jordan Poole, DeAndre Jordan, etc.
-  - For last-name-only queries use a leading space: player_name ILIKE '% Harris%'
-    to reduce false matches like "Gary Harris" when searching just "Harris"
-  - Expand ALL nicknames to full names before searching:
-      "Steph" or "Steph Curry"   → player_name ILIKE '%Stephen Curry%' OR player_name ILIKE '%Steph Curry%'
-      "Bron" or "King James"     → player_name ILIKE '%LeBron James%'
-      "Greek Freak"              → player_name ILIKE '%Giannis%'
-      "KD"                       → player_name ILIKE '%Kevin Durant%'
-      "AD"                       → player_name ILIKE '%Anthony Davis%'
-      "Kawhi"                    → player_name ILIKE '%Kawhi Leonard%'
-      "CP3"                      → player_name ILIKE '%Chris Paul%'
-      "Dame"                     → player_name ILIKE '%Damian Lillard%'
-      "Russ"                     → player_name ILIKE '%Russell Westbrook%'
-      "PG" or "PG13"             → player_name ILIKE '%Paul George%'
-
-TRACKING TABLE PER-MODE RULE:
-  - All `nba_player_tracking_pt_*` tables suffixed `_re` or `_pl` are in PER-GAME mode.
-  - The numeric stat columns (DRIVES, DRIVE_PTS, POST_TOUCHES, AVG_SPEED, etc.) are
-    already per-game values. NEVER divide them by GP.
-  - The same applies to nba_hustle_*, nba_clutch_*, nba_advanced_*, nba_lineups_*,
-    team_advanced_*, and nba_standings_* tables.
-  - For "most X per game" questions on these tables, just ORDER BY the column directly
-    (with the numeric cast described next).
-
-TEXT-STORED NUMERIC COLUMNS (CRITICAL):
-  Every column in nba_advanced_*, nba_clutch_*, nba_hustle_*, nba_player_tracking_pt_*,
-  nba_lineups_*, team_advanced_*, and nba_standings_* tables is stored as TEXT in
-  PostgreSQL — even numeric stats like GP, DRIVES, PIE, TS_PCT, etc.
-  This means:
-  - Numeric comparisons ALWAYS need an explicit cast:
-      WHERE NULLIF("GP", '')::numeric >= 20
-  - Numeric ORDER BY ALWAYS needs an explicit cast:
-      ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST
-  - WITHOUT the cast, "9.5" sorts ABOVE "19.2" (lexicographic) and any `>= 20`
-    comparison fails with `operator does not exist: text >= integer`.
-  - Use NULLIF(col, '') so empty strings cast cleanly to NULL instead of erroring.
-  - The all_players_regular_*, all_players_playoffs_*, player_game_logs, and
-    court_shots tables DO have proper numeric types — no casts needed there.
-
-AGGREGATION RULES for season summary tables:
-  - ONLY use SUM()+GROUP BY when combining MULTIPLE rows per player
-    (examples: UNION ALL across many seasons for career stats, or other explicit multi-season rollups).
-  - For SINGLE-SEASON season-summary queries (one all_players_regular_YYYY_YYYY table),
-    SELECT columns directly and DO NOT use SUM() or GROUP BY.
-  - If percentages already exist in season summary tables (`fg_pct`, `fg3_pct`, `ft_pct`), select them directly.
-  - Only calculate percentages via SUM() when aggregating multiple rows per player:
-      (CAST(SUM(fgm) AS DOUBLE PRECISION) / NULLIF(SUM(fga), 0)) AS fg_pct
-      (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct
-      (CAST(SUM(ftm) AS DOUBLE PRECISION) / NULLIF(SUM(fta), 0)) AS ft_pct
-
-STANDARD PLAYER PERFORMANCE SELECT BLOCK:
-  Use this exact block ONLY for career/all-time or explicit multi-season aggregation:
-    player_name,
-    SUM(pts)  AS total_pts,
-    SUM(reb)  AS total_reb,
-    SUM(ast)  AS total_ast,
-    SUM(stl)  AS total_stl,
-    SUM(blk)  AS total_blk,
-    SUM(tov)  AS total_tov,
-    SUM(fgm)  AS total_fgm,
-    SUM(fga)  AS total_fga,
-    SUM(fg3m) AS total_fg3m,
-    SUM(fg3a) AS total_fg3a,
-    SUM(ftm)  AS total_ftm,
-    SUM(fta)  AS total_fta,
-    (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-    (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
-    (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
-
-STANDARD SINGLE-SEASON LEADERBOARD BLOCK (NO AGGREGATION):
-  Use this for questions like "top scorers in 2001-02", "best scorers this season", "league leaders in points":
-    player_name,
-    team_abbreviation,
-    pts,
-    pts_rank,
-    gp,
-    fg_pct,
-    fg3_pct,
-    fg3m,
-    fg3a,
-    ftm,
-    fta,
-    ft_pct
-  FROM one season table only
-  ORDER BY pts_rank ASC NULLS LAST (or pts DESC when rank unavailable)
-
-STANDARD GAME LOG SELECT BLOCK:
-  Use this exact block when querying player_game_logs for recent/current games:
-    player_name,
-    game_date,
-    matchup,
-    wl,
-    pts,
-    reb,
-    ast,
-    stl,
-    blk,
-    tov,
-    fgm,
-    fga,
-    fg3m,
-    fg3a,
-    ftm,
-    fta,
-    min
-  DO NOT INCLUDE MATH OR PERCENTAGE CALCULATIONS.
-
-DIVISION SAFETY:
-  - ALWAYS wrap division denominators with NULLIF(..., 0)
-  - ALWAYS cast numerator to DOUBLE PRECISION before dividing
-  - NEVER do raw division like fgm / fga — always use the safe pattern above
-
-DATE FILTERING:
-  - NEVER use EXTRACT() or DATE_TRUNC().
-  - If a user asks for a specific month (e.g., "March 2024"), filter dates using standard string comparisons: WHERE game_date >= '2024-03-01' AND game_date <= '2024-03-31'
-
-GENERAL:
-  - Do NOT add a generic LIMIT (e.g. LIMIT 50) unless the user asks for top-N, last-X games, or a bounded sample.
-  - For shot charts, game logs, or "all shots / full picture" asks, omit LIMIT so results are not arbitrarily truncated (heavy queries are still bounded by server cost/timeout).
-  - NEVER use SELECT * — always name columns explicitly
-  - NEVER invent column names that are not listed in this prompt
-  - NEVER add ORDER BY game_date to season summary tables (game_date does not exist there)
-  - NEVER add WHERE season_id = ... to season summary tables (season_id does not exist there)
-  - NEVER add WHERE season_type = ... to season summary tables (season_type does not exist there)
-  - If a question is ambiguous between recency and season summary, default to player_game_logs
-    with season_id = '22025' since it is the most current data available
-  - For "last N games" / "recent games" / "last X games" prompts, omit the
-    season_id filter so cross-season tails work. Just ORDER BY game_date DESC LIMIT N.
-
-════════════════════════════════════════════════════════════════════════
-SECTION 4: SEASON AND YEAR REFERENCE MAP
-════════════════════════════════════════════════════════════════════════
-
-  "current season" or no year specified (regular)  → all_players_regular_2024_2025
-    **Exception:** Head-to-head "who is better / between X and Y" with NO season/year wording → RULE 6B career UNION ALL (not only latest season).
-  "current playoffs" or no year specified (playoff) → all_players_playoffs_2024_2025
-  Bare year uses START-YEAR mapping for regular season:
-  "2020"                                            → all_players_regular_2020_2021
-  "2018"                                            → all_players_regular_2018_2019
-  "2016"                                            → all_players_regular_2016_2017
-
-  Playoff year uses END-YEAR mapping:
-  "2020 playoffs"                                   → all_players_playoffs_2019_2020
-  "2016 playoffs"                                   → all_players_playoffs_2015_2016
-
-  "last season" / "2024-25"                         → all_players_regular_2024_2025
-  "2023-24" / "last year"                           → all_players_regular_2023_2024
-  "2022-23"                                         → all_players_regular_2022_2023
-  "2021-22"                                         → all_players_regular_2021_2022
-  "2020-21"                                         → all_players_regular_2020_2021
-  "bubble" / "2019-20"                              → all_players_regular_2019_2020
-  "2018-19"                                         → all_players_regular_2018_2019
-  "2017-18"                                         → all_players_regular_2017_2018
-  "2016-17"                                         → all_players_regular_2016_2017
-  "2015-16"                                         → all_players_regular_2015_2016
-
-  season_id values inside player_game_logs:
-    2025-26 season (CURRENT — use this by default): '22025'
-    2024-25 season:                                 '22024'
-    2023-24 season:                                 '22023'
-    2022-23 season:                                 '22022'
-  season_type values (EXACT strings, case-sensitive):
-    'Regular Season'
-    'Playoffs'
-
-════════════════════════════════════════════════════════════════════════
-SECTION 5: WORKED EXAMPLES OF CORRECT QUERIES
-════════════════════════════════════════════════════════════════════════
-
-Q: "Analyze Giannis playoff performance"
-→ RULE 1. No year. Use all_players_playoffs_2024_2025.
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  SUM(stl) AS total_stl, SUM(blk) AS total_blk, SUM(tov) AS total_tov,
-  SUM(fgm) AS total_fgm, SUM(fga) AS total_fga,
-  SUM(fg3m) AS total_fg3m, SUM(fg3a) AS total_fg3a,
-  SUM(ftm) AS total_ftm, SUM(fta) AS total_fta,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
-  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
-FROM all_players_playoffs_2024_2025
-WHERE player_name ILIKE '%Giannis%'
-GROUP BY player_name LIMIT 50;
-
-Q: "Analyze Garry Harris playoff performance"
-→ RULE 1. No year. Use all_players_playoffs_2024_2025.
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  SUM(stl) AS total_stl, SUM(blk) AS total_blk, SUM(tov) AS total_tov,
-  SUM(fgm) AS total_fgm, SUM(fga) AS total_fga,
-  SUM(fg3m) AS total_fg3m, SUM(fg3a) AS total_fg3a,
-  SUM(ftm) AS total_ftm, SUM(fta) AS total_fta,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
-  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
-FROM all_players_playoffs_2024_2025
-WHERE player_name ILIKE '%Garry Harris%'
-GROUP BY player_name LIMIT 50;
-
-Q: "How did Giannis do in the 2019 playoffs"
-→ RULE 4. Year specified: 2019 → all_players_playoffs_2018_2019.
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
-  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
-FROM all_players_playoffs_2018_2019
-WHERE player_name ILIKE '%Giannis%'
-GROUP BY player_name LIMIT 50;
-
-Q: "Show me LeBron's last 10 games"
-→ RULE 3. Recency. Use player_game_logs, season_id = '22025', ORDER BY game_date DESC.
-SELECT player_name, game_date, matchup, wl, pts, reb, ast, stl, blk, tov,
-  fgm, fga, fg3m, fg3a, ftm, fta, min,
-  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct,
-  (CAST(fg3m AS DOUBLE PRECISION) / NULLIF(fg3a, 0)) AS fg3_pct,
-  (CAST(ftm  AS DOUBLE PRECISION) / NULLIF(fta,  0)) AS ft_pct
-FROM player_game_logs
-WHERE player_name ILIKE '%LeBron James%'
-  AND season_id = '22025'
-ORDER BY game_date DESC LIMIT 10;
-
-Q: "How has Steph been playing lately"
-→ RULE 3 / RULE 10. Recency keyword. Use player_game_logs, season_id = '22025'.
-SELECT player_name, game_date, matchup, wl, pts, reb, ast,
-  fgm, fga, fg3m, fg3a,
-  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct,
-  (CAST(fg3m AS DOUBLE PRECISION) / NULLIF(fg3a, 0)) AS fg3_pct
-FROM player_game_logs
-WHERE (player_name ILIKE '%Stephen Curry%' OR player_name ILIKE '%Steph Curry%')
-  AND season_id = '22025'
-  AND season_type = 'Regular Season'
-ORDER BY game_date DESC LIMIT 15;
-
-Q: "Compare LeBron and Curry this season"
-→ RULE 6. Two players, same era, season summary. Use all_players_regular_2024_2025.
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
-  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
-FROM all_players_regular_2024_2025
-WHERE player_name ILIKE '%LeBron James%' OR player_name ILIKE '%Stephen Curry%'
-GROUP BY player_name LIMIT 50;
-
-Q: "What were Kevin Durant's stats 2015"
-→ RULE 4 + RULE 11. Single-player season profile, no aggregation.
-SELECT DISTINCT player_name, team_abbreviation, age, gp, min, w_pct,
-  pts, reb, ast, tov, stl, blk, pf, plus_minus, fgm, fga,
-  fg_pct, fg3_pct, ft_pct, fg3m, fg3a, ftm, fta,
-  pts_rank, fg_pct_rank, fg3_pct_rank, ft_pct_rank, fgm_rank, fga_rank, fg3m_rank, fg3a_rank, ftm_rank, fta_rank, min_rank,
-  reb_rank, dreb_rank, oreb_rank, ast_rank, tov_rank, stl_rank, blk_rank, pf_rank,
-  dreb, oreb, dd2, td3, dd2_rank, td3_rank
-FROM all_players_regular_2015_2016
-WHERE player_name ILIKE '%Kevin Durant%'
-LIMIT 50;
-
-Q: "Who are the top 10 scorers this season"
-→ RULE 8. Leaderboard. Use all_players_regular_2024_2025.
-SELECT player_name, team_abbreviation, pts, pts_rank, gp, fg_pct, fg3_pct, fg3m, fg3a, ftm, fta, ft_pct
-FROM all_players_regular_2024_2025
-ORDER BY pts_rank ASC NULLS LAST LIMIT 10;
-
-Q: "Who are the best scorers from 2000-2001"
-→ RULE 4 + RULE 8. Specific season leaderboard from one table, no aggregation.
-SELECT DISTINCT player_name, team_abbreviation, pts, pts_rank, gp, fg_pct, fg3_pct, fg3m, fg3a, ftm, fta, ft_pct
-FROM all_players_regular_2000_2001
-ORDER BY pts_rank ASC NULLS LAST LIMIT 5;
-
-Q: "Show me Steph Curry's career stats"
-→ RULE 5. Career = UNION ALL across all yearly tables.
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
-  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct
-FROM (
-  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2012_2013 WHERE player_name ILIKE '%Stephen Curry%'
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2013_2014 WHERE player_name ILIKE '%Stephen Curry%'
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2014_2015 WHERE player_name ILIKE '%Stephen Curry%'
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%Stephen Curry%'
-) AS career GROUP BY player_name LIMIT 50;
-
-Q: "Is Giannis on a hot streak"
-→ RULE 3. Streak = game log recency. Use player_game_logs.
-SELECT player_name, game_date, matchup, wl, pts, reb, ast,
-  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct
-FROM player_game_logs
-WHERE player_name ILIKE '%Giannis%'
-  AND season_id = '22025'
-  AND season_type = 'Regular Season'
-ORDER BY game_date DESC LIMIT 10;
-
-Q: "Compare LeBron and Jordan career stats"
-→ RULE 7. Different eras. UNION ALL per player. CRITICAL: The shape below is
-   shown ABBREVIATED for readability. You MUST emit ONE leg PER AVAILABLE
-   SEASON listed in DATABASE SCHEMA above for each player's actual era.
-   Do NOT copy these legs verbatim — the post-processor cannot add legs you
-   did not emit. For Jordan, include every available all_players_regular_*
-   table from 1996_1997 through 2002_2003. For LeBron, include every
-   available all_players_regular_* table from 2003_2004 through 2024_2025
-   (every season in between, no gaps).
-SELECT player_name,
-  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
-  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct
-FROM (
-  -- Michael Jordan: ONE leg per available season in his era (1996-97 through 2002-03)
-  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_1996_1997 WHERE player_name ILIKE '%Michael Jordan%'
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_1997_1998 WHERE player_name ILIKE '%Michael Jordan%'
-  UNION ALL
-  -- ... include 2001_2002 and 2002_2003 as well ...
-  UNION ALL
-  -- LeBron James: ONE leg per available season (2003-04 through 2024-25, every season)
-  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2003_2004 WHERE player_name ILIKE '%LeBron James%'
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2004_2005 WHERE player_name ILIKE '%LeBron James%'
-  UNION ALL
-  -- ... continue for 2005_2006, 2006_2007, ..., 2023_2024 ...
-  UNION ALL
-  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%LeBron James%'
-) AS combined GROUP BY player_name LIMIT 50;
-
-Q: "Show me Kevin Durant's points trend from 2015 to 2023"
-→ RULE 5. By-season trend. UNION ALL across EVERY season in the inclusive range.
-   ONE ROW PER SEASON. No SUM. No GROUP BY across seasons.
-SELECT player_name, season_label, pts, gp, fg_pct, fg3_pct, ft_pct
-FROM (
-  SELECT player_name, '2015-16' AS season_label, pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2015_2016 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2016-17', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2016_2017 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2017-18', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2017_2018 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2018-19', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2018_2019 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2019-20', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2019_2020 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2020-21', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2020_2021 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2021-22', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2021_2022 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2022-23', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2022_2023 WHERE player_name ILIKE '%Kevin Durant%'
-  UNION ALL
-  SELECT player_name, '2023-24', pts, gp, fg_pct, fg3_pct, ft_pct
-    FROM all_players_regular_2023_2024 WHERE player_name ILIKE '%Kevin Durant%'
-) AS trend
-ORDER BY season_label;
-
-Q: "Compare Luka Doncic and Trae Young assists from 2020 to 2024"
-→ RULE 6 + RULE 5. Two players, multi-season range. UNION ALL each (player, season).
-   ONE ROW PER (player, season). No cross-season aggregation.
-SELECT player_name, season_label, ast, gp
-FROM (
-  SELECT player_name, '2020-21' AS season_label, ast, gp FROM all_players_regular_2020_2021
-    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
-  UNION ALL
-  SELECT player_name, '2021-22', ast, gp FROM all_players_regular_2021_2022
-    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
-  UNION ALL
-  SELECT player_name, '2022-23', ast, gp FROM all_players_regular_2022_2023
-    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
-  UNION ALL
-  SELECT player_name, '2023-24', ast, gp FROM all_players_regular_2023_2024
-    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
-  UNION ALL
-  SELECT player_name, '2024-25', ast, gp FROM all_players_regular_2024_2025
-    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
-) AS combined
-ORDER BY season_label, player_name;
-
-Q: "Which teams have the best net rating this season?"
-→ RULE 8. Team-level advanced metric. Use team_advanced 2025_26, not player tables.
-   Values are TEXT, so cast for sorting and sample filters.
-SELECT "TEAM_NAME", "GP", "W", "L", "W_PCT", "OFF_RATING", "DEF_RATING", "NET_RATING", "PACE"
-FROM team_advanced_season_2025_26_regular_season_pergame
-WHERE NULLIF("GP", '')::numeric >= 20
-ORDER BY NULLIF("NET_RATING", '')::numeric DESC NULLS LAST
-LIMIT 10;
-
-Q: "What seed are the Warriors this season?"
-→ RULE 8. Standings/seed question. Use nba_standings 2025_26 and match team city/name.
-SELECT "TeamCity", "TeamName", "Conference", "PlayoffRank", "WINS", "LOSSES", "WinPCT", "Record", "L10", "CurrentStreak"
-FROM nba_standings_season_2025_26_leaguestandingsv3
-WHERE "TeamName" ILIKE '%Warriors%' OR "TeamCity" ILIKE '%Golden State%'
-LIMIT 5;
-
-Q: "Compare the Celtics and Lakers defenses in 2024-25"
-→ RULE 8. Team-level defensive comparison. Use team_advanced 2024_25 and DEF_RATING.
-   Lower DEF_RATING is better.
-SELECT "TEAM_NAME", "GP", "W", "L", "W_PCT", "DEF_RATING", "NET_RATING", "DREB_PCT", "PACE"
-FROM team_advanced_season_2024_25_regular_season_pergame
-WHERE "TEAM_NAME" ILIKE '%Celtics%' OR "TEAM_NAME" ILIKE '%Lakers%'
-ORDER BY NULLIF("DEF_RATING", '')::numeric ASC NULLS LAST
-LIMIT 10;
-
-Q: "point differential from 2010 to 2024"
-→ RULE 8. Point differential is "DiffPointsPG" in standings, not "NET_RATING".
-   This is a multi-season range, so UNION every standings table from 2010-11 through 2024-25.
-SELECT season_start, season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
-FROM (
-  SELECT 2010 AS season_start, '2010-11' AS season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
-  FROM nba_standings_season_2010_11_leaguestandingsv3
-  UNION ALL
-  SELECT 2011 AS season_start, '2011-12' AS season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
-  FROM nba_standings_season_2011_12_leaguestandingsv3
-  -- continue one UNION ALL leg per requested season through 2024-25
-) AS point_differential_trend
-ORDER BY season_start ASC, NULLIF("DiffPointsPG", '')::numeric DESC NULLS LAST
-LIMIT 500;
-
-Q: "Who had the most drives per game in 2023?"
-→ RULE 0 + RULE 11. "drives" → tracking_pt_drives. "in 2023" → 2023_24 season.
-   "DRIVES" is already per-game in this table — DO NOT divide by GP.
-   These tables store numbers as TEXT, so cast with NULLIF(col, '')::numeric.
-SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "DRIVES",
-       "DRIVE_PTS", "DRIVE_FG_PCT", "DRIVE_AST"
-FROM nba_player_tracking_pt_drives_season_2023_24_season_type_re
-WHERE NULLIF("GP", '')::numeric >= 20
-ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST
-LIMIT 10;
-
-Q: "Who leads in deflections this season?"
-→ RULE 0 + RULE 11. "deflections" → hustle. "this season" → 2025_26.
-   These tables store numbers as TEXT, so cast with NULLIF(col, '')::numeric.
-SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "G", "DEFLECTIONS", "CONTESTED_SHOTS", "CHARGES_DRAWN"
-FROM nba_hustle_season_2025_26_season_type_regular_season_per_mo
-WHERE NULLIF("G", '')::numeric >= 20
-ORDER BY NULLIF("DEFLECTIONS", '')::numeric DESC NULLS LAST
-LIMIT 10;
-
-Q: "Who had the highest PER in 2023?"
-→ RULE 15. PER is not stored — closest equivalent is "PIE" in nba_advanced_*.
-   Numbers in advanced tables are TEXT, so cast with NULLIF(col, '')::numeric.
-SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "PIE"
-FROM nba_advanced_season_2023_24_season_type_regular_season_per
-WHERE NULLIF("GP", '')::numeric >= 20
-ORDER BY NULLIF("PIE", '')::numeric DESC NULLS LAST
-LIMIT 10;
-
-Q: "How does Giannis perform on post-ups?"
-→ RULE 0 + RULE 11. "post-ups" → tracking_pt_posttouch. No year ⇒ current ⇒ 2025_26.
-SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "POST_TOUCHES",
-       "POST_TOUCH_FG_PCT", "POINTS", "PTS_PER_TOUCH"
-FROM nba_player_tracking_pt_posttouch_season_2025_26_season_type
-WHERE "PLAYER_NAME" ILIKE '%Giannis%';
-
-Q: "What were LeBron's stats vs the Celtics in 2024?"
-→ RULE 13. Use player_game_logs. Calendar year 2024 ⇒ filter by game_date range.
-SELECT player_name, game_date, matchup, wl, pts, reb, ast, stl, blk, tov,
-  fgm, fga, fg3m, fg3a, ftm, fta, min,
-  (CAST(fgm AS DOUBLE PRECISION) / NULLIF(fga, 0)) AS fg_pct
-FROM player_game_logs
-WHERE player_name ILIKE '%LeBron James%'
-  AND matchup ILIKE '%BOS%'
-  AND game_date >= '2024-01-01' AND game_date <= '2024-12-31'
-ORDER BY game_date DESC;
-
-Q: "How many points did Wembanyama score in his last 5 games?"
-→ RULE 3. "last N games" — do NOT pin to a specific season; let game_date order across season boundary.
-SELECT player_name, game_date, matchup, wl, pts, reb, ast, fgm, fga, fg3m, fg3a, ftm, fta, min
-FROM player_game_logs
-WHERE player_name ILIKE '%Victor Wembanyama%'
-  OR player_name ILIKE '%Wembanyama%'
-ORDER BY game_date DESC
-LIMIT 5;
-
-════════════════════════════════════════════════════════════════════════
-SECTION 6: COMMON MISTAKES — NEVER DO THESE
-════════════════════════════════════════════════════════════════════════
-
-❌ SELECT season_id FROM all_players_playoffs_2024_2025    -- does not exist in summary tables
-❌ SELECT game_date FROM all_players_regular_2024_2025     -- does not exist in summary tables
-❌ SELECT fg_pct FROM player_game_logs                     -- does not exist, must calculate
-❌ SELECT oreb FROM player_game_logs                       -- does not exist in game logs
-❌ WHERE season_type = 'Playoffs' on a summary table       -- column does not exist there
-❌ WHERE season_id = '22025' on a summary table            -- column does not exist there
-❌ player_name ILIKE 'Jordan%'                             -- matches wrong players
-❌ player_name ILIKE 'Harris'                              -- missing wildcards
-❌ fgm / fga                                               -- unsafe, use NULLIF
-❌ SELECT * FROM any table                                  -- always name columns explicitly
-❌ Using all_players_playoffs_2018_2019 when no year given  -- always default to 2024_2025
-❌ Using player_game_logs for "analyze playoff performance" -- use season summary tables
-❌ AVG(fg_pct) from season summary tables                  -- use SUM(fgm)/SUM(fga) instead
-❌ ORDER BY game_date on a season summary table            -- game_date does not exist there
-❌ WHERE season_id = '22024' for current 2025-26 games     -- current season is '22025'
-❌ Using all_players_regular_2024_2025 for "last X games"  -- no game_date column there
-❌ Assuming player_game_logs is outdated                   -- it has data through Feb 2026
-❌ SELECT gp FROM player_game_logs                         -- use COUNT(*) AS games_played
-
-════════════════════════════════════════════════════════════════════════
-OUTPUT FORMAT
-════════════════════════════════════════════════════════════════════════
-Return ONLY the raw SQL query.
-No explanation. No markdown. No backticks. No comments. No preamble.
-The query must be directly executable in PostgreSQL as-is.
-
-DATABASE SCHEMA:
-{schema_description}
+    use_cache = use_cache and _sql_cache_enabled()
+    cache_key = template_key = data_version = slots = filled_sql = None
+
+    # Connections come from the shared pool and are only held while talking to
+    # Postgres — never across an LLM call (SQL generation or repair).
+    with pooled_connection() as conn:
+        schema_description = get_db_schema(conn)
+        if use_cache:
+            schema_fingerprint = hashlib.sha256(schema_description.encode("utf-8")).hexdigest()[:16]
+            cache_key = question_key(normalize_question(user_input_param, _PLAYER_ALIAS_MAP), schema_fingerprint)
+            data_version = _current_season_data_version(conn)
+            cached_sql = _sql_cache.get(cache_key, data_version)
+            if cached_sql:
+                df = _execute_prepared_sql(cached_sql, conn, "NL→SQL cache")
+                if df is not None and not df.empty:
+                    return df
+                _sql_cache.invalidate(cache_key)
+
+        if _fast_path_enabled():
+            plan = _fast_path_plan(user_input_param, conn)
+            if plan is not None:
+                df = _execute_prepared_sql(plan.sql, conn, f"fast path {plan.intent}")
+                if df is not None and not df.empty:
+                    if cache_key and df.attrs.get("sql"):
+                        _sql_cache.put(cache_key, df.attrs["sql"], data_version)
+                    return df
+
+        if use_cache:
+            slots = _question_slots(user_input_param)
+            if slots is not None:
+                template_key = question_key(slots.template, f"template:{schema_fingerprint}")
+                template_sql = _template_cache.get(template_key, None)
+                if template_sql:
+                    filled_sql = fill_sql_template(template_sql, slots)
+                    logger.info("NL→SQL template hit: %s", slots.template)
+
+        scopes = _sql_prompt_scopes(user_input_param)
+        prompt_schema = (
+            describe_schema(get_schema_catalog(conn), schema_sections_for(scopes)) if scopes is not None else None
+        )
+
+    if filled_sql:
+        # Filled templates go through the full rewrite pipeline, like model output.
+        df = _rewrite_and_execute_sql(filled_sql, user_input_param, schema_description)
+        if df is not None and not df.empty:
+            if df.attrs.get("sql"):
+                _sql_cache.put(cache_key, df.attrs["sql"], data_version)
+            return df
+
+    sql_query = _generate_sql_with_model(user_input_param, schema_description, scopes, prompt_schema)
+    if sql_query is None:
+        return None
 
-USER REQUEST:
-{user_input_param}
+    df = _rewrite_and_execute_sql(sql_query, user_input_param, schema_description)
+    if cache_key and df is not None and not df.empty and df.attrs.get("sql"):
+        _sql_cache.put(cache_key, df.attrs["sql"], data_version)
+        template_sql = parameterize_sql(sql_query, slots) if template_key else None
+        if template_sql:
+            # Model SQL before any rewrite, so it does not depend on the data version.
+            _template_cache.put(template_key, template_sql, None, live=False)
+    return df
 
-Generate the SQL:"""
+
+def _sql_prompt_scopes(user_input_param: str) -> Optional[frozenset]:
+    """Prompt scopes for the question, or None to send the full prompt."""
+    if os.getenv("SQL_PROMPT_SCOPING_DISABLED", "").strip().lower() in ("1", "true", "yes"):
+        return None
+    return question_scopes(user_input_param)
+
+
+def prompt_token_stats() -> dict:
+    return _prompt_token_stats.snapshot()
+
+
+def _generate_sql_with_model(
+    user_input_param: str,
+    schema_description: str,
+    scopes: Optional[frozenset] = None,
+    prompt_schema: Optional[str] = None,
+):
+    """
+    ``schema_description`` is the full schema text; ``prompt_schema`` the
+    part of it selected for ``scopes``. Without scopes the full prompt is sent.
+    """
+    if scopes is None or prompt_schema is None:
+        scopes, prompt_schema = None, schema_description
+    prompt = build_sql_prompt(user_input_param, prompt_schema, scopes)
+    estimated = estimate_tokens(prompt)
+    estimated_full = estimated if scopes is None else estimate_tokens(build_sql_prompt(user_input_param, schema_description))
 
     try:
-        response = client.chat.completions.create(
+        response = client.chat_completion(
+            "nl_sql",
             model="gpt-5.4-mini",
             messages=[
                 {"role": "system", "content": "You are a SQL query generator. Return ONLY valid SQL queries."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0,
-            max_completion_tokens=1500
+            max_completion_tokens=1500,
+            prompt_cache_key="nl-sql",
+        )
+
+        usage = response_usage(response)
+        _prompt_token_stats.record(scopes, estimated, estimated_full, usage)
+        logger.info(
+            "SQL prompt scopes=%s: ~%d tokens (full prompt ~%d), reported %s",
+            sorted(scopes) if scopes is not None else "all", estimated, estimated_full, usage,
         )
 
         sql_query = response.choices[0].message.content.strip()
@@ -2738,117 +2172,237 @@ Generate the SQL:"""
         logger.error("OpenAI API error: %s", e)
         return None
 
-    sql_query = _enforce_start_year_table_mapping(sql_query, user_input_param)
-    sql_query = _enforce_nth_season_table_mapping(sql_query, user_input_param, conn)
-    sql_query = _rewrite_nth_season_comparison_sql(sql_query, user_input_param, conn)
-    sql_query = _rewrite_implicit_head_to_head_to_career_sql(sql_query, user_input_param, conn)
-    sql_query = _enforce_advanced_table_mapping(sql_query, user_input_param, schema_description)
-    sql_query = _rewrite_point_differential_trend_sql(sql_query, user_input_param)
-    sql_query = _rewrite_career_aggregate_to_by_season(sql_query, user_input_param, conn)
-    sql_query = _ensure_rebounding_leaderboard_columns(sql_query, user_input_param)
-    sql_query = _ensure_assist_leaderboard_columns(sql_query, user_input_param)
-    sql_query = _overfetch_all_players_leaderboard_sql(sql_query, user_input_param)
-    sql_query = _ensure_all_players_broad_columns(sql_query, user_input_param)
-    sql_query = _expand_player_name_filters_for_encoding(sql_query)
-    sql_query = _ensure_profile_columns_in_sql(sql_query, user_input_param)
-    sql_query = _ensure_season_columns_in_sql(sql_query)
-    # Skip raw-data policy for advanced metrics by user-intent keywords. The
-    # enforcer itself ALSO bypasses scrubbing when the SQL touches a text-storage
-    # family (nba_advanced_*, nba_clutch_*, nba_hustle_*, nba_player_tracking_pt_*,
-    # nba_lineups_*, team_advanced_*, nba_standings_*) — those queries need ORDER BY
-    # and NULLIF/::numeric casts to function. So this gate is just for keyword-based
-    # routing; the function is the safety net for everything else.
-    if not _is_advanced_metrics_request(user_input_param):
-        try:
-            sql_query = _enforce_raw_data_only_sql(sql_query)
-        except ValueError as policy_error:
-            logger.warning("Raw-data policy violation in generated SQL. Attempting repair: %s", policy_error)
-            sql_query = repair_sql_error(
-                original_sql=sql_query,
-                error_message=f"Raw-data policy violation: {policy_error}",
-                schema_description=schema_description,
-                user_input=user_input_param
-            )
-            sql_query = _enforce_start_year_table_mapping(sql_query, user_input_param)
-            sql_query = _enforce_nth_season_table_mapping(sql_query, user_input_param, conn)
-            sql_query = _rewrite_nth_season_comparison_sql(sql_query, user_input_param, conn)
-            sql_query = _rewrite_implicit_head_to_head_to_career_sql(sql_query, user_input_param, conn)
-            sql_query = _enforce_advanced_table_mapping(sql_query, user_input_param, schema_description)
-            sql_query = _rewrite_point_differential_trend_sql(sql_query, user_input_param)
-            sql_query = _expand_player_name_filters_for_encoding(sql_query)
-            sql_query = _ensure_profile_columns_in_sql(sql_query, user_input_param)
-            sql_query = _ensure_season_columns_in_sql(sql_query)
-            sql_query = _enforce_raw_data_only_sql(sql_query)
-    sql_query = _rewrite_nth_season_comparison_sql(sql_query, user_input_param, conn)
-    sql_query = _rewrite_implicit_head_to_head_to_career_sql(sql_query, user_input_param, conn)
-    sql_query = limit_rows(sql_query)
+    return sql_query
 
-    try:
-        sql_query = validate_and_normalize_sql(sql_query)
-    except ValueError as e:
-        logger.error("Validation error: %s", e)
-        return None
 
-    max_attempts = 3
+# Safeguard passes over model SQL, in order. Gates read only the question and
+# are memoized per request on the RewriteContext.
+def _asks_nth_season(ctx: RewriteContext) -> bool:
+    return bool(_extract_requested_nth_season(ctx.question))
 
-    for attempt in range(max_attempts):
-        try:
-            logger.debug("Attempt %d executing query...", attempt + 1)
-            logger.info("Final SQL being executed:\n%s", sql_query)
-            return execute_query(conn, sql_query)
 
-        except Exception as e:
-            error_message = str(e)
-            logger.error("SQL execution error: %s", error_message)
+_rewrite_stats = RewriteStats()
+# Tree passes share the context's parse of the statement (see rewrite_pipeline).
+_START_YEAR_PASS = RewritePass(
+    "start_year_tables",
+    lambda tree, c: _start_year_table_tree(tree, c.question),
+    lambda c: _extract_bare_year_request(c.question) is not None,
+    tree=True,
+)
+_NTH_SEASON_PASS = RewritePass(
+    "nth_season_tables", lambda tree, c: _nth_season_table_tree(tree, c.question, c.conn), _asks_nth_season, tree=True
+)
+_NTH_SEASON_COMPARISON_PASS = RewritePass(
+    "nth_season_comparison",
+    lambda sql, c: _rewrite_nth_season_comparison_sql(sql, c.question, c.conn),
+    _asks_nth_season,
+)
+_HEAD_TO_HEAD_CAREER_PASS = RewritePass(
+    "head_to_head_career",
+    lambda sql, c: _rewrite_implicit_head_to_head_to_career_sql(sql, c.question, c.conn),
+    lambda c: c.conn is not None and _is_implicit_head_to_head_career_question(c.question),
+)
+_ADVANCED_TABLES_PASS = RewritePass(
+    "advanced_tables",
+    lambda sql, c: _enforce_advanced_table_mapping(sql, c.question, c.catalog),
+    lambda c: _is_advanced_metrics_request(c.question),
+)
+_POINT_DIFFERENTIAL_PASS = RewritePass(
+    "point_differential_trend",
+    lambda sql, c: _rewrite_point_differential_trend_sql(sql, c.question),
+    lambda c: _is_point_differential_request(c.question),
+)
+_NAME_ENCODING_PASS = RewritePass("name_encoding", lambda sql, c: _expand_player_name_filters_for_encoding(sql))
+_PROFILE_COLUMNS_PASS = RewritePass(
+    "profile_columns",
+    lambda sql, c: _ensure_profile_columns_in_sql(sql, c.question),
+    lambda c: _is_single_player_profile_request(c.question),
+)
+_SEASON_COLUMNS_PASS = RewritePass("season_columns", lambda sql, c: _ensure_season_columns_in_sql(sql))
+_RAW_DATA_POLICY_PASS = RewritePass(
+    "raw_data_policy",
+    lambda sql, c: _enforce_raw_data_only_sql(sql),
+    lambda c: not _is_advanced_metrics_request(c.question),
+)
+
+_MODEL_SQL_PASSES = RewritePipeline(
+    [
+        _START_YEAR_PASS,
+        _NTH_SEASON_PASS,
+        _NTH_SEASON_COMPARISON_PASS,
+        _HEAD_TO_HEAD_CAREER_PASS,
+        _ADVANCED_TABLES_PASS,
+        _POINT_DIFFERENTIAL_PASS,
+        RewritePass(
+            "career_by_season", lambda tree, c: _career_by_season_tree(tree, c.question, c.conn), tree=True
+        ),
+        RewritePass("rebounding_columns", lambda sql, c: _ensure_rebounding_leaderboard_columns(sql, c.question)),
+        RewritePass("assist_columns", lambda sql, c: _ensure_assist_leaderboard_columns(sql, c.question)),
+        RewritePass("leaderboard_overfetch", lambda sql, c: _overfetch_all_players_leaderboard_sql(sql, c.question)),
+        RewritePass("broad_columns", lambda sql, c: _ensure_all_players_broad_columns(sql, c.question)),
+        _NAME_ENCODING_PASS,
+        _PROFILE_COLUMNS_PASS,
+        _SEASON_COLUMNS_PASS,
+    ],
+    _rewrite_stats,
+)
+# After repair_sql_error fixed a raw-data policy violation.
+_POLICY_REPAIR_SQL_PASSES = RewritePipeline(
+    [
+        _START_YEAR_PASS,
+        _NTH_SEASON_PASS,
+        _NTH_SEASON_COMPARISON_PASS,
+        _HEAD_TO_HEAD_CAREER_PASS,
+        _ADVANCED_TABLES_PASS,
+        _POINT_DIFFERENTIAL_PASS,
+        _NAME_ENCODING_PASS,
+        _PROFILE_COLUMNS_PASS,
+        _SEASON_COLUMNS_PASS,
+        replace(_RAW_DATA_POLICY_PASS, applies=None),
+    ],
+    _rewrite_stats,
+)
+_FINAL_SQL_PASSES = RewritePipeline(
+    [
+        _NTH_SEASON_COMPARISON_PASS,
+        _HEAD_TO_HEAD_CAREER_PASS,
+        RewritePass(
+            "collapse_season_unions", lambda sql, c: _collapse_season_unions_to_fact_table(sql, c.catalog)
+        ),
+    ],
+    _rewrite_stats,
+)
+# After repair_sql_error fixed an execution error: the raw-data policy applies
+# to every repaired statement, advanced-metrics questions included.
+_REPAIR_SQL_PASSES = (
+    _MODEL_SQL_PASSES
+    + RewritePipeline([replace(_RAW_DATA_POLICY_PASS, applies=None)], _rewrite_stats)
+    + _FINAL_SQL_PASSES
+)
 
-            if any(keyword in error_message.lower()
-                   for keyword in ["does not exist", "column", "relation"]):
 
-                logger.debug("Attempting schema self-repair...")
+def rewrite_pass_stats() -> dict:
+    return _rewrite_stats.snapshot()
+
+
+def _sql_preflight_enabled() -> bool:
+    return os.getenv("SQL_PREFLIGHT_DISABLED", "").strip().lower() not in ("1", "true", "yes")
 
-                sql_query = repair_sql_error(
-                    original_sql=sql_query,
-                    error_message=error_message,
-                    schema_description=schema_description,
-                    user_input=user_input_param
-                )
 
-                sql_query = _enforce_start_year_table_mapping(sql_query, user_input_param)
-                sql_query = _enforce_nth_season_table_mapping(sql_query, user_input_param, conn)
-                sql_query = _rewrite_nth_season_comparison_sql(sql_query, user_input_param, conn)
-                sql_query = _rewrite_implicit_head_to_head_to_career_sql(sql_query, user_input_param, conn)
-                sql_query = _enforce_advanced_table_mapping(sql_query, user_input_param, schema_description)
-                sql_query = _rewrite_point_differential_trend_sql(sql_query, user_input_param)
-                sql_query = _rewrite_career_aggregate_to_by_season(sql_query, user_input_param, conn)
-                sql_query = _ensure_rebounding_leaderboard_columns(sql_query, user_input_param)
-                sql_query = _ensure_assist_leaderboard_columns(sql_query, user_input_param)
-                sql_query = _overfetch_all_players_leaderboard_sql(sql_query, user_input_param)
-                sql_query = _ensure_all_players_broad_columns(sql_query, user_input_param)
-                sql_query = _expand_player_name_filters_for_encoding(sql_query)
-                sql_query = _ensure_profile_columns_in_sql(sql_query, user_input_param)
-                sql_query = _ensure_season_columns_in_sql(sql_query)
-                sql_query = _enforce_raw_data_only_sql(sql_query)
-                sql_query = _rewrite_nth_season_comparison_sql(sql_query, user_input_param, conn)
-                sql_query = _rewrite_implicit_head_to_head_to_career_sql(sql_query, user_input_param, conn)
-                sql_query = limit_rows(sql_query)
+def _finish_sql(sql_query: str, ctx: RewriteContext, passes: RewritePipeline):
+    """Final passes, player-id resolution, row limit and validation; (sql, ilike_sql)."""
+    sql_query = passes.run(sql_query, ctx)
+    sql_query, ilike_sql = _resolve_player_name_filters_to_ids(sql_query, ctx.conn, ctx.catalog)
+    sql_query = limit_rows(sql_query)
+    sql_query = validate_and_normalize_sql(sql_query, parsed=ctx.parsed(sql_query))
+    ilike_sql = validate_and_normalize_sql(limit_rows(ilike_sql)) if ilike_sql else None
+    return sql_query, ilike_sql
+
 
+def _rewrite_and_execute_sql(sql_query: str, user_input_param: str, schema_description: str):
+    """
+    Rewrite, validate and run model SQL, repairing it on failure.
+
+    A pooled connection is borrowed only for the rewrite and execute steps;
+    it is returned before every repair_sql_error call so slow repairs cannot
+    exhaust the pool.
+    """
+    policy_error = None
+    with pooled_connection() as conn:
+        catalog = get_schema_catalog(conn)
+        ctx = RewriteContext(user_input_param, conn, catalog)
+        sql_query = _MODEL_SQL_PASSES.run(sql_query, ctx)
+        # Skip raw-data policy for advanced metrics by user-intent keywords. The
+        # enforcer itself ALSO bypasses scrubbing when the SQL touches a text-storage
+        # family (nba_advanced_*, nba_clutch_*, nba_hustle_*, nba_player_tracking_pt_*,
+        # nba_lineups_*, team_advanced_*, nba_standings_*) — those queries need ORDER BY
+        # and NULLIF/::numeric casts to function. So this gate is just for keyword-based
+        # routing; the function is the safety net for everything else.
+        if ctx.gate(_RAW_DATA_POLICY_PASS.name, _RAW_DATA_POLICY_PASS.applies):
+            try:
+                sql_query = RewritePipeline([_RAW_DATA_POLICY_PASS], _rewrite_stats).run(sql_query, ctx)
+            except ValueError as e:
+                policy_error = e
+
+    final_passes = _FINAL_SQL_PASSES
+    if policy_error is not None:
+        logger.warning("Raw-data policy violation in generated SQL. Attempting repair: %s", policy_error)
+        sql_query = repair_sql_error(
+            original_sql=sql_query,
+            error_message=f"Raw-data policy violation: {policy_error}",
+            schema_description=schema_description,
+            user_input=user_input_param
+        )
+        final_passes = _POLICY_REPAIR_SQL_PASSES + _FINAL_SQL_PASSES
+
+    max_attempts = 3
+    local_repairs_left = 2
+    attempt = 0
+
+    while True:
+        with pooled_connection() as conn:
+            ctx.conn = conn
+            if final_passes is not None:
                 try:
-                    sql_query = validate_and_normalize_sql(sql_query)
+                    sql_query, ilike_sql = _finish_sql(sql_query, ctx, final_passes)
                 except ValueError as e:
-                    logger.error("Repaired SQL is unsafe: %s", e)
+                    logger.error("%s: %s", "Repaired SQL is unsafe" if attempt else "Validation error", e)
                     return None
+                final_passes = None
 
-                continue
-            else:
-                logger.error("Non-repairable error.")
-                return None
+            try:
+                logger.debug("Attempt %d executing query...", attempt + 1)
+                if _sql_preflight_enabled():
+                    # Unknown names fail here with Postgres' own wording, so the
+                    # repair below runs without a failed round trip to RDS.
+                    sql_query = preflight_sql(sql_query, catalog)
+                    ilike_sql = preflight_sql(ilike_sql, catalog) if ilike_sql else None
+                logger.info("Final SQL being executed:\n%s", sql_query)
+                df = _execute_with_name_filter_fallback(conn, sql_query, ilike_sql)
+                if df is not None:
+                    # The statement before the player_id rewrite, for the NL→SQL cache.
+                    df.attrs["sql"] = ilike_sql or sql_query
+                return df
+
+            except Exception as e:
+                error_message = str(e)
+                logger.error("SQL execution error: %s", error_message)
+
+                if not any(keyword in error_message.lower()
+                           for keyword in ["does not exist", "column", "relation"]):
+                    logger.error("Non-repairable error.")
+                    return None
+
+                # Near-miss names are fixed against the catalog first; the
+                # LLM repair below only runs when that cannot resolve them.
+                local_sql = repair_sql_locally(sql_query, catalog) if local_repairs_left else None
+                if local_sql is not None:
+                    local_repairs_left -= 1
+                    sql_query = local_sql
+                    if ilike_sql:
+                        # Keep the ILIKE fallback even when it needs no (or no possible) fix.
+                        ilike_sql = repair_sql_locally(ilike_sql, catalog) or ilike_sql
+                    continue
+
+        # The connection is back in the pool for the LLM repair.
+        attempt += 1
+        if attempt >= max_attempts:
+            break
+        logger.debug("Attempting schema self-repair...")
+        sql_query = repair_sql_error(
+            original_sql=sql_query,
+            error_message=error_message,
+            schema_description=schema_description,
+            user_input=user_input_param
+        )
+        final_passes = _REPAIR_SQL_PASSES
 
     logger.error("Max repair attempts reached.")
     return None
 
 
-def run_query(question: str):
-    return natural_language_to_sql(question)
+def run_query(question: str, use_cache: bool = True):
+    return natural_language_to_sql(question, use_cache=use_cache)
 
 
 def debug_query_routing(user_input: str, model_sql: str):
@@ -2856,17 +2410,22 @@ def debug_query_routing(user_input: str, model_sql: str):
     Debug helper to validate table routing and active DB identity without relying
     on a second OpenAI SQL generation pass.
     """
-    conn = get_connection()
+    with pooled_connection() as conn:
+        return _debug_query_routing_with_conn(conn, user_input, model_sql)
+
+
+def _debug_query_routing_with_conn(conn, user_input: str, model_sql: str):
     cursor = conn.cursor()
     try:
         cursor.execute(
             "SELECT current_database(), current_user, current_schema(), current_setting('search_path'), inet_server_addr(), inet_server_port();"
         )
         db_identity = cursor.fetchone()
+        catalog = get_schema_catalog(conn)
 
         sql_after_year = _enforce_start_year_table_mapping(model_sql or "", user_input or "")
         sql_after_nth = _enforce_nth_season_table_mapping(sql_after_year, user_input or "", conn)
-        sql_after_advanced = _enforce_advanced_table_mapping(sql_after_nth, user_input or "")
+        sql_after_advanced = _enforce_advanced_table_mapping(sql_after_nth, user_input or "", catalog)
         sql_after_name = _expand_player_name_filters_for_encoding(sql_after_advanced)
         sql_after_profile = _ensure_profile_columns_in_sql(sql_after_name, user_input or "")
         final_sql = _enforce_raw_data_only_sql(sql_after_profile)
@@ -2880,47 +2439,19 @@ def debug_query_routing(user_input: str, model_sql: str):
         start, end, is_playoffs = _extract_requested_season_window(user_input or "")
         expected_advanced_table = _advanced_table_name_for_window(start, end, is_playoffs)
 
-        cursor.execute(
-            """
-            SELECT EXISTS (
-                SELECT 1
-                FROM information_schema.tables
-                WHERE table_schema = 'public' AND table_name = %s
-            );
-            """,
-            (expected_advanced_table,),
-        )
-        expected_advanced_table_exists = bool(cursor.fetchone()[0])
+        expected_advanced_table_exists = expected_advanced_table in catalog
 
         cursor.execute("SELECT to_regclass(%s);", (f"public.{expected_advanced_table}",))
         regclass_public = cursor.fetchone()[0]
         cursor.execute("SELECT to_regclass(%s);", (expected_advanced_table,))
         regclass_unqualified = cursor.fetchone()[0]
 
-        cursor.execute(
-            """
-            SELECT table_schema, table_name
-            FROM information_schema.tables
-            WHERE table_name = %s
-            ORDER BY table_schema, table_name;
-            """,
-            (expected_advanced_table,),
-        )
-        exact_table_matches = [
-            {"table_schema": row[0], "table_name": row[1]} for row in cursor.fetchall()
-        ]
-
-        cursor.execute(
-            """
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = 'public'
-              AND table_name ILIKE 'nba%%advanced%%'
-            ORDER BY table_name
-            LIMIT 100;
-            """
+        exact_table_matches = (
+            [{"table_schema": "public", "table_name": expected_advanced_table}]
+            if expected_advanced_table_exists
+            else []
         )
-        advanced_table_candidates = [row[0] for row in cursor.fetchall()]
+        advanced_table_candidates = catalog.family_tables("nba_advanced")[:100]
 
         return {
             "db_identity": {
@@ -2952,4 +2483,3 @@ def debug_query_routing(user_input: str, model_sql: str):
         }
     finally:
         cursor.close()
-        conn.close()
@@ -0,0 +1,430 @@
+"""
+Shared gateway for every OpenAI chat call in the backend.
+
+One pooled sync client and one pooled async client (keep-alive tuned, SDK
+retries off) sit behind:
+
+- a per-call deadline that covers every attempt, not just one request;
+- retries with full-jitter exponential backoff on 429 / 5xx / timeouts /
+  connection errors, honoring Retry-After when the API sends it;
+- a global in-flight limit shared by sync and async callers, so a burst
+  queues briefly instead of piling timeouts onto the API;
+- a circuit breaker that fails fast for a cooldown after repeated transient
+  failures, then lets one trial call through.
+
+Call sites use ``get_llm_gateway().chat_completion(call_site, **create_kwargs)``
+(or ``achat_completion`` from async code, ``stream_chat_completion`` for
+token streaming). Token usage is recorded per call site in
+Interpreter.llm_usage.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+import openai
+
+from Interpreter.llm_usage import record_llm_usage
+
+try:
+    import httpx
+except ImportError:  # the SDK's default pool is used instead
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://us.api.openai.com/v1"
+
+
+class LlmUnavailableError(RuntimeError):
+    """Raised when the circuit is open or no in-flight slot frees up before the deadline."""
+
+
+def _is_transient(error: BaseException) -> bool:
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after_seconds(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures; half-opens after ``cooldown``."""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def admit(self) -> Optional[bool]:
+        """None when the call is rejected, else whether it is the half-open trial call."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_in_flight:
+                return None
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def abandon_trial(self) -> None:
+        """The trial call ended without an outcome (no slot, cancelled); let the next one try instead."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    self.times_opened += 1
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class InFlightLimit:
+    """Counting limit usable from threads (blocking) and coroutines (polling)."""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self._cond = threading.Condition()
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self, timeout: float) -> bool:
+        end = time.monotonic() + timeout
+        with self._cond:
+            while self.in_flight >= self.max_in_flight:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, timeout: float) -> bool:
+        end = time.monotonic() + timeout
+        while not self.try_acquire():
+            if time.monotonic() >= end:
+                return False
+            await asyncio.sleep(0.02)
+        return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+
+class LlmGateway:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        max_in_flight: int = 16,
+        max_retries: int = 3,
+        deadline_seconds: float = 60.0,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        max_connections: int = 32,
+        keepalive_seconds: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+        sync_client: Any = None,
+        async_client: Any = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.deadline_seconds = deadline_seconds
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_connections = max_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.limit = InFlightLimit(max_in_flight)
+        self.breaker = breaker or CircuitBreaker()
+        self._sync_client = sync_client
+        self._async_client = async_client
+        self._client_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0, "deadline_exceeded": 0}
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+    def _http_kwargs(self, async_client: bool) -> dict:
+        if httpx is None:
+            return {}
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_seconds,
+        )
+        factory = openai.DefaultAsyncHttpxClient if async_client else openai.DefaultHttpxClient
+        return {"http_client": factory(limits=limits)}
+
+    def _client(self) -> Any:
+        if self._sync_client is None:
+            with self._client_lock:
+                if self._sync_client is None:
+                    self._sync_client = openai.OpenAI(
+                        api_key=self.api_key, base_url=self.base_url, max_retries=0, **self._http_kwargs(False)
+                    )
+        return self._sync_client
+
+    def _aclient(self) -> Any:
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    self._async_client = openai.AsyncOpenAI(
+                        api_key=self.api_key, base_url=self.base_url, max_retries=0, **self._http_kwargs(True)
+                    )
+        return self._async_client
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _admit(self, call_site: str) -> bool:
+        """Admit a call through the breaker; returns whether it is the half-open trial."""
+        trial = self.breaker.admit()
+        if trial is None:
+            self._count("rejected")
+            raise LlmUnavailableError(f"LLM circuit open; {call_site} call rejected")
+        return trial
+
+    def _next_wait(self, call_site: str, attempt: int, error: BaseException, end: float) -> Optional[float]:
+        """Seconds to sleep before retrying, or None to give up and re-raise."""
+        if not _is_transient(error):
+            # A bad request is not an outage; it does not trip the breaker.
+            self.breaker.record_success()
+            return None
+        wait = self._backoff(attempt, error)
+        out_of_time = time.monotonic() + wait >= end
+        if attempt >= self.max_retries or out_of_time:
+            self.breaker.record_failure()
+            self._count("failures")
+            if out_of_time:
+                self._count("deadline_exceeded")
+            return None
+        self._count("retries")
+        logger.warning("LLM %s attempt %d failed (%s); retrying in %.2fs", call_site, attempt + 1, error, wait)
+        return wait
+
+    def chat_completion(self, call_site: str, deadline: Optional[float] = None, **create_kwargs) -> Any:
+        """``chat.completions.create`` with the gateway's limits, retries and breaker."""
+        trial = self._admit(call_site)
+        try:
+            end = time.monotonic() + (deadline or self.deadline_seconds)
+            if not self.limit.acquire(max(0.0, end - time.monotonic())):
+                self._count("rejected")
+                raise LlmUnavailableError(f"No LLM slot free before the {call_site} deadline")
+            self._count("calls")
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        response = self._client().chat.completions.create(
+                            timeout=max(0.1, end - time.monotonic()), **create_kwargs
+                        )
+                    except Exception as error:
+                        wait = self._next_wait(call_site, attempt, error, end)
+                        if wait is None:
+                            raise
+                        time.sleep(wait)
+                        attempt += 1
+                        continue
+                    self.breaker.record_success()
+                    record_llm_usage(call_site, response)
+                    return response
+            finally:
+                self.limit.release()
+        except BaseException:
+            # Covers cancellation and interrupts, which skip the failure bookkeeping.
+            if trial:
+                self.breaker.abandon_trial()
+            raise
+
+    async def achat_completion(self, call_site: str, deadline: Optional[float] = None, **create_kwargs) -> Any:
+        """Async ``chat_completion``; shares the in-flight limit and breaker with sync callers."""
+        trial = self._admit(call_site)
+        try:
+            end = time.monotonic() + (deadline or self.deadline_seconds)
+            if not await self.limit.acquire_async(max(0.0, end - time.monotonic())):
+                self._count("rejected")
+                raise LlmUnavailableError(f"No LLM slot free before the {call_site} deadline")
+            self._count("calls")
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        response = await self._aclient().chat.completions.create(
+                            timeout=max(0.1, end - time.monotonic()), **create_kwargs
+                        )
+                    except Exception as error:
+                        wait = self._next_wait(call_site, attempt, error, end)
+                        if wait is None:
+                            raise
+                        await asyncio.sleep(wait)
+                        attempt += 1
+                        continue
+                    self.breaker.record_success()
+                    record_llm_usage(call_site, response)
+                    return response
+            finally:
+                self.limit.release()
+        except BaseException:
+            # asyncio.CancelledError is a BaseException and skips the failure bookkeeping.
+            if trial:
+                self.breaker.abandon_trial()
+            raise
+
+    def stream_chat_completion(
+        self, call_site: str, deadline: Optional[float] = None, **create_kwargs
+    ) -> Iterator[str]:
+        """
+        Streamed ``chat_completion`` yielding content deltas.
+
+        Only opening the stream is retried; once tokens have been handed to
+        the caller a failure propagates. The in-flight slot and the upstream
+        response are held until the stream is exhausted or the generator is
+        closed.
+        """
+        trial = self._admit(call_site)
+        try:
+            end = time.monotonic() + (deadline or self.deadline_seconds)
+            if not self.limit.acquire(max(0.0, end - time.monotonic())):
+                self._count("rejected")
+                raise LlmUnavailableError(f"No LLM slot free before the {call_site} deadline")
+            self._count("calls")
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        stream = self._client().chat.completions.create(
+                            stream=True,
+                            stream_options={"include_usage": True},
+                            timeout=max(0.1, end - time.monotonic()),
+                            **create_kwargs,
+                        )
+                        break
+                    except Exception as error:
+                        wait = self._next_wait(call_site, attempt, error, end)
+                        if wait is None:
+                            raise
+                        time.sleep(wait)
+                        attempt += 1
+                self.breaker.record_success()
+                trial = False
+                try:
+                    for chunk in stream:
+                        if getattr(chunk, "usage", None) is not None:
+                            record_llm_usage(call_site, chunk)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    # Ends the upstream response when the consumer stops early,
+                    # so the model stops generating and the connection is freed.
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+            finally:
+                self.limit.release()
+        except BaseException:
+            # Covers GeneratorExit and interrupts, which skip the failure bookkeeping.
+            if trial:
+                self.breaker.abandon_trial()
+            raise
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(
+            in_flight=self.limit.in_flight,
+            max_in_flight=self.limit.max_in_flight,
+            breaker=self.breaker.state,
+            breaker_opened=self.breaker.times_opened,
+        )
+        return stats
+
+
+_gateway_lock = threading.Lock()
+_gateway: Optional[LlmGateway] = None
+
+
+def _build_gateway() -> LlmGateway:
+    # A missing key is left to the SDK, which reads OPENAI_API_KEY when the
+    # client is first built (after load_dotenv has run).
+    return LlmGateway(
+        api_key=os.getenv("OPENAI_API_KEY") or None,
+        base_url=os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL),
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "16")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        deadline_seconds=float(os.getenv("LLM_DEADLINE_SECONDS", "60")),
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "32")),
+        keepalive_seconds=float(os.getenv("LLM_KEEPALIVE_SECONDS", "60")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30")),
+        ),
+    )
+
+
+def get_llm_gateway() -> LlmGateway:
+    """Process-wide gateway, built on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = _build_gateway()
+    return _gateway
+
+
+def llm_gateway_stats() -> dict:
+    return get_llm_gateway().stats()
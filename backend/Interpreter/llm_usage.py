@@ -0,0 +1,67 @@
+"""
+Token usage per LLM call site, including provider prompt-cache hits.
+
+Every prompt in the backend is laid out static-instructions-first so the
+provider can serve the shared prefix from its prompt cache. The
+``cached_tokens`` counters here show how much of each call site's prompt
+actually came from that cache.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+def response_usage(response: Any) -> Optional[Dict[str, int]]:
+    """prompt / cached / completion token counts from a chat completion, or None."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+    }
+
+
+class LlmUsageStats:
+    """Running token counters keyed by call site ("nl_sql", "dashboard", ...)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_site: str, response: Any) -> Optional[Dict[str, int]]:
+        usage = response_usage(response)
+        if usage is None:
+            return None
+        with self._lock:
+            site = self._sites.setdefault(
+                call_site, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+            )
+            site["calls"] += 1
+            for key, value in usage.items():
+                site[key] += value
+        return usage
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for call_site, site in self._sites.items():
+                prompt = site["prompt_tokens"]
+                out[call_site] = {
+                    **site,
+                    "cached_ratio": round(site["cached_tokens"] / prompt, 4) if prompt else 0.0,
+                }
+            return out
+
+
+_usage_stats = LlmUsageStats()
+
+
+def record_llm_usage(call_site: str, response: Any) -> Optional[Dict[str, int]]:
+    return _usage_stats.record(call_site, response)
+
+
+def llm_usage_stats() -> Dict[str, Dict[str, Any]]:
+    return _usage_stats.snapshot()
@@ -0,0 +1,364 @@
+"""
+Question features extracted once per question text.
+
+The interpreter safeguards, the analyzer and the dashboard router all ask the
+same questions of the user's text (which season, which ordinal season, is it
+a playoff / advanced-metrics / over-time request, how many rows, which
+names). ``question_features`` runs every extractor once and returns an
+immutable ``QuestionFeatures``; repeat calls with the same text (every
+rewriter, every repair iteration, every module in the request) hit an LRU
+instead of lowercasing and regex-scanning the text again.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+ORDINAL_WORDS = {
+    "first": 1,
+    "second": 2,
+    "third": 3,
+    "fourth": 4,
+    "fifth": 5,
+    "sixth": 6,
+    "seventh": 7,
+    "eighth": 8,
+    "ninth": 9,
+    "tenth": 10,
+    "eleventh": 11,
+    "twelfth": 12,
+    "thirteenth": 13,
+    "fourteenth": 14,
+    "fifteenth": 15,
+}
+
+SeasonWindow = Tuple[int, int, bool]
+
+
+@dataclass(frozen=True)
+class QuestionFeatures:
+    text: str
+    lowered: str
+    years: Tuple[int, ...]
+    is_playoffs: bool
+    bare_year: Optional[Tuple[int, bool]]
+    season_window: SeasonWindow
+    season_start_span: Optional[SeasonWindow]
+    nth_season: Optional[int]
+    top_n: Optional[int]
+    names: Tuple[str, ...]
+    is_advanced_metrics: bool
+    is_point_differential: bool
+    is_single_player_profile: bool
+    is_over_time: bool
+
+
+def current_question_text(user_input: str) -> str:
+    raw = (user_input or "").strip()
+    if not raw:
+        return ""
+    # If the backend wrapped chat history, use only the explicit current-question segment
+    # for intent/routing safeguards.
+    match = re.search(r"(?is)\bcurrent question\s*:\s*(.+)$", raw)
+    if match:
+        return match.group(1).strip()
+    return raw
+
+
+def _bare_year(q: str, is_playoffs: bool) -> Optional[Tuple[int, bool]]:
+    # If explicit season range is provided (e.g., 2024-25), do not override.
+    if re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2}|19\d{2}|20\d{2})\b", q):
+        return None
+
+    year_match = re.search(r"\b(19\d{2}|20\d{2})\b", q)
+    if not year_match:
+        return None
+    return int(year_match.group(1)), is_playoffs
+
+
+def _nth_season(q: str) -> Optional[int]:
+    digit_match = re.search(r"\b(\d{1,2})(st|nd|rd|th)\s+(season|year)\b", q)
+    if digit_match:
+        n = int(digit_match.group(1))
+        if n > 0:
+            return n
+
+    for word, n in ORDINAL_WORDS.items():
+        if re.search(rf"\b{word}\s+(season|year)\b", q):
+            return n
+    return None
+
+
+def _season_window(q: str, is_playoffs: bool, bare: Optional[Tuple[int, bool]]) -> SeasonWindow:
+    range_match = re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2}|19\d{2}|20\d{2})\b", q)
+    if range_match:
+        start = int(range_match.group(1))
+        end_raw = range_match.group(2)
+        end = int(f"{str(start)[:2]}{end_raw}") if len(end_raw) == 2 else int(end_raw)
+        return start, end, is_playoffs
+
+    if bare is not None:
+        year, playoffs_flag = bare
+        if playoffs_flag:
+            return year - 1, year, True
+        return year, year + 1, False
+
+    if "this season" in q or "current season" in q or "last season" in q:
+        return 2024, 2025, False
+    if "this playoff" in q or "current playoff" in q or "last playoff" in q:
+        return 2024, 2025, True
+
+    return 2024, 2025, is_playoffs
+
+
+def _season_start_span(
+    q: str, is_playoffs: bool, bare: Optional[Tuple[int, bool]], window: SeasonWindow
+) -> Optional[SeasonWindow]:
+    explicit_range = re.search(
+        r"\b(19\d{2}|20\d{2})(?:\s+season)?\s*(?:to|through|thru|-)\s*(19\d{2}|20\d{2})(?:\s+season)?\b",
+        q,
+    )
+    if explicit_range:
+        start = int(explicit_range.group(1))
+        end = int(explicit_range.group(2))
+        if start > end:
+            start, end = end, start
+        return start, end, is_playoffs
+
+    prefixed_range = re.search(r"\bfrom\b\s*(19\d{2}|20\d{2})\b.+?\bto\b\s*(19\d{2}|20\d{2})\b", q)
+    if prefixed_range:
+        start = int(prefixed_range.group(1))
+        end = int(prefixed_range.group(2))
+        if start > end:
+            start, end = end, start
+        return start, end, is_playoffs
+
+    decade_match = re.search(r"\b(19\d{2}|20\d{2})s\b", q)
+    if decade_match:
+        start = int(decade_match.group(1))
+        return start, start + 9, is_playoffs
+
+    season_label_match = re.search(r"\b(19\d{2}|20\d{2})\s*[-/]\s*(\d{2})\b", q)
+    if season_label_match:
+        start = int(season_label_match.group(1))
+        return start, start, is_playoffs
+
+    if bare is not None:
+        year, playoffs_flag = bare
+        if playoffs_flag:
+            return year - 1, year - 1, True
+        return year, year, False
+
+    if any(k in q for k in ["this season", "current season", "last season", "this playoff", "current playoff", "last playoff"]):
+        start, _, playoffs_flag = window
+        return start, start, playoffs_flag
+
+    return None
+
+
+def _top_n(q: str) -> Optional[int]:
+    match = re.search(r"\b(top|best|leading|worst|bottom|lowest)\s+(\d{1,3})\b", q)
+    return int(match.group(2)) if match else None
+
+
+def _is_advanced_metrics(q: str) -> bool:
+    advanced_terms = [
+        "true shooting",
+        "ts%",
+        "ts pct",
+        "ts_pct",
+        "efg",
+        "efg%",
+        "usage rate",
+        "usg",
+        "off rating",
+        "def rating",
+        "net rating",
+        "pie",
+        "advanced stat",
+        "advanced metric",
+    ]
+    return any(term in q for term in advanced_terms)
+
+
+def _is_point_differential(q: str) -> bool:
+    return any(
+        term in q
+        for term in [
+            "point differential",
+            "point diff",
+            "points differential",
+            "points diff",
+            "scoring differential",
+            "score differential",
+            "diffpointspg",
+            "diff points",
+        ]
+    )
+
+
+def _is_single_player_profile(q: str) -> bool:
+    has_profile_intent = any(
+        k in q for k in ["what were", " stats", "stat ", "show", "profile", "season stats"]
+    )
+    has_exclusions = any(
+        k in q
+        for k in [
+            "top ", "best ", "highest", "most ", "leading ",
+            "compare", "versus", " vs ", "between",
+            "leaderboard", "by season", "per season",
+            "trend", "over time", "over the years", "through the years",
+            "decade", "rookie year", "from ", " to ", "career",
+            "better", "worse", "as well as", " or ",
+            "who was", "who is", "who's", "of the two",
+            "follow-up constraint",   # set by main.py when continuing a comparison
+        ]
+    )
+    return has_profile_intent and not has_exclusions
+
+
+def _is_over_time(q: str) -> bool:
+    phrases = [
+        "by season",
+        "per season",
+        "each season",
+        "season by season",
+        "over the years",
+        "through the years",
+        "across seasons",
+        "year by year",
+        "trend",
+        "over time",
+        "over his career",
+        "over her career",
+        "over their career",
+        "throughout his career",
+        "throughout her career",
+        "throughout their career",
+    ]
+    if any(p in q for p in phrases):
+        return True
+    # Handle slight misspellings like "careeer" and flexible "over ... career" phrasing.
+    if re.search(r"\bover\b.*\bcaree+r\b", q):
+        return True
+    if re.search(r"\bthroughout\b.*\bcaree+r\b", q):
+        return True
+    if re.search(r"\b(per\s+game|per-game)\b.*\bcaree+r\b", q) or re.search(r"\bcaree+r\b.*\b(per\s+game|per-game)\b", q):
+        return True
+    if "rookie year" in q:
+        return True
+    if re.search(r"\bfrom\b.+\bto\b\s*(19\d{2}|20\d{2})\b", q):
+        return True
+    if re.search(r"\b(19\d{2}|20\d{2})s\b", q) or "decade" in q:
+        return True
+    if re.search(r"\b(highest|best|most|peak)\b.+\bseason\b", q):
+        return True
+    return re.search(r"\b(19\d{2}|20\d{2})\s*(to|through|thru|-)\s*(19\d{2}|20\d{2})\b", q) is not None
+
+
+_NAME_BLACKLIST = {
+    "Top", "Show", "Compare", "Vs", "Versus", "Skill", "Profile", "Points",
+    "Assists", "Rebounds", "Playoffs", "Regular", "Season", "Last", "Games",
+    "Trend", "Leaderboard", "Heat", "Shot", "Chart", "Map", "Best", "Worst",
+    "Shooting", "Zones", "Selection",
+    # Common verbs / question-words at sentence start.
+    "Tell", "Give", "Make", "Create", "Build", "Find",
+    "When", "Where", "Why", "How", "What", "Who",
+    # Acronyms / stat tokens that look like names but aren't
+    "PPG", "RPG", "APG", "SPG", "BPG", "MPG",
+    "FG", "FGM", "FGA", "FT", "FTM", "FTA",
+    "TS", "EFG", "USG", "PER", "PIE", "VORP", "BPM",
+    "PTS", "REB", "AST", "STL", "BLK", "TOV",
+    "NBA", "MVP", "DPOY", "ROY",
+    # Months (so "March 2024" doesn't become a "name")
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+    # NBA team mascots — so "vs the Celtics" doesn't extract "Celtics" as a player.
+    "Hawks", "Celtics", "Nets", "Hornets", "Bulls", "Cavaliers", "Cavs",
+    "Mavericks", "Mavs", "Nuggets", "Pistons", "Warriors", "Rockets",
+    "Pacers", "Clippers", "Lakers", "Grizzlies", "Heat", "Bucks",
+    "Timberwolves", "Wolves", "Pelicans", "Knicks", "Thunder",
+    "Magic", "Sixers", "Suns", "Blazers", "Trail", "Kings",
+    "Spurs", "Raptors", "Jazz", "Wizards",
+    # Other noise tokens
+    "Plot", "Graph", "Distribution", "Scatter",
+}
+
+
+def extract_name_candidates(q: str) -> List[str]:
+    """Capitalized player-name candidates, in order, without duplicates."""
+    # Strip possessives so "LeBron's" doesn't truncate the next word.
+    cleaned_q = re.sub(r"['’]s\b", "", q)
+    # Strip leading verb phrases like "Compare", "Show me", "Plot", "Tell me"
+    # at the START of the question so they don't get glued to a real player name
+    # (e.g. "Compare LeBron and KD" must extract "LeBron" not "Compare LeBron").
+    # We do this only at sentence start to avoid mangling mid-sentence content.
+    cleaned_q = re.sub(
+        r"^\s*(?:please\s+)?"
+        r"(?:can\s+you\s+|could\s+you\s+|would\s+you\s+)?"
+        r"(?:please\s+)?"
+        r"(?:show\s+me|show|tell\s+me|tell|give\s+me|give|"
+        r"compare|plot|graph|chart|display|find|fetch|get|pull\s+up|pull|"
+        r"how\s+(?:has|did|does|do)|how\s+many|how\s+much|"
+        r"who(?:'s|\s+is|\s+was|\s+are|\s+were|\s+had)?|"
+        r"what(?:'s|\s+is|\s+are|\s+were|\s+was)?|"
+        r"where\s+(?:is|are|was|were|does|do|did)?|"
+        r"when\s+(?:is|are|was|were|does|do|did)?|"
+        r"which|let\s+me\s+see|i\s+want\s+to\s+see)\b",
+        "",
+        cleaned_q,
+        flags=re.IGNORECASE,
+    )
+    # Allow internal capitals (LeBron, McGrady, DeRozan, O'Neal etc.).
+    name_token = r"[A-Z][A-Za-z][A-Za-z\-']*"
+    candidates = re.findall(rf"\b{name_token}(?:\s+{name_token}){{0,2}}\b", cleaned_q)
+    out = []
+    seen = set()
+    for c in candidates:
+        # Single-word candidates that exactly match a blacklist word are noise.
+        if " " not in c and c in _NAME_BLACKLIST:
+            continue
+        if c in seen:
+            continue
+        seen.add(c)
+        out.append(c)
+    return out
+
+
+@lru_cache(maxsize=int(os.getenv("QUESTION_FEATURES_CACHE_SIZE", "512")))
+def question_features(user_input: str) -> QuestionFeatures:
+    text = current_question_text(user_input)
+    q = text.lower()
+    is_playoffs = ("playoff" in q) or ("postseason" in q)
+    bare = _bare_year(q, is_playoffs)
+    window = _season_window(q, is_playoffs, bare)
+    return QuestionFeatures(
+        text=text,
+        lowered=q,
+        years=tuple(int(y) for y in re.findall(r"\b(19\d{2}|20\d{2})\b", q)),
+        is_playoffs=is_playoffs,
+        bare_year=bare,
+        season_window=window,
+        season_start_span=_season_start_span(q, is_playoffs, bare, window),
+        nth_season=_nth_season(q),
+        top_n=_top_n(q),
+        names=tuple(extract_name_candidates(text)),
+        is_advanced_metrics=_is_advanced_metrics(q),
+        is_point_differential=_is_point_differential(q),
+        is_single_player_profile=_is_single_player_profile(q),
+        is_over_time=_is_over_time(q),
+    )
+
+
+def question_features_stats() -> dict:
+    info = question_features.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
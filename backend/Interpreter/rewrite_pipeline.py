@@ -0,0 +1,152 @@
+"""
+Pass manager for the SQL safeguards applied to model output.
+
+Each rewriter in interpreter.py is registered once as a named pass with an
+optional gate on the question. Gates are evaluated once per request and
+memoized on the RewriteContext, so the repair loop re-runs the chain without
+re-scanning the question, and passes whose gate is false are never called.
+
+Passes are either string rewriters or tree transforms over a sqlglot AST.
+Tree passes share one parse per statement: the pipeline parses lazily when
+the first tree pass needs it, hands the same tree to every following tree
+pass, and serializes only when a string pass (or the caller) needs text.
+Serialized trees are remembered on the context, so validation of the final
+statement reuses the tree instead of parsing it again.
+
+Every pass run is timed; the totals are exposed in /api/debug/metrics.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import sqlglot
+from sqlglot import exp
+
+
+@dataclass
+class RewriteContext:
+    """Per-request inputs shared by every pass."""
+
+    question: str
+    conn: Any = None
+    catalog: Any = None
+    _gates: Dict[str, bool] = field(default_factory=dict, repr=False)
+    _trees: Dict[str, Optional[exp.Expression]] = field(default_factory=dict, repr=False)
+
+    def gate(self, name: str, check: Callable[["RewriteContext"], bool]) -> bool:
+        if name not in self._gates:
+            self._gates[name] = bool(check(self))
+        return self._gates[name]
+
+    def parse(self, sql: str) -> Optional[exp.Expression]:
+        """Postgres AST for ``sql``, parsed at most once per request; None when unparseable."""
+        if sql not in self._trees:
+            try:
+                self._trees[sql] = sqlglot.parse_one(sql, read="postgres")
+            except sqlglot.errors.SqlglotError:
+                self._trees[sql] = None
+        return self._trees[sql]
+
+    def parsed(self, sql: str) -> Optional[exp.Expression]:
+        """The tree already known for ``sql`` (parsed or serialized this request), without parsing."""
+        return self._trees.get(sql)
+
+    def remember(self, sql: str, tree: exp.Expression) -> None:
+        self._trees[sql] = tree
+
+
+# A tree pass returns a new tree when it rewrites, or None to leave the
+# statement unchanged. Trees are shared, so passes must not mutate their input
+# in place (Expression.transform and .copy() return new trees).
+TreeRewrite = Callable[[exp.Expression, RewriteContext], Optional[exp.Expression]]
+StringRewrite = Callable[[str, RewriteContext], str]
+
+
+@dataclass(frozen=True)
+class RewritePass:
+    name: str
+    run: Union[StringRewrite, TreeRewrite]
+    applies: Optional[Callable[[RewriteContext], bool]] = None
+    tree: bool = False
+
+
+def to_sql(tree: exp.Expression) -> str:
+    return tree.sql(dialect="postgres")
+
+
+class RewriteStats:
+    """Per-pass run / skip / change counts and wall time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._passes: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        return self._passes.setdefault(
+            name, {"runs": 0, "skipped": 0, "changed": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+
+    def record(self, name: str, elapsed_ms: float, changed: bool) -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry["runs"] += 1
+            entry["changed"] += int(changed)
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    def skip(self, name: str) -> None:
+        with self._lock:
+            self._entry(name)["skipped"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            out = {}
+            for name, entry in self._passes.items():
+                runs = entry["runs"]
+                out[name] = {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 3),
+                    "max_ms": round(entry["max_ms"], 3),
+                    "avg_ms": round(entry["total_ms"] / runs, 3) if runs else 0.0,
+                }
+            return out
+
+
+class RewritePipeline:
+    def __init__(self, passes: Iterable[RewritePass], stats: Optional[RewriteStats] = None):
+        self.passes: Tuple[RewritePass, ...] = tuple(passes)
+        self.stats = stats or RewriteStats()
+
+    def __add__(self, other: "RewritePipeline") -> "RewritePipeline":
+        return RewritePipeline(self.passes + other.passes, self.stats)
+
+    def run(self, sql: str, ctx: RewriteContext) -> str:
+        # ``tree`` is set while the statement's current form is an AST that has
+        # not been serialized yet; ``sql`` is stale until then.
+        tree: Optional[exp.Expression] = None
+        for rewrite in self.passes:
+            if rewrite.applies is not None and not ctx.gate(rewrite.name, rewrite.applies):
+                self.stats.skip(rewrite.name)
+                continue
+            started = time.perf_counter()
+            if rewrite.tree:
+                current = tree if tree is not None else ctx.parse(sql)
+                rewritten_tree = rewrite.run(current, ctx) if current is not None else None
+                changed = rewritten_tree is not None
+                if changed:
+                    tree = rewritten_tree
+            else:
+                if tree is not None:
+                    sql = to_sql(tree)
+                    ctx.remember(sql, tree)
+                    tree = None
+                rewritten = rewrite.run(sql, ctx)
+                changed = rewritten != sql
+                sql = rewritten
+            self.stats.record(rewrite.name, (time.perf_counter() - started) * 1000.0, changed)
+        if tree is not None:
+            sql = to_sql(tree)
+            ctx.remember(sql, tree)
+        return sql
@@ -0,0 +1,60 @@
+"""
+Single-flight coalescing for the request pipelines.
+
+When a question trends, many users submit the same text within seconds.
+Concurrent callers with the same key (the effective question plus the
+current-season data version) share one in-progress computation instead of
+each running SQL generation, the query and the analyzer LLM call again.
+
+Only in-flight work is shared; nothing is kept after the computation
+finishes. Results are shared objects, so callers must copy before mutating.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def question_flight_key(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question for flight keys."""
+    return " ".join((question or "").split()).casefold()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent ``run(key, factory)`` calls on one event loop.
+
+    The first caller's coroutine runs as its own task, so a leader whose
+    client disconnects does not cancel the result its followers are
+    waiting on. Exceptions propagate to every waiter.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _t, key=key: self._forget(key, _t))
+            self._count("leaders")
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged as lost
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {**self._stats, "in_flight": len(self._tasks)}
@@ -0,0 +1,271 @@
+"""
+NL→SQL cache in front of the SQL-generation model.
+
+Questions are normalized (case, accents, punctuation, whitespace, player
+aliases) and mapped to the final post-rewrite SQL that produced a result.
+Entries whose SQL reads current-season data are tagged with the
+current-season data version and dropped when it changes; closed-season SQL
+only expires by TTL. An optional on-disk tier (NL_SQL_CACHE_PATH, SQLite)
+survives restarts and is shared by every worker process.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Callable, Mapping, Optional, Sequence, Tuple
+
+from Executer.player_index import fold_name
+from Executer.result_cache import FOREVER, table_refs, ttl_for_tables
+
+logger = logging.getLogger(__name__)
+
+# Changes whenever a live table (game logs, current-season families) is
+# written or re-analyzed. Counters reset with the stats collector, which only
+# costs a round of cache misses.
+CURRENT_SEASON_VERSION_SQL = """
+    SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)::text || ':' ||
+           COALESCE(MAX(GREATEST(last_analyze, last_autoanalyze))::text, '')
+    FROM pg_stat_user_tables
+    WHERE schemaname = 'public'
+      AND (relname = 'player_game_logs' OR relname LIKE %s OR relname LIKE %s);
+"""
+
+_CACHE_FORMAT_VERSION = "1"
+_MIN_FOLDED_ALIAS_LENGTH = 4
+
+
+def normalize_question(text: str, aliases: Optional[Mapping[str, Sequence[str]]] = None) -> str:
+    """
+    Fold a question to its cache form: lowercase, accents and punctuation
+    stripped, whitespace collapsed, known aliases replaced by the player's name
+    ("steph 3pt% 2016?" → "stephen curry 3pt 2016").
+    """
+    folded = fold_name(text)
+    if not aliases or not folded:
+        return folded
+    canonical = {}
+    for alias, targets in aliases.items():
+        alias_folded = fold_name(alias)
+        # Two-letter aliases (kd, pg, ad) double as ordinary words; folding
+        # them could give two different questions the same SQL.
+        if targets and len(alias_folded) >= _MIN_FOLDED_ALIAS_LENGTH:
+            canonical[alias_folded] = fold_name(targets[0])
+    if not canonical:
+        return folded
+    # One pass, longest alias first; an alias already followed by the
+    # player's surname ("lebron james") folds to the same form as "lebron".
+    ordered = sorted(canonical.items(), key=lambda item: -len(item[0]))
+    pattern = "|".join(
+        rf"(\b{re.escape(alias)}\b(?:\s+{re.escape(target.split()[-1])}\b)?)" for alias, target in ordered
+    )
+    return re.sub(pattern, lambda m: ordered[m.lastindex - 1][1], folded)
+
+
+def question_key(normalized_question: str, schema_fingerprint: str) -> str:
+    """Cache key; the schema fingerprint keeps entries from outliving a schema change."""
+    raw = f"{_CACHE_FORMAT_VERSION}\x1f{schema_fingerprint}\x1f{normalized_question}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def reads_live_data(sql_query: str) -> bool:
+    """True when the SQL touches tables that change during the season."""
+    return ttl_for_tables(table_refs(sql_query)) is not FOREVER
+
+
+class SqlCache:
+    """
+    Bounded LRU of question key → SQL with an optional SQLite tier.
+
+    ``get`` serves memory first, then disk (promoting the hit). Live entries
+    carry the data version they were generated under and miss once it moves.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 86400.0,
+        disk_path: Optional[str] = None,
+        disk_table: str = "nl_sql_cache",
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.disk_table = disk_table
+        self._lock = threading.Lock()
+        # key -> (sql, data_version or None, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str], float]]" = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "stale": 0, "evictions": 0}
+        if disk_path:
+            self._init_disk()
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.disk_path, timeout=5.0)
+
+    def _init_disk(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.disk_path)), exist_ok=True)
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.disk_table} ("
+                    "key TEXT PRIMARY KEY, sql TEXT NOT NULL, data_version TEXT, expires_at REAL NOT NULL)"
+                )
+        except sqlite3.Error as e:
+            logger.warning("NL→SQL disk cache unavailable at %s: %s", self.disk_path, e)
+            self.disk_path = None
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, Optional[str], float]]:
+        if not self.disk_path:
+            return None
+        try:
+            with closing(self._connect()) as db, db:
+                row = db.execute(
+                    f"SELECT sql, data_version, expires_at FROM {self.disk_table} WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("NL→SQL disk cache read failed: %s", e)
+            return None
+        return (row[0], row[1], float(row[2])) if row else None
+
+    def _disk_put(self, key: str, entry: Tuple[str, Optional[str], float]) -> None:
+        if not self.disk_path:
+            return
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self.disk_table} (key, sql, data_version, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, *entry),
+                )
+        except sqlite3.Error as e:
+            logger.debug("NL→SQL disk cache write failed: %s", e)
+
+    def _disk_delete(self, key: Optional[str] = None) -> None:
+        if not self.disk_path:
+            return
+        try:
+            with closing(self._connect()) as db, db:
+                if key is None:
+                    db.execute(f"DELETE FROM {self.disk_table}")
+                else:
+                    db.execute(f"DELETE FROM {self.disk_table} WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.debug("NL→SQL disk cache delete failed: %s", e)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def _usable(self, entry: Tuple[str, Optional[str], float], data_version: Optional[str], now: float) -> bool:
+        _, entry_version, expires_at = entry
+        if expires_at <= now:
+            return False
+        return entry_version is None or entry_version == data_version
+
+    def get(self, key: str, data_version: Optional[str]) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._usable(entry, data_version, now):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+                self._stats["stale"] += 1
+
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is not None and self._usable(entry, data_version, now):
+                self._store_locked(key, entry)
+                self._stats["disk_hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+        if entry is not None:
+            self._disk_delete(key)
+        return None
+
+    def _store_locked(self, key: str, entry: Tuple[str, Optional[str], float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def put(self, key: str, sql_query: str, data_version: Optional[str], live: Optional[bool] = None) -> None:
+        """
+        Store ``sql_query``. The version tag is only kept when the SQL reads
+        live tables; pass ``live`` to override that check.
+        """
+        live = reads_live_data(sql_query) if live is None else live
+        if live and data_version is None:
+            # No version to pin it to, so it could never be invalidated.
+            return
+        entry = (sql_query, data_version if live else None, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._store_locked(key, entry)
+            self._stats["stores"] += 1
+        self._disk_put(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        self._disk_delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._disk_delete()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "disk": bool(self.disk_path),
+                "hit_rate": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class DataVersionProbe:
+    """Current-season data version, re-read from Postgres at most every ``check_seconds``."""
+
+    def __init__(self, check_seconds: float = 60.0):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._checked_at: Optional[float] = None
+
+    def current(self, read_version: Callable[[], str]) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+                return self._version
+        try:
+            version = read_version()
+        except Exception as e:
+            logger.warning("Could not read current-season data version: %s", e)
+            # Unknown version: live entries must miss rather than serve stale SQL.
+            return None
+        with self._lock:
+            self._version = version
+            self._checked_at = now
+        return version
+
+
+def read_current_season_data_version(conn, season_start: int) -> str:
+    short = f"%\\_{season_start}\\_{str(season_start + 1)[-2:]}%"
+    full = f"all\\_players\\_%\\_{season_start}\\_{season_start + 1}"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CURRENT_SEASON_VERSION_SQL, (short, full))
+        return str(cursor.fetchone()[0])
+    finally:
+        cursor.close()
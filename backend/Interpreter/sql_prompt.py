@@ -0,0 +1,1215 @@
+"""
+Intent-scoped assembly of the NL→SQL prompt.
+
+The SQL prompt is split into sections (table types, routing rules, query
+construction rules, worked examples) tagged with the question scopes they
+serve. A "top scorers" question only needs the player-table sections; a
+hustle or standings question also pulls in the extended-family routing, the
+text-storage casting rules and that family's examples. Core sections are always
+sent, so a question whose intent is not detected gets the same player-table
+prompt the model has always seen for it.
+
+Core sections come first and are byte-identical on every call, so the
+provider's prompt cache can serve them; scoped sections, the schema and
+the question follow. Schema text is scoped the same way through
+``schema_sections_for``, and every assembled prompt is measured so the cut
+shows up in ``prompt_token_stats()``.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional
+
+CORE = frozenset()
+# Scopes routed to the extended (non all_players_*) table families.
+EXTENDED = frozenset({"team", "shots", "lineups", "specialty", "advanced", "schedule"})
+# Families whose numbers are stored as TEXT and whose tables are already per-game.
+TEXT_STORAGE = frozenset({"team", "lineups", "specialty", "advanced"})
+ALL_SCOPES = EXTENDED | {"playoffs", "recent", "career", "compare", "matchup", "fantasy"}
+
+_SCOPE_PATTERNS = (
+    ("playoffs", r"\b(playoffs?|postseason)\b"),
+    ("recent", r"\b(last|past|recent|recently|lately|hot streak|streak|cold|game logs?|games?|tonight|yesterday)\b"),
+    (
+        "career",
+        r"\b(career|trend|by season|per season|each season|every season|over the years|over time|all[- ]time|"
+        r"since|from (?:19|20)\d{2}|rookie|first|second|third|\d+(?:st|nd|rd|th) season)\b",
+    ),
+    ("compare", r"\b(compare|comparison|vs\.?|versus|better|best between|head[- ]to[- ]head)\b"),
+    ("matchup", r"\b(vs\.?|versus|against|when playing)\b"),
+    ("fantasy", r"\bfantasy\b"),
+    (
+        "team",
+        r"\b(teams?|franchises?|standings?|seeds?|seeding|conference|division|records?|win ?rate|winrate|"
+        r"offen[cs]e|defen[cs]e|defensive|offensive|pace|point differential|net rating|"
+        r"hawks|celtics|nets|hornets|bulls|cavaliers|cavs|mavericks|mavs|nuggets|pistons|warriors|rockets|"
+        r"pacers|clippers|lakers|grizzlies|heat|bucks|timberwolves|wolves|pelicans|knicks|thunder|magic|"
+        r"76ers|sixers|suns|blazers|kings|spurs|raptors|jazz|wizards)\b",
+    ),
+    ("shots", r"\b(shot charts?|shot distance|shot zones?|shots?|dunks?|layups?|step[- ]?backs?|shoot from)\b"),
+    ("lineups", r"\b(lineups?|5[- ]man|five[- ]man|units?)\b"),
+    (
+        "specialty",
+        r"\b(clutch|close games|last 5 minutes|hustle|deflections?|box ?outs?|charges|contested|screen assists?|"
+        r"tracking|drives?|touches|post[- ]?ups?|paint|catch and shoot|pull[- ]?ups?|possessions?|"
+        r"seconds per touch|speed|distance|miles|passing|passes|rim|rebound chances|defense|defensive)\b",
+    ),
+    (
+        "advanced",
+        r"\b(advanced|true shooting|ts%?|efg%?|usage|usg%?|net rating|off(?:ensive)? rating|def(?:ensive)? rating|"
+        r"pie|per|win shares|impact|assist percentage|rebound percentage|ratings?|efficiency)\b",
+    ),
+    ("schedule", r"\b(schedule|upcoming|next game)\b"),
+)
+_SCOPE_RES = tuple((scope, re.compile(pattern)) for scope, pattern in _SCOPE_PATTERNS)
+
+# Schema-description sections (see Executer.executor.describe_schema) each scope needs.
+_SCHEMA_SECTIONS = {
+    None: ("all_players", "player_game_logs"),
+    "team": ("team_advanced", "nba_standings"),
+    "shots": ("court_shots",),
+    "advanced": ("nba_advanced",),
+    "specialty": ("families",),
+    "lineups": ("families",),
+    "schedule": ("families",),
+}
+
+
+def question_scopes(question: str) -> FrozenSet[str]:
+    """Scopes whose rules and examples the question may need (empty = player tables only)."""
+    q = " ".join((question or "").lower().split())
+    scopes = {scope for scope, pattern in _SCOPE_RES if pattern.search(q)}
+    if "compare" in scopes:
+        # A head-to-head with no season wording is answered as a career comparison (RULE 6).
+        scopes.add("career")
+    return frozenset(scopes)
+
+
+def schema_sections_for(scopes: Iterable[str]) -> FrozenSet[str]:
+    sections = set(_SCHEMA_SECTIONS[None])
+    for scope in scopes:
+        sections.update(_SCHEMA_SECTIONS.get(scope, ()))
+    return frozenset(sections)
+
+
+def build_sql_prompt(user_input: str, schema_description: str, scopes: Optional[Iterable[str]] = None) -> str:
+    """
+    The SQL-generation prompt for ``user_input``. ``scopes=None`` sends every
+    section (the full prompt).
+
+    Layout is static-first so the provider's prompt cache can reuse the
+    prefix: the core sections (byte-identical on every call), then the
+    scoped sections, then the schema, and the question last.
+    """
+    active = ALL_SCOPES if scopes is None else frozenset(scopes)
+    core = "\n".join(text for _, section_scopes, text in _SECTIONS if not section_scopes)
+    scoped = [text for _, section_scopes, text in _SECTIONS if section_scopes and section_scopes & active]
+    parts = [core]
+    if scoped:
+        parts.append(_SCOPED_HEADER)
+        parts.extend(scoped)
+    body = "\n".join(parts)
+    return f"""
+{body}
+DATABASE SCHEMA:
+{schema_description}
+
+USER REQUEST:
+{user_input}
+
+Generate the SQL:"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for prompts not yet sent."""
+    return math.ceil(len(text or "") / 4)
+
+
+class PromptTokenStats:
+    """Running prompt-size counters for the SQL-generation call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "scoped_requests": 0,
+            "estimated_prompt_tokens": 0,
+            "estimated_full_prompt_tokens": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "reported_requests": 0,
+        }
+        self._last: dict = {}
+
+    def record(
+        self,
+        scopes: Optional[FrozenSet[str]],
+        estimated: int,
+        estimated_full: int,
+        usage: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """``usage`` is the provider-reported prompt / cached / completion token counts."""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["scoped_requests"] += scopes is not None
+            self._stats["estimated_prompt_tokens"] += estimated
+            self._stats["estimated_full_prompt_tokens"] += estimated_full
+            if usage is not None:
+                self._stats["reported_requests"] += 1
+                for key in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+                    self._stats[key] += usage.get(key, 0)
+            self._last = {
+                "scopes": sorted(scopes) if scopes is not None else "all",
+                "estimated_prompt_tokens": estimated,
+                "estimated_full_prompt_tokens": estimated_full,
+                **(usage or {}),
+            }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            requests = stats["requests"]
+            reported = stats["reported_requests"]
+            full = stats["estimated_full_prompt_tokens"]
+            stats["avg_estimated_prompt_tokens"] = round(stats["estimated_prompt_tokens"] / requests) if requests else 0
+            stats["avg_prompt_tokens"] = round(stats["prompt_tokens"] / reported) if reported else 0
+            stats["cached_ratio"] = (
+                round(stats["cached_tokens"] / stats["prompt_tokens"], 4) if stats["prompt_tokens"] else 0.0
+            )
+            stats["estimated_reduction"] = round(1 - stats["estimated_prompt_tokens"] / full, 4) if full else 0.0
+            stats["last"] = dict(self._last)
+            return stats
+
+
+_SCOPED_HEADER = """════════════════════════════════════════════════════════════════════════
+QUESTION-SPECIFIC RULES AND EXAMPLES
+════════════════════════════════════════════════════════════════════════
+These parts of SECTIONS 1-5 only apply to some questions, so they are listed
+here. Rule numbers keep their meaning and priority (RULE 0 is still checked first).
+"""
+
+# (name, scopes, text). Sections with no scopes are the always-sent core.
+_SECTIONS = (
+    (
+        "role",
+        CORE,
+        """You are a senior SQL data engineer specializing in NBA statistics databases.
+Your ONLY task is to convert a natural language request into a VALID PostgreSQL SELECT query.
+You MUST follow every rule below without exception. There is no ambiguity — if a rule applies, follow it exactly.
+
+GLOBAL OVERRIDE (HIGHEST PRIORITY):
+- Return RAW DATA queries only.
+- SELECT only direct existing columns from source table(s).
+- DO NOT use SUM, AVG, COUNT, MIN, MAX, CAST, NULLIF, COALESCE, window functions, or arithmetic expressions.
+- DO NOT use GROUP BY, HAVING, or ORDER BY.
+- The analyzer layer handles sorting, ranking, and math after query execution.
+""",
+    ),
+    (
+        "table_types_header",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 1: THE TWO TABLE TYPES — UNDERSTAND THEM COMPLETELY
+════════════════════════════════════════════════════════════════════════
+""",
+    ),
+    (
+        "season_summary_tables",
+        CORE,
+        """TYPE A — SEASON SUMMARY TABLES:
+  Naming pattern: `all_players_regular_YYYY_YYYY` and `all_players_playoffs_YYYY_YYYY`
+  What they contain: One row per player per season. Pre-aggregated season stats.
+  IMPORTANT SCHEMA MEANING:
+    - `pts`, `reb`, `ast`, `fg_pct`, `fg3_pct`, `ft_pct` are already season-level values for that player.
+    - `gp` is games played in that season.
+    - `_rank` columns (like `pts_rank`) are precomputed league ranks for that season.
+    - Because each player is already one row in a season table, single-season leaderboards should NOT use SUM()+GROUP BY.
+  Available regular season tables (oldest to newest):
+    all_players_regular_1996_1997, all_players_regular_1997_1998, all_players_regular_1998_1999,
+    all_players_regular_1999_2000, all_players_regular_2000_2001, all_players_regular_2001_2002,
+    all_players_regular_2002_2003, all_players_regular_2003_2004, all_players_regular_2004_2005,
+    all_players_regular_2005_2006, all_players_regular_2006_2007, all_players_regular_2007_2008,
+    all_players_regular_2008_2009, all_players_regular_2009_2010, all_players_regular_2010_2011,
+    all_players_regular_2011_2012, all_players_regular_2012_2013, all_players_regular_2013_2014,
+    all_players_regular_2014_2015, all_players_regular_2015_2016, all_players_regular_2016_2017,
+    all_players_regular_2017_2018, all_players_regular_2018_2019, all_players_regular_2019_2020,
+    all_players_regular_2020_2021, all_players_regular_2021_2022, all_players_regular_2022_2023,
+    all_players_regular_2023_2024, all_players_regular_2024_2025
+  Available playoffs tables (oldest to newest):
+    all_players_playoffs_2007_2008, all_players_playoffs_2008_2009, all_players_playoffs_2009_2010,
+    all_players_playoffs_2010_2011, all_players_playoffs_2011_2012, all_players_playoffs_2012_2013,
+    all_players_playoffs_2013_2014, all_players_playoffs_2014_2015, all_players_playoffs_2015_2016,
+    all_players_playoffs_2016_2017, all_players_playoffs_2017_2018, all_players_playoffs_2018_2019,
+    all_players_playoffs_2019_2020, all_players_playoffs_2020_2021, all_players_playoffs_2021_2022,
+    all_players_playoffs_2022_2023, all_players_playoffs_2023_2024, all_players_playoffs_2024_2025
+
+  COLUMNS THAT EXIST in all_players_regular_* AND all_players_playoffs_*:
+    player_id, player_name, nickname, team_id, team_abbreviation, age, gp, w, l,
+    w_pct, min, fgm, fga, fg_pct, fg3m, fg3a, fg3_pct, ftm, fta, ft_pct,
+    oreb, dreb, reb, ast, tov, stl, blk, blka, pf, pfd, pts, plus_minus,
+    nba_fantasy_pts, dd2, td3, gp_rank, w_rank, l_rank, w_pct_rank, min_rank,
+    fgm_rank, fga_rank, fg_pct_rank, fg3m_rank, fg3a_rank, fg3_pct_rank,
+    ftm_rank, fta_rank, ft_pct_rank, oreb_rank, dreb_rank, reb_rank, ast_rank,
+    tov_rank, stl_rank, blk_rank, blka_rank, pf_rank, pfd_rank, pts_rank,
+    plus_minus_rank, nba_fantasy_pts_rank, dd2_rank, td3_rank, wnba_fantasy_pts,
+    wnba_fantasy_pts_rank, team_count
+
+  COLUMNS THAT DO NOT EXIST in season summary tables — NEVER USE THEM:
+    ❌ season_id       (the season is encoded in the TABLE NAME itself)
+    ❌ game_date       (these are season summaries, not individual games)
+    ❌ game_id         (no individual game tracking)
+    ❌ matchup         (no opponent info)
+    ❌ wl              (w and l are separated into two columns)
+    ❌ season_type     (regular vs playoffs is encoded in the TABLE NAME)
+""",
+    ),
+    (
+        "game_log_table",
+        CORE,
+        """TYPE B — GAME LOGS TABLE:
+  Table name: `player_game_logs` (only ONE table, not split by year)
+  What it contains: One row per player per game. Raw box score per game.
+  IMPORTANT: This table is the MOST UP TO DATE data source, containing game logs
+  through February 2026. It covers the full 2025-26 season currently in progress.
+  Use this table whenever the user wants current, recent, or live-season data.
+
+  COLUMNS THAT EXIST in player_game_logs:
+    player_id, player_name, team_abbreviation, game_id, game_date, season_id,
+    season_type, matchup, wl, pts, ast, reb, stl, blk, tov, fgm, fga,
+    fg3m, fg3a, ftm, fta, min
+
+  COLUMNS THAT DO NOT EXIST in player_game_logs — NEVER USE THEM:
+    ❌ fg_pct          (must be calculated: CAST(SUM(fgm) AS DOUBLE PRECISION) / NULLIF(SUM(fga), 0))
+    ❌ fg3_pct         (must be calculated: CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0))
+    ❌ ft_pct          (must be calculated: CAST(SUM(ftm) AS DOUBLE PRECISION) / NULLIF(SUM(fta), 0))
+    ❌ age             (not tracked per game)
+    ❌ gp              (not a column — count rows instead: COUNT(*) AS games_played)
+    ❌ oreb            (offensive rebounds not tracked separately)
+    ❌ dreb            (defensive rebounds not tracked separately)
+    ❌ nickname        (not in this table)
+    ❌ plus_minus      (not in this table)
+    ❌ dd2, td3        (not in this table)
+    ❌ any _rank columns (none of the rank columns exist here)
+    ❌ team_id         (not in this table)
+    ❌ team_count      (not in this table)
+""",
+    ),
+    (
+        "extended_families",
+        EXTENDED,
+        """TYPE C — EXTENDED NBA DATA FAMILIES (from current_working_data schema):
+  These tables exist and should be used when user intent clearly matches them:
+  - `nba_advanced_...`  (advanced metrics / impact context)
+  - `nba_clutch_...`    (late-game / clutch situations)
+  - `nba_hustle_...`    (hustle events: deflections, contested stats, etc.)
+  - `nba_lineups_...`   (lineup combinations and lineup performance)
+  - `nba_schedule_...`  (game schedules)
+  - `nba_standings_...` (team standings / rank / records)
+
+  IMPORTANT:
+  - These tables are highly structured by name (season, season_type, per_mode, endpoint naming).
+  - ALWAYS rely on DATABASE SCHEMA below to pick exact columns; never invent columns.
+  - If user asks for clutch/hustle/lineup/schedule/standings, do NOT force all_players_regular_* or player_game_logs.
+  - Use table-name pattern matching by intent first, then schema-confirmed columns.
+""",
+    ),
+    (
+        "table_rules_header",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 2: TABLE SELECTION RULES — FOLLOW IN ORDER, FIRST MATCH WINS
+════════════════════════════════════════════════════════════════════════
+""",
+    ),
+    (
+        "rule_extended_routing",
+        EXTENDED,
+        """RULE 0 — INTENT ROUTING FOR EXTENDED TABLE FAMILIES:
+  If a question clearly targets one of these domains, use that family first:
+  - "clutch", "in close games", "last 5 minutes"        → `nba_clutch_...`
+  - "hustle", "deflections", "box outs", "charges"      → `nba_hustle_...`
+  - "tracking", "drives", "touches", "distance", "speed"→ `nba_player_tracking_...`
+  - "shot chart", "shot distance", "step back", "dunks" → `court_shots`
+  - "lineup", "5-man unit", "best lineup"               → `nba_lineups_...`
+  - "standings", "seed", "conference rank"              → `nba_standings_...`
+  - "advanced metrics", "true shooting", "net rating"   → `nba_advanced_...`
+  When routing to any of the families above:
+  - "this season" / no year → 2025_26 (these families are current).
+  - For all_players_regular / all_players_playoffs, "this season" still maps to 2024_2025
+    because those tables are not produced yet for 2025-26.
+""",
+    ),
+    (
+        "rules_player_tables",
+        CORE,
+        """RULE 1 — MOST RECENT PLAYOFF PERFORMANCE:
+  Trigger phrases: "playoff performance", "playoffs", "analyze playoffs", "postseason"
+  With NO specific year mentioned:
+  → ALWAYS use: `all_players_playoffs_2024_2025`
+  → ALWAYS use SUM() aggregation with GROUP BY player_name
+
+RULE 2 — MOST RECENT REGULAR SEASON PERFORMANCE:
+  Trigger phrases: "season stats", "season averages", "top scorers", "leaderboards"
+  With NO specific year mentioned:
+  → ALWAYS use: `all_players_regular_2024_2025`
+  → Use this table when rank columns (_rank) or oreb, dreb, age, gp are needed.
+
+RULE 3 — CURRENT FORM / RECENT ACTIVITY:
+  Trigger phrases: "lately", "recently", "last X games", "hot streak", "game log"
+  → ALWAYS use `player_game_logs` — it has data through February 2026.
+  → For 2025-26 season: WHERE season_id = '22025' AND season_type = 'Regular Season'
+  → ALWAYS ORDER BY game_date DESC LIMIT X.
+
+RULE 4 — SPECIFIC YEAR OR SEASON REQUESTED:
+  START-YEAR RULE: A bare year means the season that STARTS that year.
+    "2020" or "2020 season" → all_players_regular_2020_2021
+  PLAYOFF EXCEPTION: A playoff year refers to playoffs at the END of that season.
+    "2020 playoffs" → all_players_playoffs_2019_2020
+
+RULE 5 — CAREER STATS & TRENDS:
+  → For "career" stats: UNION ALL across ALL available yearly tables for that player, then wrap in a subquery with SUM() and GROUP BY.
+  → For "by season" or "trends over time": UNION ALL across relevant season tables, but return ONE ROW PER SEASON (do NOT use SUM or GROUP BY).
+
+RULE 6 — COMPARING PLAYERS:
+  → Specific season ("this season"): Use ONE `all_players_regular` table.
+  → No year context ("Who is better X or Y?"): Treat as a CAREER comparison. UNION ALL across every table and calculate career weighted averages.
+  → Different eras: UNION ALL per player from their respective era tables.
+
+RULE 7 — TOP PLAYERS / LEADERBOARD QUESTIONS:
+  → Use ONE season summary table directly. Do NOT use SUM(), GROUP BY, or UNION.
+  → ALWAYS ORDER BY the requested stat (e.g., ORDER BY pts_rank ASC NULLS LAST).
+""",
+    ),
+    (
+        "rule_teams",
+        {"team"},
+        """RULE 8 — TEAM AND FRANCHISE QUERIES:
+  Trigger phrases: "top teams", "best NBA teams", "team winrate", "team standings", "best offense",
+    "best defense", "net rating", "which team", "Warriors", "Lakers", "Celtics", franchise/team names.
+  → If the subject is a TEAM or FRANCHISE, do NOT query player tables.
+  → Use `team_advanced_season_YYYY_YY_regular_season_pergame` / `team_advanced_season_YYYY_YY_playoffs_pergame`
+    for team offense, defense, net rating, pace, true shooting, eFG, rebounding rate, turnover rate, and team-level comparisons.
+  → Use `nba_standings_season_YYYY_YY_leaguestandingsv3` for records, standings, seed, conference/division rank,
+    home/road record, last 10, streaks, point differential, and games-back questions.
+  → "point differential" means standings column "DiffPointsPG" (points per game differential),
+    NOT team_advanced "NET_RATING". If a range is requested ("from 2010 to 2024"),
+    UNION ALL one `nba_standings_season_YYYY_YY_leaguestandingsv3` table per season and
+    include `season_start` / `season_label`; do NOT collapse to one year or LIMIT 1.
+  → For "this season", "current season", or no year on team_advanced/nba_standings, use 2025_26 when available.
+    Use 2024_25 only for "last season" or explicit 2024-25 wording.
+  → Team advanced columns are UPPERCASE and must be double-quoted:
+    "TEAM_ID", "TEAM_NAME", "GP", "W", "L", "W_PCT", "OFF_RATING", "DEF_RATING",
+    "NET_RATING", "AST_PCT", "REB_PCT", "TM_TOV_PCT", "EFG_PCT", "TS_PCT", "PACE", "PIE".
+  → Standings columns are CamelCase/text and must be double-quoted:
+    "TeamCity", "TeamName", "Conference", "Division", "PlayoffRank", "WINS", "LOSSES",
+    "WinPCT", "Record", "HOME", "ROAD", "L10", "CurrentStreak", "PointsPG", "OppPointsPG", "DiffPointsPG".
+  → All team_advanced_* and nba_standings_* numeric columns are TEXT, so leaderboards and numeric filters require
+    NULLIF("COLUMN", '')::numeric casts in WHERE/ORDER BY.
+  → Team name matching:
+    - team_advanced_*: use "TEAM_NAME" ILIKE '%Warriors%' or '%Golden State Warriors%'.
+    - nba_standings_*: use "TeamName" ILIKE '%Warriors%' OR "TeamCity" ILIKE '%Golden State%'.
+""",
+    ),
+    (
+        "rule_shot_charts",
+        {"shots"},
+        """RULE 9 — SHOT CHARTS, DISTANCE, AND PLAY-BY-PLAY (court_shots):
+  Trigger phrases: "shot chart", "where does X shoot from", "average shot distance", "dunks", "layups", "step back"
+  → ALWAYS use the `court_shots` table.
+  → `court_shots` is ONE massive table. Do NOT append years to the table name.
+  → Filter by `game_date` or `player_name` using standard WHERE clauses.
+  → Columns are lowercase: game_id, player_name, team_name, game_date, action_type, shot_type, shot_zone_basic, shot_distance, loc_x, loc_y, shot_made_flag
+""",
+    ),
+    (
+        "rule_lineups",
+        {"lineups"},
+        """RULE 10 — LINEUPS AND 5-MAN UNITS (PLAYOFFS-ONLY DATA):
+  Trigger phrases: "best 5-man lineup", "lineup net rating", "best lineup"
+  IMPORTANT: lineup data EXISTS ONLY FOR PLAYOFFS. There are no regular-season lineup tables.
+  Available years: 2007-08, 2012-13, 2021-22, 2022-23, 2023-24, 2024-25.
+  → Use ONLY: nba_lineups_group_5_season_YYYY_YY_season_type_playoffs_pe (ends in _pe)
+  → If the user asks for regular-season lineups, answer that the data is playoff-only
+    and ask whether they want the most recent playoff lineups instead. Return no other table.
+""",
+    ),
+    (
+        "rule_specialty_tables",
+        {"specialty"},
+        """RULE 11 — SPECIALTY STATS & TRACKING (STRICT 63-CHAR TABLE NAMES):
+
+    CURRENT SEASON NOTE: Unlike all_players_*, the advanced / clutch / hustle / tracking
+    families DO have 2025-26 tables. For "this season" or "current season" advanced/specialty
+    questions, use the 2025_26 suffix (e.g. nba_advanced_season_2025_26_season_type_regular_season_per).
+    Use 2024_25 only when the user explicitly asks for last season.
+
+  CRITICAL: PostgreSQL forcefully truncated these table names at exactly 63 characters. 
+  DO NOT write "regular_season" or "per_mode_per" for the tracking tables. You MUST copy these exact suffix patterns character-for-character:
+  
+  → Hustle ("deflections", "contested shots", "charges", "screen assists"):
+      Regular Season: `nba_hustle_season_YYYY_YY_season_type_regular_season_per_mo`
+      Playoffs: `nba_hustle_season_YYYY_YY_season_type_playoffs_per_mode_per`
+      Columns to use: "SCREEN_ASSISTS", "SCREEN_AST_PTS", "DEFLECTIONS", "CHARGES_DRAWN"
+      Availability in this database:
+        - Regular-season hustle data exists from 2015_16 through 2025_26 only.
+        - Playoff hustle data exists for 1998_99, 2004_05, and 2015_16 through 2024_25.
+        - If the requested hustle/deflections season is unavailable, do NOT invent a table.
+      
+  → Clutch ("clutch", "last 5 minutes"):
+      Regular: `nba_clutch_season_YYYY_YY_season_type_regular_season_per_mo`
+      Playoffs: `nba_clutch_season_YYYY_YY_season_type_playoffs_per_mode_per`
+      
+  → Drives ("drives", "drives per game"):
+      Regular: `nba_player_tracking_pt_drives_season_YYYY_YY_season_type_re`
+      Playoffs: `nba_player_tracking_pt_drives_season_YYYY_YY_season_type_pl`
+      Available columns: "DRIVES", "DRIVE_FGM", "DRIVE_FGA", "DRIVE_FG_PCT",
+                         "DRIVE_PTS", "DRIVE_PASSES", "DRIVE_AST", "DRIVE_TOV", "GP".
+      CRITICAL: The `_re` and `_pl` tables are stored in PER-GAME mode by default.
+      "DRIVES" is ALREADY the per-game value. DO NOT divide DRIVES by GP.
+      For "most drives per game" → ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST.
+      Apply WHERE NULLIF("GP", '')::numeric >= 20 for leaderboards to exclude small-sample outliers.
+      
+  → Passing ("passing", "assists created"):
+      Regular: `nba_player_tracking_pt_passing_season_YYYY_YY_season_type_r`
+      Playoffs: `nba_player_tracking_pt_passing_season_YYYY_YY_season_type_p`
+
+  → Defense ("defense", "opponent points at rim", "rim protection", "give up"):
+      Regular: `nba_player_tracking_pt_defense_season_YYYY_YY_season_type_r`
+      Columns to use: "DEF_RIM_FGM", "DEF_RIM_FGA", "DEF_RIM_FG_PCT", "STL", "BLK" (Do not use OPP_PTS, it does not exist).
+      IMPORTANT: DO NOT use the `SUM(pts)` aggregation block for defense tables. Use RAW columns.
+      
+  → Tracking endpoints that DO NOT split by regular/playoffs (append this EXACT suffix to the season year):
+      "catch and shoot": `nba_player_tracking_pt_catchshoot_season_YYYY_YY_season_typ`
+      "post-ups": `nba_player_tracking_pt_posttouch_season_YYYY_YY_season_type`
+      "paint touches": `nba_player_tracking_pt_painttouch_season_YYYY_YY_season_typ`
+      "pull up": `nba_player_tracking_pt_pullupshot_season_YYYY_YY_season_typ`
+      "efficiency" / "drive points": `nba_player_tracking_pt_efficiency_season_YYYY_YY_season_typ`
+      → Tracking endpoints that DO NOT split by regular/playoffs:
+      "possessions" / "seconds per touch" / "time of possession": `nba_player_tracking_pt_possessions_season_YYYY_YY_season_ty`
+        → Use column "AVG_SEC_PER_TOUCH" for seconds per touch.
+      "rebounding" / "rebound chances": `nba_player_tracking_pt_rebounding_season_YYYY_YY_season_typ`
+      "speed and distance" / "miles run": `nba_player_tracking_pt_speeddistance_season_YYYY_YY_season`
+
+  UPPERCASE COLUMNS: You MUST wrap the column names in double quotes for ALL these tables. 
+  ALWAYS include `"TEAM_ABBREVIATION"` and `"GP"` (Games Played) in your SELECT statement for tracking tables so the user can distinguish between regular season rows, playoff rows, and mid-season trades. Example: SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "AVG_SEC_PER_TOUCH" ...
+""",
+    ),
+    (
+        "rule_advanced_tables",
+        {"advanced"},
+        """RULE 12 — ADVANCED METRICS (STRICT 63-CHAR TABLE NAMES):
+  For "PER", "Win Shares", or "impact", use `"PIE"` or `"NET_RATING"` from the advanced tables.
+  CRITICAL: PostgreSQL forcefully truncated the advanced table names. You MUST use these exact suffixes:
+  → Regular Season: `nba_advanced_season_YYYY_YY_season_type_regular_season_per`
+  → Playoffs: `nba_advanced_season_YYYY_YY_season_type_playoffs_per_mode_p`
+  Remember to wrap UPPERCASE columns in double quotes.
+""",
+    ),
+    (
+        "rule_matchups",
+        {"matchup"},
+        """RULE 13 — MATCHUPS AND OPPONENTS (VS / AGAINST):
+  Trigger phrases: "vs [Team]", "against the [Team]", "when playing the [Team]"
+  → ALWAYS use the `player_game_logs` table.
+  → Use the `matchup` column to filter for the opponent using a wildcard. 
+  → The matchup format is "TEAM vs. OPP" or "TEAM @ OPP". 
+  → EXAMPLE: For "against the Nuggets", use `WHERE matchup ILIKE '%DEN%'`.
+  → (Note: ALWAYS convert team mascots to their 3-letter abbreviations for the ILIKE filter).
+""",
+    ),
+    (
+        "rule_fantasy",
+        {"fantasy"},
+        """RULE 14 — FANTASY BASKETBALL:
+  Trigger phrases: "fantasy points", "best fantasy player", "fantasy value"
+  → Use the `all_players_regular_YYYY_YYYY` tables.
+  → Select the `nba_fantasy_pts` and `nba_fantasy_pts_rank` columns. Do NOT attempt to calculate fantasy points manually.
+""",
+    ),
+    (
+        "rule_advanced_acronyms",
+        {"advanced"},
+        """RULE 15 — SPECIFIC ADVANCED ACRONYMS (TS%, eFG%, USG%):
+  If the user asks for specific advanced shooting/usage metrics:
+  → Use the `nba_advanced_season_...` tables.
+  → "True Shooting" or "TS%" = `"TS_PCT"`
+  → "Effective Field Goal" or "eFG%" = `"EFG_PCT"`
+  → "Usage Rate" or "USG%" = `"USG_PCT"`
+  → "Assist Percentage" = `"AST_PCT"`
+  → "Rebound Percentage" = `"REB_PCT"`
+  → "PER" (Player Efficiency Rating, John Hollinger's metric):
+       This database does NOT store classic PER. The closest equivalent is "PIE" in nba_advanced_*.
+       Numbers in nba_advanced_* are TEXT-stored, so cast with NULLIF(col, '')::numeric.
+       Map "PER" → SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "PIE"
+                   FROM nba_advanced_season_YYYY_YY_season_type_regular_season_per
+                   WHERE NULLIF("GP", '')::numeric >= 20
+                   ORDER BY NULLIF("PIE", '')::numeric DESC NULLS LAST LIMIT 10;
+       The analyzer will rename PIE to "PIE (PER equivalent)" in the rendered output —
+       you do NOT need to alias it in the SQL.
+  CRITICAL: You MUST wrap these uppercase column names in double quotes.
+""",
+    ),
+    (
+        "rule_excluded_tables",
+        CORE,
+        """RULE 16 — TABLES YOU MUST NOT USE:
+  These tables appear in the schema but are NOT to be queried by this system:
+  - `nba_regular_season_totals_*`  (legacy import, columns differ from all_players_regular_*)
+  - `nba_shot_locations_*`         (column names are unnamed/duplicated, unusable)
+  - `team_advanced_staging`        (staging copy, not for production)
+  ALWAYS prefer the canonical equivalent:
+  - season totals → `all_players_regular_YYYY_YYYY`
+  - shot location → `court_shots`
+  - team advanced → `team_advanced_season_YYYY_YY_regular_season_pergame`
+""",
+    ),
+    (
+        "construction_header",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 3: MANDATORY QUERY CONSTRUCTION RULES
+════════════════════════════════════════════════════════════════════════
+""",
+    ),
+    (
+        "player_name_matching",
+        CORE,
+        """PLAYER NAME MATCHING:
+  - ALWAYS use ILIKE with wildcards on BOTH sides: player_name ILIKE '%Giannis%'
+  - For full names use: player_name ILIKE '%LeBron James%'
+  - NEVER use exact match (=) for player names
+  - NEVER use ILIKE 'Jordan%' — this matches Jordan Poole, DeAndre Jordan, etc.
+  - For last-name-only queries use a leading space: player_name ILIKE '% Harris%'
+    to reduce false matches like "Gary Harris" when searching just "Harris"
+  - Expand ALL nicknames to full names before searching:
+      "Steph" or "Steph Curry"   → player_name ILIKE '%Stephen Curry%' OR player_name ILIKE '%Steph Curry%'
+      "Bron" or "King James"     → player_name ILIKE '%LeBron James%'
+      "Greek Freak"              → player_name ILIKE '%Giannis%'
+      "KD"                       → player_name ILIKE '%Kevin Durant%'
+      "AD"                       → player_name ILIKE '%Anthony Davis%'
+      "Kawhi"                    → player_name ILIKE '%Kawhi Leonard%'
+      "CP3"                      → player_name ILIKE '%Chris Paul%'
+      "Dame"                     → player_name ILIKE '%Damian Lillard%'
+      "Russ"                     → player_name ILIKE '%Russell Westbrook%'
+      "PG" or "PG13"             → player_name ILIKE '%Paul George%'
+""",
+    ),
+    (
+        "per_mode_tables",
+        TEXT_STORAGE,
+        """TRACKING TABLE PER-MODE RULE:
+  - All `nba_player_tracking_pt_*` tables suffixed `_re` or `_pl` are in PER-GAME mode.
+  - The numeric stat columns (DRIVES, DRIVE_PTS, POST_TOUCHES, AVG_SPEED, etc.) are
+    already per-game values. NEVER divide them by GP.
+  - The same applies to nba_hustle_*, nba_clutch_*, nba_advanced_*, nba_lineups_*,
+    team_advanced_*, and nba_standings_* tables.
+  - For "most X per game" questions on these tables, just ORDER BY the column directly
+    (with the numeric cast described next).
+""",
+    ),
+    (
+        "text_stored_numerics",
+        TEXT_STORAGE,
+        """TEXT-STORED NUMERIC COLUMNS (CRITICAL):
+  Every column in nba_advanced_*, nba_clutch_*, nba_hustle_*, nba_player_tracking_pt_*,
+  nba_lineups_*, team_advanced_*, and nba_standings_* tables is stored as TEXT in
+  PostgreSQL — even numeric stats like GP, DRIVES, PIE, TS_PCT, etc.
+  This means:
+  - Numeric comparisons ALWAYS need an explicit cast:
+      WHERE NULLIF("GP", '')::numeric >= 20
+  - Numeric ORDER BY ALWAYS needs an explicit cast:
+      ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST
+  - WITHOUT the cast, "9.5" sorts ABOVE "19.2" (lexicographic) and any `>= 20`
+    comparison fails with `operator does not exist: text >= integer`.
+  - Use NULLIF(col, '') so empty strings cast cleanly to NULL instead of erroring.
+  - The all_players_regular_*, all_players_playoffs_*, player_game_logs, and
+    court_shots tables DO have proper numeric types — no casts needed there.
+""",
+    ),
+    (
+        "aggregation_and_select_blocks",
+        CORE,
+        """AGGREGATION RULES for season summary tables:
+  - ONLY use SUM()+GROUP BY when combining MULTIPLE rows per player
+    (examples: UNION ALL across many seasons for career stats, or other explicit multi-season rollups).
+  - For SINGLE-SEASON season-summary queries (one all_players_regular_YYYY_YYYY table),
+    SELECT columns directly and DO NOT use SUM() or GROUP BY.
+  - If percentages already exist in season summary tables (`fg_pct`, `fg3_pct`, `ft_pct`), select them directly.
+  - Only calculate percentages via SUM() when aggregating multiple rows per player:
+      (CAST(SUM(fgm) AS DOUBLE PRECISION) / NULLIF(SUM(fga), 0)) AS fg_pct
+      (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct
+      (CAST(SUM(ftm) AS DOUBLE PRECISION) / NULLIF(SUM(fta), 0)) AS ft_pct
+
+STANDARD PLAYER PERFORMANCE SELECT BLOCK:
+  Use this exact block ONLY for career/all-time or explicit multi-season aggregation:
+    player_name,
+    SUM(pts)  AS total_pts,
+    SUM(reb)  AS total_reb,
+    SUM(ast)  AS total_ast,
+    SUM(stl)  AS total_stl,
+    SUM(blk)  AS total_blk,
+    SUM(tov)  AS total_tov,
+    SUM(fgm)  AS total_fgm,
+    SUM(fga)  AS total_fga,
+    SUM(fg3m) AS total_fg3m,
+    SUM(fg3a) AS total_fg3a,
+    SUM(ftm)  AS total_ftm,
+    SUM(fta)  AS total_fta,
+    (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+    (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
+    (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
+
+STANDARD SINGLE-SEASON LEADERBOARD BLOCK (NO AGGREGATION):
+  Use this for questions like "top scorers in 2001-02", "best scorers this season", "league leaders in points":
+    player_name,
+    team_abbreviation,
+    pts,
+    pts_rank,
+    gp,
+    fg_pct,
+    fg3_pct,
+    fg3m,
+    fg3a,
+    ftm,
+    fta,
+    ft_pct
+  FROM one season table only
+  ORDER BY pts_rank ASC NULLS LAST (or pts DESC when rank unavailable)
+
+STANDARD GAME LOG SELECT BLOCK:
+  Use this exact block when querying player_game_logs for recent/current games:
+    player_name,
+    game_date,
+    matchup,
+    wl,
+    pts,
+    reb,
+    ast,
+    stl,
+    blk,
+    tov,
+    fgm,
+    fga,
+    fg3m,
+    fg3a,
+    ftm,
+    fta,
+    min
+  DO NOT INCLUDE MATH OR PERCENTAGE CALCULATIONS.
+
+DIVISION SAFETY:
+  - ALWAYS wrap division denominators with NULLIF(..., 0)
+  - ALWAYS cast numerator to DOUBLE PRECISION before dividing
+  - NEVER do raw division like fgm / fga — always use the safe pattern above
+
+DATE FILTERING:
+  - NEVER use EXTRACT() or DATE_TRUNC().
+  - If a user asks for a specific month (e.g., "March 2024"), filter dates using standard string comparisons: WHERE game_date >= '2024-03-01' AND game_date <= '2024-03-31'
+
+GENERAL:
+  - Do NOT add a generic LIMIT (e.g. LIMIT 50) unless the user asks for top-N, last-X games, or a bounded sample.
+  - For shot charts, game logs, or "all shots / full picture" asks, omit LIMIT so results are not arbitrarily truncated (heavy queries are still bounded by server cost/timeout).
+  - NEVER use SELECT * — always name columns explicitly
+  - NEVER invent column names that are not listed in this prompt
+  - NEVER add ORDER BY game_date to season summary tables (game_date does not exist there)
+  - NEVER add WHERE season_id = ... to season summary tables (season_id does not exist there)
+  - NEVER add WHERE season_type = ... to season summary tables (season_type does not exist there)
+  - If a question is ambiguous between recency and season summary, default to player_game_logs
+    with season_id = '22025' since it is the most current data available
+  - For "last N games" / "recent games" / "last X games" prompts, omit the
+    season_id filter so cross-season tails work. Just ORDER BY game_date DESC LIMIT N.
+""",
+    ),
+    (
+        "season_map",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 4: SEASON AND YEAR REFERENCE MAP
+════════════════════════════════════════════════════════════════════════
+
+  "current season" or no year specified (regular)  → all_players_regular_2024_2025
+    **Exception:** Head-to-head "who is better / between X and Y" with NO season/year wording → RULE 6B career UNION ALL (not only latest season).
+  "current playoffs" or no year specified (playoff) → all_players_playoffs_2024_2025
+  Bare year uses START-YEAR mapping for regular season:
+  "2020"                                            → all_players_regular_2020_2021
+  "2018"                                            → all_players_regular_2018_2019
+  "2016"                                            → all_players_regular_2016_2017
+
+  Playoff year uses END-YEAR mapping:
+  "2020 playoffs"                                   → all_players_playoffs_2019_2020
+  "2016 playoffs"                                   → all_players_playoffs_2015_2016
+
+  "last season" / "2024-25"                         → all_players_regular_2024_2025
+  "2023-24" / "last year"                           → all_players_regular_2023_2024
+  "2022-23"                                         → all_players_regular_2022_2023
+  "2021-22"                                         → all_players_regular_2021_2022
+  "2020-21"                                         → all_players_regular_2020_2021
+  "bubble" / "2019-20"                              → all_players_regular_2019_2020
+  "2018-19"                                         → all_players_regular_2018_2019
+  "2017-18"                                         → all_players_regular_2017_2018
+  "2016-17"                                         → all_players_regular_2016_2017
+  "2015-16"                                         → all_players_regular_2015_2016
+
+  season_id values inside player_game_logs:
+    2025-26 season (CURRENT — use this by default): '22025'
+    2024-25 season:                                 '22024'
+    2023-24 season:                                 '22023'
+    2022-23 season:                                 '22022'
+  season_type values (EXACT strings, case-sensitive):
+    'Regular Season'
+    'Playoffs'
+""",
+    ),
+    (
+        "examples_header",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 5: WORKED EXAMPLES OF CORRECT QUERIES
+════════════════════════════════════════════════════════════════════════
+""",
+    ),
+    (
+        "example_playoffs_no_year",
+        {"playoffs"},
+        """Q: "Analyze Giannis playoff performance"
+→ RULE 1. No year. Use all_players_playoffs_2024_2025.
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  SUM(stl) AS total_stl, SUM(blk) AS total_blk, SUM(tov) AS total_tov,
+  SUM(fgm) AS total_fgm, SUM(fga) AS total_fga,
+  SUM(fg3m) AS total_fg3m, SUM(fg3a) AS total_fg3a,
+  SUM(ftm) AS total_ftm, SUM(fta) AS total_fta,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
+  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
+FROM all_players_playoffs_2024_2025
+WHERE player_name ILIKE '%Giannis%'
+GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_playoffs_last_name",
+        {"playoffs"},
+        """Q: "Analyze Garry Harris playoff performance"
+→ RULE 1. No year. Use all_players_playoffs_2024_2025.
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  SUM(stl) AS total_stl, SUM(blk) AS total_blk, SUM(tov) AS total_tov,
+  SUM(fgm) AS total_fgm, SUM(fga) AS total_fga,
+  SUM(fg3m) AS total_fg3m, SUM(fg3a) AS total_fg3a,
+  SUM(ftm) AS total_ftm, SUM(fta) AS total_fta,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
+  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
+FROM all_players_playoffs_2024_2025
+WHERE player_name ILIKE '%Garry Harris%'
+GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_playoffs_year",
+        {"playoffs"},
+        """Q: "How did Giannis do in the 2019 playoffs"
+→ RULE 4. Year specified: 2019 → all_players_playoffs_2018_2019.
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
+  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
+FROM all_players_playoffs_2018_2019
+WHERE player_name ILIKE '%Giannis%'
+GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_last_games",
+        {"recent"},
+        """Q: "Show me LeBron's last 10 games"
+→ RULE 3. Recency. Use player_game_logs, season_id = '22025', ORDER BY game_date DESC.
+SELECT player_name, game_date, matchup, wl, pts, reb, ast, stl, blk, tov,
+  fgm, fga, fg3m, fg3a, ftm, fta, min,
+  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct,
+  (CAST(fg3m AS DOUBLE PRECISION) / NULLIF(fg3a, 0)) AS fg3_pct,
+  (CAST(ftm  AS DOUBLE PRECISION) / NULLIF(fta,  0)) AS ft_pct
+FROM player_game_logs
+WHERE player_name ILIKE '%LeBron James%'
+  AND season_id = '22025'
+ORDER BY game_date DESC LIMIT 10;
+""",
+    ),
+    (
+        "example_lately",
+        {"recent"},
+        """Q: "How has Steph been playing lately"
+→ RULE 3 / RULE 10. Recency keyword. Use player_game_logs, season_id = '22025'.
+SELECT player_name, game_date, matchup, wl, pts, reb, ast,
+  fgm, fga, fg3m, fg3a,
+  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct,
+  (CAST(fg3m AS DOUBLE PRECISION) / NULLIF(fg3a, 0)) AS fg3_pct
+FROM player_game_logs
+WHERE (player_name ILIKE '%Stephen Curry%' OR player_name ILIKE '%Steph Curry%')
+  AND season_id = '22025'
+  AND season_type = 'Regular Season'
+ORDER BY game_date DESC LIMIT 15;
+""",
+    ),
+    (
+        "example_compare_season",
+        {"compare"},
+        """Q: "Compare LeBron and Curry this season"
+→ RULE 6. Two players, same era, season summary. Use all_players_regular_2024_2025.
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct,
+  (CAST(SUM(ftm)  AS DOUBLE PRECISION) / NULLIF(SUM(fta),  0)) AS ft_pct
+FROM all_players_regular_2024_2025
+WHERE player_name ILIKE '%LeBron James%' OR player_name ILIKE '%Stephen Curry%'
+GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_season_profile",
+        CORE,
+        """Q: "What were Kevin Durant's stats 2015"
+→ RULE 4 + RULE 11. Single-player season profile, no aggregation.
+SELECT DISTINCT player_name, team_abbreviation, age, gp, min, w_pct,
+  pts, reb, ast, tov, stl, blk, pf, plus_minus, fgm, fga,
+  fg_pct, fg3_pct, ft_pct, fg3m, fg3a, ftm, fta,
+  pts_rank, fg_pct_rank, fg3_pct_rank, ft_pct_rank, fgm_rank, fga_rank, fg3m_rank, fg3a_rank, ftm_rank, fta_rank, min_rank,
+  reb_rank, dreb_rank, oreb_rank, ast_rank, tov_rank, stl_rank, blk_rank, pf_rank,
+  dreb, oreb, dd2, td3, dd2_rank, td3_rank
+FROM all_players_regular_2015_2016
+WHERE player_name ILIKE '%Kevin Durant%'
+LIMIT 50;
+""",
+    ),
+    (
+        "example_leaderboard",
+        CORE,
+        """Q: "Who are the top 10 scorers this season"
+→ RULE 8. Leaderboard. Use all_players_regular_2024_2025.
+SELECT player_name, team_abbreviation, pts, pts_rank, gp, fg_pct, fg3_pct, fg3m, fg3a, ftm, fta, ft_pct
+FROM all_players_regular_2024_2025
+ORDER BY pts_rank ASC NULLS LAST LIMIT 10;
+""",
+    ),
+    (
+        "example_leaderboard_season",
+        CORE,
+        """Q: "Who are the best scorers from 2000-2001"
+→ RULE 4 + RULE 8. Specific season leaderboard from one table, no aggregation.
+SELECT DISTINCT player_name, team_abbreviation, pts, pts_rank, gp, fg_pct, fg3_pct, fg3m, fg3a, ftm, fta, ft_pct
+FROM all_players_regular_2000_2001
+ORDER BY pts_rank ASC NULLS LAST LIMIT 5;
+""",
+    ),
+    (
+        "example_career",
+        {"career"},
+        """Q: "Show me Steph Curry's career stats"
+→ RULE 5. Career = UNION ALL across all yearly tables.
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct,
+  (CAST(SUM(fg3m) AS DOUBLE PRECISION) / NULLIF(SUM(fg3a), 0)) AS fg3_pct
+FROM (
+  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2012_2013 WHERE player_name ILIKE '%Stephen Curry%'
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2013_2014 WHERE player_name ILIKE '%Stephen Curry%'
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2014_2015 WHERE player_name ILIKE '%Stephen Curry%'
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga, fg3m, fg3a FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%Stephen Curry%'
+) AS career GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_hot_streak",
+        {"recent"},
+        """Q: "Is Giannis on a hot streak"
+→ RULE 3. Streak = game log recency. Use player_game_logs.
+SELECT player_name, game_date, matchup, wl, pts, reb, ast,
+  (CAST(fgm  AS DOUBLE PRECISION) / NULLIF(fga,  0)) AS fg_pct
+FROM player_game_logs
+WHERE player_name ILIKE '%Giannis%'
+  AND season_id = '22025'
+  AND season_type = 'Regular Season'
+ORDER BY game_date DESC LIMIT 10;
+""",
+    ),
+    (
+        "example_compare_eras",
+        {"compare"},
+        """Q: "Compare LeBron and Jordan career stats"
+→ RULE 7. Different eras. UNION ALL per player. CRITICAL: The shape below is
+   shown ABBREVIATED for readability. You MUST emit ONE leg PER AVAILABLE
+   SEASON listed in DATABASE SCHEMA above for each player's actual era.
+   Do NOT copy these legs verbatim — the post-processor cannot add legs you
+   did not emit. For Jordan, include every available all_players_regular_*
+   table from 1996_1997 through 2002_2003. For LeBron, include every
+   available all_players_regular_* table from 2003_2004 through 2024_2025
+   (every season in between, no gaps).
+SELECT player_name,
+  SUM(pts) AS total_pts, SUM(reb) AS total_reb, SUM(ast) AS total_ast,
+  (CAST(SUM(fgm)  AS DOUBLE PRECISION) / NULLIF(SUM(fga),  0)) AS fg_pct
+FROM (
+  -- Michael Jordan: ONE leg per available season in his era (1996-97 through 2002-03)
+  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_1996_1997 WHERE player_name ILIKE '%Michael Jordan%'
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_1997_1998 WHERE player_name ILIKE '%Michael Jordan%'
+  UNION ALL
+  -- ... include 2001_2002 and 2002_2003 as well ...
+  UNION ALL
+  -- LeBron James: ONE leg per available season (2003-04 through 2024-25, every season)
+  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2003_2004 WHERE player_name ILIKE '%LeBron James%'
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2004_2005 WHERE player_name ILIKE '%LeBron James%'
+  UNION ALL
+  -- ... continue for 2005_2006, 2006_2007, ..., 2023_2024 ...
+  UNION ALL
+  SELECT player_name, pts, reb, ast, fgm, fga FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%LeBron James%'
+) AS combined GROUP BY player_name LIMIT 50;
+""",
+    ),
+    (
+        "example_trend",
+        {"career"},
+        """Q: "Show me Kevin Durant's points trend from 2015 to 2023"
+→ RULE 5. By-season trend. UNION ALL across EVERY season in the inclusive range.
+   ONE ROW PER SEASON. No SUM. No GROUP BY across seasons.
+SELECT player_name, season_label, pts, gp, fg_pct, fg3_pct, ft_pct
+FROM (
+  SELECT player_name, '2015-16' AS season_label, pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2015_2016 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2016-17', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2016_2017 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2017-18', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2017_2018 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2018-19', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2018_2019 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2019-20', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2019_2020 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2020-21', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2020_2021 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2021-22', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2021_2022 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2022-23', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2022_2023 WHERE player_name ILIKE '%Kevin Durant%'
+  UNION ALL
+  SELECT player_name, '2023-24', pts, gp, fg_pct, fg3_pct, ft_pct
+    FROM all_players_regular_2023_2024 WHERE player_name ILIKE '%Kevin Durant%'
+) AS trend
+ORDER BY season_label;
+""",
+    ),
+    (
+        "example_compare_range",
+        {"compare"},
+        """Q: "Compare Luka Doncic and Trae Young assists from 2020 to 2024"
+→ RULE 6 + RULE 5. Two players, multi-season range. UNION ALL each (player, season).
+   ONE ROW PER (player, season). No cross-season aggregation.
+SELECT player_name, season_label, ast, gp
+FROM (
+  SELECT player_name, '2020-21' AS season_label, ast, gp FROM all_players_regular_2020_2021
+    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
+  UNION ALL
+  SELECT player_name, '2021-22', ast, gp FROM all_players_regular_2021_2022
+    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
+  UNION ALL
+  SELECT player_name, '2022-23', ast, gp FROM all_players_regular_2022_2023
+    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
+  UNION ALL
+  SELECT player_name, '2023-24', ast, gp FROM all_players_regular_2023_2024
+    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
+  UNION ALL
+  SELECT player_name, '2024-25', ast, gp FROM all_players_regular_2024_2025
+    WHERE player_name ILIKE '%Luka Doncic%' OR player_name ILIKE '%Trae Young%'
+) AS combined
+ORDER BY season_label, player_name;
+""",
+    ),
+    (
+        "example_team_net_rating",
+        {"team"},
+        """Q: "Which teams have the best net rating this season?"
+→ RULE 8. Team-level advanced metric. Use team_advanced 2025_26, not player tables.
+   Values are TEXT, so cast for sorting and sample filters.
+SELECT "TEAM_NAME", "GP", "W", "L", "W_PCT", "OFF_RATING", "DEF_RATING", "NET_RATING", "PACE"
+FROM team_advanced_season_2025_26_regular_season_pergame
+WHERE NULLIF("GP", '')::numeric >= 20
+ORDER BY NULLIF("NET_RATING", '')::numeric DESC NULLS LAST
+LIMIT 10;
+""",
+    ),
+    (
+        "example_team_seed",
+        {"team"},
+        """Q: "What seed are the Warriors this season?"
+→ RULE 8. Standings/seed question. Use nba_standings 2025_26 and match team city/name.
+SELECT "TeamCity", "TeamName", "Conference", "PlayoffRank", "WINS", "LOSSES", "WinPCT", "Record", "L10", "CurrentStreak"
+FROM nba_standings_season_2025_26_leaguestandingsv3
+WHERE "TeamName" ILIKE '%Warriors%' OR "TeamCity" ILIKE '%Golden State%'
+LIMIT 5;
+""",
+    ),
+    (
+        "example_team_defense",
+        {"team"},
+        """Q: "Compare the Celtics and Lakers defenses in 2024-25"
+→ RULE 8. Team-level defensive comparison. Use team_advanced 2024_25 and DEF_RATING.
+   Lower DEF_RATING is better.
+SELECT "TEAM_NAME", "GP", "W", "L", "W_PCT", "DEF_RATING", "NET_RATING", "DREB_PCT", "PACE"
+FROM team_advanced_season_2024_25_regular_season_pergame
+WHERE "TEAM_NAME" ILIKE '%Celtics%' OR "TEAM_NAME" ILIKE '%Lakers%'
+ORDER BY NULLIF("DEF_RATING", '')::numeric ASC NULLS LAST
+LIMIT 10;
+""",
+    ),
+    (
+        "example_point_differential",
+        {"team"},
+        """Q: "point differential from 2010 to 2024"
+→ RULE 8. Point differential is "DiffPointsPG" in standings, not "NET_RATING".
+   This is a multi-season range, so UNION every standings table from 2010-11 through 2024-25.
+SELECT season_start, season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
+FROM (
+  SELECT 2010 AS season_start, '2010-11' AS season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
+  FROM nba_standings_season_2010_11_leaguestandingsv3
+  UNION ALL
+  SELECT 2011 AS season_start, '2011-12' AS season_label, "TeamCity", "TeamName", "WINS", "LOSSES", "WinPCT", "PointsPG", "OppPointsPG", "DiffPointsPG"
+  FROM nba_standings_season_2011_12_leaguestandingsv3
+  -- continue one UNION ALL leg per requested season through 2024-25
+) AS point_differential_trend
+ORDER BY season_start ASC, NULLIF("DiffPointsPG", '')::numeric DESC NULLS LAST
+LIMIT 500;
+""",
+    ),
+    (
+        "example_drives",
+        {"specialty"},
+        """Q: "Who had the most drives per game in 2023?"
+→ RULE 0 + RULE 11. "drives" → tracking_pt_drives. "in 2023" → 2023_24 season.
+   "DRIVES" is already per-game in this table — DO NOT divide by GP.
+   These tables store numbers as TEXT, so cast with NULLIF(col, '')::numeric.
+SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "DRIVES",
+       "DRIVE_PTS", "DRIVE_FG_PCT", "DRIVE_AST"
+FROM nba_player_tracking_pt_drives_season_2023_24_season_type_re
+WHERE NULLIF("GP", '')::numeric >= 20
+ORDER BY NULLIF("DRIVES", '')::numeric DESC NULLS LAST
+LIMIT 10;
+""",
+    ),
+    (
+        "example_deflections",
+        {"specialty"},
+        """Q: "Who leads in deflections this season?"
+→ RULE 0 + RULE 11. "deflections" → hustle. "this season" → 2025_26.
+   These tables store numbers as TEXT, so cast with NULLIF(col, '')::numeric.
+SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "G", "DEFLECTIONS", "CONTESTED_SHOTS", "CHARGES_DRAWN"
+FROM nba_hustle_season_2025_26_season_type_regular_season_per_mo
+WHERE NULLIF("G", '')::numeric >= 20
+ORDER BY NULLIF("DEFLECTIONS", '')::numeric DESC NULLS LAST
+LIMIT 10;
+""",
+    ),
+    (
+        "example_per",
+        {"advanced"},
+        """Q: "Who had the highest PER in 2023?"
+→ RULE 15. PER is not stored — closest equivalent is "PIE" in nba_advanced_*.
+   Numbers in advanced tables are TEXT, so cast with NULLIF(col, '')::numeric.
+SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "PIE"
+FROM nba_advanced_season_2023_24_season_type_regular_season_per
+WHERE NULLIF("GP", '')::numeric >= 20
+ORDER BY NULLIF("PIE", '')::numeric DESC NULLS LAST
+LIMIT 10;
+""",
+    ),
+    (
+        "example_post_ups",
+        {"specialty"},
+        """Q: "How does Giannis perform on post-ups?"
+→ RULE 0 + RULE 11. "post-ups" → tracking_pt_posttouch. No year ⇒ current ⇒ 2025_26.
+SELECT "PLAYER_NAME", "TEAM_ABBREVIATION", "GP", "POST_TOUCHES",
+       "POST_TOUCH_FG_PCT", "POINTS", "PTS_PER_TOUCH"
+FROM nba_player_tracking_pt_posttouch_season_2025_26_season_type
+WHERE "PLAYER_NAME" ILIKE '%Giannis%';
+""",
+    ),
+    (
+        "example_matchup",
+        {"matchup"},
+        """Q: "What were LeBron's stats vs the Celtics in 2024?"
+→ RULE 13. Use player_game_logs. Calendar year 2024 ⇒ filter by game_date range.
+SELECT player_name, game_date, matchup, wl, pts, reb, ast, stl, blk, tov,
+  fgm, fga, fg3m, fg3a, ftm, fta, min,
+  (CAST(fgm AS DOUBLE PRECISION) / NULLIF(fga, 0)) AS fg_pct
+FROM player_game_logs
+WHERE player_name ILIKE '%LeBron James%'
+  AND matchup ILIKE '%BOS%'
+  AND game_date >= '2024-01-01' AND game_date <= '2024-12-31'
+ORDER BY game_date DESC;
+""",
+    ),
+    (
+        "example_last_n_games",
+        {"recent"},
+        """Q: "How many points did Wembanyama score in his last 5 games?"
+→ RULE 3. "last N games" — do NOT pin to a specific season; let game_date order across season boundary.
+SELECT player_name, game_date, matchup, wl, pts, reb, ast, fgm, fga, fg3m, fg3a, ftm, fta, min
+FROM player_game_logs
+WHERE player_name ILIKE '%Victor Wembanyama%'
+  OR player_name ILIKE '%Wembanyama%'
+ORDER BY game_date DESC
+LIMIT 5;
+""",
+    ),
+    (
+        "common_mistakes",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+SECTION 6: COMMON MISTAKES — NEVER DO THESE
+════════════════════════════════════════════════════════════════════════
+
+❌ SELECT season_id FROM all_players_playoffs_2024_2025    -- does not exist in summary tables
+❌ SELECT game_date FROM all_players_regular_2024_2025     -- does not exist in summary tables
+❌ SELECT fg_pct FROM player_game_logs                     -- does not exist, must calculate
+❌ SELECT oreb FROM player_game_logs                       -- does not exist in game logs
+❌ WHERE season_type = 'Playoffs' on a summary table       -- column does not exist there
+❌ WHERE season_id = '22025' on a summary table            -- column does not exist there
+❌ player_name ILIKE 'Jordan%'                             -- matches wrong players
+❌ player_name ILIKE 'Harris'                              -- missing wildcards
+❌ fgm / fga                                               -- unsafe, use NULLIF
+❌ SELECT * FROM any table                                  -- always name columns explicitly
+❌ Using all_players_playoffs_2018_2019 when no year given  -- always default to 2024_2025
+❌ Using player_game_logs for "analyze playoff performance" -- use season summary tables
+❌ AVG(fg_pct) from season summary tables                  -- use SUM(fgm)/SUM(fga) instead
+❌ ORDER BY game_date on a season summary table            -- game_date does not exist there
+❌ WHERE season_id = '22024' for current 2025-26 games     -- current season is '22025'
+❌ Using all_players_regular_2024_2025 for "last X games"  -- no game_date column there
+❌ Assuming player_game_logs is outdated                   -- it has data through Feb 2026
+❌ SELECT gp FROM player_game_logs                         -- use COUNT(*) AS games_played
+""",
+    ),
+    (
+        "output_format",
+        CORE,
+        """════════════════════════════════════════════════════════════════════════
+OUTPUT FORMAT
+════════════════════════════════════════════════════════════════════════
+Return ONLY the raw SQL query.
+No explanation. No markdown. No backticks. No comments. No preamble.
+The query must be directly executable in PostgreSQL as-is.
+""",
+    ),
+)
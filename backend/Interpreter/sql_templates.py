@@ -0,0 +1,157 @@
+"""
+Question-template SQL cache helpers.
+
+"LeBron James 2012 stats" and "Kevin Durant 2016 stats" share the template
+"{player0} {season} stats". The model SQL for the first question is stored
+with the player literal and season suffixes replaced by placeholders, and the
+second question is answered by filling them back in. The filled SQL then runs
+through the normal rewrite pipeline, which validates it like model output.
+
+A template is only built when every slot value can be found (and replaced)
+in both the question and the SQL, and no other season year is left in the
+SQL. Anything that is not a slot stays literal in the template key, so a
+template is never reused for a question it was not generated for.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+from Executer.player_index import fold_name
+
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_SQL_LITERAL_RE = re.compile(r"'((?:[^']|'')*)'")
+
+
+@dataclass(frozen=True)
+class QuestionSlots:
+    """A normalized question with its slot values cut out."""
+
+    template: str
+    players: Tuple[str, ...] = ()
+    season: Optional[Tuple[int, int]] = None
+    nth: Optional[int] = None
+
+    @property
+    def has_slots(self) -> bool:
+        return bool(self.players) or self.season is not None or self.nth is not None
+
+
+def question_slots(
+    normalized_question: str,
+    player_names: Sequence[str],
+    season_window: Optional[Tuple[int, int]],
+    nth: Optional[int],
+    ordinal_words: Optional[dict] = None,
+) -> Optional[QuestionSlots]:
+    """
+    Replace player names, the requested season and the nth-season ordinal in
+    an already-normalized question with placeholders. Returns None when a
+    year is mentioned that is not the requested season (ranges, "since
+    2010"), because that year could not be substituted safely.
+    """
+    text = normalized_question or ""
+    if not text:
+        return None
+
+    # Longest first so "lebron james" is claimed before a stray "james".
+    originals = {}
+    for name in player_names:
+        originals.setdefault(fold_name(name), name)
+    originals.pop("", None)
+    spans = []
+    for folded in sorted(originals, key=len, reverse=True):
+        m = re.search(rf"\b{re.escape(folded)}\b", text)
+        if m:
+            spans.append((m.start(), m.end(), originals[folded]))
+            text = text[: m.start()] + "\x00" * (m.end() - m.start()) + text[m.end() :]
+    spans.sort()
+    players = tuple(name for _, _, name in spans)
+    # Right to left so earlier offsets stay valid.
+    for i in reversed(range(len(spans))):
+        start, end, _ = spans[i]
+        text = text[:start] + f"{{player{i}}}" + text[end:]
+
+    season = None
+    if season_window is not None:
+        start, end = season_window
+        yy = str(end)[-2:]
+        pattern = rf"\b(?:{start}\s+(?:{end}|{yy})|{start}|{end})\b"
+        if re.search(pattern, text):
+            text = re.sub(pattern, "{season}", text)
+            season = (start, end)
+    if _YEAR_RE.search(text):
+        return None
+
+    if nth:
+        words = [w for w, n in (ordinal_words or {}).items() if n == nth]
+        pattern = rf"\b(?:{nth}(?:st|nd|rd|th)|{'|'.join(words) or '(?!)'})\b"
+        if re.search(pattern, text):
+            text = re.sub(pattern, "{nth}", text)
+        else:
+            nth = None
+
+    slots = QuestionSlots(template=" ".join(text.split()), players=players, season=season, nth=nth)
+    return slots if slots.has_slots else None
+
+
+def parameterize_sql(sql_query: str, slots: QuestionSlots) -> Optional[str]:
+    """
+    Model SQL with ``slots`` replaced by ``{{player0}}`` / ``{{season_start}}``
+    style placeholders, or None if a slot value is used in a form this cannot
+    recognize (so substituting it later would leave stale values behind).
+    """
+    q = sql_query or ""
+    if not q:
+        return None
+
+    folded_players = [fold_name(p) for p in slots.players]
+    used = set()
+
+    def _literal(match: re.Match) -> str:
+        content = match.group(1)
+        folded = fold_name(content.replace("%", " "))
+        for i, name in enumerate(folded_players):
+            if folded == name:
+                used.add(i)
+                lead = "%" if content.startswith("%") else ""
+                trail = "%" if content.endswith("%") else ""
+                return f"'{lead}{{{{player{i}}}}}{trail}'"
+        return match.group(0)
+
+    q = _SQL_LITERAL_RE.sub(_literal, q)
+    if len(used) != len(folded_players):
+        return None
+    # A leftover literal carrying part of a slotted name ("%James%") would go stale.
+    name_tokens = {tok for name in folded_players for tok in name.split() if len(tok) >= 3}
+    for content in _SQL_LITERAL_RE.findall(q):
+        if name_tokens & set(fold_name(content.replace("%", " ")).split()):
+            return None
+
+    if slots.season is not None:
+        start, end = slots.season
+        yy = str(end)[-2:]
+        q = re.sub(rf"(?<!\d){start}_{end}(?!\d)", "{{season_start}}_{{season_end}}", q)
+        q = re.sub(rf"(?<!\d){start}_{yy}(?!\d)", "{{season_start}}_{{season_yy}}", q)
+        q = re.sub(rf"(?<!\d){start}-{yy}(?!\d)", "{{season_start}}-{{season_yy}}", q)
+        q = re.sub(rf"(?<!\d){start}(?!\d)", "{{season_start}}", q)
+    # Any other year in the SQL came from something outside the slots
+    # (model knowledge of a rookie year, a hardcoded current season).
+    if re.search(r"(?<!\d)(?:19|20)\d{2}(?!\d)", q):
+        return None
+    return q
+
+
+def fill_sql_template(template_sql: str, slots: QuestionSlots) -> str:
+    """Substitute a new question's slot values into a parameterized template."""
+    q = template_sql
+    for i, name in enumerate(slots.players):
+        q = q.replace(f"{{{{player{i}}}}}", name.replace("'", "''"))
+    if slots.season is not None:
+        start, end = slots.season
+        q = (
+            q.replace("{{season_start}}", str(start))
+            .replace("{{season_end}}", str(end))
+            .replace("{{season_yy}}", str(end)[-2:])
+        )
+    return q
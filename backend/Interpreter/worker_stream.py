@@ -0,0 +1,47 @@
+"""
+Drive a synchronous generator from async code on a worker pool.
+
+Each ``next()`` runs on the executor so the event loop keeps serving other
+requests. When the consumer stops early (client disconnect cancels the
+task mid-step), the generator is closed on the worker side once the pending
+``next()`` has returned: closing a generator that is still executing raises
+``ValueError``, and the close is what runs the generator's cleanup (for the
+analyzer stream, releasing the LLM slot).
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, Future
+from typing import Any, AsyncIterator, Generator, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _close_generator(generator: Generator) -> None:
+    try:
+        generator.close()
+    except Exception as e:
+        logger.warning("Closing worker stream failed: %s", e)
+
+
+def _close_when_idle(generator: Generator, pending: Optional[Future], executor: Executor) -> None:
+    if pending is not None and not pending.done():
+        # Runs on the worker thread as soon as the in-flight next() returns.
+        pending.add_done_callback(lambda _f: _close_generator(generator))
+    else:
+        executor.submit(_close_generator, generator)
+
+
+async def iterate_on_executor(generator: Generator, executor: Executor) -> AsyncIterator[Any]:
+    pending: Optional[Future] = None
+    try:
+        while True:
+            pending = executor.submit(next, generator, _DONE)
+            item = await asyncio.wrap_future(pending)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        _close_when_idle(generator, pending, executor)
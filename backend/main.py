@@ -9,10 +9,11 @@ logging.getLogger().setLevel(
 
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any, Set
 from DashboardBackend.dashboardInterpreter import interpret_question
-from Analyzer.query_analyzer import analyze_question_with_data
+from Analyzer.query_analyzer import analyze_question_with_data, narrative_cache_stats, stream_analysis_with_data
 from auth import (
     sign_up,
     log_in,
@@ -21,20 +22,71 @@ from auth import (
     get_conversation_messages,
     list_conversations,
 )
-from Interpreter.interpreter import run_query, debug_query_routing
-from openai import OpenAI
+from Interpreter.interpreter import (
+    current_data_version,
+    debug_query_routing,
+    prompt_token_stats,
+    rewrite_pass_stats,
+    run_query,
+    sql_cache_stats,
+)
+from Interpreter.llm_gateway import get_llm_gateway, llm_gateway_stats
+from Interpreter.llm_usage import llm_usage_stats
+from Interpreter.question_features import question_features_stats
+from Interpreter.single_flight import SingleFlight, question_flight_key
+from Interpreter.worker_stream import iterate_on_executor
+from Executer.executor import (
+    close_pool,
+    get_pool,
+    plan_cost_cache_stats,
+    result_cache_stats,
+    warm_schema_catalog,
+)
+from Executer.player_index import warm_player_index
+from Executer.sql_preflight import preflight_stats
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import numpy as np
 import pandas as pd
 import re
 
 app = FastAPI()
 
-context_client = (
-    OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url="https://us.api.openai.com/v1")
-    if os.getenv("OPENAI_API_KEY")
-    else None
+context_client = get_llm_gateway() if os.getenv("OPENAI_API_KEY") else None
+
+# The SQL pipeline, analyzer and Firebase helpers are synchronous (psycopg2,
+# pandas, pyrebase). Run them on a bounded worker pool so the event loop keeps
+# serving other requests while one question is in flight. Keep PIPELINE_WORKERS
+# at or below POSTGRES_POOL_MAX so workers do not queue on DB checkouts.
+_pipeline_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PIPELINE_WORKERS", "8")),
+    thread_name_prefix="pipeline",
 )
 
+
+# Concurrent identical questions (same text, same data version) share one
+# pipeline run; see Interpreter.single_flight.
+_pipeline_flights = SingleFlight()
+
+
+async def _run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pipeline_executor, functools.partial(func, *args, **kwargs))
+
+
+@app.on_event("startup")
+def _warm_schema_catalog():
+    # Snapshot load is a local file read; any rebuild runs in the background.
+    warm_schema_catalog()
+    warm_player_index()
+
+
+@app.on_event("shutdown")
+def _shutdown_workers():
+    _pipeline_executor.shutdown(wait=False, cancel_futures=True)
+    close_pool()
+
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "API is running"}
@@ -51,6 +103,8 @@ class QueryRequest(BaseModel):
     question: str
     conversationId: Optional[str] = None
     history: Optional[List[Dict[str, Any]]] = None
+    # Skip the NL→SQL cache and regenerate SQL for this request.
+    noCache: bool = False
 
 class AuthRequest(BaseModel):
     email: str
@@ -162,7 +216,7 @@ def _json_object_from_text(raw: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _resolve_followup_with_ai(
+async def _resolve_followup_with_ai(
     current_question: str, history_messages: List[Dict[str, Any]]
 ) -> Optional[Dict[str, str]]:
     """
@@ -200,7 +254,9 @@ def _resolve_followup_with_ai(
     )
 
     try:
-        response = context_client.chat.completions.create(
+        response = await context_client.achat_completion(
+            "context_resolver",
+            deadline=float(os.getenv("CONTEXT_RESOLVER_DEADLINE_SECONDS", "10")),
             model=os.getenv("CONTEXT_RESOLVER_MODEL", "gpt-5.4-mini"),
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -208,6 +264,7 @@ def _resolve_followup_with_ai(
             ],
             temperature=0,
             max_completion_tokens=500,
+            prompt_cache_key="context_resolver",
         )
         parsed = _json_object_from_text(response.choices[0].message.content or "")
         if not parsed:
@@ -573,7 +630,7 @@ def _unsupported_specialty_message(question: str) -> Optional[str]:
     return None
 
 
-def _build_effective_question_from_history(
+async def _build_effective_question_from_history(
     current_question: str, history_messages: List[Dict[str, Any]]
 ) -> tuple[str, str, str]:
     """
@@ -581,7 +638,7 @@ def _build_effective_question_from_history(
     into a standalone question; fall back to the old context wrapper plus
     targeted deterministic constraints when the rewrite is unavailable.
     """
-    ai_resolution = _resolve_followup_with_ai(current_question, history_messages)
+    ai_resolution = await _resolve_followup_with_ai(current_question, history_messages)
     if ai_resolution:
         return (
             ai_resolution["effective_question"],
@@ -636,15 +693,125 @@ def _build_effective_question_from_history(
 
     return effective_question, analysis_question, "deterministic_context_wrapper"
 
+def _records_for_json(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return df.replace({np.nan: None}).to_dict(orient="records")
+
+
 @app.post("/api/dashboards")
 async def dashboard_endpoint(request: QueryRequest):
-    result = interpret_question(request.question)
+    flight_key = ("dashboard", question_flight_key(request.question), await _run_blocking(current_data_version))
+    result = await _pipeline_flights.run(flight_key, lambda: _run_blocking(interpret_question, request.question))
     if result.get("success"):
         return result
     else:
         print("Error details:", result.get("error"), result.get("details"))
         raise HTTPException(status_code=400, detail=result.get("error", "Unknown error"))
 
+async def _resolve_analysis_context(
+    request: QueryRequest, authorization: Optional[str]
+) -> tuple[str, str, bool, str]:
+    """(effective_question, analysis_question, history_context_applied, history_context_reason)."""
+    effective_question = request.question
+    analysis_question = request.question
+    history_context_applied = False
+    history_context_reason = "no_history_available"
+    history_messages: List[Dict[str, Any]] = _sanitize_history_messages(request.history)
+
+    wants_history = _should_apply_history_context(request.question)
+
+    # Prefer history passed by the frontend (works for both guest and auth chats).
+    if history_messages and wants_history:
+        effective_question, analysis_question, context_strategy = await _build_effective_question_from_history(
+            request.question, history_messages
+        )
+        history_context_applied = True
+        history_context_reason = f"request_history_used/{context_strategy}"
+    # Fallback for older clients: load persisted history for authenticated users.
+    elif request.conversationId and authorization and wants_history:
+        try:
+            uid = await _run_blocking(get_uid_from_authorization, authorization)
+            history_result = await _run_blocking(
+                get_conversation_messages, uid, request.conversationId.strip()
+            )
+            if history_result.get("success"):
+                fetched_history = history_result.get("messages", [])
+                if isinstance(fetched_history, list) and fetched_history:
+                    effective_question, analysis_question, context_strategy = await _build_effective_question_from_history(
+                        request.question, _sanitize_history_messages(fetched_history)
+                    )
+                    history_context_applied = True
+                    history_context_reason = f"stored_history_used/{context_strategy}"
+                else:
+                    history_context_reason = "stored_history_empty"
+            else:
+                history_context_reason = "history_lookup_failed"
+        except Exception as history_error:
+            # Keep analysis available even if history lookup fails.
+            print(f"History context skipped: {history_error}")
+            history_context_reason = "history_lookup_exception"
+    elif history_messages:
+        history_context_reason = "history_not_needed_for_standalone_question"
+    elif request.conversationId and authorization:
+        history_context_reason = "stored_history_not_needed_for_standalone_question"
+    elif request.conversationId and not authorization:
+        history_context_reason = "guest_without_request_history"
+    return effective_question, analysis_question, history_context_applied, history_context_reason
+
+
+def _analysis_debug_payload(
+    request: QueryRequest,
+    effective_question: str,
+    analysis_question: str,
+    history_context_applied: bool,
+    history_context_reason: str,
+) -> Dict[str, Any]:
+    return {
+        "historyContextApplied": history_context_applied,
+        "historyContextReason": history_context_reason,
+        "conversationId": request.conversationId,
+        "originalQuestion": request.question,
+        "effectiveQuestion": effective_question,
+        "analysisQuestion": analysis_question,
+    }
+
+
+_NO_DATA_ANALYSIS = (
+    "No data was found for this query. This could mean:\n"
+    "- The player or team did not appear in the requested season/playoffs.\n"
+    "- The player or team name may be misspelled or not recognized.\n"
+    "- Try specifying a season year, e.g. 'Giannis 2023 playoff performance'."
+)
+
+
+async def _answer_analysis(effective_question: str, analysis_question: str, no_cache: bool) -> Dict[str, Any]:
+    # Run the query once here; query_analyzer should only interpret the returned dataframe.
+    query_result = await _run_blocking(run_query, effective_question, use_cache=not no_cache)
+
+    # Handle empty or failed queries with a helpful message instead of crashing
+    if query_result is None or query_result.empty:
+        return {
+            "success": True,
+            "analysis": _NO_DATA_ANALYSIS,
+            "data": [],
+            "question": analysis_question
+        }
+
+    # Clean NaN before JSON serialization
+    clean_data = await _run_blocking(_records_for_json, query_result)
+
+    # Pass the already-fetched dataframe directly to the analyzer
+    # so it does NOT run a second query internally
+    analysis_result = await _run_blocking(analyze_question_with_data, analysis_question, query_result)
+
+    return {
+        "success": True,
+        "analysis": analysis_result,
+        "data": clean_data,
+        "question": analysis_question,
+        "truncated": bool(query_result.attrs.get("truncated", False)),
+    }
+
+
 @app.post("/api/analysis")
 async def analysis_endpoint(
     request: QueryRequest,
@@ -654,46 +821,12 @@ async def analysis_endpoint(
         print("----HIT----- /api/analysis")
         print(f"Question: {request.question}")
 
-        effective_question = request.question
-        analysis_question = request.question
-        history_context_applied = False
-        history_context_reason = "no_history_available"
-        history_messages: List[Dict[str, Any]] = _sanitize_history_messages(request.history)
-
-        # Prefer history passed by the frontend (works for both guest and auth chats).
-        if history_messages and _should_apply_history_context(request.question):
-            effective_question, analysis_question, context_strategy = _build_effective_question_from_history(
-                request.question, history_messages
-            )
-            history_context_applied = True
-            history_context_reason = f"request_history_used/{context_strategy}"
-        # Fallback for older clients: load persisted history for authenticated users.
-        elif request.conversationId and authorization and _should_apply_history_context(request.question):
-            try:
-                uid = get_uid_from_authorization(authorization)
-                history_result = get_conversation_messages(uid, request.conversationId.strip())
-                if history_result.get("success"):
-                    fetched_history = history_result.get("messages", [])
-                    if isinstance(fetched_history, list) and fetched_history:
-                        effective_question, analysis_question, context_strategy = _build_effective_question_from_history(
-                            request.question, _sanitize_history_messages(fetched_history)
-                        )
-                        history_context_applied = True
-                        history_context_reason = f"stored_history_used/{context_strategy}"
-                    else:
-                        history_context_reason = "stored_history_empty"
-                else:
-                    history_context_reason = "history_lookup_failed"
-            except Exception as history_error:
-                # Keep analysis available even if history lookup fails.
-                print(f"History context skipped: {history_error}")
-                history_context_reason = "history_lookup_exception"
-        elif history_messages:
-            history_context_reason = "history_not_needed_for_standalone_question"
-        elif request.conversationId and authorization:
-            history_context_reason = "stored_history_not_needed_for_standalone_question"
-        elif request.conversationId and not authorization:
-            history_context_reason = "guest_without_request_history"
+        (
+            effective_question,
+            analysis_question,
+            history_context_applied,
+            history_context_reason,
+        ) = await _resolve_analysis_context(request, authorization)
 
         unsupported_message = _unsupported_specialty_message(effective_question)
         if unsupported_message:
@@ -704,82 +837,125 @@ async def analysis_endpoint(
                 "question": analysis_question,
             }
             if _analysis_debug_enabled():
-                payload["debug"] = {
-                    "historyContextApplied": history_context_applied,
-                    "historyContextReason": history_context_reason,
-                    "conversationId": request.conversationId,
-                    "originalQuestion": request.question,
-                    "effectiveQuestion": effective_question,
-                    "analysisQuestion": analysis_question,
-                    "unsupportedReason": "specialty_table_unavailable",
-                }
-            return payload
-
-        # Run the query once here; query_analyzer should only interpret the returned dataframe.
-        query_result = run_query(effective_question)
-
-        # Handle empty or failed queries with a helpful message instead of crashing
-        if query_result is None or query_result.empty:
-            payload = {
-                "success": True,
-                "analysis": (
-                    "No data was found for this query. This could mean:\n"
-                    "- The player or team did not appear in the requested season/playoffs.\n"
-                    "- The player or team name may be misspelled or not recognized.\n"
-                    "- Try specifying a season year, e.g. 'Giannis 2023 playoff performance'."
-                ),
-                "data": [],
-                "question": analysis_question
-            }
-            if _analysis_debug_enabled():
-                payload["debug"] = {
-                    "historyContextApplied": history_context_applied,
-                    "historyContextReason": history_context_reason,
-                    "conversationId": request.conversationId,
-                    "originalQuestion": request.question,
-                    "effectiveQuestion": effective_question,
-                    "analysisQuestion": analysis_question,
-                }
+                payload["debug"] = _analysis_debug_payload(
+                    request, effective_question, analysis_question, history_context_applied, history_context_reason
+                )
+                payload["debug"]["unsupportedReason"] = "specialty_table_unavailable"
             return payload
 
-        # Clean NaN before JSON serialization
-        clean_data = query_result.replace({np.nan: None}).to_dict(orient="records")
-
-        # Pass the already-fetched dataframe directly to the analyzer
-        # so it does NOT run a second query internally
-        analysis_result = analyze_question_with_data(analysis_question, query_result)
-
-        payload = {
-            "success": True,
-            "analysis": analysis_result,
-            "data": clean_data,
-            "question": analysis_question
-        }
+        # Identical in-flight questions share one query + analyzer run.
+        flight_key = (
+            "analysis",
+            question_flight_key(effective_question),
+            question_flight_key(analysis_question),
+            bool(request.noCache),
+            await _run_blocking(current_data_version),
+        )
+        payload = dict(await _pipeline_flights.run(
+            flight_key,
+            lambda: _answer_analysis(effective_question, analysis_question, request.noCache),
+        ))
         if _analysis_debug_enabled():
-            payload["debug"] = {
-                "historyContextApplied": history_context_applied,
-                "historyContextReason": history_context_reason,
-                "conversationId": request.conversationId,
-                "originalQuestion": request.question,
-                "effectiveQuestion": effective_question,
-                "analysisQuestion": analysis_question,
-            }
+            payload["debug"] = _analysis_debug_payload(
+                request, effective_question, analysis_question, history_context_applied, history_context_reason
+            )
         return payload
 
     except Exception as e:
         print(f"Analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/analysis/stream")
+async def analysis_stream_endpoint(
+    request: QueryRequest,
+    authorization: Optional[str] = Header(default=None),
+):
+    """
+    Server-Sent Events variant of /api/analysis.
+
+    Events, in order: ``table`` (data, question, truncated) as soon as the
+    query returns; ``token`` ({"text": delta}) while the narrative streams;
+    one ``analysis`` ({"text": ...}) with the final formatted answer, which
+    deterministic formatters send on its own; then ``done`` (debug info when
+    enabled). Failures end the stream with ``error`` ({"detail": ...}).
+    """
+    print("----HIT----- /api/analysis/stream")
+    print(f"Question: {request.question}")
+    context = await _resolve_analysis_context(request, authorization)
+    effective_question, analysis_question = context[0], context[1]
+    done = {"debug": _analysis_debug_payload(request, *context)} if _analysis_debug_enabled() else {}
+
+    async def events():
+        analysis_events = None
+        try:
+            unsupported_message = _unsupported_specialty_message(effective_question)
+            if unsupported_message:
+                yield _sse("table", {"data": [], "question": analysis_question, "truncated": False})
+                yield _sse("analysis", {"text": unsupported_message})
+                yield _sse("done", done)
+                return
+
+            flight_key = (
+                "query",
+                question_flight_key(effective_question),
+                bool(request.noCache),
+                await _run_blocking(current_data_version),
+            )
+            query_result = await _pipeline_flights.run(
+                flight_key, lambda: _run_blocking(run_query, effective_question, use_cache=not request.noCache)
+            )
+            if query_result is None or query_result.empty:
+                yield _sse("table", {"data": [], "question": analysis_question, "truncated": False})
+                yield _sse("analysis", {"text": _NO_DATA_ANALYSIS})
+                yield _sse("done", done)
+                return
+
+            clean_data = await _run_blocking(_records_for_json, query_result)
+            yield _sse("table", {
+                "data": clean_data,
+                "question": analysis_question,
+                "truncated": bool(query_result.attrs.get("truncated", False)),
+            })
+
+            # The analyzer is synchronous; pull each event on the worker pool.
+            analysis_events = iterate_on_executor(
+                stream_analysis_with_data(analysis_question, query_result), _pipeline_executor
+            )
+            async for event, text in analysis_events:
+                yield _sse(event, {"detail": text} if event == "error" else {"text": text})
+                if event == "error":
+                    return
+            yield _sse("done", done)
+        except Exception as e:
+            print(f"Analysis stream error: {str(e)}")
+            yield _sse("error", {"detail": f"Analysis failed: {str(e)}"})
+        finally:
+            if analysis_events is not None:
+                # Closes the analyzer (releasing its LLM slot) once any in-flight step returns.
+                await analysis_events.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/signup")
 async def signup_endpoint(request: AuthRequest):
-    result = sign_up(request.email, request.password)
+    result = await _run_blocking(sign_up, request.email, request.password)
     if result["success"]:
         return result
     raise HTTPException(status_code=400, detail=result["error"])
 
 @app.post("/api/login")
 async def login_endpoint(request: AuthRequest):
-    result = log_in(request.email, request.password)
+    result = await _run_blocking(log_in, request.email, request.password)
     if result["success"]:
         return result
     raise HTTPException(status_code=400, detail=result["error"])
@@ -790,7 +966,7 @@ async def save_history_message_endpoint(
     request: HistoryMessageRequest,
     authorization: Optional[str] = Header(default=None),
 ):
-    uid = get_uid_from_authorization(authorization)
+    uid = await _run_blocking(get_uid_from_authorization, authorization)
 
     if request.role not in {"user", "assistant"}:
         raise HTTPException(status_code=400, detail="role must be 'user' or 'assistant'")
@@ -800,7 +976,8 @@ async def save_history_message_endpoint(
     if not request.content.strip():
         raise HTTPException(status_code=400, detail="content is required")
 
-    result = save_history_message(
+    result = await _run_blocking(
+        save_history_message,
         uid=uid,
         conversation_id=request.conversationId.strip(),
         role=request.role,
@@ -813,8 +990,8 @@ async def save_history_message_endpoint(
 
 @app.get("/api/history")
 async def list_history_endpoint(authorization: Optional[str] = Header(default=None)):
-    uid = get_uid_from_authorization(authorization)
-    result = list_conversations(uid)
+    uid = await _run_blocking(get_uid_from_authorization, authorization)
+    result = await _run_blocking(list_conversations, uid)
     if result.get("success"):
         return result
     raise HTTPException(status_code=500, detail=result.get("error", "Failed to load history list"))
@@ -825,8 +1002,8 @@ async def get_history_endpoint(
     conversation_id: str,
     authorization: Optional[str] = Header(default=None),
 ):
-    uid = get_uid_from_authorization(authorization)
-    result = get_conversation_messages(uid, conversation_id)
+    uid = await _run_blocking(get_uid_from_authorization, authorization)
+    result = await _run_blocking(get_conversation_messages, uid, conversation_id)
     if result.get("success"):
         return result
     raise HTTPException(status_code=500, detail=result.get("error", "Failed to load history"))
@@ -842,9 +1019,30 @@ async def debug_routing_endpoint(request: DebugRoutingRequest):
             )
         return {
             "success": True,
-            "debug": debug_query_routing(request.question, request.model_sql)
+            "debug": await _run_blocking(debug_query_routing, request.question, request.model_sql)
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Debug routing failed: {str(e)}")
+
+
+@app.get("/api/debug/metrics")
+async def debug_metrics_endpoint():
+    return {
+        "success": True,
+        "metrics": {
+            "db_pool": get_pool().stats(),
+            "result_cache": result_cache_stats(),
+            "plan_cost_cache": plan_cost_cache_stats(),
+            "nl_sql_cache": sql_cache_stats(),
+            "sql_prompt": prompt_token_stats(),
+            "llm_usage": llm_usage_stats(),
+            "llm_gateway": llm_gateway_stats(),
+            "single_flight": _pipeline_flights.stats(),
+            "narrative_cache": narrative_cache_stats(),
+            "sql_preflight": preflight_stats(),
+            "sql_rewrites": rewrite_pass_stats(),
+            "question_features": question_features_stats(),
+        },
+    }
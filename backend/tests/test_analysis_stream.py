@@ -0,0 +1,101 @@
+"""
+Unit tests for the streaming analyst narrative (fake gateway; no OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import pandas as pd  # noqa: E402
+
+from Analyzer import query_analyzer as qa  # noqa: E402
+from Analyzer.narrative_cache import NarrativeCache  # noqa: E402
+from Interpreter.worker_stream import iterate_on_executor  # noqa: E402
+
+
+class _FakeGateway:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.streamed = []
+
+    def stream_chat_completion(self, call_site, **kwargs):
+        self.streamed.append(call_site)
+        yield from self.deltas
+
+    def chat_completion(self, call_site, **kwargs):
+        raise AssertionError(f"unexpected blocking call from {call_site}")
+
+
+class TestStreamAnalysis(unittest.TestCase):
+    def test_deterministic_formatter_is_one_analysis_event(self):
+        df = pd.DataFrame([{"player_name": "Stephen Curry", "gp": 74, "season_label": "2023-24"}])
+        gateway = _FakeGateway([])
+        with mock.patch.object(qa, "client", gateway):
+            events = list(qa.stream_analysis_with_data("How many games did Curry play in 2023-24?", df))
+        self.assertEqual(events, [("analysis", "\nStephen Curry played **74** games in the **2023-24 season**.")])
+        self.assertEqual(gateway.streamed, [])
+
+    def test_narrative_streams_tokens_then_final_text(self):
+        df = pd.DataFrame({"player_name": [f"Player {i}" for i in range(30)], "pts": range(30)})
+        gateway = _FakeGateway(["Scoring ", "is ", "### up"])
+        with mock.patch.object(qa, "client", gateway), mock.patch.object(qa, "_narrative_cache", NarrativeCache()):
+            events = list(qa.stream_analysis_with_data("Describe scoring across the league", df))
+            cached = list(qa.stream_analysis_with_data("Describe scoring across the league", df))
+        self.assertEqual([e for e, _ in events], ["token", "token", "token", "analysis"])
+        self.assertEqual(events[-1][1], "\nScoring is \n\n### up")
+        self.assertEqual(gateway.streamed, ["analysis_narrative"])
+        self.assertEqual(cached, [events[-1]])
+
+
+class TestWorkerStream(unittest.TestCase):
+    def test_disconnect_mid_step_closes_after_the_step_returns(self):
+        release = threading.Event()
+        closed = threading.Event()
+
+        def analyzer():
+            try:
+                yield ("token", "Scoring ")
+                release.wait(5)
+                yield ("token", "is up")
+            finally:
+                closed.set()
+
+        async def client_disconnects(executor):
+            received = []
+
+            async def consume():
+                async for item in iterate_on_executor(analyzer(), executor):
+                    received.append(item)
+
+            task = asyncio.ensure_future(consume())
+            while not received:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)  # second next() is now blocked on the worker
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return received
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            received = asyncio.run(client_disconnects(executor))
+            self.assertFalse(closed.is_set())
+            release.set()
+            self.assertTrue(closed.wait(5))
+        self.assertEqual(received, [("token", "Scoring ")])
+
+
+if __name__ == "__main__":
+    unittest.main()
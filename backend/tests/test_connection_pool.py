@@ -0,0 +1,142 @@
+"""
+Unit tests for the shared PostgreSQL connection pool (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from psycopg2 import extensions  # noqa: E402
+
+from Executer.connection_pool import ConnectionPool, PoolTimeoutError  # noqa: E402
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+        self.conn.pings += 1
+
+    def fetchone(self):
+        return (1,)
+
+
+class _FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.pings = 0
+        self.rollbacks = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(unittest.TestCase):
+    def _pool(self, **kwargs):
+        self.opened = []
+
+        def connect():
+            conn = _FakeConn()
+            self.opened.append(conn)
+            return conn
+
+        defaults = dict(min_size=0, max_size=2, checkout_timeout=0.2, ping_after_idle=3600, leak_seconds=0)
+        defaults.update(kwargs)
+        return ConnectionPool(connect, **defaults)
+
+    def test_reuses_returned_connection(self):
+        pool = self._pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(pool.stats()["reused"], 1)
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = self._pool(max_size=1)
+        held = pool.getconn()
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn(timeout=0.05)
+        pool.putconn(held)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_waiter_gets_connection_when_returned(self):
+        pool = self._pool(max_size=1)
+        held = pool.getconn()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.getconn(timeout=2)))
+        waiter.start()
+        pool.putconn(held)
+        waiter.join(2)
+        self.assertEqual(got, [held])
+
+    def test_open_transaction_rolled_back_on_return(self):
+        pool = self._pool()
+        conn = pool.getconn()
+        conn.status = extensions.TRANSACTION_STATUS_INERROR
+        pool.putconn(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_unhealthy_connection_replaced_on_borrow(self):
+        pool = self._pool(ping_after_idle=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.broken = True
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_warm_opens_min_size(self):
+        pool = self._pool(min_size=2)
+        pool.warm()
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_leak_reported_once(self):
+        pool = self._pool(max_size=3, leak_seconds=0.01)
+        leaked = pool.getconn()
+        threading.Event().wait(0.03)
+        with self.assertLogs("Executer.connection_pool", level="WARNING"):
+            pool.putconn(pool.getconn())
+        pool.putconn(pool.getconn())
+        self.assertEqual(pool.stats()["leaks_detected"], 1)
+        pool.putconn(leaked)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for the deterministic fast-path SQL builders (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer.schema_catalog import SchemaCatalog  # noqa: E402
+from Interpreter.fast_path import plan_fast_path  # noqa: E402
+
+_PLAYER_COLUMNS = ["player_id", "player_name", "team_abbreviation", "gp", "pts", "pts_rank", "reb", "reb_rank", "ast"]
+_FULL_ROW = ["player_id", "player_name", "gp", "pts", "reb", "ast"]
+_CAREER = ["player_name", "gp", "pts", "reb", "ast"]
+
+
+def _catalog() -> SchemaCatalog:
+    rows = []
+    for start in (2022, 2023, 2024):
+        for season_type in ("regular", "playoffs"):
+            table = f"all_players_{season_type}_{start}_{start + 1}"
+            rows += [(table, col, "double precision") for col in _PLAYER_COLUMNS]
+    rows += [("player_game_logs", col, "text") for col in ("player_name", "game_date", "matchup", "pts", "reb")]
+    rows += [
+        ("nba_standings_season_2024_25_leaguestandingsv3", col, "text")
+        for col in ("TeamCity", "TeamName", "Conference", "PlayoffRank", "WINS", "LOSSES")
+    ]
+    return SchemaCatalog.from_rows(rows)
+
+
+def _plan(question, players=(), window=(2024, 2025, False), explicit=False):
+    return plan_fast_path(question, list(players), window, explicit, 2024, _catalog(), _FULL_ROW, _CAREER)
+
+
+class TestFastPathPlans(unittest.TestCase):
+    def test_leaderboard_orders_by_rank_with_overfetch(self):
+        plan = _plan("Who are the top 5 scorers this season?")
+        self.assertEqual(plan.intent, "leaderboard")
+        self.assertIn('FROM public."all_players_regular_2024_2025"', plan.sql)
+        self.assertIn("ORDER BY pts_rank ASC NULLS LAST LIMIT 8", plan.sql)
+        self.assertEqual(plan.confidence, 1.0)
+
+    def test_player_season_line(self):
+        plan = _plan("LeBron James stats in 2023 playoffs", ["LeBron James"], (2022, 2023, True), explicit=True)
+        self.assertEqual(plan.intent, "player_season")
+        self.assertIn('public."all_players_playoffs_2022_2023"', plan.sql)
+        self.assertIn("player_name ILIKE '%LeBron James%'", plan.sql)
+
+    def test_career_by_season_unions_every_season(self):
+        plan = _plan("Stephen Curry career points by season", ["Stephen Curry"])
+        self.assertEqual(plan.intent, "career_by_season")
+        self.assertEqual(plan.sql.count("UNION ALL"), 2)
+        self.assertTrue(plan.sql.endswith("ORDER BY season_start;"))
+        self.assertNotIn("pts_rank", plan.sql)
+
+    def test_last_games_and_standings(self):
+        games = _plan("Luka Doncic last five games", ["Luka Doncic"])
+        self.assertEqual(games.intent, "last_games")
+        self.assertIn("ORDER BY game_date DESC LIMIT 5", games.sql)
+        standings = _plan("Western conference standings")
+        self.assertEqual(standings.intent, "standings")
+        self.assertIn("\"Conference\" = 'West'", standings.sql)
+        self.assertIn('public."nba_standings_season_2024_25_leaguestandingsv3"', standings.sql)
+
+    def test_unsupported_shapes_fall_back_to_the_model(self):
+        self.assertIsNone(_plan("Compare Curry and LeBron points", ["Stephen Curry", "LeBron James"]))
+        self.assertIsNone(_plan("Top scorers at home this season"))
+        self.assertIsNone(_plan("Most points and rebounds this season"))
+        self.assertIsNone(_plan("Top scorers in 2010", window=(2010, 2011, False), explicit=True))
+        self.assertIsNone(_plan("Luka Doncic last 5 games of 2023", ["Luka Doncic"], explicit=True))
+
+    def test_stray_numbers_lower_confidence(self):
+        plan = _plan("Top scorers this season with 30 plus")
+        self.assertLess(plan.confidence, 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Unit tests for the shared LLM gateway (fake clients; no OpenAI access required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import openai  # noqa: E402
+
+from Interpreter.llm_gateway import CircuitBreaker, LlmGateway, LlmUnavailableError  # noqa: E402
+from Interpreter.llm_usage import llm_usage_stats  # noqa: E402
+
+_REQUEST = SimpleNamespace(method="POST", url="https://api.test/v1/chat/completions")
+
+
+def _transient():
+    return openai.APIConnectionError(message="connection reset", request=_REQUEST)
+
+
+class _FakeCompletions:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class _FakeAsyncCompletions(_FakeCompletions):
+    async def create(self, **kwargs):
+        return _FakeCompletions.create(self, **kwargs)
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def _gateway(outcomes, **kwargs):
+    completions = _FakeCompletions(outcomes)
+    kwargs.setdefault("backoff_base", 0.0)
+    return LlmGateway(sync_client=_client(completions), **kwargs), completions
+
+
+class TestLlmGateway(unittest.TestCase):
+    def test_transient_errors_are_retried_with_a_deadline_timeout(self):
+        gateway, completions = _gateway([_transient(), _transient(), "ok"])
+        self.assertEqual(gateway.chat_completion("test", model="m", messages=[]), "ok")
+        self.assertEqual(len(completions.calls), 3)
+        self.assertLessEqual(completions.calls[0]["timeout"], gateway.deadline_seconds)
+        self.assertEqual(gateway.stats()["retries"], 2)
+
+    def test_non_transient_errors_are_not_retried(self):
+        gateway, completions = _gateway([ValueError("bad request"), "ok"])
+        with self.assertRaises(ValueError):
+            gateway.chat_completion("test", model="m", messages=[])
+        self.assertEqual(len(completions.calls), 1)
+        self.assertEqual(gateway.breaker.state, "closed")
+
+    def test_breaker_opens_after_repeated_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+        gateway, completions = _gateway([_transient()] * 4, max_retries=1, breaker=breaker)
+        for _ in range(2):
+            with self.assertRaises(openai.APIConnectionError):
+                gateway.chat_completion("test", model="m", messages=[])
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(LlmUnavailableError):
+            gateway.chat_completion("test", model="m", messages=[])
+        self.assertEqual(len(completions.calls), 4)
+        self.assertEqual(gateway.stats()["rejected"], 1)
+
+    def test_half_open_breaker_closes_on_a_successful_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        gateway, _ = _gateway([_transient(), "ok"], max_retries=0, breaker=breaker)
+        with self.assertRaises(openai.APIConnectionError):
+            gateway.chat_completion("test", model="m", messages=[])
+        self.assertEqual(gateway.chat_completion("test", model="m", messages=[]), "ok")
+        self.assertEqual(breaker.state, "closed")
+
+    def test_in_flight_limit_rejects_at_the_deadline(self):
+        gateway, _ = _gateway(["ok"], max_in_flight=1)
+        self.assertTrue(gateway.limit.try_acquire())
+        with self.assertRaises(LlmUnavailableError):
+            gateway.chat_completion("test", deadline=0.05, model="m", messages=[])
+        gateway.limit.release()
+        self.assertEqual(gateway.chat_completion("test", model="m", messages=[]), "ok")
+        self.assertEqual(gateway.limit.in_flight, 0)
+
+    def test_stream_retries_opening_and_records_final_usage(self):
+        def chunk(text, usage=None):
+            delta = SimpleNamespace(content=text)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)] if text else [], usage=usage)
+
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=2, prompt_tokens_details=None)
+        gateway, completions = _gateway([_transient(), iter([chunk("Hel"), chunk("lo"), chunk(None, usage)])])
+        self.assertEqual(list(gateway.stream_chat_completion("stream_test", model="m", messages=[])), ["Hel", "lo"])
+        self.assertTrue(completions.calls[1]["stream"])
+        self.assertEqual(gateway.limit.in_flight, 0)
+        self.assertEqual(llm_usage_stats()["stream_test"]["prompt_tokens"], 10)
+
+    def test_closing_the_stream_early_closes_the_upstream_response(self):
+        class _FakeStream:
+            closed = False
+
+            def __iter__(self):
+                for text in ("Hel", "lo"):
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+            def close(self):
+                self.closed = True
+
+        stream = _FakeStream()
+        gateway, _ = _gateway([stream])
+        deltas = gateway.stream_chat_completion("stream_test", model="m", messages=[])
+        self.assertEqual(next(deltas), "Hel")
+        deltas.close()
+        self.assertTrue(stream.closed)
+        self.assertEqual(gateway.limit.in_flight, 0)
+
+    def test_async_calls_share_the_retry_path(self):
+        completions = _FakeAsyncCompletions([_transient(), "ok"])
+        gateway = LlmGateway(async_client=_client(completions), backoff_base=0.0)
+        result = asyncio.run(gateway.achat_completion("test", model="m", messages=[]))
+        self.assertEqual(result, "ok")
+        self.assertEqual(len(completions.calls), 2)
+
+    def test_cancelled_half_open_trial_frees_the_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure()
+
+        class _HangingCompletions:
+            async def create(self, **kwargs):
+                await asyncio.sleep(60)
+
+        gateway = LlmGateway(async_client=_client(_HangingCompletions()), breaker=breaker)
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(gateway.achat_completion("test", model="m", messages=[]))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_trial())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+        self.assertEqual(gateway.limit.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit tests for per-call-site LLM token accounting (no OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.llm_usage import LlmUsageStats, response_usage  # noqa: E402
+
+
+def _response(prompt, cached, completion):
+    details = SimpleNamespace(cached_tokens=cached)
+    usage = SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion, prompt_tokens_details=details)
+    return SimpleNamespace(usage=usage)
+
+
+class TestLlmUsage(unittest.TestCase):
+    def test_cached_tokens_are_recorded_per_call_site(self):
+        stats = LlmUsageStats()
+        stats.record("nl_sql", _response(5000, 4096, 120))
+        stats.record("nl_sql", _response(5000, 0, 80))
+        stats.record("dashboard", _response(3000, 2048, 200))
+        snap = stats.snapshot()
+        self.assertEqual(snap["nl_sql"]["calls"], 2)
+        self.assertEqual(snap["nl_sql"]["cached_tokens"], 4096)
+        self.assertEqual(snap["nl_sql"]["cached_ratio"], 0.4096)
+        self.assertEqual(snap["dashboard"]["completion_tokens"], 200)
+
+    def test_missing_usage_is_ignored(self):
+        self.assertIsNone(response_usage(SimpleNamespace()))
+        usage = response_usage(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2)))
+        self.assertEqual(usage, {"prompt_tokens": 10, "cached_tokens": 0, "completion_tokens": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
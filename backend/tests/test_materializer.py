@@ -0,0 +1,81 @@
+"""
+Unit tests for typed result materialization (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import numpy as np  # noqa: E402
+
+from Executer.materializer import materialize_dataframe  # noqa: E402
+
+_TEXT, _INT4, _NUMERIC = 25, 23, 1700
+
+
+def _obj(values):
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class TestMaterializeDataFrame(unittest.TestCase):
+    def test_ints_narrow_to_int32_and_ranks_to_int16(self):
+        df = materialize_dataframe(
+            ["gp", "pts_rank"], [_INT4, _INT4], [np.array([1, 82], dtype=np.int64), np.array([1, 450], dtype=np.int64)]
+        )
+        self.assertEqual(df["gp"].dtype, np.int32)
+        self.assertEqual(df["pts_rank"].dtype, np.int16)
+
+    def test_floats_narrow_only_when_exact(self):
+        df = materialize_dataframe(
+            ["exact", "inexact"], [_NUMERIC, _NUMERIC], [np.array([0.5, np.nan]), np.array([27.3, 1.0])]
+        )
+        self.assertEqual(df["exact"].dtype, np.float32)
+        self.assertEqual(df["inexact"].dtype, np.float64)
+        self.assertEqual(df["inexact"].iloc[0], 27.3)
+
+    def test_numeric_text_columns_are_parsed(self):
+        df = materialize_dataframe(
+            ["NET_RATING", "GP", "GAME_ID", "SEASON"],
+            [_TEXT] * 4,
+            [
+                _obj(["5.5", "", None, "-1.25"]),
+                _obj(["70", "82", "12", "3"]),
+                _obj(["0022300061", "0022300062", "0022300063", "0022300064"]),
+                _obj(["2023-24"] * 4),
+            ],
+        )
+        self.assertEqual(df["NET_RATING"].dtype.kind, "f")
+        self.assertTrue(np.isnan(df["NET_RATING"].iloc[1]))
+        self.assertEqual(df["GP"].dtype, np.int32)
+        self.assertEqual(df["GAME_ID"].iloc[0], "0022300061")
+        self.assertEqual(df["SEASON"].iloc[0], "2023-24")
+
+    def test_repeated_names_become_categorical(self):
+        names = _obj(["LeBron James", "Stephen Curry"] * 40)
+        df = materialize_dataframe(["PLAYER_NAME"], [_TEXT], [names])
+        self.assertEqual(str(df["PLAYER_NAME"].dtype), "category")
+        unique = materialize_dataframe(["player_name"], [_TEXT], [_obj([f"p{i}" for i in range(80)])])
+        self.assertNotEqual(str(unique["player_name"].dtype), "category")
+
+    def test_duplicate_column_names_preserved(self):
+        df = materialize_dataframe(["season", "season"], [_TEXT, _TEXT], [_obj(["a"]), _obj(["b"])])
+        self.assertEqual(list(df.columns), ["season", "season"])
+
+    def test_compact_disabled_keeps_raw_arrays(self):
+        df = materialize_dataframe(["gp"], [_INT4], [np.array([1, 2], dtype=np.int64)], compact=False)
+        self.assertEqual(df["gp"].dtype, np.int64)
+
+
+if __name__ == "__main__":
+    unittest.main()
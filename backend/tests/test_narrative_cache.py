@@ -0,0 +1,70 @@
+"""
+Unit tests for the analyst narrative cache (fake gateway; no OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import pandas as pd  # noqa: E402
+
+from Analyzer import query_analyzer as qa  # noqa: E402
+from Analyzer.narrative_cache import NarrativeCache, dataframe_fingerprint, narrative_key  # noqa: E402
+
+
+def _completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class TestNarrativeKey(unittest.TestCase):
+    def test_fingerprint_ignores_index_but_not_values(self):
+        df = pd.DataFrame({"player_name": ["A", "B"], "pts": [30.1, 25.0]})
+        self.assertEqual(dataframe_fingerprint(df), dataframe_fingerprint(df.set_index(pd.Index([7, 9]))))
+        changed = df.assign(pts=[30.1, 25.5])
+        self.assertNotEqual(dataframe_fingerprint(df), dataframe_fingerprint(changed))
+
+    def test_question_is_normalized(self):
+        df = pd.DataFrame({"pts": [1]})
+        self.assertEqual(
+            narrative_key("Who scored most?", "scoring", df), narrative_key("who  scored MOST", "scoring", df)
+        )
+        self.assertNotEqual(narrative_key("who scored most", "defense", df), narrative_key("who scored most", "scoring", df))
+
+    def test_lru_eviction(self):
+        cache = NarrativeCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+class TestAnalyzerUsesNarrativeCache(unittest.TestCase):
+    def test_repeat_comparison_skips_the_model_including_the_retry(self):
+        df = pd.DataFrame({"player_name": ["Stephen Curry", "LeBron James"], "pts": [29.4, 27.1]})
+        gateway = mock.Mock()
+        gateway.chat_completion.side_effect = [_completion("Curry."), _completion("Curry edged LeBron. " * 10)]
+        with mock.patch.object(qa, "client", gateway), mock.patch.object(qa, "_narrative_cache", NarrativeCache()):
+            first = qa.analyze_question_with_data("Compare Curry and LeBron scoring", df)
+            second = qa.analyze_question_with_data("compare curry and lebron scoring", df.copy())
+        self.assertEqual(first, second)
+        self.assertIn("Curry edged LeBron", first)
+        sites = [call.args[0] for call in gateway.chat_completion.call_args_list]
+        self.assertEqual(sites, ["analysis_narrative", "analysis_narrative_retry"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the memoized planner-cost check (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer.plan_cost_cache import PlanCostCache, sql_fingerprint  # noqa: E402
+
+
+class TestSqlFingerprint(unittest.TestCase):
+    def test_literals_share_a_fingerprint(self):
+        a = sql_fingerprint("SELECT pts FROM all_players_regular_2010_2011 WHERE player_name ILIKE '%LeBron%' LIMIT 5")
+        b = sql_fingerprint("SELECT pts FROM all_players_regular_2010_2011 WHERE player_name ILIKE '%Curry%' LIMIT 5")
+        self.assertEqual(a, b)
+
+    def test_limits_do_not_share_a_fingerprint(self):
+        a = sql_fingerprint("SELECT * FROM player_game_logs LIMIT 10")
+        b = sql_fingerprint("SELECT * FROM player_game_logs LIMIT 1000000")
+        self.assertNotEqual(a, b)
+        c = sql_fingerprint("SELECT * FROM player_game_logs LIMIT 10 OFFSET 500")
+        self.assertNotEqual(a, c)
+
+    def test_tables_do_not_share_a_fingerprint(self):
+        a = sql_fingerprint("SELECT pts FROM all_players_regular_2010_2011")
+        b = sql_fingerprint("SELECT pts FROM player_game_logs")
+        self.assertNotEqual(a, b)
+
+
+class TestPlanCostCache(unittest.TestCase):
+    def test_skips_explain_only_when_well_under_cap(self):
+        cache = PlanCostCache(skip_ratio=0.5)
+        self.assertIsNone(cache.lookup("fp", 1000))
+        cache.record("fp", 400)
+        self.assertEqual(cache.lookup("fp", 1000), 400)
+        self.assertIsNone(cache.lookup("fp", 600))
+        stats = cache.stats()
+        self.assertEqual((stats["explains_run"], stats["saved_round_trips"]), (1, 1))
+
+    def test_keeps_highest_estimate(self):
+        cache = PlanCostCache(skip_ratio=0.5)
+        cache.record("fp", 900)
+        cache.record("fp", 10)
+        self.assertIsNone(cache.lookup("fp", 1000))
+
+    def test_stats_version_change_invalidates(self):
+        cache = PlanCostCache(stats_check_seconds=0)
+        versions = iter([("t1", 10), ("t1", 10), ("t2", 10)])
+        cache.check_stats_version(lambda: next(versions))
+        cache.record("fp", 1)
+        cache.check_stats_version(lambda: next(versions))
+        self.assertEqual(cache.lookup("fp", 100), 1)
+        cache.check_stats_version(lambda: next(versions))
+        self.assertIsNone(cache.lookup("fp", 100))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_stats_version_rechecked_only_when_due(self):
+        cache = PlanCostCache(stats_check_seconds=3600)
+        calls = []
+        cache.check_stats_version(lambda: calls.append(1) or ("t1", 1))
+        cache.check_stats_version(lambda: calls.append(1) or ("t2", 1))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Unit tests for the in-memory player name index (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer.player_index import (  # noqa: E402
+    PlayerIndex,
+    fold_name,
+    player_ids_for_name_filter,
+    player_index_sql,
+    rewrite_player_name_filters_to_ids,
+)
+from Executer.schema_catalog import SchemaCatalog  # noqa: E402
+
+_ROWS = [
+    (1629029, "Luka Dončić", "Luka"),
+    (2544, "LeBron James", "LeBron"),
+    (2544, "LeBron James", "LeBron"),
+    (201939, "Stephen Curry", "Stephen"),
+    (203999, "Nikola Jokić", "Nikola"),
+    (1628983, "Shai Gilgeous-Alexander", "Shai"),
+    (202691, "Klay Thompson", "Klay"),
+]
+_ALIASES = {"steph": ["Stephen Curry", "Steph Curry"], "sga": ["Shai Gilgeous-Alexander"]}
+
+
+class TestPlayerIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PlayerIndex(_ROWS)
+
+    def test_fold_name_strips_accents_and_punctuation(self):
+        self.assertEqual(fold_name("  Luka  Dončić "), "luka doncic")
+        self.assertEqual(fold_name("Shai Gilgeous-Alexander"), "shai gilgeous alexander")
+
+    def test_exact_and_accent_folded_lookup(self):
+        self.assertEqual(self.index.resolve("Luka Doncic"), [1629029])
+        self.assertEqual(self.index.resolve("nikola jokic"), [203999])
+        self.assertEqual(len(self.index), 6)
+
+    def test_token_prefix_lookup(self):
+        self.assertEqual(self.index.resolve("Luka Don"), [1629029])
+        self.assertEqual(self.index.resolve("Gilgeous Alexander"), [1628983])
+        self.assertEqual(self.index.resolve("Michael Jordan"), [])
+
+    def test_aliases(self):
+        self.assertEqual(self.index.resolve("Steph", aliases=_ALIASES), [201939])
+        self.assertTrue(self.index.contains("SGA", aliases=_ALIASES))
+        self.assertFalse(self.index.contains("SGA"))
+
+    def test_did_you_mean(self):
+        self.assertEqual(self.index.suggest("Stephan Cury")[0], "Stephen Curry")
+        self.assertEqual(self.index.suggest("Klay Thomson")[0], "Klay Thompson")
+        self.assertEqual(self.index.suggest("zzzz"), [])
+
+
+class TestSeasonPresence(unittest.TestCase):
+    def setUp(self):
+        rows = [
+            (1641705, "Victor Wembanyama", "Victor", 2023, "regular"),
+            (1641705, "Victor Wembanyama", "Victor", 2024, "regular"),
+            (2544, "LeBron James", "LeBron", 2003, "regular"),
+            (2544, "LeBron James", "LeBron", 2005, "playoffs"),
+            (2544, "LeBron James", "LeBron", 2004, "regular"),
+            (None, "George Mikan", None, 1948, "regular"),
+        ]
+        self.index = PlayerIndex(rows)
+
+    def test_seasons_by_type(self):
+        self.assertTrue(self.index.has_seasons)
+        self.assertEqual(self.index.seasons([1641705], "regular"), [2023, 2024])
+        self.assertEqual(self.index.seasons([2544], "playoffs"), [2005])
+        self.assertEqual(self.index.seasons(self.index.resolve("George Mikan"), "regular"), [1948])
+        self.assertEqual(self.index.seasons([1641705, 2544], "regular"), [2003, 2004, 2023, 2024])
+        self.assertFalse(PlayerIndex(_ROWS).has_seasons)
+
+    def test_name_only_where_clauses_resolve(self):
+        where = "(player_name ILIKE '%Wembanyama%' OR player_name ILIKE '%LeBron James%')"
+        self.assertEqual(player_ids_for_name_filter(where, self.index), {1641705, 2544})
+        self.assertIsNone(player_ids_for_name_filter("player_name ILIKE '%LeBron%' AND gp > 10", self.index))
+        self.assertIsNone(player_ids_for_name_filter("player_name ILIKE '%Michael Jordan%'", self.index))
+
+
+class TestPlayerIndexSql(unittest.TestCase):
+    def test_single_query_over_all_season_tables(self):
+        catalog = SchemaCatalog.from_rows(
+            [
+                ("all_players_regular_1996_1997", "player_name", "text"),
+                ("all_players_regular_2024_2025", "player_id", "bigint"),
+                ("all_players_regular_2024_2025", "player_name", "text"),
+                ("all_players_regular_2024_2025", "nickname", "text"),
+                ("all_players_playoffs_2024_2025", "player_name", "text"),
+            ]
+        )
+        sql = player_index_sql(catalog)
+        self.assertEqual(sql.count(" UNION "), 2)
+        self.assertIn('NULL::bigint AS player_id, player_name::text AS player_name, NULL::text AS nickname FROM public."all_players_regular_1996_1997"', sql)
+        self.assertIn("SELECT 2024 AS season_start, 'playoffs' AS season_type, NULL::bigint", sql)
+
+
+class TestPlayerIdRewrite(unittest.TestCase):
+    def setUp(self):
+        self.index = PlayerIndex(_ROWS)
+        self.catalog = SchemaCatalog.from_rows(
+            [
+                ("all_players_regular_2024_2025", "player_id", "bigint"),
+                ("all_players_regular_2024_2025", "player_name", "text"),
+                ("nba_advanced_season_2024_25_per_mode_p", "PLAYER_ID", "text"),
+                ("nba_advanced_season_2024_25_per_mode_p", "PLAYER_NAME", "text"),
+            ]
+        )
+
+    def test_expanded_filter_becomes_id_lookup(self):
+        sql = (
+            "SELECT * FROM public.all_players_regular_2024_2025 WHERE "
+            "(player_name ILIKE '%Luka Doncic%' OR (player_name ILIKE '%Luka%' AND player_name ILIKE '%Don%'))"
+        )
+        out = rewrite_player_name_filters_to_ids(sql, self.index, self.catalog)
+        self.assertTrue(out.endswith("WHERE (player_id = ANY(ARRAY[1629029]))"))
+
+    def test_plain_filter_with_alias_prefix(self):
+        sql = "SELECT p.pts FROM all_players_regular_2024_2025 p WHERE p.player_name ILIKE '%Steph%'"
+        out = rewrite_player_name_filters_to_ids(sql, self.index, self.catalog, _ALIASES)
+        self.assertIn("p.player_id = ANY(ARRAY[201939])", out)
+
+    def test_falls_back_to_ilike(self):
+        unknown = "SELECT * FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%Michael Jordan%'"
+        self.assertEqual(rewrite_player_name_filters_to_ids(unknown, self.index, self.catalog), unknown)
+        text_family = (
+            'SELECT * FROM nba_advanced_season_2024_25_per_mode_p WHERE "PLAYER_NAME" ILIKE \'%Luka Doncic%\''
+        )
+        self.assertEqual(rewrite_player_name_filters_to_ids(text_family, self.index, self.catalog), text_family)
+        self.assertEqual(rewrite_player_name_filters_to_ids(unknown, None, self.catalog), unknown)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Tests for the player_season fact table build and the UNION ALL collapse rewriter
+(no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from Executer.player_season import build_statements, player_season_coverage  # noqa: E402
+from Executer.schema_catalog import SchemaCatalog  # noqa: E402
+from Interpreter import interpreter as intr  # noqa: E402
+
+_COLS = ["player_id", "player_name", "team_abbreviation", "gp", "pts"]
+
+
+def _catalog(with_fact_table=True):
+    rows = []
+    for table in (
+        "all_players_regular_2022_2023",
+        "all_players_regular_2023_2024",
+        "all_players_playoffs_2023_2024",
+        "all_players_regular_2025_2026",
+    ):
+        rows += [(table, c, "double precision") for c in _COLS]
+    rows.append(("all_players_regular_2023_2024", "nickname", "text"))
+    if with_fact_table:
+        comment = json.dumps({"coverage": {"regular": [2022, 2023], "playoffs": [2023]}})
+        fact_cols = ["season_start", "season_label", "season_type"] + _COLS
+        rows += [("player_season", c, "text", comment if i == 0 else None) for i, c in enumerate(fact_cols)]
+    return SchemaCatalog.from_rows(rows)
+
+
+def _leg(start, name, table_type="regular"):
+    label = f"{start}-{str(start + 1)[-2:]}"
+    return (
+        f"SELECT {start} AS season_start, '{label}' AS season_label, player_name, gp, pts "
+        f"FROM all_players_{table_type}_{start}_{start + 1} WHERE player_name ILIKE '%{name}%'"
+    )
+
+
+class TestBuildStatements(unittest.TestCase):
+    def test_closed_seasons_only_with_shared_columns(self):
+        statements, coverage = build_statements(_catalog(with_fact_table=False), max_start=2024)
+        self.assertEqual(coverage, {"regular": [2022, 2023], "playoffs": [2023]})
+        create = next(s for s in statements if s.startswith("CREATE TABLE"))
+        self.assertEqual(create.count("UNION ALL"), 2)
+        self.assertNotIn("2025_2026", create)
+        self.assertNotIn("nickname", create)
+        self.assertTrue(statements[-1].startswith("COMMENT ON TABLE"))
+
+    def test_coverage_read_from_table_comment(self):
+        self.assertEqual(player_season_coverage(_catalog())["regular"], {2022, 2023})
+        self.assertIsNone(player_season_coverage(_catalog(with_fact_table=False)))
+
+
+class TestCollapseSeasonUnions(unittest.TestCase):
+    def test_derived_union_becomes_single_scan(self):
+        legs = [_leg(2022, "LeBron"), _leg(2023, "LeBron"), _leg(2022, "Durant"), _leg(2023, "Durant")]
+        sql = f"SELECT DISTINCT season_start, season_label, player_name FROM ({' UNION ALL '.join(legs)}) AS by_season LIMIT 500;"
+        out = intr._collapse_season_unions_to_fact_table(sql, _catalog())
+        self.assertNotIn("UNION ALL", out)
+        self.assertIn('FROM public."player_season"', out)
+        self.assertIn("season_start IN (2022, 2023) AND (player_name ILIKE '%Durant%')", out)
+        self.assertTrue(out.endswith("AS by_season LIMIT 500;"))
+
+    def test_uncovered_current_season_stays_a_leg(self):
+        sql = f"SELECT * FROM ({_leg(2022, 'x')} UNION ALL {_leg(2023, 'x')} UNION ALL {_leg(2025, 'x')}) AS t"
+        out = intr._collapse_season_unions_to_fact_table(sql, _catalog())
+        self.assertEqual(out.count("UNION ALL"), 1)
+        self.assertIn("all_players_regular_2025_2026", out)
+
+    def test_top_level_union_keeps_order_and_limit(self):
+        sql = f"{_leg(2022, 'x')} UNION ALL {_leg(2023, 'x', 'playoffs')} ORDER BY pts DESC LIMIT 5"
+        out = intr._collapse_season_unions_to_fact_table(sql, _catalog())
+        self.assertIn("season_type = 'playoffs' AND season_start IN (2023)", out)
+        self.assertTrue(out.endswith("ORDER BY pts DESC LIMIT 5"))
+
+    def test_unknown_column_or_missing_table_is_left_alone(self):
+        sql = f"SELECT * FROM ({_leg(2022, 'x')} UNION ALL {_leg(2023, 'x')}) AS t".replace("pts", "nickname")
+        self.assertEqual(intr._collapse_season_unions_to_fact_table(sql, _catalog()), sql)
+        plain = f"SELECT * FROM ({_leg(2022, 'x')} UNION ALL {_leg(2023, 'x')}) AS t"
+        self.assertEqual(intr._collapse_season_unions_to_fact_table(plain, _catalog(with_fact_table=False)), plain)
+
+    def test_star_legs_are_left_alone(self):
+        legs = [
+            f"SELECT * FROM all_players_regular_{start}_{start + 1} WHERE player_id = 1" for start in (2022, 2023, 2025)
+        ]
+        sql = " UNION ALL ".join(legs)
+        self.assertEqual(intr._collapse_season_unions_to_fact_table(sql, _catalog()), sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
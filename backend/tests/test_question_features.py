@@ -0,0 +1,55 @@
+"""
+Unit tests for shared question feature extraction (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.question_features import question_features  # noqa: E402
+
+
+class TestQuestionFeatures(unittest.TestCase):
+    def test_wrapped_question_uses_current_segment(self):
+        f = question_features(
+            "Conversation context:\nUser: LeBron in 2012\n\nCurrent question: what about his 2nd year in the playoffs"
+        )
+        self.assertEqual(f.text, "what about his 2nd year in the playoffs")
+        self.assertEqual(f.nth_season, 2)
+        self.assertTrue(f.is_playoffs)
+        self.assertEqual(f.years, ())
+
+    def test_seasons_top_n_and_names(self):
+        f = question_features("Top 10 scorers in the 2019 playoffs")
+        self.assertEqual(f.top_n, 10)
+        self.assertEqual(f.bare_year, (2019, True))
+        self.assertEqual(f.season_window, (2018, 2019, True))
+        self.assertEqual(f.season_start_span, (2018, 2018, True))
+
+        f = question_features("Compare Stephen Curry and Kevin Durant from 2015 to 2020")
+        self.assertEqual(f.names, ("Stephen Curry", "Kevin Durant"))
+        self.assertEqual(f.years, (2015, 2020))
+        self.assertEqual(f.season_start_span, (2015, 2020, False))
+        self.assertTrue(f.is_over_time)
+        self.assertFalse(f.is_single_player_profile)
+
+    def test_features_are_cached_and_immutable(self):
+        first = question_features("Show Jokic net rating in 2023-24")
+        self.assertIs(question_features("Show Jokic net rating in 2023-24"), first)
+        self.assertTrue(first.is_advanced_metrics)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            first.top_n = 3
+
+
+if __name__ == "__main__":
+    unittest.main()
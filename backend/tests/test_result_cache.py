@@ -0,0 +1,111 @@
+"""
+Unit tests for the query result cache (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import pandas as pd  # noqa: E402
+
+from Executer.result_cache import (  # noqa: E402
+    FOREVER,
+    ResultCache,
+    dataframe_nbytes,
+    is_cacheable_sql,
+    table_refs,
+    ttl_for_tables,
+)
+
+
+class TestTtlPolicy(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(
+            os.environ,
+            {"CURRENT_SEASON_START": "2025", "RESULT_CACHE_LIVE_TTL": "60", "RESULT_CACHE_DEFAULT_TTL": "600"},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_closed_seasons_cached_forever(self):
+        self.assertIs(ttl_for_tables(["all_players_regular_1996_1997", "all_players_regular_2024_2025"]), FOREVER)
+        self.assertIs(ttl_for_tables(["nba_advanced_season_2023_24_season_type_regular_season_per"]), FOREVER)
+
+    def test_live_tables_expire_quickly(self):
+        self.assertEqual(ttl_for_tables(["player_game_logs"]), 60)
+        self.assertEqual(ttl_for_tables(["nba_standings_season_2025_26_leaguestandingsv3"]), 60)
+        self.assertEqual(ttl_for_tables(["all_players_regular_2025_2026"]), 60)
+
+    def test_shortest_ttl_wins(self):
+        self.assertEqual(ttl_for_tables(["all_players_regular_2010_2011", "player_game_logs"]), 60)
+        self.assertEqual(ttl_for_tables(["all_players_regular_2010_2011", "court_shots"]), 600)
+
+    def test_comma_join_tables_are_all_referenced(self):
+        sql = (
+            "SELECT a.player_name, g.pts FROM all_players_regular_2018_2019 a, player_game_logs g "
+            "WHERE a.player_id = g.player_id"
+        )
+        self.assertEqual(table_refs(sql), ["all_players_regular_2018_2019", "player_game_logs"])
+        self.assertEqual(ttl_for_tables(table_refs(sql)), 60)
+        with_cte = "WITH recent AS (SELECT * FROM public.player_game_logs) SELECT * FROM recent"
+        self.assertEqual(table_refs(with_cte), ["player_game_logs"])
+
+    def test_non_deterministic_sql_not_cacheable(self):
+        self.assertFalse(is_cacheable_sql("SELECT * FROM player_game_logs WHERE game_date > now() - interval '7 days'"))
+        self.assertTrue(is_cacheable_sql("SELECT player_name FROM all_players_regular_2010_2011"))
+
+
+class TestResultCache(unittest.TestCase):
+    def _df(self, n=10):
+        return pd.DataFrame({"player_name": [f"p{i}" for i in range(n)], "pts": range(n)})
+
+    def test_hit_returns_copy_and_counts(self):
+        cache = ResultCache(max_bytes=1_000_000)
+        cache.put("q", self._df(), FOREVER)
+        first = cache.get("q")
+        first.loc[0, "pts"] = 999
+        second = cache.get("q")
+        self.assertEqual(second.loc[0, "pts"], 0)
+        self.assertIsNone(cache.get("missing"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_expired_entry_is_a_miss(self):
+        cache = ResultCache(max_bytes=1_000_000)
+        with mock.patch("Executer.result_cache.time.monotonic", return_value=100.0):
+            cache.put("q", self._df(), 5)
+        with mock.patch("Executer.result_cache.time.monotonic", return_value=106.0):
+            self.assertIsNone(cache.get("q"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction_by_bytes(self):
+        size = dataframe_nbytes(self._df())
+        cache = ResultCache(max_bytes=size * 2, max_entry_bytes=size)
+        cache.put("a", self._df(), FOREVER)
+        cache.put("b", self._df(), FOREVER)
+        cache.get("a")
+        cache.put("c", self._df(), FOREVER)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.stats()["bytes"], size * 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_oversize_result_not_stored(self):
+        cache = ResultCache(max_bytes=100)
+        self.assertFalse(cache.put("big", self._df(1000), FOREVER))
+        self.assertEqual(cache.stats()["oversize"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
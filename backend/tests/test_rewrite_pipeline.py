@@ -0,0 +1,142 @@
+"""
+Unit tests for the SQL rewrite pass pipeline (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import sqlglot  # noqa: E402
+from sqlglot import exp  # noqa: E402
+
+from Interpreter import rewrite_pipeline  # noqa: E402
+from Interpreter.rewrite_pipeline import (  # noqa: E402
+    RewriteContext,
+    RewritePass,
+    RewritePipeline,
+    RewriteStats,
+)
+from Interpreter import interpreter  # noqa: E402
+
+
+class TestRewritePipeline(unittest.TestCase):
+    def test_passes_run_in_order_and_gates_skip(self):
+        stats = RewriteStats()
+        pipeline = RewritePipeline(
+            [
+                RewritePass("upper", lambda sql, c: sql.upper()),
+                RewritePass("never", lambda sql, c: sql + " never", lambda c: False),
+                RewritePass("suffix", lambda sql, c: sql + " LIMIT 5"),
+            ],
+            stats,
+        )
+        out = pipeline.run("select 1", RewriteContext("q"))
+        self.assertEqual(out, "SELECT 1 LIMIT 5")
+        snap = stats.snapshot()
+        self.assertEqual(snap["never"]["skipped"], 1)
+        self.assertEqual(snap["never"]["runs"], 0)
+        self.assertEqual(snap["upper"]["changed"], 1)
+        self.assertGreaterEqual(snap["suffix"]["total_ms"], 0.0)
+
+    def test_gate_is_evaluated_once_per_context(self):
+        calls = []
+
+        def gate(ctx):
+            calls.append(ctx.question)
+            return True
+
+        pipeline = RewritePipeline([RewritePass("noop", lambda sql, c: sql, gate)])
+        ctx = RewriteContext("who led the league in assists")
+        pipeline.run("select 1", ctx)
+        pipeline.run("select 2", ctx)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(pipeline.stats.snapshot()["noop"]["changed"], 0)
+
+    def test_concatenated_pipelines_share_stats(self):
+        stats = RewriteStats()
+        first = RewritePipeline([RewritePass("a", lambda sql, c: sql + "a")], stats)
+        second = RewritePipeline([RewritePass("b", lambda sql, c: sql + "b")], stats)
+        combined = first + second
+        self.assertEqual(combined.run("", RewriteContext("q")), "ab")
+        self.assertIs(combined.stats, stats)
+        self.assertEqual(set(stats.snapshot()), {"a", "b"})
+
+    def test_consecutive_tree_passes_share_one_parse(self):
+        def rename(tree, ctx):
+            tree = tree.copy()
+            tree.find(exp.Table).this.set("this", "b")
+            return tree
+
+        seen = []
+        pipeline = RewritePipeline(
+            [
+                RewritePass("rename", rename, tree=True),
+                RewritePass("seen", lambda tree, c: seen.append(tree), tree=True),
+                RewritePass("suffix", lambda sql, c: sql + " LIMIT 5"),
+            ]
+        )
+        ctx = RewriteContext("q")
+        with mock.patch.object(rewrite_pipeline.sqlglot, "parse_one", wraps=sqlglot.parse_one) as parse:
+            out = pipeline.run("SELECT x FROM a", ctx)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(out, "SELECT x FROM b LIMIT 5")
+        self.assertEqual(seen[0].sql(), "SELECT x FROM b")
+        self.assertIs(ctx.parsed("SELECT x FROM b"), seen[0])
+        self.assertEqual(pipeline.stats.snapshot()["seen"]["changed"], 0)
+
+    def test_unparseable_sql_skips_tree_passes(self):
+        pipeline = RewritePipeline([RewritePass("tree", lambda tree, c: exp.select("1"), tree=True)])
+        self.assertEqual(pipeline.run("SELEC FROM (", RewriteContext("q")), "SELEC FROM (")
+
+
+class TestTreeRewrites(unittest.TestCase):
+    def test_start_year_renames_tables_and_qualifiers(self):
+        out = interpreter._enforce_start_year_table_mapping(
+            "SELECT all_players_regular_2020_2021.pts FROM all_players_regular_2020_2021 "
+            "WHERE team_abbreviation = 'all_players_regular_2020_2021'",
+            "top scorers in 2015",
+        )
+        self.assertEqual(
+            out,
+            "SELECT all_players_regular_2015_2016.pts FROM all_players_regular_2015_2016 "
+            "WHERE team_abbreviation = 'all_players_regular_2020_2021'",
+        )
+
+    def test_career_rewrite_reuses_the_where_clause_from_the_tree(self):
+        sql = (
+            "SELECT player_name, pts FROM all_players_regular_2020_2021 WHERE team_abbreviation = 'LAL' "
+            "UNION ALL SELECT player_name, pts FROM all_players_regular_2019_2020 WHERE team_abbreviation = 'LAL' "
+            "ORDER BY pts DESC LIMIT 10"
+        )
+        out = interpreter._rewrite_career_aggregate_to_by_season(sql, "Lakers scoring over time")
+        self.assertEqual(out.count("WHERE team_abbreviation = 'LAL'"), 2)
+        self.assertLess(out.index("all_players_regular_2019_2020"), out.index("all_players_regular_2020_2021"))
+        self.assertTrue(out.endswith("AS by_season ORDER BY season_start ASC LIMIT 50"))
+
+    def test_nth_season_leg_points_at_the_players_nth_season(self):
+        with mock.patch.object(interpreter, "_available_season_starts", lambda conn, t: [2003, 2004, 2005]), \
+                mock.patch.object(interpreter, "_player_seasons_for_where", lambda conn, t, w: [2003, 2004, 2005]):
+            out = interpreter._enforce_nth_season_table_mapping(
+                "SELECT player_name, pts FROM all_players_regular_2024_2025 WHERE player_name ILIKE '%LeBron James%'",
+                "LeBron James 2nd season",
+                conn=None,
+            )
+        self.assertEqual(
+            out,
+            "SELECT player_name, pts, '2004-05' AS season_label, 2004 AS season_start "
+            "FROM all_players_regular_2004_2005 WHERE player_name ILIKE '%LeBron James%'",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
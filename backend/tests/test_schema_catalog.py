@@ -0,0 +1,142 @@
+"""
+Unit tests for the bulk schema catalog (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer import executor  # noqa: E402
+from Executer.executor import describe_schema  # noqa: E402
+from Executer.schema_catalog import SchemaCatalog, classify_table, load_snapshot, save_snapshot  # noqa: E402
+
+_ROWS = [
+    ("all_players_regular_2022_2023", "player_name", "text"),
+    ("all_players_regular_2022_2023", "pts", "double precision"),
+    ("all_players_regular_2023_2024", "player_name", "text"),
+    ("all_players_regular_2023_2024", "pts", "double precision"),
+    ("all_players_playoffs_2023_2024", "player_name", "text"),
+    ("nba_advanced_season_2022_23_season_type_regular_season_per", "PLAYER_NAME", "text"),
+    ("nba_advanced_season_2023_24_season_type_playoffs_per_mode_p", "PLAYER_NAME", "text"),
+    ("nba_hustle_season_2024_25_season_type_regular_season_per_mo", "PLAYER_NAME", "text"),
+    ("player_game_logs", "player_name", "text"),
+]
+
+
+class _FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+
+    def fetchall(self):
+        return list(_ROWS)
+
+    def close(self):
+        pass
+
+
+class _FakeConn:
+    def __init__(self):
+        self.queries = []
+
+    def cursor(self):
+        return _FakeCursor(self.queries)
+
+
+class TestClassifyTable(unittest.TestCase):
+    def test_season_families(self):
+        info = classify_table("all_players_playoffs_1999_2000")
+        self.assertEqual((info.family, info.season_start, info.season_type), ("all_players_playoffs", 1999, "playoffs"))
+        info = classify_table("nba_advanced_season_2023_24_season_type_regular_season_per")
+        self.assertEqual((info.family, info.season_start, info.season_type), ("nba_advanced", 2023, "regular"))
+        info = classify_table("nba_player_tracking_pt_posttouch_season_2025_26_season_type")
+        self.assertEqual(info.family, "nba_player_tracking_pt_posttouch")
+
+    def test_non_season_table(self):
+        info = classify_table("player_game_logs")
+        self.assertEqual((info.family, info.season_start), ("player_game_logs", None))
+
+
+class TestSchemaCatalog(unittest.TestCase):
+    def test_single_query_load_and_indexes(self):
+        conn = _FakeConn()
+        catalog = SchemaCatalog.load(conn)
+        self.assertEqual(len(conn.queries), 1)
+        self.assertEqual(catalog.season_starts("all_players_regular"), [2022, 2023])
+        self.assertEqual(catalog.season_starts("nba_advanced", "playoffs"), [2023])
+        self.assertEqual(
+            catalog.season_table("nba_advanced", 2022, "regular"),
+            "nba_advanced_season_2022_23_season_type_regular_season_per",
+        )
+        self.assertEqual(catalog.column_types("all_players_regular_2023_2024")["pts"], "double precision")
+
+    def test_round_trips_through_dict(self):
+        catalog = SchemaCatalog.from_rows(_ROWS)
+        restored = SchemaCatalog.from_dict(catalog.to_dict())
+        self.assertEqual(restored.table_names(), catalog.table_names())
+        self.assertEqual(restored.columns("player_game_logs"), ["player_name"])
+
+    def test_prompt_text_uses_latest_sample_columns(self):
+        text = describe_schema(SchemaCatalog.from_rows(_ROWS))
+        self.assertIn("Available (2): 2022-2023, 2023-2024", text)
+        self.assertIn("player_game_logs(player_name)", text)
+        self.assertIn("nba_hustle_season_* (1 tables", text)
+
+    def test_prompt_text_can_be_limited_to_sections(self):
+        text = describe_schema(SchemaCatalog.from_rows(_ROWS), {"all_players", "player_game_logs"})
+        self.assertIn("=== Regular Season Tables ===", text)
+        self.assertIn("player_game_logs(player_name)", text)
+        self.assertNotIn("Advanced Season Tables", text)
+        self.assertNotIn("nba_hustle_season_*", text)
+
+
+class TestSchemaSnapshot(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "schema_catalog.json")
+        for patcher in (
+            mock.patch.object(executor, "_SCHEMA_SNAPSHOT_PATH", self.path),
+            mock.patch.dict(executor._schema_cache, {"value": None, "catalog": None, "fetched_at": 0.0}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_snapshot_round_trip(self):
+        save_snapshot(SchemaCatalog.from_rows(_ROWS), self.path, 123.0)
+        catalog, fetched_at = load_snapshot(self.path)
+        self.assertEqual(fetched_at, 123.0)
+        self.assertIn("player_game_logs", catalog)
+
+    def test_missing_snapshot_builds_inline_and_writes_file(self):
+        conn = _FakeConn()
+        executor.get_schema_catalog(conn)
+        self.assertEqual(len(conn.queries), 1)
+        self.assertIsNotNone(load_snapshot(self.path))
+
+    def test_stale_snapshot_served_while_refreshing(self):
+        save_snapshot(SchemaCatalog.from_rows(_ROWS), self.path, time.time() - 10_000)
+        conn = _FakeConn()
+        with mock.patch.object(executor, "_refresh_schema_in_background") as refresh:
+            catalog = executor.get_schema_catalog(conn)
+        self.assertIn("player_game_logs", catalog)
+        self.assertEqual(conn.queries, [])
+        refresh.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Unit tests for single-flight request coalescing (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.single_flight import SingleFlight, question_flight_key  # noqa: E402
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_keys_share_one_run(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def compute(value):
+            runs.append(value)
+            await asyncio.sleep(0.01)
+            return {"answer": value}
+
+        async def main():
+            return await asyncio.gather(
+                flights.run("q", lambda: compute(1)),
+                flights.run("q", lambda: compute(2)),
+                flights.run("other", lambda: compute(3)),
+            )
+
+        results = asyncio.run(main())
+        self.assertEqual(results, [{"answer": 1}, {"answer": 1}, {"answer": 3}])
+        self.assertEqual(runs, [1, 3])
+        self.assertEqual(flights.stats(), {"leaders": 2, "coalesced": 1, "in_flight": 0})
+
+    def test_failures_reach_every_waiter_and_are_not_remembered(self):
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("query failed")
+
+        async def main():
+            outcomes = await asyncio.gather(
+                flights.run("q", fail), flights.run("q", fail), return_exceptions=True
+            )
+            retry = await flights.run("q", lambda: asyncio.sleep(0, result="ok"))
+            return outcomes, retry
+
+        outcomes, retry = asyncio.run(main())
+        self.assertTrue(all(isinstance(o, ValueError) for o in outcomes))
+        self.assertEqual(retry, "ok")
+
+    def test_leader_cancellation_does_not_cancel_followers(self):
+        flights = SingleFlight()
+
+        async def main():
+            leader = asyncio.ensure_future(flights.run("q", lambda: asyncio.sleep(0.02, result="done")))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.run("q", lambda: asyncio.sleep(0, result="other")))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), "done")
+
+    def test_question_key_ignores_case_and_spacing(self):
+        self.assertEqual(question_flight_key("  Top  scorers\nTHIS season "), "top scorers this season")
+
+
+if __name__ == "__main__":
+    unittest.main()
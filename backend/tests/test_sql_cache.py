@@ -0,0 +1,97 @@
+"""
+Unit tests for the NL→SQL cache (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.sql_cache import (  # noqa: E402
+    DataVersionProbe,
+    SqlCache,
+    normalize_question,
+    question_key,
+)
+
+_ALIASES = {"steph": ["Stephen Curry"], "lebron": ["LeBron James"], "kd": ["Kevin Durant"]}
+_CLOSED_SQL = "SELECT pts FROM public.all_players_regular_2015_2016 WHERE player_id = 201939"
+_LIVE_SQL = "SELECT pts FROM public.player_game_logs WHERE player_id = 201939"
+
+
+class TestNormalizeQuestion(unittest.TestCase):
+    def test_case_punctuation_accents_and_aliases(self):
+        self.assertEqual(normalize_question("  Steph 3PT%  in 2016?", _ALIASES), "stephen curry 3pt in 2016")
+        self.assertEqual(normalize_question("Luka Dončić, 2024!"), "luka doncic 2024")
+        self.assertEqual(
+            normalize_question("LeBron James stats", _ALIASES), normalize_question("lebron stats", _ALIASES)
+        )
+
+    def test_short_aliases_are_not_folded(self):
+        self.assertEqual(normalize_question("KD stats", _ALIASES), "kd stats")
+
+    def test_key_depends_on_schema(self):
+        self.assertNotEqual(question_key("q", "schema-a"), question_key("q", "schema-b"))
+
+
+class TestSqlCache(unittest.TestCase):
+    def test_closed_season_sql_ignores_data_version(self):
+        cache = SqlCache()
+        cache.put("k", _CLOSED_SQL, "v1")
+        self.assertEqual(cache.get("k", "v2"), _CLOSED_SQL)
+
+    def test_live_sql_misses_after_data_version_changes(self):
+        cache = SqlCache()
+        cache.put("k", _LIVE_SQL, "v1")
+        self.assertEqual(cache.get("k", "v1"), _LIVE_SQL)
+        self.assertIsNone(cache.get("k", "v2"))
+        cache.put("unversioned", _LIVE_SQL, None)
+        self.assertIsNone(cache.get("unversioned", None))
+        self.assertEqual(cache.stats()["stale"], 1)
+
+    def test_ttl_and_lru_bounds(self):
+        cache = SqlCache(max_entries=2, ttl_seconds=0)
+        cache.put("k", _CLOSED_SQL, None)
+        self.assertIsNone(cache.get("k", None))
+        cache = SqlCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, _CLOSED_SQL, None)
+        self.assertIsNone(cache.get("a", None))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_disk_tier_survives_a_new_instance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nl_sql.sqlite")
+            SqlCache(disk_path=path).put("k", _CLOSED_SQL, None)
+            restarted = SqlCache(disk_path=path)
+            self.assertEqual(restarted.get("k", None), _CLOSED_SQL)
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+            restarted.invalidate("k")
+            self.assertIsNone(SqlCache(disk_path=path).get("k", None))
+
+
+class TestDataVersionProbe(unittest.TestCase):
+    def test_reads_are_throttled_and_failures_return_none(self):
+        calls = []
+        probe = DataVersionProbe(check_seconds=60)
+        self.assertEqual(probe.current(lambda: calls.append(1) or "v1"), "v1")
+        self.assertEqual(probe.current(lambda: calls.append(1) or "v2"), "v1")
+        self.assertEqual(len(calls), 1)
+
+        def _boom():
+            raise RuntimeError("db down")
+
+        self.assertIsNone(DataVersionProbe().current(_boom))
+
+
+if __name__ == "__main__":
+    unittest.main()
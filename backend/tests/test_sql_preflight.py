@@ -0,0 +1,111 @@
+"""
+Unit tests for catalog-based SQL pre-flight validation (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer.schema_catalog import SchemaCatalog  # noqa: E402
+from Executer.sql_preflight import SqlPreflightError, auto_repair_sql, check_sql, preflight_sql  # noqa: E402
+
+_TRACKING = "nba_player_tracking_pt_season_2023_24_season_type_regular_season_per_mode_p"
+
+
+def _catalog() -> SchemaCatalog:
+    rows = [("all_players_regular_2023_2024", c, "double precision") for c in ("player_name", "gp", "pts", "fg_pct")]
+    rows += [("player_game_logs", c, "text") for c in ("player_name", "game_date", "pts", "fgm", "fga")]
+    rows += [
+        ("nba_advanced_season_2023_24_season_type_regular_season_per", c, "text")
+        for c in ("PLAYER_NAME", "TS_PCT", "USG_PCT")
+    ]
+    rows += [
+        ("nba_hustle_season_2023_24_season_type_regular_season_per_mo", c, "text")
+        for c in ("PLAYER_NAME", "DEFLECTIONS")
+    ]
+    rows += [(_TRACKING[:63], c, "text") for c in ("PLAYER_NAME", "DIST_MILES")]
+    rows += [("team_advanced_season_2023_24", c, "text") for c in ("TEAM_NAME", "NET_RATING")]
+    return SchemaCatalog.from_rows(rows)
+
+
+class TestSqlPreflight(unittest.TestCase):
+    def test_valid_sql_passes_unchanged(self):
+        sql = (
+            'SELECT player_name, pts AS points FROM public."all_players_regular_2023_2024" '
+            "WHERE gp > 10 ORDER BY points DESC"
+        )
+        self.assertEqual(preflight_sql(sql, _catalog()), sql)
+
+    def test_text_storage_columns_are_quoted_and_uppercased(self):
+        result = check_sql("SELECT t.team_name, t.Net_Rating FROM team_advanced_season_2023_24 t", _catalog())
+        self.assertEqual(result.problems, [])
+        self.assertIn('t."TEAM_NAME", t."NET_RATING"', result.sql)
+
+    def test_untruncated_table_name_maps_to_the_stored_name(self):
+        result = check_sql(f"SELECT PLAYER_NAME, dist_miles FROM public.{_TRACKING}", _catalog())
+        self.assertEqual(result.problems, [])
+        self.assertIn(f"FROM public.{_TRACKING[:63]}", result.sql)
+        self.assertIn('"PLAYER_NAME", "DIST_MILES"', result.sql)
+
+    def test_unknown_names_raise_postgres_style_errors(self):
+        with self.assertRaises(SqlPreflightError) as ctx:
+            preflight_sql("SELECT player_name, fg_pct FROM player_game_logs", _catalog())
+        self.assertEqual(str(ctx.exception), 'column "fg_pct" does not exist')
+        with self.assertRaises(SqlPreflightError) as ctx:
+            preflight_sql("SELECT pts FROM public.all_players_regular_2031_2032", _catalog())
+        self.assertIn('relation "public.all_players_regular_2031_2032" does not exist', str(ctx.exception))
+
+    def test_ctes_derived_tables_and_correlated_references_are_not_judged(self):
+        sql = (
+            "WITH recent AS (SELECT player_name, pts FROM player_game_logs) "
+            "SELECT r.player_name, r.anything FROM recent r "
+            "WHERE EXISTS (SELECT 1 FROM all_players_regular_2023_2024 a WHERE a.player_name = r.player_name)"
+        )
+        self.assertEqual(check_sql(sql, _catalog()).problems, [])
+
+
+class TestAutoRepair(unittest.TestCase):
+    def _repair(self, sql):
+        result = auto_repair_sql(sql, _catalog())
+        return result.sql if result else None
+
+    def test_differently_truncated_table_and_near_miss_column(self):
+        self.assertEqual(
+            self._repair(
+                "SELECT player_name, deflection "
+                "FROM nba_hustle_season_2023_24_season_type_regular_season_per_mode"
+            ),
+            'SELECT "PLAYER_NAME", "DEFLECTIONS" FROM nba_hustle_season_2023_24_season_type_regular_season_per_mo',
+        )
+
+    def test_game_log_percentage_is_computed_from_makes_and_attempts(self):
+        self.assertEqual(
+            self._repair("SELECT player_name, fg_pct FROM player_game_logs"),
+            "SELECT player_name, (CAST(fgm AS DOUBLE PRECISION) / NULLIF(fga, 0)) AS fg_pct FROM player_game_logs",
+        )
+
+    def test_missing_stat_swaps_to_the_sibling_family(self):
+        repaired = self._repair("SELECT player_name, ts_pct FROM all_players_regular_2023_2024")
+        self.assertEqual(
+            repaired,
+            'SELECT "PLAYER_NAME", "TS_PCT" FROM nba_advanced_season_2023_24_season_type_regular_season_per',
+        )
+
+    def test_unresolvable_names_are_left_for_the_llm(self):
+        # A season that is not loaded must not be fuzzed onto a neighbouring one.
+        self.assertIsNone(self._repair("SELECT pts FROM all_players_regular_2022_2023"))
+        self.assertIsNone(self._repair("SELECT player_name, fg3_pct FROM player_game_logs"))
+        self.assertIsNone(self._repair("SELECT player_name, pts FROM player_game_logs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for intent-scoped SQL prompt assembly (no database or OpenAI required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.sql_prompt import (  # noqa: E402
+    PromptTokenStats,
+    build_sql_prompt,
+    estimate_tokens,
+    question_scopes,
+    schema_sections_for,
+)
+
+
+def _prompt(question: str) -> str:
+    return build_sql_prompt(question, "SCHEMA", question_scopes(question))
+
+
+class TestQuestionScopes(unittest.TestCase):
+    def test_scopes_by_intent(self):
+        self.assertEqual(question_scopes("Who are the top 10 scorers this season"), frozenset())
+        self.assertIn("specialty", question_scopes("Who leads in deflections this season?"))
+        self.assertIn("team", question_scopes("What seed are the Warriors?"))
+        self.assertEqual(question_scopes("Compare LeBron and Curry"), frozenset({"compare", "career"}))
+
+    def test_schema_sections(self):
+        self.assertEqual(schema_sections_for(()), frozenset({"all_players", "player_game_logs"}))
+        self.assertIn("nba_standings", schema_sections_for({"team"}))
+
+
+class TestBuildSqlPrompt(unittest.TestCase):
+    def test_static_core_is_a_shared_prefix(self):
+        leaderboard = _prompt("Who are the top 10 scorers this season")
+        hustle = _prompt("Who leads in deflections this season?")
+        core_end = leaderboard.index("DATABASE SCHEMA:")
+        self.assertEqual(hustle[:core_end], leaderboard[:core_end])
+        self.assertTrue(hustle.rstrip().endswith("Who leads in deflections this season?\n\nGenerate the SQL:"))
+
+    def test_full_prompt_has_every_rule(self):
+        full = build_sql_prompt("q", "SCHEMA")
+        for rule in range(17):
+            self.assertIn(f"RULE {rule} —", full)
+        self.assertTrue(full.rstrip().endswith("Generate the SQL:"))
+
+    def test_leaderboard_prompt_leaves_out_extended_families(self):
+        prompt = _prompt("Who are the top 10 scorers this season")
+        self.assertIn("RULE 7 —", prompt)
+        self.assertIn('Q: "Who are the top 10 scorers this season"', prompt)
+        for absent in ("RULE 0 —", "RULE 11 —", "TEXT-STORED NUMERIC COLUMNS", 'Q: "Who leads in deflections'):
+            self.assertNotIn(absent, prompt)
+        self.assertLess(estimate_tokens(prompt), estimate_tokens(build_sql_prompt("q", "SCHEMA")) * 0.6)
+
+    def test_specialty_prompt_pulls_in_routing_casts_and_examples(self):
+        prompt = _prompt("Who leads in deflections this season?")
+        for present in ("TYPE C —", "RULE 0 —", "RULE 11 —", "TEXT-STORED NUMERIC COLUMNS", 'Q: "Who leads in deflections'):
+            self.assertIn(present, prompt)
+        self.assertNotIn("RULE 8 —", prompt)
+
+
+class TestPromptTokenStats(unittest.TestCase):
+    def test_counts_and_reduction(self):
+        stats = PromptTokenStats()
+        stats.record(frozenset(), 500, 1000, {"prompt_tokens": 480, "cached_tokens": 240, "completion_tokens": 40})
+        stats.record(None, 1000, 1000)
+        snap = stats.snapshot()
+        self.assertEqual(snap["requests"], 2)
+        self.assertEqual(snap["scoped_requests"], 1)
+        self.assertEqual(snap["avg_prompt_tokens"], 480)
+        self.assertEqual(snap["cached_ratio"], 0.5)
+        self.assertEqual(snap["estimated_reduction"], 0.25)
+        self.assertEqual(snap["last"]["scopes"], "all")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit tests for question-template slot extraction and SQL parameterization.
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Interpreter.sql_templates import fill_sql_template, parameterize_sql, question_slots  # noqa: E402
+
+_LEBRON_SQL = (
+    "SELECT player_name, pts, '2012-13' AS season_label "
+    "FROM public.all_players_regular_2012_2013 WHERE (player_name ILIKE '%LeBron James%')"
+)
+
+
+class TestQuestionSlots(unittest.TestCase):
+    def test_players_and_season_become_placeholders(self):
+        lebron = question_slots("lebron james 2012 stats", ["LeBron James"], (2012, 2013), None)
+        durant = question_slots("kevin durant 2016 stats", ["Kevin Durant"], (2016, 2017), None)
+        self.assertEqual(lebron.template, "{player0} {season} stats")
+        self.assertEqual(lebron.template, durant.template)
+        self.assertEqual(durant.players, ("Kevin Durant",))
+
+    def test_players_are_numbered_by_position(self):
+        slots = question_slots(
+            "compare stephen curry and lebron james 2015 16", ["LeBron James", "Stephen Curry"], (2015, 2016), None
+        )
+        self.assertEqual(slots.template, "compare {player0} and {player1} {season}")
+        self.assertEqual(slots.players, ("Stephen Curry", "LeBron James"))
+
+    def test_nth_season_ordinal(self):
+        slots = question_slots("luka doncic third season", ["Luka Doncic"], (2024, 2025), 3, {"third": 3})
+        self.assertEqual(slots.template, "{player0} {nth} season")
+        self.assertIsNone(slots.season)
+
+    def test_unslotted_years_and_slotless_questions_are_rejected(self):
+        self.assertIsNone(question_slots("lebron james from 2010 to 2015", ["LeBron James"], (2010, 2011), None))
+        self.assertIsNone(question_slots("who led the league this season", [], (2024, 2025), None))
+
+
+class TestParameterizeSql(unittest.TestCase):
+    def test_round_trip_to_a_new_player_and_season(self):
+        slots = question_slots("lebron james 2012 stats", ["LeBron James"], (2012, 2013), None)
+        template = parameterize_sql(_LEBRON_SQL, slots)
+        self.assertNotIn("2012", template)
+        self.assertNotIn("LeBron", template)
+
+        durant = question_slots("kevin durant 2016 stats", ["Kevin Durant"], (2016, 2017), None)
+        self.assertEqual(
+            fill_sql_template(template, durant),
+            "SELECT player_name, pts, '2016-17' AS season_label "
+            "FROM public.all_players_regular_2016_2017 WHERE (player_name ILIKE '%Kevin Durant%')",
+        )
+
+    def test_unrecognized_slot_usage_is_not_templated(self):
+        slots = question_slots("lebron james 2012 stats", ["LeBron James"], (2012, 2013), None)
+        # Surname-only literal: the name slot cannot be substituted cleanly.
+        self.assertIsNone(parameterize_sql(_LEBRON_SQL.replace("%LeBron James%", "%James%"), slots))
+        # A year the question never mentioned (e.g. a model-chosen rookie season).
+        rookie = question_slots("lebron james rookie stats", ["LeBron James"], None, None)
+        self.assertIsNone(
+            parameterize_sql(
+                "SELECT pts FROM all_players_regular_2003_2004 WHERE player_name ILIKE '%LeBron James%'", rookie
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
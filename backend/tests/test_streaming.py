@@ -0,0 +1,101 @@
+"""
+Unit tests for server-side cursor streaming (no database required).
+
+Run from backend directory:
+    python -m unittest discover -s tests -p "test_*.py" -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from decimal import Decimal
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from Executer.streaming import stream_query  # noqa: E402
+
+_DESCRIPTION = [("player_name", 25), ("gp", 23), ("pts", 1700)]
+
+
+class _FakeNamedCursor:
+    def __init__(self, rows, name):
+        self.rows = list(rows)
+        self.name = name
+        self.itersize = None
+        self.description = None
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, sql):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        self.description = _DESCRIPTION
+        self.fetch_sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    def cursor(self, name=None):
+        assert name, "streaming must use a named server-side cursor"
+        cursor = _FakeNamedCursor(self.rows, name)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def _rows(n):
+    return [(f"Player {i}", i, Decimal("10.5") if i % 2 else None) for i in range(n)]
+
+
+class TestStreamQuery(unittest.TestCase):
+    def test_batches_into_typed_columns(self):
+        conn = _FakeConn(_rows(5))
+        result = stream_query(conn, "SELECT 1;", batch_size=2)
+        self.assertEqual(result.row_count, 5)
+        self.assertEqual(result.batches, 3)
+        self.assertFalse(result.truncated)
+        self.assertEqual(conn.cursors[0].sql, "SELECT 1")
+        self.assertTrue(conn.cursors[0].closed)
+        df = result.to_dataframe()
+        self.assertEqual(df["gp"].dtype.kind, "i")
+        self.assertEqual(df["pts"].dtype.kind, "f")
+        self.assertEqual(df["pts"].isna().sum(), 3)
+
+    def test_row_ceiling_sets_truncated(self):
+        conn = _FakeConn(_rows(10))
+        result = stream_query(conn, "SELECT 1", batch_size=4, max_rows=6)
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.row_count, 6)
+        self.assertEqual(sum(conn.cursors[0].fetch_sizes), 7)
+        self.assertTrue(result.to_dataframe().attrs["truncated"])
+
+    def test_exact_ceiling_is_not_truncated(self):
+        result = stream_query(_FakeConn(_rows(6)), "SELECT 1", batch_size=4, max_rows=6)
+        self.assertFalse(result.truncated)
+
+    def test_records_use_python_values(self):
+        records = stream_query(_FakeConn(_rows(2)), "SELECT 1").to_records()
+        self.assertEqual(records[0], {"player_name": "Player 0", "gp": 0, "pts": None})
+        self.assertIsInstance(records[1]["gp"], int)
+        self.assertEqual(records[1]["pts"], 10.5)
+
+    def test_empty_result_keeps_columns(self):
+        df = stream_query(_FakeConn([]), "SELECT 1").to_dataframe()
+        self.assertEqual(list(df.columns), ["player_name", "gp", "pts"])
+        self.assertTrue(df.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()